@@ -5,34 +5,22 @@
 
 
 # Import required packages
-from os import path
-from userInterface import *
+import sys
+from noteMetrics import add_arguments, configure, operation
+from userInterface import userInterface, initialize_state
 
 
+@operation
 def retrieve_max_id():
     """
-    Retrieves maximum ID value from saved notes to help continue from previous state
-    :return: (int) Maximum note ID
+    Opens notes file for session and retrieves maximum ID value from saved notes to help continue from previous state
+    :return: (int) Maximum note ID, None if no notes have been saved
     """
-    notesDictList = []
+    # Journal is opened once, by store of session, which reads only header of index kept next to notes file, unless
+    # index is out of date; Opening journal also discards any change left half-written by an interrupted save
+    initialize_state()
 
-    # Retrieve notes data if there exists non empty notes file
-    if (path.exists('Notes.txt')) and (path.getsize('Notes.txt') != 0):
-        with open('Notes.txt', 'r') as f:
-            for line in f.readlines():
-                # Using yaml to parse dictionary object from string
-                notesDictList.append(yaml.safe_load(line))
-
-        # Store in pandas dataframe for ease of access
-        notesDF = pd.DataFrame(notesDictList)
-
-        # Convert notes ID column from string to integer type
-        notesDF['Note ID'] = pd.to_numeric(notesDF['Note ID'])
-
-        # Generate ID for next new note to be created
-        max_id = notesDF['Note ID'].max()
-
-        return max_id
+    return userInterface.store.idCounter or None
 
 
 def display_menu():
@@ -55,7 +43,10 @@ def display_menu():
     print('7. Save all notes to file.')
     print('8. Restore file contents.')
     print('9. Show notes statistics.')
-    print('10. Exit.')
+    print('10. Search notes.')
+    print('11. Undo or redo last change.')
+    print('12. Show note as it was at a given time.')
+    print('13. Exit.')
 
     print(str(60 * '*'))
 
@@ -66,8 +57,8 @@ def validate_user_input(user_input):
     :param user_input: Input entered by user, in response to primary menu item
     :return: (bool) True if user input is expected, False otherwise
     """
-    if user_input not in ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10']:
-        print('\nERROR : Invalid Input!\nEnter from the given options above (ranging 1-10).')
+    if user_input not in ['1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12', '13']:
+        print('\nERROR : Invalid Input!\nEnter from the given options above (ranging 1-13).')
         print('Starting Over...')
 
         return False
@@ -83,6 +74,10 @@ def main():
     Interacts with userInterface class
     :return: None
     """
+    # Call function to open notes file and retrieve maximum ID value from saved notes to help continue from previous
+    # state
+    retrieve_max_id()
+
     # Loop to keep displaying primary menu item unless user wants to terminate session
     while True:
         # Call function to display primary menu item
@@ -106,6 +101,20 @@ def main():
 
 
 if __name__ == '__main__':
+    # Instrumentation options alone still start interactive menu; other arguments select non-interactive command
+    # mode, see 'python Main.py --help'
+    if len(sys.argv) > 1:
+        import argparse
+
+        metricsArguments, commandArguments = add_arguments(argparse.ArgumentParser(add_help=False)).parse_known_args()
+
+        if commandArguments:
+            from noteCommands import run_command
+
+            sys.exit(run_command(sys.argv[1:]))
+
+        configure(metricsArguments)
+
     main()
 
 # This is end of script.
@@ -4,29 +4,73 @@
 # Saumya Gupta, DS
 
 
+# Import required packages
+import datetime
+from noteBodies import resolve
+
+# Dates are held as integer microseconds since epoch; notes without completion date hold 'NO_DATE', smallest 64-bit
+# integer, which lies far before 'datetime.min', so no date converts to it
+EPOCH = datetime.datetime(1970, 1, 1)
+NO_DATE = -(1 << 63)
+ONE_MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+def to_epoch(dateValue):
+    """
+    Converts datetime to integer microseconds since epoch
+    :param dateValue: (datetime) Timestamp, or None
+    :return: (int) Microseconds since epoch, 'NO_DATE' if 'dateValue' is None
+    """
+    if dateValue is None:
+        return NO_DATE
+
+    return (dateValue - EPOCH) // ONE_MICROSECOND
+
+
+def from_epoch(epochValue):
+    """
+    Converts integer microseconds since epoch back to datetime
+    :param epochValue: (int) Microseconds since epoch, or 'NO_DATE'
+    :return: (datetime) Timestamp, None if 'epochValue' is 'NO_DATE'
+    """
+    if epochValue == NO_DATE:
+        return None
+
+    return EPOCH + datetime.timedelta(0, 0, epochValue)
+
+
 class Note:
     """
-    Represents a single note
+    Represents a single note; dates are held as epoch microseconds and converted to datetime objects on access only,
+    so notes restored from file never build datetime objects until their dates are shown or compared
 
     Attributes
     ----------
     ID : (int) Unique identification number of note
-    dateCreated : (datetime) Creation date of note
-    title : (str) Title of note
-    text : (str) Text/body of note
+    createdEpoch : (int) Creation date of note in microseconds since epoch
+    completedEpoch : (int) Completion date of note in microseconds since epoch, 'NO_DATE' if note has none
+    dateCreated : (datetime) Creation date of note; property over 'createdEpoch'
+    title : (str) Title of note; may be held as lazy handle into notes file, decoded on access
+    text : (str) Text/body of note; may be held as lazy handle into notes file or compressed, decoded on access
     isCompleted : (bool) True if note is completed, otherwise False
-    dateCompleted : (datetime) Completion date of note
+    dateCompleted : (datetime) Completion date of note, None if note has none; property over 'completedEpoch'
+    version : (int) Number of times note has been saved; compared on save to detect changes made by other processes
 
     Methods
     -------
+    from_epochs(ID, createdEpoch, title, text, isCompleted, completedEpoch, version) : Creates note from epoch dates
     update_title(new_title) : Updates title of note
     update_text(new_text) : Updates text/body of note
     change_completion_status() : Toggles completion status of note
     mark_complete(dateCompleted) : Marks note complete
     mark_incomplete() : Marks note incomplete
     get_all_data() : Returns dictionary of notes data
+    copy() : Returns copy of note
     """
-    def __init__(self, ID, dateCreated, title, text, isCompleted, dateCompleted=None):
+    # Fixed attribute slots instead of per-instance dictionary keep memory footprint of each note small
+    __slots__ = ('ID', 'createdEpoch', '_title', '_text', 'isCompleted', 'completedEpoch', 'version')
+
+    def __init__(self, ID, dateCreated, title, text, isCompleted, dateCompleted=None, version=0):
         """
         Initializes note attributes
         :param ID: (int) ID for note generated automatically using incremental counter
@@ -34,6 +78,8 @@ class Note:
         :param title: (str) Title input by user
         :param text: (str) Text/body input by user
         :param isCompleted: (bool) True if note marked completed by user, otherwise False
+        :param dateCompleted: (datetime) Completion date, None if note is not completed
+        :param version: (int) Version counter of saved note, 0 for note never saved
         """
         self.ID = ID
         self.dateCreated = dateCreated
@@ -41,6 +87,101 @@ class Note:
         self.text = text
         self.isCompleted = isCompleted
         self.dateCompleted = dateCompleted
+        self.version = version
+
+    @classmethod
+    def from_epochs(cls, ID, createdEpoch, title, text, isCompleted, completedEpoch=NO_DATE, version=0):
+        """
+        Creates note from dates in epoch microseconds, as read from notes file, without converting them
+        :param ID: (int) Note ID
+        :param createdEpoch: (int) Creation date in microseconds since epoch
+        :param title: (str or LazyText) Title
+        :param text: (str, bytes or LazyText) Text/body, possibly compressed or lazy
+        :param isCompleted: (bool) True if note is complete
+        :param completedEpoch: (int) Completion date in microseconds since epoch, 'NO_DATE' if none
+        :param version: (int) Version counter of saved note
+        :return: (Note) Note object
+        """
+        noteObject = cls.__new__(cls)
+        noteObject.ID = ID
+        noteObject.createdEpoch = createdEpoch
+        noteObject._title = title
+        noteObject._text = text
+        noteObject.isCompleted = isCompleted
+        noteObject.completedEpoch = completedEpoch
+        noteObject.version = version
+
+        return noteObject
+
+    @property
+    def dateCreated(self):
+        """
+        Returns creation date of note
+        :return: (datetime) Creation date
+        """
+        return from_epoch(self.createdEpoch)
+
+    @dateCreated.setter
+    def dateCreated(self, value):
+        """
+        Sets creation date of note
+        :param value: (datetime) Creation date
+        :return: None
+        """
+        self.createdEpoch = to_epoch(value)
+
+    @property
+    def dateCompleted(self):
+        """
+        Returns completion date of note
+        :return: (datetime) Completion date, None if note has none
+        """
+        return from_epoch(self.completedEpoch)
+
+    @dateCompleted.setter
+    def dateCompleted(self, value):
+        """
+        Sets completion date of note
+        :param value: (datetime) Completion date, None to clear it
+        :return: None
+        """
+        self.completedEpoch = to_epoch(value)
+
+    @property
+    def title(self):
+        """
+        Returns title of note, decoding it from notes file if it was restored lazily
+        :return: (str) Title of note
+        """
+        return self._title if isinstance(self._title, str) else resolve(self._title)
+
+    @title.setter
+    def title(self, value):
+        """
+        Sets title of note
+        :param value: (str or LazyText) Title, or lazy handle to title in notes file
+        :return: None
+        """
+        self._title = value
+
+    @property
+    def text(self):
+        """
+        Returns text of note, decoding it from notes file if it was restored lazily, or decompressing it if it is kept
+        compressed
+        :return: (str) Text/body of note
+        """
+        return self._text if isinstance(self._text, str) else resolve(self._text)
+
+    @text.setter
+    def text(self, value):
+        """
+        Sets text of note
+        :param value: (str, bytes or LazyText) Text, compressed text (see 'TextCodec.pack()'), or lazy handle to text
+                      in notes file
+        :return: None
+        """
+        self._text = value
 
     def update_title(self, new_title):
         """
@@ -79,7 +220,7 @@ class Note:
         Marks note incomplete; completion date is set to 'None': sets 'isCompleted' to False
         :return: None
         """
-        self.dateCompleted = None
+        self.completedEpoch = NO_DATE
         self.isCompleted = False
 
     def get_all_data(self):
@@ -93,7 +234,15 @@ class Note:
             'Text': self.text,
             'Completed': 'Yes' if self.isCompleted else 'No',
             'Creation Date': str(self.dateCreated),
-            'Completion Date': str(self.dateCompleted) if self.dateCompleted else None
+            'Completion Date': None if self.completedEpoch == NO_DATE else str(self.dateCompleted)
         }
 
+    def copy(self):
+        """
+        Returns copy of note; lazily restored title and text stay lazy in copy
+        :return: (Note) Note with same attributes
+        """
+        return Note.from_epochs(self.ID, self.createdEpoch, self._title, self._text, self.isCompleted,
+                                self.completedEpoch, self.version)
+
 # This is end of script.
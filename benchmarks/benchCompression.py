@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import subprocess
+import tracemalloc
+
+# Benchmarks are run from the 'benchmarks' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from syntheticNotes import generate_notes
+
+# Compression modes compared; mode is read by program modules on import, so each is measured in its own process
+MODES = ('', 'zlib')
+
+# Average lengths of note texts in characters
+BODY_SIZES = (100, 500, 2000)
+
+# Notes read at random positions to time single reads
+READS = 2000
+
+
+def measure(notesCount, bodySize):
+    """
+    Measures file size, memory held by restored notes, restore throughput, read latency and compaction time in
+    compression mode of current process
+    :param notesCount: (int) Number of notes
+    :param bodySize: (int) Average length of note texts in characters
+    :return: (dict) Measurements
+    """
+    from noteBodies import COMPRESS_MODE
+    from noteFormats import write_notes
+    from notesStore import NotesStore
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        filePath = os.path.join(tempDir, 'Notes.txt')
+
+        startTime = time.perf_counter()
+        write_notes(filePath, generate_notes(notesCount, bodySize=bodySize), compressMode=COMPRESS_MODE)
+        writeTime = time.perf_counter() - startTime
+        fileBytes = os.path.getsize(filePath)
+
+        store = NotesStore(filePath)
+        tracemalloc.start()
+        startTime = time.perf_counter()
+        store.restore()
+        restoreTime = time.perf_counter() - startTime
+        memoryBytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+        IDs = random.Random(0).choices(range(1, notesCount + 1), k=READS)
+        startTime = time.perf_counter()
+
+        for ID in IDs:
+            store.get(ID).text
+
+        readTime = (time.perf_counter() - startTime) / READS
+
+        startTime = time.perf_counter()
+        store.journal.compact()
+        compactTime = time.perf_counter() - startTime
+
+    return {'file MB': fileBytes / (1 << 20), 'memory MB': memoryBytes / (1 << 20),
+            'write notes/s': notesCount / writeTime, 'restore notes/s': notesCount / restoreTime,
+            'read us': 1e6 * readTime, 'compact s': compactTime}
+
+
+def main():
+    """
+    Compares uncompressed note texts with texts compressed with shared zlib dictionary, for several text sizes
+    Usage: python benchmarks/benchCompression.py [number of notes]
+    :return: None
+    """
+    if len(sys.argv) > 3 and sys.argv[1] == '--measure':
+        print(json.dumps(measure(int(sys.argv[2]), int(sys.argv[3]))))
+        return
+
+    notesCount = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    print('notes: %d\n' % notesCount)
+    print('%6s %6s %9s %10s %14s %16s %9s %10s' % ('text', 'mode', 'file MB', 'memory MB', 'write notes/s',
+                                                   'restore notes/s', 'read us', 'compact s'))
+
+    for bodySize in BODY_SIZES:
+        for mode in MODES:
+            completedProcess = subprocess.run([sys.executable, os.path.abspath(__file__), '--measure', str(notesCount),
+                                               str(bodySize)], env=dict(os.environ, NOTES_COMPRESS=mode),
+                                              capture_output=True, text=True, check=True)
+            results = json.loads(completedProcess.stdout)
+
+            print('%6d %6s %9.1f %10.1f %14.0f %16.0f %9.2f %10.2f' % (bodySize, mode or 'off', results['file MB'],
+                                                                        results['memory MB'],
+                                                                        results['write notes/s'],
+                                                                        results['restore notes/s'],
+                                                                        results['read us'], results['compact s']))
+
+
+if __name__ == '__main__':
+    main()
+
+# This is end of script.
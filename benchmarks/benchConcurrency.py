@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import time
+import random
+import tempfile
+import threading
+
+# Benchmarks are run from the 'benchmarks' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notesStore import NotesStore
+
+# Share of each operation in mixed workload; the rest are reads
+OPERATION_WEIGHTS = (('create', 30), ('update', 25), ('complete', 10), ('delete', 5), ('read', 22), ('page', 5),
+                     ('stats', 1), ('search', 2))
+
+THREAD_COUNTS = (1, 2, 4, 8, 16)
+
+
+def run_worker(store, operationsCount, seed, errors):
+    """
+    Runs mixed workload against store from one thread
+    :param store: (NotesStore) Thread-safe store
+    :param operationsCount: (int) Number of operations to run
+    :param seed: (int) Random seed of this thread
+    :param errors: (list) List collecting unexpected exceptions
+    :return: None
+    """
+    randomGenerator = random.Random(seed)
+    operations = randomGenerator.choices([name for name, _ in OPERATION_WEIGHTS],
+                                         [weight for _, weight in OPERATION_WEIGHTS], k=operationsCount)
+
+    try:
+        for operation in operations:
+            ID = randomGenerator.randint(1, max(store.idCounter, 1))
+
+            try:
+                if operation == 'create':
+                    store.create('Title %d' % seed, 'Text of note written by thread %d' % seed)
+
+                elif operation == 'update':
+                    store.update(ID, text='Updated by thread %d' % seed)
+
+                elif operation == 'complete':
+                    store.complete(ID)
+
+                elif operation == 'delete':
+                    store.delete(ID)
+
+                elif operation == 'read':
+                    store.get(ID)
+
+                elif operation == 'page':
+                    store.page(randomGenerator.randint(0, max(store.count() - 20, 0)))
+
+                elif operation == 'stats':
+                    store.stats()
+
+                else:
+                    store.search('thread')
+
+            except LookupError:
+                # Note was deleted by another thread, or never created
+                pass
+
+    except Exception as error:
+        errors.append(error)
+
+
+def check_store(store):
+    """
+    Checks that statistics and notes of store agree after stress run
+    :param store: (NotesStore) Store to check
+    :return: None
+    :raises AssertionError: If store is inconsistent
+    """
+    assert store.noteStats.total_count() == store.count(), 'statistics and notes disagree'
+    assert all(ID == noteObject.ID for ID, noteObject in store.noteObjectList.items()), 'note stored under wrong ID'
+    assert max(store.noteObjectList, default=0) <= store.idCounter, 'note ID above allocated IDs'
+
+    completedCount = sum(1 for noteObject in store.noteObjectList.values() if noteObject.isCompleted)
+    assert store.noteStats.incomplete_count() == store.count() - completedCount, 'completion counters drifted'
+
+
+def main():
+    """
+    Measures throughput of mixed workload on thread-safe store as number of threads grows, and checks store
+    consistency after every run; same number of operations is spread over threads, so store grows equally in
+    every run
+    Usage: python benchmarks/benchConcurrency.py [number of operations]
+    :return: None
+    """
+    operationsCount = int(sys.argv[1]) if len(sys.argv) > 1 else 80000
+
+    print('%8s %12s %12s %12s' % ('threads', 'operations', 'seconds', 'ops/s'))
+
+    for threadCount in THREAD_COUNTS:
+        with tempfile.TemporaryDirectory() as tempDir:
+            store = NotesStore(os.path.join(tempDir, 'Notes.txt'), threadSafe=True)
+            store.bulk_create(('Seed title %d' % ID, 'Seed text %d' % ID, False) for ID in range(1000))
+
+            errors = []
+            threads = [threading.Thread(target=run_worker, args=(store, operationsCount // threadCount, seed, errors))
+                       for seed in range(threadCount)]
+
+            startTime = time.perf_counter()
+
+            for thread in threads:
+                thread.start()
+
+            for thread in threads:
+                thread.join()
+
+            elapsedTime = time.perf_counter() - startTime
+
+            if errors:
+                raise errors[0]
+
+            check_store(store)
+            store.save()
+
+            # Everything saved must read back as is
+            restoredStore = NotesStore(store.filePath)
+            restoredStore.restore()
+            assert restoredStore.count() == store.count(), 'saved notes differ from notes in session'
+
+        totalOperations = threadCount * (operationsCount // threadCount)
+
+        print('%8d %12d %12.2f %12.0f' % (threadCount, totalOperations, elapsedTime, totalOperations / elapsedTime))
+
+
+if __name__ == '__main__':
+    main()
+
+# This is end of script.
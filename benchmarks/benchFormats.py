@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import time
+import datetime
+import tempfile
+
+# Benchmarks are run from the 'benchmarks' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Note import Note
+from noteFormats import FORMAT_TEXT, FORMAT_BINARY, read_notes, write_notes
+
+
+def generate_notes(notesCount, textLength=200):
+    """
+    Generates synthetic note objects
+    :param notesCount: (int) Number of notes to generate
+    :param textLength: (int) Length of each note text
+    :return: (generator) Note objects
+    """
+    dateStart = datetime.datetime(2021, 1, 1, 8, 30, 15, 123456)
+
+    for ID in range(1, notesCount + 1):
+        dateCreated = dateStart + datetime.timedelta(minutes=ID)
+        isCompleted = ID % 3 == 0
+
+        yield Note(ID, dateCreated, 'Note title ' + str(ID), ('text %d ' % ID * textLength)[:textLength], isCompleted,
+                   dateCreated + datetime.timedelta(days=ID % 30) if isCompleted else None)
+
+
+def time_format(filePath, notesList, fileFormat):
+    """
+    Times save and load of notes in given format
+    :param filePath: (str) Path of file used for benchmark
+    :param notesList: (list) Note objects to save
+    :param fileFormat: (str) Format to benchmark
+    :return: (tuple) Save seconds, load seconds and file size in bytes
+    """
+    startTime = time.perf_counter()
+    write_notes(filePath, notesList, fileFormat)
+    saveTime = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    loadedCount = sum(1 for _ in read_notes(filePath))
+    loadTime = time.perf_counter() - startTime
+
+    assert loadedCount == len(notesList)
+
+    return saveTime, loadTime, os.path.getsize(filePath)
+
+
+def main():
+    """
+    Compares save and load throughput of plain text and binary notes file formats
+    Usage: python benchmarks/benchFormats.py [number of notes]
+    :return: None
+    """
+    notesCount = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    notesList = list(generate_notes(notesCount))
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        filePath = os.path.join(tempDir, 'Notes.txt')
+
+        results = {}
+
+        for fileFormat in (FORMAT_TEXT, FORMAT_BINARY):
+            results[fileFormat] = time_format(filePath, notesList, fileFormat)
+
+            saveTime, loadTime, fileSize = results[fileFormat]
+
+            print('%-7s save: %8.2f s (%10.0f notes/s)  load: %8.2f s (%10.0f notes/s)  size: %8.1f MB'
+                  % (fileFormat, saveTime, notesCount / saveTime, loadTime, notesCount / loadTime, fileSize / 1e6))
+
+    print('binary speedup - save: %.1fx  load: %.1fx'
+          % (results[FORMAT_TEXT][0] / results[FORMAT_BINARY][0], results[FORMAT_TEXT][1] / results[FORMAT_BINARY][1]))
+
+
+if __name__ == '__main__':
+    main()
+
+# This is end of script.
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import time
+import random
+import datetime
+import tempfile
+import tracemalloc
+
+# Benchmarks are run from the 'benchmarks' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notesStore import NotesStore
+from noteHistory import NoteHistory
+from syntheticNotes import generate_notes
+
+# Numbers of changes history keeps; 0 keeps no history
+RETENTIONS = (0, 1000, 10000, 100000)
+
+# Average length of note texts in characters
+BODY_SIZE = 2000
+
+
+def run_changes(store, changesCount, seed):
+    """
+    Changes random notes: mostly titles or completion status, which leave texts shared with earlier versions, and
+    some texts
+    :param store: (NotesStore) Store to change
+    :param changesCount: (int) Number of changes
+    :param seed: (int) Random seed
+    :return: None
+    """
+    randomGenerator = random.Random(seed)
+    IDs = list(store.noteObjectList)
+
+    for changeNumber in range(changesCount):
+        ID = randomGenerator.choice(IDs)
+        changeKind = randomGenerator.random()
+
+        if changeKind < 0.6:
+            store.update(ID, title='Title of change ' + str(changeNumber))
+
+        elif changeKind < 0.9:
+            store.update(ID, isCompleted=not store.get(ID).isCompleted)
+
+        else:
+            store.update(ID, text='Text of change ' + str(changeNumber))
+
+
+def main():
+    """
+    Measures memory history holds and time changes take for growing retention, along with undo and 'note_as_of()'
+    lookups; memory is compared with copying title and text of every replaced version
+    Usage: python benchmarks/benchHistory.py [number of notes] [number of changes]
+    :return: None
+    """
+    notesCount = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    changesCount = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+
+    print('notes: %d, changes: %d, average text: %d characters\n' % (notesCount, changesCount, BODY_SIZE))
+    print('%10s %8s %12s %14s %14s %12s %12s' % ('retention', 'kept', 'memory MB', 'full copies MB', 'us/change',
+                                                 'us/undo', 'us/as-of'))
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        for maxChanges in RETENTIONS:
+            store = NotesStore(os.path.join(tempDir, 'Notes.txt'))
+            store.history = NoteHistory(maxChanges=maxChanges)
+
+            for noteObject in generate_notes(notesCount, bodySize=BODY_SIZE):
+                store.noteObjectList[noteObject.ID] = noteObject
+
+            startDate = datetime.datetime.now()
+
+            # Memory still allocated after changes, less notes in session, is held by history
+            tracemalloc.start()
+            startTime = time.perf_counter()
+            run_changes(store, changesCount, seed=maxChanges)
+            changeTime = time.perf_counter() - startTime
+
+            store.journal.pendingChanges.clear()
+            store.baseNotes.clear()
+            historyBytes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+
+            # Copying every kept version would duplicate its title and text
+            copiedBytes = sum(sys.getsizeof(noteObject.title) + sys.getsizeof(noteObject.text)
+                              for versions in store.history.versions.values() for noteObject in versions
+                              if noteObject is not None)
+
+            asOfDate = startDate + (datetime.datetime.now() - startDate) / 2
+            startTime = time.perf_counter()
+
+            for ID in range(1, notesCount + 1):
+                try:
+                    store.note_as_of(ID, asOfDate)
+
+                except LookupError:
+                    pass
+
+            asOfTime = (time.perf_counter() - startTime) / notesCount
+
+            undoCount = min(1000, len(store.history.undoSteps))
+            startTime = time.perf_counter()
+
+            for _ in range(undoCount):
+                store.undo()
+
+            undoTime = (time.perf_counter() - startTime) / max(undoCount, 1)
+
+            print('%10d %8d %12.1f %14.1f %14.1f %12.1f %12.2f' % (maxChanges, store.history.changes_count(),
+                                                                   historyBytes / (1 << 20), copiedBytes / (1 << 20),
+                                                                   1e6 * changeTime / changesCount, 1e6 * undoTime,
+                                                                   1e6 * asOfTime))
+
+
+if __name__ == '__main__':
+    main()
+
+# This is end of script.
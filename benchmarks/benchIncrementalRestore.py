@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import time
+import datetime
+import tempfile
+
+# Benchmarks are run from the 'benchmarks' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Note import Note
+from noteFormats import write_notes
+from notesStore import NotesStore
+
+# Notes changed by other session between restores
+CHANGED_COUNTS = (10, 1000, 10000)
+
+
+def time_restore(store):
+    """
+    Restores notes into store
+    :param store: (NotesStore) Store to restore into
+    :return: (tuple) Seconds taken and number of notes restored
+    """
+    startTime = time.perf_counter()
+    restoredNotes = store.restore()
+
+    return time.perf_counter() - startTime, len(restoredNotes)
+
+
+def main():
+    """
+    Measures restore of notes another session saved since last restore: incremental restore of session that restored
+    before, against full restore of new session; once with changes still in journal and once after compaction
+    Usage: python benchmarks/benchIncrementalRestore.py [number of notes]
+    :return: None
+    """
+    notesCount = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    dateCreated = datetime.datetime(2021, 1, 1)
+
+    print('notes: %d\n' % notesCount)
+    print('%8s %12s %10s %14s %10s' % ('changed', 'compacted', 'full s', 'incremental s', 'speedup'))
+
+    for changedCount in CHANGED_COUNTS:
+        for isCompacted in (False, True):
+            with tempfile.TemporaryDirectory() as tempDir:
+                filePath = os.path.join(tempDir, 'Notes.txt')
+
+                write_notes(filePath, (Note(ID, dateCreated, 'Note title ' + str(ID), 'Note text ' + str(ID), False)
+                                       for ID in range(1, notesCount + 1)))
+
+                readerStore, writerStore = NotesStore(filePath), NotesStore(filePath)
+                readerStore.restore()
+                writerStore.restore()
+
+                # Half of changes update saved notes, half create new ones
+                for ID in range(1, changedCount // 2 + 1):
+                    writerStore.update(ID * (notesCount // changedCount), text='Changed text ' + str(ID))
+
+                writerStore.bulk_create(('New title', 'New text', False) for _ in range(changedCount // 2))
+                writerStore.save(allowCompaction=False)
+
+                if isCompacted:
+                    writerStore.journal.compact()
+
+                incrementalTime, restoredCount = time_restore(readerStore)
+                fullTime, _ = time_restore(NotesStore(filePath))
+
+                assert restoredCount == changedCount // 2, 'new notes not restored'
+                assert readerStore.count() == writerStore.count(), 'sessions differ'
+
+                print('%8d %12s %10.3f %14.3f %9.1fx' % (changedCount, 'yes' if isCompacted else 'no', fullTime,
+                                                         incrementalTime, fullTime / incrementalTime))
+
+
+if __name__ == '__main__':
+    main()
+
+# This is end of script.
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import datetime
+import tracemalloc
+
+# Benchmarks are run from the 'benchmarks' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Note import Note
+
+
+class DictNote:
+    """
+    Represents a single note laid out as before 'Note' got attribute slots: plain attributes in per-instance dictionary
+    """
+    def __init__(self, ID, dateCreated, title, text, isCompleted, dateCompleted=None):
+        """
+        Initializes note attributes
+        """
+        self.ID = ID
+        self.dateCreated = dateCreated
+        self.title = title
+        self.text = text
+        self.isCompleted = isCompleted
+        self.dateCompleted = dateCompleted
+
+
+def measure(noteClass, notesCount, titles, texts):
+    """
+    Measures memory allocated by note objects of given class, excluding shared title and text strings
+    :param noteClass: (type) Class used to build notes
+    :param notesCount: (int) Number of notes to build
+    :param titles: (list) Title strings, shared by both layouts
+    :param texts: (list) Text strings, shared by both layouts
+    :return: (int) Bytes allocated
+    """
+    dateStart = datetime.datetime(2021, 1, 1, 8, 30, 15, 123456)
+
+    tracemalloc.start()
+
+    noteObjectList = {}
+
+    for ID in range(1, notesCount + 1):
+        dateCreated = dateStart + datetime.timedelta(minutes=ID)
+        isCompleted = ID % 3 == 0
+
+        noteObjectList[ID] = noteClass(ID, dateCreated, titles[ID - 1], texts[ID - 1], isCompleted,
+                                       dateCreated + datetime.timedelta(days=1) if isCompleted else None)
+
+    allocatedBytes, _ = tracemalloc.get_traced_memory()
+
+    tracemalloc.stop()
+
+    return allocatedBytes
+
+
+def main():
+    """
+    Compares memory footprint of note layouts, including 'noteObjectList' dictionary holding them
+    Usage: python benchmarks/benchMemory.py [number of notes]
+    :return: None
+    """
+    notesCount = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    # Strings are built once up front, so only per-note overhead is measured
+    titles = ['Note title ' + str(ID) for ID in range(1, notesCount + 1)]
+    texts = ['Note text ' + str(ID) for ID in range(1, notesCount + 1)]
+
+    results = {}
+
+    for noteClass in (DictNote, Note):
+        results[noteClass.__name__] = measure(noteClass, notesCount, titles, texts)
+
+        print('%-9s %8.1f MB  (%6.1f bytes/note)'
+              % (noteClass.__name__, results[noteClass.__name__] / 1e6, results[noteClass.__name__] / notesCount))
+
+    print('memory saved: %.1f%%' % (100 * (1 - results['Note'] / results['DictNote'])))
+
+
+if __name__ == '__main__':
+    main()
+
+# This is end of script.
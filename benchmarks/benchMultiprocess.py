@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import time
+import random
+import tempfile
+import multiprocessing
+
+# Benchmarks are run from the 'benchmarks' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notesStore import NotesStore
+
+PROCESS_COUNTS = (1, 2, 4, 8)
+
+# Notes every process updates, so saves have to merge changes of other processes
+SHARED_NOTES = 200
+
+# Changes made between two saves of one process
+SAVE_EVERY = 50
+
+
+def run_writer(filePath, operationsCount, seed, resultQueue):
+    """
+    Runs write workload from one process: creates own notes, updates own and shared notes and saves periodically
+    :param filePath: (str) Path of shared notes file
+    :param operationsCount: (int) Number of changes to make
+    :param seed: (int) Random seed of this process
+    :param resultQueue: (Queue) Queue receiving created IDs, last texts of own notes, saves and conflicts
+    :return: None
+    """
+    randomGenerator = random.Random(seed)
+    store = NotesStore(filePath)
+    store.restore()
+
+    ownIDs, conflictIDs, savesCount = [], [], 0
+
+    for operationNumber in range(1, operationsCount + 1):
+        choice = randomGenerator.random()
+
+        if choice < 0.4 or not ownIDs:
+            ownIDs.append(store.create('Note of process %d' % seed, 'Created by process %d' % seed).ID)
+
+        elif choice < 0.7:
+            store.update(randomGenerator.choice(ownIDs), text='Text %d of process %d' % (operationNumber, seed))
+
+        else:
+            # Processes update different fields of shared notes, except when more processes than fields run
+            sharedID = randomGenerator.randint(1, SHARED_NOTES)
+
+            if seed % 2:
+                store.update(sharedID, title='Title %d of process %d' % (operationNumber, seed))
+
+            else:
+                store.update(sharedID, text='Text %d of process %d' % (operationNumber, seed))
+
+        if operationNumber % SAVE_EVERY == 0 or operationNumber == operationsCount:
+            store.save(conflictIDs)
+            savesCount += 1
+
+    resultQueue.put((ownIDs, {ID: store.get(ID).text for ID in ownIDs}, savesCount, len(conflictIDs)))
+
+
+def check_file(filePath, results):
+    """
+    Checks that no note or change made by any process was lost and no ID was given out twice
+    :param filePath: (str) Path of shared notes file
+    :param results: (list) Results sent by writer processes
+    :return: None
+    :raises AssertionError: If notes file misses notes or changes
+    """
+    store = NotesStore(filePath)
+    store.restore()
+
+    createdIDs = [ID for ownIDs, _, _, _ in results for ID in ownIDs]
+
+    assert len(createdIDs) == len(set(createdIDs)), 'same ID given to notes of different processes'
+    assert store.count() == SHARED_NOTES + len(createdIDs), 'notes lost'
+
+    for _, ownTexts, _, _ in results:
+        for ID, text in ownTexts.items():
+            assert store.get(ID).text == text, 'change to note ID %d lost' % ID
+
+
+def main():
+    """
+    Measures write throughput of several processes sharing one notes file, and checks file after every run;
+    same number of changes is spread over processes
+    Usage: python benchmarks/benchMultiprocess.py [number of changes]
+    :return: None
+    """
+    operationsCount = int(sys.argv[1]) if len(sys.argv) > 1 else 16000
+
+    print('%10s %12s %12s %12s %12s %12s' % ('processes', 'changes', 'seconds', 'changes/s', 'saves/s',
+                                             'conflicts'))
+
+    for processCount in PROCESS_COUNTS:
+        with tempfile.TemporaryDirectory() as tempDir:
+            filePath = os.path.join(tempDir, 'Notes.txt')
+
+            store = NotesStore(filePath)
+            store.bulk_create(('Shared title %d' % ID, 'Shared text %d' % ID, False) for ID in range(SHARED_NOTES))
+            store.save()
+
+            resultQueue = multiprocessing.Queue()
+            processes = [multiprocessing.Process(target=run_writer,
+                                                 args=(filePath, operationsCount // processCount, seed, resultQueue))
+                         for seed in range(processCount)]
+
+            startTime = time.perf_counter()
+
+            for process in processes:
+                process.start()
+
+            # Results are collected before joining, so no process blocks on a full queue
+            results = [resultQueue.get() for _ in processes]
+
+            for process in processes:
+                process.join()
+
+            elapsedTime = time.perf_counter() - startTime
+
+            check_file(filePath, results)
+
+        totalOperations = processCount * (operationsCount // processCount)
+        savesCount = sum(result[2] for result in results)
+        conflictsCount = sum(result[3] for result in results)
+
+        print('%10d %12d %12.2f %12.0f %12.0f %12d' % (processCount, totalOperations, elapsedTime,
+                                                       totalOperations / elapsedTime, savesCount / elapsedTime,
+                                                       conflictsCount))
+
+
+if __name__ == '__main__':
+    main()
+
+# This is end of script.
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import time
+import datetime
+import tempfile
+
+# Benchmarks are run from the 'benchmarks' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Note import Note
+from noteFormats import FORMAT_TEXT, write_notes
+from noteLoader import iter_notes
+
+WORKER_COUNTS = (1, 2, 4, 8)
+
+
+def main():
+    """
+    Measures time to parse plain text notes file with growing number of worker processes, and checks that every
+    run yields same notes in same order
+    Usage: python benchmarks/benchParallelRestore.py [number of notes]
+    :return: None
+    """
+    notesCount = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    dateCreated = datetime.datetime(2021, 1, 1, 9, 30)
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        filePath = os.path.join(tempDir, 'Notes.txt')
+
+        write_notes(filePath, (Note(ID, dateCreated, 'Note title ' + str(ID), 'Note text of note number ' + str(ID),
+                                    ID % 3 == 0, dateCreated if ID % 3 == 0 else None)
+                               for ID in range(1, notesCount + 1)), FORMAT_TEXT)
+
+        print('notes: %d, file: %.1f MB, cores: %d\n' % (notesCount, os.path.getsize(filePath) / (1 << 20),
+                                                         os.cpu_count() or 1))
+        print('%8s %10s %12s %10s %12s' % ('workers', 'seconds', 'notes/s', 'speedup', 'efficiency'))
+
+        serialTime, serialIDs = None, None
+
+        for workersCount in WORKER_COUNTS:
+            startTime = time.perf_counter()
+            noteIDs = [noteObject.ID for noteObject in iter_notes(filePath, workersCount=workersCount)]
+            elapsedTime = time.perf_counter() - startTime
+
+            serialTime = serialTime or elapsedTime
+            serialIDs = serialIDs or noteIDs
+            assert noteIDs == serialIDs, 'parallel parsing changed notes or their order'
+
+            print('%8d %10.2f %12.0f %9.2fx %11.0f%%' % (workersCount, elapsedTime, notesCount / elapsedTime,
+                                                         serialTime / elapsedTime,
+                                                         100 * serialTime / elapsedTime / workersCount))
+
+
+if __name__ == '__main__':
+    main()
+
+# This is end of script.
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import time
+import datetime
+import tempfile
+
+# Benchmarks are run from the 'benchmarks' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notesStore import NotesStore
+from syntheticNotes import START_DATE, create_notes_file
+
+# Filtered queries timed: name and arguments of 'NotesStore.query()'
+QUERIES = (('incomplete created in month', {'isCompleted': False, 'createdFrom': datetime.datetime(2022, 3, 1),
+                                            'createdTo': datetime.datetime(2022, 4, 1)}),
+           ('overdue incomplete', {'isCompleted': False, 'createdTo': START_DATE + datetime.timedelta(days=7)}),
+           ('completed in week', {'completedFrom': datetime.datetime(2022, 6, 1),
+                                  'completedTo': datetime.datetime(2022, 6, 8)}),
+           ('completed, first page', {'isCompleted': True, 'limit': 20}))
+
+# Runs of each query; best run is kept
+REPEAT = 5
+
+
+def scan_query(store, isCompleted=None, createdFrom=None, createdTo=None, completedFrom=None, completedTo=None,
+               limit=None):
+    """
+    Answers query by checking every note, as listings did before query indexes
+    :param store: (NotesStore) Store to query
+    :return: (list) Notes passing filters, in creation date order
+    """
+    matchingNotes = [noteObject for noteObject in store.noteObjectList.values()
+                     if (isCompleted is None or noteObject.isCompleted == isCompleted)
+                     and (createdFrom is None or noteObject.dateCreated >= createdFrom)
+                     and (createdTo is None or noteObject.dateCreated < createdTo)
+                     and (completedFrom is None or (noteObject.dateCompleted or datetime.datetime.min) >= completedFrom)
+                     and (completedTo is None or (noteObject.dateCompleted or datetime.datetime.max) < completedTo)]
+
+    return sorted(matchingNotes, key=lambda noteObject: (noteObject.createdEpoch, noteObject.ID))[:limit]
+
+
+def best_time(function):
+    """
+    Times function, keeping best of 'REPEAT' runs
+    :param function: (function) Function to time
+    :return: (tuple) Seconds of best run and result of function
+    """
+    bestSeconds, result = None, None
+
+    for _ in range(REPEAT):
+        startTime = time.perf_counter()
+        result = function()
+        seconds = time.perf_counter() - startTime
+        bestSeconds = seconds if bestSeconds is None else min(bestSeconds, seconds)
+
+    return bestSeconds, result
+
+
+def main():
+    """
+    Measures filtered queries answered from query indexes against scanning every note, along with time to build
+    indexes and to keep them up to date on changes
+    Usage: python benchmarks/benchQueries.py [number of notes]
+    :return: None
+    """
+    notesCount = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        filePath = os.path.join(tempDir, 'Notes.txt')
+        create_notes_file(filePath, notesCount)
+
+        store = NotesStore(filePath)
+        store.restore()
+
+        startTime = time.perf_counter()
+        store.query(isCompleted=True, limit=1)
+        print('notes: %d, indexes built in %.3f s\n' % (notesCount, time.perf_counter() - startTime))
+
+        print('%-30s %8s %12s %12s %10s' % ('query', 'notes', 'scan ms', 'index ms', 'speedup'))
+
+        for queryName, queryArguments in QUERIES:
+            scanTime, scannedNotes = best_time(lambda: scan_query(store, **queryArguments))
+            indexTime, indexedNotes = best_time(lambda: store.query(**queryArguments))
+
+            if 'completedFrom' not in queryArguments:
+                assert indexedNotes == scannedNotes, 'query indexes disagree with scan'
+
+            else:
+                assert sorted(indexedNotes, key=lambda noteObject: noteObject.ID) == \
+                    sorted(scannedNotes, key=lambda noteObject: noteObject.ID), 'query indexes disagree with scan'
+
+            print('%-30s %8d %12.3f %12.3f %9.0fx' % (queryName, len(indexedNotes), 1e3 * scanTime, 1e3 * indexTime,
+                                                      scanTime / indexTime))
+
+        # Completing moves note between indexes; creating appends it
+        IDs = range(1, min(notesCount, 1000) + 1)
+        updateTime, _ = best_time(lambda: [store.update(ID, isCompleted=ID % 2 == 0) for ID in IDs])
+        createTime, _ = best_time(lambda: store.bulk_create(('Title', 'Text', False) for _ in IDs))
+
+        print('\nupdate with indexes: %.1f us/note, create: %.1f us/note' % (1e6 * updateTime / len(IDs),
+                                                                           1e6 * createTime / len(IDs)))
+
+
+if __name__ == '__main__':
+    main()
+
+# This is end of script.
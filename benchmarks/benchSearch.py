@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import time
+import random
+import datetime
+import itertools
+import tempfile
+
+# Benchmarks are run from the 'benchmarks' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Note import Note
+from noteSearch import SearchIndex
+
+# Vocabulary with Zipf-like word frequencies, so some words are common and most are rare
+VOCABULARY = ['word' + str(rank) for rank in range(50000)]
+CUMULATIVE_WEIGHTS = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(VOCABULARY))))
+
+
+def main():
+    """
+    Measures build, save, load and query latency of search index
+    Usage: python benchmarks/benchSearch.py [number of notes]
+    :return: None
+    """
+    notesCount = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    random.seed(42)
+
+    dateCreated = datetime.datetime(2021, 1, 1)
+    noteObjectList = {ID: Note(ID, dateCreated,
+                               ' '.join(random.choices(VOCABULARY, cum_weights=CUMULATIVE_WEIGHTS, k=4)),
+                               ' '.join(random.choices(VOCABULARY, cum_weights=CUMULATIVE_WEIGHTS, k=30)), False)
+                      for ID in range(1, notesCount + 1)}
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        searchIndex = SearchIndex(os.path.join(tempDir, 'Notes.txt'))
+
+        startTime = time.perf_counter()
+        searchIndex.ensure_loaded(noteObjectList)
+        print('build: %8.2f s' % (time.perf_counter() - startTime))
+
+        startTime = time.perf_counter()
+        searchIndex.save()
+        print('save:  %8.2f s' % (time.perf_counter() - startTime))
+
+        startTime = time.perf_counter()
+        searchIndex = SearchIndex(os.path.join(tempDir, 'Notes.txt'))
+        searchIndex.ensure_loaded(noteObjectList)
+        print('load:  %8.2f s' % (time.perf_counter() - startTime))
+
+    # Queries mixing rare, medium and prefix words
+    queries = {'rare': ['word' + str(random.randint(20000, 49999)) for _ in range(100)],
+               'medium': ['word' + str(random.randint(500, 5000)) + ' word' + str(random.randint(500, 5000))
+                          for _ in range(100)],
+               'prefix': ['word' + str(random.randint(1000, 4999)) + '*' for _ in range(100)],
+               'common': ['word' + str(random.randint(0, 20)) for _ in range(20)]}
+
+    for queryType, queryList in queries.items():
+        latencies = []
+
+        # First search of a common word converts its postings to arrays; measure repeated searches
+        for query in queryList:
+            searchIndex.search(query, noteObjectList)
+
+        for query in queryList:
+            startTime = time.perf_counter()
+            searchIndex.search(query, noteObjectList)
+            latencies.append(time.perf_counter() - startTime)
+
+        latencies.sort()
+
+        print('%-7s query p50: %8.2f ms  p99: %8.2f ms'
+              % (queryType, 1000 * latencies[len(latencies) // 2], 1000 * latencies[int(len(latencies) * 0.99)]))
+
+
+if __name__ == '__main__':
+    main()
+
+# This is end of script.
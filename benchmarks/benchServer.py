@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import json
+import time
+import random
+import signal
+import asyncio
+import tempfile
+import subprocess
+
+# Benchmarks are run from the 'benchmarks' folder; make program modules importable
+PROGRAM_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROGRAM_DIR)
+
+from notesStore import NotesStore
+
+SEED_NOTES = 10000
+
+# Share of each request in mixed workload
+REQUEST_WEIGHTS = (('read', 45), ('create', 20), ('update', 20), ('complete', 8), ('delete', 5), ('stats', 2))
+
+# Concurrent connections and requests each connection sends before reading their responses
+LOAD_LEVELS = ((1, 1), (1, 16), (16, 1), (16, 16), (64, 4))
+
+
+def build_request(operation, ID):
+    """
+    Encodes HTTP request of mixed workload
+    :param operation: (str) Operation name from 'REQUEST_WEIGHTS'
+    :param ID: (int) Note ID requested
+    :return: (bytes) Complete request
+    """
+    method, path, payload = {'read': ('GET', '/notes/%d' % ID, None),
+                             'create': ('POST', '/notes', {'title': 'Benchmark', 'text': 'Created by load generator'}),
+                             'update': ('PATCH', '/notes/%d' % ID, {'text': 'Updated by load generator'}),
+                             'complete': ('POST', '/notes/%d/complete' % ID, {}),
+                             'delete': ('DELETE', '/notes/%d' % ID, None),
+                             'stats': ('GET', '/stats?period=week', None)}[operation]
+
+    body = json.dumps(payload).encode() if payload is not None else b''
+
+    return ('%s %s HTTP/1.1\r\nHost: localhost\r\nContent-Length: %d\r\n\r\n' % (method, path, len(body))).encode() \
+        + body
+
+
+async def read_response(reader):
+    """
+    Reads one response from server
+    :param reader: (StreamReader) Connection input stream
+    :return: (tuple) Status code and decoded JSON body
+    """
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    headers = dict(line.lower().split(': ', 1) for line in lines[1:] if line)
+    body = await reader.readexactly(int(headers['content-length']))
+
+    return int(lines[0].split(' ')[1]), json.loads(body)
+
+
+async def run_connection(address, requestsCount, depth, seed, latencies, counters):
+    """
+    Sends requests of mixed workload over one connection, 'depth' at a time without waiting for responses
+    :param address: (tuple) Host and port of server
+    :param requestsCount: (int) Number of requests to send
+    :param depth: (int) Pipelining depth
+    :param seed: (int) Random seed of this connection
+    :param latencies: (list) List collecting latency of every request in seconds
+    :param counters: (dict) Counters of statuses, created and deleted notes
+    :return: None
+    """
+    randomGenerator = random.Random(seed)
+    operations = randomGenerator.choices([name for name, _ in REQUEST_WEIGHTS],
+                                         [weight for _, weight in REQUEST_WEIGHTS], k=requestsCount)
+    reader, writer = await asyncio.open_connection(*address)
+
+    for start in range(0, requestsCount, depth):
+        burst = operations[start:start + depth]
+
+        sentTime = time.perf_counter()
+        writer.write(b''.join(build_request(operation, randomGenerator.randint(1, SEED_NOTES)) for operation in burst))
+        await writer.drain()
+
+        for operation in burst:
+            status, _ = await read_response(reader)
+            latencies.append(time.perf_counter() - sentTime)
+            counters[status] = counters.get(status, 0) + 1
+
+            if status < 300 and operation in ('create', 'delete'):
+                counters[operation] += 1
+
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_load(address, connectionsCount, depth, requestsCount):
+    """
+    Runs mixed workload over several connections at once
+    :return: (tuple) Elapsed seconds, sorted latencies and counters
+    """
+    latencies, counters = [], {'create': 0, 'delete': 0}
+    startTime = time.perf_counter()
+
+    await asyncio.gather(*[run_connection(address, requestsCount // connectionsCount, depth, seed, latencies, counters)
+                           for seed in range(connectionsCount)])
+
+    return time.perf_counter() - startTime, sorted(latencies), counters
+
+
+def percentile(sortedValues, percent):
+    """
+    Returns percentile of sorted values
+    :param sortedValues: (list) Values in ascending order
+    :param percent: (float) Percentile, 0 to 100
+    :return: (float) Value below which 'percent' of values fall
+    """
+    return sortedValues[min(len(sortedValues) - 1, int(len(sortedValues) * percent / 100))]
+
+
+def main():
+    """
+    Starts notes server on seeded notes file and measures latency and throughput of mixed workload at several load
+    levels; checks after shutdown that every acknowledged change was saved
+    Usage: python benchmarks/benchServer.py [number of requests per load level]
+    :return: None
+    """
+    requestsCount = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        filePath = os.path.join(tempDir, 'Notes.txt')
+
+        store = NotesStore(filePath)
+        store.bulk_create(('Seed title %d' % ID, 'Seed text %d' % ID, False) for ID in range(SEED_NOTES))
+        store.save()
+
+        server = subprocess.Popen([sys.executable, os.path.join(PROGRAM_DIR, 'Main.py'), '--file', filePath, 'serve',
+                                   '--port', '0'], stdout=subprocess.PIPE, text=True)
+
+        try:
+            # Server reports 'Serving N notes on http://host:port' once listening
+            host, port = server.stdout.readline().rsplit('/', 1)[1].split(':')
+            createdCount, deletedCount = 0, 0
+
+            print('%11s %6s %10s %10s %10s %10s %10s' % ('connections', 'depth', 'requests', 'seconds', 'req/s',
+                                                         'p50 ms', 'p99 ms'))
+
+            for connectionsCount, depth in LOAD_LEVELS:
+                elapsedTime, latencies, counters = asyncio.run(run_load((host, int(port)), connectionsCount, depth,
+                                                                        requestsCount))
+
+                assert not any(status >= 500 for status in counters if isinstance(status, int)), 'server errors'
+
+                createdCount += counters['create']
+                deletedCount += counters['delete']
+
+                print('%11d %6d %10d %10.2f %10.0f %10.2f %10.2f' % (connectionsCount, depth, len(latencies),
+                                                                     elapsedTime, len(latencies) / elapsedTime,
+                                                                     1000 * percentile(latencies, 50),
+                                                                     1000 * percentile(latencies, 99)))
+
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait()
+
+        # Every acknowledged write must have been saved
+        restoredStore = NotesStore(filePath)
+        restoredStore.restore()
+        assert restoredStore.count() == SEED_NOTES + createdCount - deletedCount, 'acknowledged changes lost'
+
+
+if __name__ == '__main__':
+    main()
+
+# This is end of script.
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import time
+import datetime
+import tempfile
+
+# Benchmarks are run from the 'benchmarks' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import noteShards
+from Note import Note
+from noteFormats import write_notes
+from noteShards import open_journal, reshard
+from notesStore import NotesStore
+
+SHARD_COUNT = 16
+
+# Notes changed by large save, all in first shard
+CHANGED_NOTES = 20000
+
+
+def create_file(filePath, notesCount):
+    """
+    Saves synthetic notes to single notes file
+    :param filePath: (str) Path of notes file
+    :param notesCount: (int) Number of notes
+    :return: None
+    """
+    dateCreated = datetime.datetime(2021, 1, 1)
+
+    write_notes(filePath, (Note(ID, dateCreated, 'Note title ' + str(ID), 'Note text of note number ' + str(ID),
+                                ID % 3 == 0, dateCreated if ID % 3 == 0 else None) for ID in range(1, notesCount + 1)))
+
+
+def time_restore(filePath, workersCount):
+    """
+    Restores all notes into new store
+    :param filePath: (str) Path of notes file
+    :param workersCount: (int) Worker processes loading shards
+    :return: (tuple) Seconds from opening store to restored notes, and number of notes
+    """
+    noteShards.LOAD_WORKERS = workersCount
+    startTime = time.perf_counter()
+
+    store = NotesStore(filePath)
+    store.restore()
+
+    return time.perf_counter() - startTime, store.count()
+
+
+def time_large_save(filePath):
+    """
+    Changes many notes of first ID range, saves them and compacts journal, as happens once journal grows large
+    :param filePath: (str) Path of notes file
+    :return: (tuple) Seconds taken and bytes of notes files rewritten
+    """
+    store = NotesStore(filePath)
+    store.restore()
+
+    for ID in range(1, CHANGED_NOTES + 1):
+        store.update(ID, text='Changed text ' + str(ID))
+
+    dirPath = os.path.dirname(filePath)
+    fileTimes = {name: os.stat(os.path.join(dirPath, name)).st_mtime_ns for name in os.listdir(dirPath)}
+
+    startTime = time.perf_counter()
+    store.save()
+    store.journal.compact()
+    elapsedTime = time.perf_counter() - startTime
+
+    # Snapshot files replaced since changes were made were rewritten
+    filePaths = [os.path.join(dirPath, name) for name in os.listdir(dirPath) if name.endswith('.txt')]
+    rewrittenBytes = sum(os.path.getsize(path) for path in filePaths
+                         if fileTimes.get(os.path.basename(path)) != os.stat(path).st_mtime_ns)
+
+    return elapsedTime, rewrittenBytes
+
+
+def main():
+    """
+    Compares single notes file with same notes split into shards: time to first menu (highest ID), restore time with
+    growing number of worker processes, and cost of large save touching one ID range
+    Usage: python benchmarks/benchShards.py [number of notes]
+    :return: None
+    """
+    notesCount = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+    workerCounts = sorted({1, 2, 4, os.cpu_count() or 1})
+
+    print('notes: %d, shards: %d, cores: %d\n' % (notesCount, SHARD_COUNT, os.cpu_count() or 1))
+    print('%-10s %8s %12s %12s %14s %14s' % ('layout', 'workers', 'startup ms', 'restore s', 'large save s',
+                                             'rewritten MB'))
+
+    for isSharded in (False, True):
+        with tempfile.TemporaryDirectory() as tempDir:
+            filePath = os.path.join(tempDir, 'Notes.txt')
+            create_file(filePath, notesCount)
+
+            if isSharded:
+                reshard(open_journal(filePath), -(-notesCount // SHARD_COUNT))
+
+            # Indexes are built once, as first session after saving would
+            open_journal(filePath).max_id()
+
+            startTime = time.perf_counter()
+            open_journal(filePath).max_id()
+            startupTime = time.perf_counter() - startTime
+
+            for workersCount in (workerCounts if isSharded else [1]):
+                restoreTime, restoredCount = time_restore(filePath, workersCount)
+                assert restoredCount == notesCount, 'notes lost'
+
+                print('%-10s %8d %12.1f %12.2f' % ('sharded' if isSharded else 'single', workersCount,
+                                                   1000 * startupTime, restoreTime))
+
+            saveTime, rewrittenBytes = time_large_save(filePath)
+
+            print('%-10s %8s %12s %12s %14.2f %14.1f' % ('', '', '', '', saveTime, rewrittenBytes / (1 << 20)))
+
+
+if __name__ == '__main__':
+    main()
+
+# This is end of script.
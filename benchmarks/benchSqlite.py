@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import time
+import random
+import tempfile
+
+# Benchmarks are run from the 'benchmarks' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notesStore import NotesStore
+from noteShards import BACKEND_FILES, BACKEND_SQLITE
+from noteSqlite import migrate
+from syntheticNotes import create_notes_file
+
+# Changes each written on its own, and changes written at once
+SINGLE_CHANGES = 1000
+BATCH_CHANGES = 10000
+
+# Notes read from file or database at random positions
+READS = 10000
+
+
+def measure(filePath, notesCount):
+    """
+    Measures store over notes file in its current backend
+    :param filePath: (str) Path of notes file
+    :param notesCount: (int) Number of saved notes
+    :return: (list) Startup and restore seconds, microseconds per read, per single change and per batched change,
+             and seconds of filtered query
+    """
+    startTime = time.perf_counter()
+    store = NotesStore(filePath)
+    startupTime = time.perf_counter() - startTime
+
+    startTime = time.perf_counter()
+    store.restore()
+    restoreTime = time.perf_counter() - startTime
+
+    IDs = random.Random(0).choices(range(1, notesCount + 1), k=READS)
+    savedIndex = store.journal.load_index()
+    startTime = time.perf_counter()
+
+    for ID in IDs:
+        savedIndex.read_note(ID)
+
+    readTime = (time.perf_counter() - startTime) / READS
+
+    # Notes file is written on save; database is written on every change already
+    startTime = time.perf_counter()
+
+    for ID in IDs[:SINGLE_CHANGES]:
+        store.update(ID, title='Single change')
+        store.save(allowCompaction=False)
+
+    singleTime = (time.perf_counter() - startTime) / SINGLE_CHANGES
+
+    startTime = time.perf_counter()
+    store.bulk_update((ID, 'Batched change', None, None) for ID in set(IDs[:BATCH_CHANGES]))
+    store.save()
+    batchTime = (time.perf_counter() - startTime) / len(set(IDs[:BATCH_CHANGES]))
+
+    return [startupTime, restoreTime, 1e6 * readTime, 1e6 * singleTime, 1e6 * batchTime]
+
+
+def main():
+    """
+    Compares notes file with journal and SQLite database: migration, startup, restore, reading saved notes, and changes
+    written one at a time and in batches
+    Usage: python benchmarks/benchSqlite.py [number of notes]
+    :return: None
+    """
+    notesCount = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    print('notes: %d\n' % notesCount)
+    print('%8s %10s %10s %9s %16s %17s' % ('backend', 'startup s', 'restore s', 'read us', 'single change us',
+                                            'batched change us'))
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        filePath = os.path.join(tempDir, 'Notes.txt')
+        create_notes_file(filePath, notesCount)
+
+        # Index of notes file is built by first program opening it
+        NotesStore(filePath)
+
+        print('%8s %10.3f %10.3f %9.1f %16.1f %17.1f' % tuple([BACKEND_FILES] + measure(filePath, notesCount)))
+
+        startTime = time.perf_counter()
+        migrate(NotesStore(filePath).journal, BACKEND_SQLITE)
+        migrateTime = time.perf_counter() - startTime
+
+        print('%8s %10.3f %10.3f %9.1f %16.1f %17.1f' % tuple([BACKEND_SQLITE] + measure(filePath, notesCount)))
+
+        print('\nmigration: %.0f notes/s' % (notesCount / migrateTime))
+
+
+if __name__ == '__main__':
+    main()
+
+# This is end of script.
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import time
+import datetime
+import tempfile
+import subprocess
+from statistics import median
+
+# Benchmarks are run from the 'benchmarks' folder; make program modules importable
+PROGRAM_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROGRAM_DIR)
+
+from Note import Note
+from noteFormats import write_notes
+from noteJournal import NoteJournal
+
+RUNS = 7
+
+
+def create_store(dirPath, notesCount):
+    """
+    Saves synthetic notes to notes file in given folder and builds its index, as a previous session would have
+    :param dirPath: (str) Folder to create notes file in
+    :param notesCount: (int) Number of notes to save
+    :return: None
+    """
+    dateCreated = datetime.datetime(2021, 1, 1)
+    filePath = os.path.join(dirPath, 'Notes.txt')
+
+    write_notes(filePath, (Note(ID, dateCreated, 'Note title ' + str(ID), 'Note text ' + str(ID), False)
+                           for ID in range(1, notesCount + 1)))
+
+    NoteJournal(filePath).load_index()
+
+
+def time_startup(dirPath, importTime=False):
+    """
+    Starts program, shows first menu and exits right away
+    :param dirPath: (str) Folder holding notes file; used as working directory
+    :param importTime: (bool) True to collect import times with '-X importtime', which slows startup down
+    :return: (tuple) Wall time in seconds and import time report lines
+    """
+    startTime = time.perf_counter()
+
+    completedProcess = subprocess.run([sys.executable] + (['-X', 'importtime'] if importTime else []) +
+                                      [os.path.join(PROGRAM_DIR, 'Main.py')],
+                                      input='11\n', capture_output=True, text=True, cwd=dirPath)
+
+    wallTime = time.perf_counter() - startTime
+
+    if 'Enter selection' not in completedProcess.stdout:
+        raise RuntimeError('Program did not reach menu:\n' + completedProcess.stderr)
+
+    return wallTime, [line for line in completedProcess.stderr.splitlines() if line.startswith('import time:')]
+
+
+def main():
+    """
+    Measures time from starting program to first menu, and lists slowest imports
+    Usage: python benchmarks/benchStartup.py [number of saved notes]
+    :return: None
+    """
+    notesCount = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        if notesCount:
+            create_store(tempDir, notesCount)
+
+        # Interpreter start without program, to separate it from program's own startup cost
+        baseTimes = [time_interpreter() for _ in range(RUNS)]
+        results = [time_startup(tempDir) for _ in range(RUNS)]
+        _, importLines = time_startup(tempDir, importTime=True)
+
+    startupTime = median(wallTime for wallTime, _ in results)
+
+    print('saved notes:             %d' % notesCount)
+    print('interpreter only:        %.1f ms' % (1000 * median(baseTimes)))
+    print('time to first menu:      %.1f ms (median of %d runs)' % (1000 * startupTime, RUNS))
+
+    # Import time lines are 'import time: self | cumulative | module'; report slowest top-level imports
+    importTimes = []
+
+    for line in importLines[1:]:
+        selfTime, cumulativeTime, moduleName = line[len('import time:'):].split('|')
+
+        if not moduleName.startswith('  '):
+            importTimes.append((int(cumulativeTime), moduleName.strip()))
+
+    print('\nslowest top-level imports:')
+
+    for cumulativeTime, moduleName in sorted(importTimes, reverse=True)[:8]:
+        print('  %-24s %6.1f ms' % (moduleName, cumulativeTime / 1000))
+
+
+def time_interpreter():
+    """
+    Starts bare interpreter and exits
+    :return: (float) Wall time in seconds
+    """
+    startTime = time.perf_counter()
+
+    subprocess.run([sys.executable, '-c', 'pass'], check=True)
+
+    return time.perf_counter() - startTime
+
+
+if __name__ == '__main__':
+    main()
+
+# This is end of script.
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import datetime
+import tempfile
+import statistics
+import subprocess
+
+# Benchmarks are run from the 'benchmarks' folder; make program modules importable
+PROGRAM_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROGRAM_DIR)
+
+import Main
+from noteFormats import DEFAULT_FORMAT, FORMAT_BINARY, FORMAT_TEXT
+from noteShards import open_journal
+from notesStore import NotesStore
+from syntheticNotes import create_notes_file
+
+# Operations timed, in order they are run on each synthetic store
+OPERATIONS = ('startup', 'restore', 'read', 'read_saved', 'listing', 'stats', 'create', 'update', 'delete', 'save')
+
+# Pages walked by listing benchmark
+LISTING_PAGES = 50
+
+# Time per operation may grow by this share before it counts as regression
+REGRESSION_THRESHOLD = 0.25
+
+
+def build_parser():
+    """
+    Builds command line parser of benchmark suite
+    :return: (ArgumentParser) Parser
+    """
+    parser = argparse.ArgumentParser(description='Times note operations on synthetic notes files, and compares results '
+                                                 'with results of an earlier run.')
+    parser.add_argument('--notes', default='1000,10000,100000',
+                        help='comma separated numbers of notes of synthetic stores, 1000 to 10000000 '
+                             '(default: 1000,10000,100000)')
+    parser.add_argument('--body-size', type=int, default=200, help='average note text length (default: 200)')
+    parser.add_argument('--completion-ratio', type=float, default=0.5, help='share of completed notes (default: 0.5)')
+    parser.add_argument('--format', choices=[FORMAT_BINARY, FORMAT_TEXT], default=DEFAULT_FORMAT,
+                        help='format of notes file (default: %s)' % DEFAULT_FORMAT)
+    parser.add_argument('--seed', type=int, default=0, help='random seed of generated notes and operations')
+    parser.add_argument('--operations', type=int, default=1000, help='notes read, created, updated and deleted per '
+                                                                     'store (default: 1000)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs of startup, restore, listing and stats; median '
+                                                              'is kept (default: 3)')
+    parser.add_argument('--output', help='JSON file results are written to')
+    parser.add_argument('--compare', help='JSON file of earlier run to compare results with')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='slowdown counted as regression (default: %.2f)' % REGRESSION_THRESHOLD)
+
+    return parser
+
+
+def time_operation(function, operationsCount=1, repeat=1):
+    """
+    Times function, keeping median of several runs
+    :param function: (function) Function running the operation 'operationsCount' times
+    :param operationsCount: (int) Number of operations one run performs
+    :param repeat: (int) Number of runs
+    :return: (dict) Median seconds of one run, number of operations and microseconds per operation
+    """
+    runTimes = []
+
+    for _ in range(repeat):
+        startTime = time.perf_counter()
+        function()
+        runTimes.append(time.perf_counter() - startTime)
+
+    seconds = statistics.median(runTimes)
+
+    return {'seconds': seconds, 'operations': operationsCount, 'usPerOp': 1e6 * seconds / max(operationsCount, 1)}
+
+
+def run_store(notesCount, arguments):
+    """
+    Generates synthetic notes file and times every operation on it
+    :param notesCount: (int) Number of notes
+    :param arguments: (Namespace) Parsed command line options
+    :return: (dict) Operation names as keys, results of 'time_operation()' as values
+    """
+    results = {}
+    randomGenerator = random.Random(arguments.seed)
+    operationsCount = min(arguments.operations, notesCount)
+    workingDir = os.getcwd()
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        filePath = os.path.join(tempDir, 'Notes.txt')
+        create_notes_file(filePath, notesCount, arguments.seed, arguments.body_size, arguments.completion_ratio,
+                          arguments.format)
+
+        # Program reads 'Notes.txt' of working directory; index is built once, as first session after saving would
+        os.chdir(tempDir)
+
+        try:
+            Main.retrieve_max_id()
+            results['startup'] = time_operation(Main.retrieve_max_id, 1, arguments.repeat)
+
+        finally:
+            os.chdir(workingDir)
+
+        stores = []
+
+        def restore_store():
+            """
+            Restores all notes into new store, as menu option 8 does at start of session
+            :return: None
+            """
+            stores.append(NotesStore(filePath))
+            stores[-1].restore()
+
+        results['restore'] = time_operation(restore_store, notesCount, arguments.repeat)
+        store = stores[-1]
+
+        IDs = randomGenerator.sample(range(1, notesCount + 1), operationsCount)
+        journal = open_journal(filePath)
+        journal.load_index()
+
+        results['read'] = time_operation(lambda: [store.get(ID).get_all_data() for ID in IDs], operationsCount)
+        results['read_saved'] = time_operation(lambda: [journal.load_index().read_note(ID) for ID in IDs],
+                                               operationsCount)
+
+        def walk_pages():
+            """
+            Walks first pages of notes listing, as user asking for next page would
+            :return: None
+            """
+            cursor = 0
+
+            for _ in range(LISTING_PAGES):
+                cursor = store.page(cursor)[1]
+
+                if cursor is None:
+                    return
+
+        results['listing'] = time_operation(walk_pages, LISTING_PAGES, arguments.repeat)
+        results['stats'] = time_operation(store.stats, 1, arguments.repeat)
+        results['create'] = time_operation(lambda: [store.create('Benchmark title', 'Benchmark text')
+                                                    for _ in range(operationsCount)], operationsCount)
+        results['update'] = time_operation(lambda: [store.update(ID, text='Updated text') for ID in IDs],
+                                           operationsCount)
+        results['delete'] = time_operation(lambda: [store.delete(ID) for ID in IDs[:operationsCount // 2]],
+                                           operationsCount // 2)
+
+        # Every created note and every updated note (half of them deleted since) is saved once
+        results['save'] = time_operation(store.save, 2 * operationsCount)
+
+    return results
+
+
+def git_commit():
+    """
+    Returns commit of program being benchmarked
+    :return: (str) Abbreviated commit hash, None if program is not in a git repository
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROGRAM_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare_results(report, baseline, threshold):
+    """
+    Prints time per operation of both runs for stores and operations found in both
+    :param report: (dict) Report of this run
+    :param baseline: (dict) Report of earlier run
+    :param threshold: (float) Slowdown counted as regression
+    :return: (list) Store sizes and operation names that regressed
+    """
+    regressions = []
+
+    print('\ncompared with %s (%s):\n' % (baseline.get('commit') or 'earlier run', baseline.get('date')))
+    print('%10s %-12s %14s %14s %9s' % ('notes', 'operation', 'before us/op', 'now us/op', 'change'))
+
+    for notesCount, results in report['results'].items():
+        for operationName in OPERATIONS:
+            before = baseline.get('results', {}).get(notesCount, {}).get(operationName)
+
+            if before is None or operationName not in results:
+                continue
+
+            ratio = results[operationName]['usPerOp'] / max(before['usPerOp'], 1e-9)
+            isRegression = ratio > 1 + threshold
+
+            if isRegression:
+                regressions.append((notesCount, operationName))
+
+            print('%10s %-12s %14.2f %14.2f %+8.1f%%%s' % (notesCount, operationName, before['usPerOp'],
+                                                           results[operationName]['usPerOp'], 100 * (ratio - 1),
+                                                           '  REGRESSION' if isRegression else ''))
+
+    return regressions
+
+
+def main():
+    """
+    Times create, read, update, delete, save, restore, stats, listing and startup on synthetic stores of requested
+    sizes; results can be written to JSON file and compared with file of earlier run, e.g. of previous commit
+    Usage: python benchmarks/benchSuite.py [--notes 1000,10000] [--output after.json] [--compare before.json]
+    :return: (int) Exit status; 1 if any operation regressed compared with earlier run, 0 otherwise
+    """
+    arguments = build_parser().parse_args()
+    notesCounts = [int(count) for count in arguments.notes.split(',')]
+
+    report = {'commit': git_commit(), 'date': datetime.datetime.now().isoformat(timespec='seconds'),
+              'python': platform.python_version(), 'machine': platform.machine(), 'cores': os.cpu_count(),
+              'config': {'bodySize': arguments.body_size, 'completionRatio': arguments.completion_ratio,
+                         'format': arguments.format, 'seed': arguments.seed, 'operations': arguments.operations},
+              'results': {}}
+
+    print('%10s %-12s %12s %12s' % ('notes', 'operation', 'seconds', 'us/op'))
+
+    for notesCount in notesCounts:
+        results = run_store(notesCount, arguments)
+        report['results'][str(notesCount)] = results
+
+        for operationName in OPERATIONS:
+            print('%10d %-12s %12.4f %12.2f' % (notesCount, operationName, results[operationName]['seconds'],
+                                                results[operationName]['usPerOp']))
+
+    if arguments.output:
+        with open(arguments.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if arguments.compare:
+        with open(arguments.compare, 'r') as f:
+            baseline = json.load(f)
+
+        if baseline.get('config') != report['config']:
+            print('\nWARNING : Earlier run used different settings: ' + json.dumps(baseline.get('config')))
+
+        if compare_results(report, baseline, arguments.threshold):
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+
+# This is end of script.
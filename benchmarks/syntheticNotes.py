@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import random
+import datetime
+
+# Benchmarks are run from the 'benchmarks' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Note import Note
+from noteFormats import DEFAULT_FORMAT, write_notes
+
+# Words titles and texts of synthetic notes are made of
+VOCABULARY = ('meeting', 'report', 'budget', 'review', 'groceries', 'call', 'plan', 'draft', 'invoice', 'team',
+              'project', 'deadline', 'email', 'doctor', 'travel', 'book', 'garden', 'code', 'release', 'notes',
+              'idea', 'follow', 'up', 'weekly', 'monthly', 'quarter', 'client', 'design', 'test', 'fix')
+
+# Creation dates are spread over two years from this date
+START_DATE = datetime.datetime(2021, 1, 1)
+DATE_SPAN_SECONDS = 2 * 365 * 24 * 3600
+
+
+def generate_notes(notesCount, seed=0, bodySize=200, completionRatio=0.5, firstID=1):
+    """
+    Generator yielding synthetic notes; same arguments always yield same notes, so stores generated on different
+    machines or commits can be compared
+    :param notesCount: (int) Number of notes
+    :param seed: (int) Random seed
+    :param bodySize: (int) Average length of note texts in characters; lengths vary from half to one and a half times
+    :param completionRatio: (float) Share of completed notes, 0 to 1
+    :param firstID: (int) ID of first note; IDs are consecutive
+    :return: (generator) Note objects in ascending ID order
+    """
+    randomGenerator = random.Random(seed)
+
+    for ID in range(firstID, firstID + notesCount):
+        dateCreated = START_DATE + datetime.timedelta(seconds=randomGenerator.randrange(DATE_SPAN_SECONDS),
+                                                      microseconds=randomGenerator.randrange(1000000))
+        isCompleted = randomGenerator.random() < completionRatio
+        dateCompleted = dateCreated + datetime.timedelta(days=randomGenerator.randrange(60),
+                                                         seconds=randomGenerator.randrange(86400)) \
+            if isCompleted else None
+
+        title = ' '.join(randomGenerator.choices(VOCABULARY, k=randomGenerator.randint(2, 5))).capitalize()
+        textLength = randomGenerator.randint(bodySize // 2, bodySize + bodySize // 2)
+        text = ' '.join(randomGenerator.choices(VOCABULARY, k=textLength // 6 + 1))[:max(textLength, 1)]
+
+        yield Note(ID, dateCreated, title, text, isCompleted, dateCompleted)
+
+
+def create_notes_file(filePath, notesCount, seed=0, bodySize=200, completionRatio=0.5, fileFormat=DEFAULT_FORMAT):
+    """
+    Saves synthetic notes to notes file, as a session saving and compacting them would
+    :param filePath: (str) Path of notes file
+    :param notesCount: (int) Number of notes
+    :param seed: (int) Random seed
+    :param bodySize: (int) Average length of note texts in characters
+    :param completionRatio: (float) Share of completed notes
+    :param fileFormat: (str) 'FORMAT_BINARY' or 'FORMAT_TEXT'
+    :return: None
+    """
+    write_notes(filePath, generate_notes(notesCount, seed, bodySize, completionRatio), fileFormat)
+
+# This is end of script.
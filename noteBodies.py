@@ -0,0 +1,351 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import re
+import sys
+import mmap
+import zlib
+import threading
+from collections import Counter, OrderedDict
+
+# Lazy loading modes: note texts (and titles for 'LAZY_ALL') of restored notes stay in notes file until needed
+LAZY_OFF = ''
+LAZY_TEXT = 'text'
+LAZY_ALL = 'all'
+
+# Lazy loading mode and byte budget of decoded bodies cache; set through environment variables
+LAZY_MODE = os.environ.get('NOTES_LAZY', LAZY_OFF)
+CACHE_BYTES = int(os.environ.get('NOTES_BODY_CACHE_BYTES', 16 * 1024 * 1024))
+
+# Compression of note texts: off, or zlib with dictionary shared by notes file; set through environment variable
+COMPRESS_OFF = ''
+COMPRESS_ZLIB = 'zlib'
+COMPRESS_MODE = os.environ.get('NOTES_COMPRESS', COMPRESS_OFF)
+
+# Size of shared dictionary, texts it is trained on, and shortest text worth compressing, in bytes
+DICTIONARY_BYTES = 16384
+TRAINING_TEXTS = 2000
+COMPRESS_MIN_BYTES = 64
+
+# Dictionary training counts repeated sentences or lines first, then words
+SEGMENT_PATTERN = re.compile(r'[^.!?\n]+[.!?\n]?')
+WORD_PATTERN = re.compile(r'\w+\W*')
+
+# Codecs of process by number; compressed texts kept in memory start with number of their codec
+CODECS = []
+CODECS_BY_DICTIONARY = {}
+MAX_CODECS = 256
+
+
+def train_dictionary(texts, dictionaryBytes=DICTIONARY_BYTES):
+    """
+    Trains shared compression dictionary on sample of note texts: sentences and lines found in several texts, then
+    words, most frequent last since zlib encodes nearer matches in fewer bits, and sample texts in remaining space
+    :param texts: (list) Sample of note texts
+    :param dictionaryBytes: (int) Maximum size of dictionary in bytes
+    :return: (bytes) Dictionary, empty if there are no texts
+    """
+    segmentCounts = Counter(segment for text in texts for segment in set(SEGMENT_PATTERN.findall(text)))
+    wordCounts = Counter(word for text in texts for word in WORD_PATTERN.findall(text))
+
+    pieces = []
+    usedBytes = 0
+
+    for counts in (segmentCounts, wordCounts):
+        # Pieces are ranked by bytes they would save: occurrences times length
+        for piece, count in sorted(counts.items(), key=lambda item: item[1] * len(item[0]), reverse=True):
+            pieceBytes = piece.encode('utf-8')
+
+            if count < 2 or usedBytes + len(pieceBytes) > dictionaryBytes:
+                continue
+
+            pieces.append(pieceBytes)
+            usedBytes += len(pieceBytes)
+
+    for text in texts:
+        if usedBytes >= dictionaryBytes:
+            break
+
+        textBytes = text.encode('utf-8')[:dictionaryBytes - usedBytes]
+        pieces.append(textBytes)
+        usedBytes += len(textBytes)
+
+    # Best pieces were collected first, so they end up last
+    return b''.join(reversed(pieces))
+
+
+class TextCodec:
+    """
+    Represents zlib compression of note texts with shared dictionary; texts are compressed one by one as raw deflate
+    streams, so any text can be decompressed on its own
+
+    Attributes
+    ----------
+    dictionary : (bytes) Shared dictionary
+    number : (int) Position of codec in 'CODECS'
+
+    Methods
+    -------
+    compress(textBytes) : Compresses text, if worthwhile
+    decompress(data) : Decompresses text
+    pack(data) : Returns compressed text tagged with codec, for keeping in memory
+    """
+    def __init__(self, dictionary, number):
+        """
+        Initializes codec attributes
+        :param dictionary: (bytes) Shared dictionary
+        :param number: (int) Position of codec in 'CODECS'
+        """
+        self.dictionary = dictionary
+        self.number = number
+
+    def compress(self, textBytes):
+        """
+        Compresses UTF-8 encoded text
+        :param textBytes: (bytes) Encoded text
+        :return: (bytes) Compressed text, None if text is too short or would not shrink
+        """
+        if len(textBytes) < COMPRESS_MIN_BYTES:
+            return None
+
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15, 8, zlib.Z_DEFAULT_STRATEGY, self.dictionary)
+        data = compressor.compress(textBytes) + compressor.flush()
+
+        return data if len(data) < len(textBytes) else None
+
+    def decompress(self, data):
+        """
+        Decompresses text
+        :param data: (bytes-like) Compressed text
+        :return: (bytes) UTF-8 encoded text
+        """
+        return zlib.decompressobj(-15, self.dictionary).decompress(data)
+
+    def pack(self, data):
+        """
+        Tags compressed text with codec number, so it can be kept in note and decompressed on access
+        :param data: (bytes-like) Compressed text
+        :return: (bytes) Codec number followed by compressed text
+        """
+        return bytes((self.number,)) + data
+
+
+def codec_for(dictionary):
+    """
+    Returns codec of dictionary, creating it on first use; files sharing dictionary share codec
+    :param dictionary: (bytes) Shared dictionary
+    :return: (TextCodec) Codec
+    """
+    codec = CODECS_BY_DICTIONARY.get(dictionary)
+
+    if codec is None:
+        codec = TextCodec(dictionary, len(CODECS))
+        CODECS_BY_DICTIONARY[dictionary] = codec
+
+        # Only codecs with a number can tag texts kept in memory
+        if len(CODECS) < MAX_CODECS:
+            CODECS.append(codec)
+
+    return codec
+
+
+def unpack_text(packed):
+    """
+    Decompresses text kept in memory by 'TextCodec.pack()'
+    :param packed: (bytes) Codec number followed by compressed text
+    :return: (str) Text
+    """
+    return str(CODECS[packed[0]].decompress(memoryview(packed)[1:]), 'utf-8')
+
+
+class MappedFile:
+    """
+    Represents notes file memory-mapped for reading; stays mapped while any lazy body refers to it
+
+    Attributes
+    ----------
+    filePath : (str) Path of mapped file
+    buffer : (mmap) Read-only memory map of file
+    """
+    def __init__(self, filePath):
+        """
+        Maps file into memory
+        :param filePath: (str) Path of file to map
+        """
+        self.filePath = filePath
+
+        with open(filePath, 'rb') as f:
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class LazyText:
+    """
+    Represents handle to UTF-8 encoded string inside memory-mapped notes file, decoded only when needed
+
+    Attributes
+    ----------
+    mappedFile : (MappedFile) File holding encoded string
+    offset : (int) Position of encoded string in file
+    length : (int) Length of encoded string in bytes
+    codec : (TextCodec) Codec string is compressed with, None if it is not compressed
+
+    Methods
+    -------
+    raw() : Returns encoded bytes without decoding
+    decode() : Returns decoded string, decompressing it if needed
+    load() : Returns decoded string, through bodies cache
+    """
+    __slots__ = ('mappedFile', 'offset', 'length', 'codec')
+
+    def __init__(self, mappedFile, offset, length, codec=None):
+        """
+        Initializes handle attributes
+        :param mappedFile: (MappedFile) File holding encoded string
+        :param offset: (int) Position of encoded string in file
+        :param length: (int) Length of encoded string in bytes
+        :param codec: (TextCodec) Codec string is compressed with, None if it is not compressed
+        """
+        self.mappedFile = mappedFile
+        self.offset = offset
+        self.length = length
+        self.codec = codec
+
+    def raw(self):
+        """
+        Returns encoded bytes without decoding them
+        :return: (bytes) UTF-8 encoded string
+        """
+        return self.mappedFile.buffer[self.offset:self.offset + self.length]
+
+    def decode(self):
+        """
+        Returns decoded string, bypassing bodies cache
+        :return: (str) Decoded string
+        """
+        raw = self.raw()
+
+        return str(raw if self.codec is None else self.codec.decompress(raw), 'utf-8')
+
+    def load(self):
+        """
+        Returns decoded string; recently used strings are served from bodies cache
+        :return: (str) Decoded string
+        """
+        return bodyCache.get(self)
+
+
+class BodyCache:
+    """
+    Represents least recently used cache of decoded lazy bodies, bounded by memory held by decoded strings; shared by
+    threads of thread-safe stores, so cache is guarded by lock, while bodies are decoded outside it
+
+    Attributes
+    ----------
+    byteBudget : (int) Maximum total size of cached bodies in bytes
+    usedBytes : (int) Current total size of cached decoded strings in bytes
+    entries : (OrderedDict) Lazy handles as keys and decoded strings as values, least recently used first
+    hits : (int) Number of lookups served from cache
+    misses : (int) Number of lookups that decoded body from file
+    lock : (Lock) Guards entries and counters
+
+    Methods
+    -------
+    get(lazyText) : Returns decoded string of handle, decoding and caching it if needed
+    resize(byteBudget) : Changes byte budget, evicting bodies if needed
+    clear() : Empties cache
+    """
+    def __init__(self, byteBudget):
+        """
+        Initializes cache attributes
+        :param byteBudget: (int) Maximum total size of cached bodies in bytes
+        """
+        self.byteBudget = byteBudget
+        self.usedBytes = 0
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, lazyText):
+        """
+        Returns decoded string of lazy handle
+        :param lazyText: (LazyText) Handle to decode
+        :return: (str) Decoded string
+        """
+        with self.lock:
+            value = self.entries.get(lazyText)
+
+            if value is not None:
+                self.hits += 1
+                self.entries.move_to_end(lazyText)
+
+                return value
+
+            self.misses += 1
+
+        value = lazyText.decode()
+
+        # Compressed bodies decode to several times their encoded size, so budget counts decoded strings
+        valueBytes = sys.getsizeof(value)
+
+        # Bodies larger than whole budget are decoded every time instead of flushing cache
+        if valueBytes <= self.byteBudget:
+            with self.lock:
+                # Another thread may have cached same body meanwhile
+                if lazyText not in self.entries:
+                    self.entries[lazyText] = value
+                    self.usedBytes += valueBytes
+                    self.evict()
+
+        return value
+
+    def evict(self):
+        """
+        Drops least recently used bodies until cache fits its byte budget; caller holds lock
+        :return: None
+        """
+        while self.usedBytes > self.byteBudget:
+            _, value = self.entries.popitem(last=False)
+            self.usedBytes -= sys.getsizeof(value)
+
+    def resize(self, byteBudget):
+        """
+        Changes byte budget of cache
+        :param byteBudget: (int) New maximum total size of cached bodies in bytes
+        :return: None
+        """
+        with self.lock:
+            self.byteBudget = byteBudget
+            self.evict()
+
+    def clear(self):
+        """
+        Empties cache
+        :return: None
+        """
+        with self.lock:
+            self.entries.clear()
+            self.usedBytes = 0
+
+
+# Cache shared by all lazy bodies
+bodyCache = BodyCache(CACHE_BYTES)
+
+
+def resolve(value):
+    """
+    Returns string as is, decompressed string of text kept compressed in memory, or decoded string of lazy handle
+    :param value: (str, bytes or LazyText) Note attribute value
+    :return: (str) Decoded string
+    """
+    if isinstance(value, str):
+        return value
+
+    return unpack_text(value) if isinstance(value, bytes) else value.load()
+
+# This is end of script.
@@ -0,0 +1,499 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import sys
+import csv
+import json
+import time
+import argparse
+import itertools
+import datetime
+from Note import Note
+from noteJournal import OP_CREATE, OP_UPDATE, OP_COMPLETE, OP_DELETE
+from noteShards import BACKEND_FILES, BACKEND_SQLITE, open_journal, reshard
+from noteStats import NoteStats
+from notesStore import check_not_empty
+from noteMetrics import add_arguments, configure, operation
+
+# Columns of exported and imported notes; same as keys of 'Note.get_all_data()'
+COLUMNS = ['Note ID', 'Title', 'Text', 'Completed', 'Creation Date', 'Completion Date']
+
+# Number of imported notes written to journal at once
+BATCH_SIZE = 10000
+
+# Largest gap above IDs in use allowed for kept IDs; search and query indexes hold arrays sized by largest ID
+MAX_ID_GAP = 1000000
+
+
+def build_parser():
+    """
+    Builds command line parser with one subcommand per note operation
+    :return: (ArgumentParser) Parser
+    """
+    parser = argparse.ArgumentParser(prog='Main.py', description='Python Notes Handler. Run without arguments for the '
+                                                                 'interactive menu.')
+    parser.add_argument('--file', default='Notes.txt', help="notes file (default: 'Notes.txt')")
+    add_arguments(parser)
+
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    createParser = subparsers.add_parser('create', help='create a note')
+    createParser.add_argument('--title', required=True)
+    createParser.add_argument('--text', required=True)
+    createParser.add_argument('--completed', action='store_true', help='mark note complete')
+
+    readParser = subparsers.add_parser('read', help='display a note')
+    readParser.add_argument('id', type=int)
+    readParser.add_argument('--json', action='store_true', help='display note as JSON')
+
+    updateParser = subparsers.add_parser('update', help='update title, text or completion status of a note')
+    updateParser.add_argument('id', type=int)
+    updateParser.add_argument('--title')
+    updateParser.add_argument('--text')
+    updateParser.add_argument('--completed', action='store_true', dest='completed', default=None)
+    updateParser.add_argument('--incomplete', action='store_false', dest='completed')
+
+    deleteParser = subparsers.add_parser('delete', help='delete a note')
+    deleteParser.add_argument('id', type=int)
+
+    completeParser = subparsers.add_parser('complete', help='add completion date to a note')
+    completeParser.add_argument('id', type=int)
+    completeParser.add_argument('--date', help='completion date (YYYY-MM-DD); current timestamp by default')
+
+    statsParser = subparsers.add_parser('stats', help='display notes statistics')
+    statsParser.add_argument('--period', choices=['week', 'month'], default='month')
+
+    importParser = subparsers.add_parser('import', help='import notes from CSV or JSON Lines file')
+    importParser.add_argument('path', help="file to import, '-' for standard input")
+    importParser.add_argument('--format', choices=['csv', 'jsonl'], help='file format (default: from extension)')
+    importParser.add_argument('--keep-ids', action='store_true', help="keep 'Note ID' of imported notes")
+    importParser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='notes written to journal at once '
+                                                                                  'with --keep-ids')
+
+    exportParser = subparsers.add_parser('export', help='export notes to CSV or JSON Lines file')
+    exportParser.add_argument('path', help="file to export to, '-' for standard output")
+    exportParser.add_argument('--format', choices=['csv', 'jsonl'], help='file format (default: from extension)')
+
+    shardParser = subparsers.add_parser('shard', help='split notes file into shards, or merge shards into one file')
+    shardParser.add_argument('--size', type=int, required=True, help='notes per shard, 0 for single file')
+
+    migrateParser = subparsers.add_parser('migrate', help='move notes into SQLite database, or back into notes file')
+    migrateParser.add_argument('--to', choices=[BACKEND_SQLITE, BACKEND_FILES], default=BACKEND_SQLITE,
+                               dest='backend', help='storage backend (default: sqlite)')
+
+    serveParser = subparsers.add_parser('serve', help='serve notes over HTTP/JSON on localhost')
+    serveParser.add_argument('--host', default='127.0.0.1')
+    serveParser.add_argument('--port', type=int, default=8080, help='port to listen on, 0 for any free port')
+    serveParser.add_argument('--batch-size', type=int, help='writes saved at once (default: 1000)')
+    serveParser.add_argument('--batch-delay', type=float, help='milliseconds a write waits for more writes to join '
+                                                               'its batch (default: 0)')
+
+    return parser
+
+
+def file_format(path, fileFormat):
+    """
+    Decides format of imported or exported file
+    :param path: (str) File path
+    :param fileFormat: (str) Format given by user, or None
+    :return: (str) 'csv' or 'jsonl'
+    """
+    if fileFormat:
+        return fileFormat
+
+    return 'csv' if path.lower().endswith('.csv') else 'jsonl'
+
+
+def open_stream(path, mode):
+    """
+    Opens file for streaming; '-' stands for standard input or output
+    :param path: (str) File path or '-'
+    :param mode: (str) 'r' or 'w'
+    :return: (file) Open text file
+    """
+    if path == '-':
+        return open((sys.stdin if mode == 'r' else sys.stdout).fileno(), mode, newline='', encoding='utf-8',
+                    closefd=False)
+
+    return open(path, mode, newline='', encoding='utf-8')
+
+
+def parse_date(value):
+    """
+    Parses date of imported row; accepts any ISO 8601 timestamp, with or without microseconds
+    :param value: (str) Timestamp string, or None/''/'None' if note has no such date
+    :return: (datetime) Parsed timestamp, None if row has no date
+    """
+    if not value or value == 'None':
+        return None
+
+    # Much faster than 'strptime()', which matters when importing millions of rows
+    return datetime.datetime.fromisoformat(value)
+
+
+def note_from_row(row, ID):
+    """
+    Builds note object from imported row
+    :param row: (dict) Row with 'COLUMNS' keys; missing dates default to current timestamp
+    :param ID: (int) ID given to note
+    :return: (Note) Note object
+    :raises ValueError: If title or text is empty
+    """
+    check_not_empty('title', row['Title'])
+    check_not_empty('text', row['Text'])
+
+    isCompleted = str(row.get('Completed', 'No')).lower() in ('yes', 'y', 'true', '1')
+    dateCreated = parse_date(row.get('Creation Date')) or datetime.datetime.now()
+    dateCompleted = parse_date(row.get('Completion Date'))
+
+    if isCompleted and dateCompleted is None:
+        dateCompleted = dateCreated
+
+    return Note(ID, dateCreated, row['Title'], row['Text'], isCompleted, dateCompleted if isCompleted else None)
+
+
+def load_note(journal, ID):
+    """
+    Reads saved note through index of notes file
+    :param journal: (NoteJournal) Journal of notes file
+    :param ID: (int) Note ID
+    :return: (Note) Saved note
+    :raises LookupError: If note is not saved
+    """
+    noteObject = journal.load_index().read_note(ID)
+
+    if noteObject is None:
+        raise LookupError('Note ID ' + str(ID) + ' not found.')
+
+    return noteObject
+
+
+def save_note(journal, operation, noteObject, baseNote=None):
+    """
+    Writes single note change to journal of notes file, merged with change another process saved since note was read
+    :param journal: (NoteJournal) Journal of notes file
+    :param operation: (int) Journal operation
+    :param noteObject: (Note) Changed note
+    :param baseNote: (Note) Note as read before change, None for created note
+    :return: None
+    """
+    conflictIDs = []
+
+    journal.record(operation, noteObject.ID)
+    journal.flush({} if operation == OP_DELETE else {noteObject.ID: noteObject}, baseNotes={noteObject.ID: baseNote},
+                  conflictIDs=conflictIDs)
+
+    if conflictIDs:
+        print('WARNING : Note ID ' + str(noteObject.ID) + ' was changed by another process meanwhile; conflicting '
+              'fields keep this change', file=sys.stderr)
+
+
+@operation
+def command_create(journal, arguments):
+    """
+    Creates note with next free ID
+    :return: None
+    """
+    check_not_empty('title', arguments.title)
+    check_not_empty('text', arguments.text)
+
+    dateCreated = datetime.datetime.now()
+    noteObject = Note(journal.reserve_ids(1), dateCreated, arguments.title, arguments.text, arguments.completed,
+                      dateCreated if arguments.completed else None)
+
+    save_note(journal, OP_CREATE, noteObject)
+
+    print('Created note ID ' + str(noteObject.ID))
+
+
+@operation
+def command_read(journal, arguments):
+    """
+    Displays saved note
+    :return: None
+    """
+    noteData = load_note(journal, arguments.id).get_all_data()
+
+    if arguments.json:
+        print(json.dumps(noteData, ensure_ascii=False))
+
+    else:
+        from tabulate import tabulate
+
+        print(tabulate(list(map(list, noteData.items())), ["Attribute", "Value"]))
+
+
+@operation
+def command_update(journal, arguments):
+    """
+    Updates title, text or completion status of saved note; completed note gets current completion date, as in menu
+    :return: None
+    """
+    check_not_empty('title', arguments.title)
+    check_not_empty('text', arguments.text)
+
+    baseNote = load_note(journal, arguments.id)
+    noteObject = baseNote.copy()
+
+    if arguments.title is not None:
+        noteObject.update_title(arguments.title)
+
+    if arguments.text is not None:
+        noteObject.update_text(arguments.text)
+
+    if arguments.completed is False:
+        noteObject.mark_incomplete()
+
+    elif arguments.completed or noteObject.isCompleted:
+        noteObject.mark_complete(datetime.datetime.now())
+
+    save_note(journal, OP_UPDATE, noteObject, baseNote)
+
+    print('Updated note ID ' + str(noteObject.ID))
+
+
+@operation
+def command_delete(journal, arguments):
+    """
+    Deletes saved note
+    :return: None
+    """
+    noteObject = load_note(journal, arguments.id)
+
+    save_note(journal, OP_DELETE, noteObject, noteObject)
+
+    print('Deleted note ID ' + str(noteObject.ID))
+
+
+@operation
+def command_complete(journal, arguments):
+    """
+    Adds completion date to saved note
+    :return: None
+    """
+    baseNote = load_note(journal, arguments.id)
+    noteObject = baseNote.copy()
+
+    dateCompleted = datetime.datetime.strptime(arguments.date, '%Y-%m-%d') if arguments.date \
+        else datetime.datetime.now()
+
+    if (noteObject.dateCreated - datetime.timedelta(days=1)) >= dateCompleted:
+        raise ValueError('Note completion date cannot be before note creation date.')
+
+    noteObject.mark_complete(dateCompleted)
+
+    save_note(journal, OP_COMPLETE, noteObject, baseNote)
+
+    print('Completed note ID ' + str(noteObject.ID))
+
+
+@operation
+def command_stats(journal, arguments):
+    """
+    Displays completion statistics of saved notes, streaming notes through statistics engine
+    :return: None
+    """
+    noteStats = NoteStats()
+
+    for noteObject in journal.iter_notes():
+        noteStats.add(noteObject)
+
+    print(json.dumps(noteStats.summary(arguments.period), indent=2))
+
+
+def iter_rows(f, fileFormat):
+    """
+    Generator yielding rows of CSV or JSON Lines file one at a time
+    :param f: (file) Open text file
+    :param fileFormat: (str) 'csv' or 'jsonl'
+    :return: (generator) Row dictionaries
+    """
+    if fileFormat == 'csv':
+        yield from csv.DictReader(f)
+
+    else:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+@operation
+def command_import(journal, arguments):
+    """
+    Streams notes from CSV or JSON Lines file into notes file;
+    Notes given new IDs are streamed straight into rewritten snapshot, so file is imported completely or not at all;
+    Notes keeping their IDs may replace saved notes, so they are written to journal in batches instead;
+    Other processes wait for import to finish, so IDs given to imported notes stay free
+    :return: None
+    """
+    startTime = time.perf_counter()
+    importedCount = 0
+
+    with journal.fileLock.hold(), open_stream(arguments.path, 'r') as f:
+        nextID = max(journal.fileLock.read_reserved_id(), journal.max_id() or 0) + 1
+        rows = iter_rows(f, file_format(arguments.path, arguments.format))
+
+        if not arguments.keep_ids:
+            importedNotes = (note_from_row(row, ID) for ID, row in enumerate(rows, nextID))
+            importedCounter = itertools.count()
+
+            # Counter advances once per note pulled by 'zip()'
+            journal.compact(noteObject for noteObject, _ in zip(importedNotes, importedCounter))
+            importedCount = next(importedCounter)
+
+        else:
+            batchNotes = {}
+            maxID = nextID + MAX_ID_GAP
+
+            for row in rows:
+                ID = int(row['Note ID']) if row.get('Note ID') else nextID
+
+                if not 1 <= ID <= maxID:
+                    raise ValueError('Note ID ' + str(ID) + ' cannot be imported; kept IDs must be between 1 and '
+                                     + str(maxID) + '.')
+
+                nextID = max(nextID, ID + 1)
+
+                batchNotes[ID] = note_from_row(row, ID)
+                journal.record(OP_CREATE, ID)
+
+                if len(batchNotes) >= arguments.batch_size:
+                    # Journal is compacted at most once, after last batch
+                    importedCount += journal.flush(batchNotes, allowCompaction=False)
+                    batchNotes = {}
+
+            importedCount += journal.flush(batchNotes)
+
+    elapsedTime = time.perf_counter() - startTime
+
+    print('Imported %d notes in %.2f s (%.0f notes/s)' % (importedCount, elapsedTime,
+                                                          importedCount / elapsedTime if elapsedTime else 0),
+          file=sys.stderr)
+
+
+@operation
+def command_export(journal, arguments):
+    """
+    Streams saved notes to CSV or JSON Lines file
+    :return: None
+    """
+    startTime = time.perf_counter()
+    exportedCount = 0
+
+    with open_stream(arguments.path, 'w') as f:
+        if file_format(arguments.path, arguments.format) == 'csv':
+            writer = csv.DictWriter(f, COLUMNS)
+            writer.writeheader()
+
+            for noteObject in journal.iter_notes():
+                writer.writerow(noteObject.get_all_data())
+                exportedCount += 1
+
+        else:
+            for noteObject in journal.iter_notes():
+                f.write(json.dumps(noteObject.get_all_data(), ensure_ascii=False) + '\n')
+                exportedCount += 1
+
+    elapsedTime = time.perf_counter() - startTime
+
+    print('Exported %d notes in %.2f s (%.0f notes/s)' % (exportedCount, elapsedTime,
+                                                          exportedCount / elapsedTime if elapsedTime else 0),
+          file=sys.stderr)
+
+
+@operation
+def command_shard(journal, arguments):
+    """
+    Moves saved notes into shards of given size, or back into single notes file
+    :return: None
+    """
+    startTime = time.perf_counter()
+    newJournal = reshard(journal, arguments.size)
+    shardsCount = len(newJournal.read_manifest()) if arguments.size else 1
+
+    print('Moved notes into %d file(s) in %.2f s' % (shardsCount, time.perf_counter() - startTime), file=sys.stderr)
+
+
+@operation
+def command_migrate(journal, arguments):
+    """
+    Moves saved notes into SQLite database next to notes file, or back into single notes file
+    :return: None
+    """
+    # Imported only for migration, to keep startup fast
+    from noteSqlite import migrate
+
+    startTime = time.perf_counter()
+    newJournal = migrate(journal, arguments.backend)
+    savedPath = newJournal.databasePath if arguments.backend == BACKEND_SQLITE else newJournal.filePath
+
+    print('Moved notes into %s in %.2f s' % (savedPath, time.perf_counter() - startTime), file=sys.stderr)
+
+
+@operation
+def command_serve(journal, arguments):
+    """
+    Serves notes over HTTP/JSON until interrupted; saved notes are restored first, and changes still waiting are
+    saved on exit
+    :return: None
+    """
+    import asyncio
+    from notesStore import NotesStore
+    from noteServer import NotesServer, BATCH_SIZE as SERVER_BATCH_SIZE, BATCH_DELAY
+
+    # Server saves writes of concurrent requests in batches itself, so stores over database do not write through
+    store = NotesStore(arguments.file, threadSafe=True, writeThrough=False)
+    store.restore()
+
+    server = NotesServer(store, arguments.batch_size or SERVER_BATCH_SIZE,
+                         arguments.batch_delay / 1000 if arguments.batch_delay is not None else BATCH_DELAY)
+
+    def report_address(address):
+        # Flushed right away, so scripts starting server can read address from pipe
+        print('Serving %d notes on http://%s:%d' % (store.count(), address[0], address[1]), flush=True)
+
+    try:
+        asyncio.run(server.serve(arguments.host, arguments.port, report_address))
+
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+
+
+COMMANDS = {'create': command_create,
+            'read': command_read,
+            'update': command_update,
+            'delete': command_delete,
+            'complete': command_complete,
+            'stats': command_stats,
+            'import': command_import,
+            'export': command_export,
+            'shard': command_shard,
+            'migrate': command_migrate,
+            'serve': command_serve}
+
+
+def run_command(argv):
+    """
+    Runs single non-interactive command
+    :param argv: (list) Command line arguments, without program name
+    :return: (int) Exit status; 0 on success, 1 on error
+    """
+    arguments = build_parser().parse_args(argv)
+    configure(arguments)
+    journal = open_journal(arguments.file)
+
+    try:
+        COMMANDS[arguments.command](journal, arguments)
+
+    except (LookupError, ValueError, OSError) as error:
+        print('ERROR : ' + str(error), file=sys.stderr)
+
+        return 1
+
+    return 0
+
+# This is end of script.
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import struct
+import threading
+from contextlib import contextmanager, nullcontext
+
+# Advisory file locks are only available on Unix; elsewhere processes are not coordinated
+try:
+    import fcntl
+
+except ImportError:
+    fcntl = None
+
+# Number of locks notes are spread over in thread-safe mode; notes whose IDs differ by a multiple share a lock
+LOCK_STRIPES = 64
+
+# Lock file content: highest note ID reserved by any process
+RESERVED_ID = struct.Struct('<q')
+
+# File locks of this process by lock file path; see 'file_lock()'
+FILE_LOCKS = {}
+FILE_LOCKS_GUARD = threading.Lock()
+
+
+class IDAllocator:
+    """
+    Represents allocator of consecutive note IDs; IDs are handed out under lock, so no two callers get same ID;
+    With journal given, IDs are reserved in notes file's lock file, so no two processes get same ID either
+
+    Attributes
+    ----------
+    lastID : (int) Highest ID handed out
+    journal : (NoteJournal) Journal reserving IDs across processes, None to allocate within process only
+    lock : (Lock or nullcontext) Lock guarding 'lastID'; no-op when not thread-safe
+
+    Methods
+    -------
+    allocate(count) : Hands out next IDs
+    """
+    def __init__(self, lastID, threadSafe=False, journal=None):
+        """
+        Initializes allocator
+        :param lastID: (int) Highest ID already in use
+        :param threadSafe: (bool) True to guard allocation with lock
+        :param journal: (NoteJournal) Journal reserving IDs across processes
+        """
+        self.lastID = lastID
+        self.journal = journal
+        self.lock = threading.Lock() if threadSafe else nullcontext()
+
+    def allocate(self, count=1):
+        """
+        Hands out next 'count' IDs at once
+        :param count: (int) Number of IDs needed
+        :return: (int) First of 'count' consecutive IDs
+        """
+        with self.lock:
+            firstID = self.journal.reserve_ids(count) if self.journal is not None else self.lastID + 1
+            self.lastID = max(self.lastID, firstID + count - 1)
+
+        return firstID
+
+
+class FileLock:
+    """
+    Represents advisory lock on lock file kept next to notes file, shared by all processes using notes file;
+    Lock is re-entrant within process, and threads of one process take turns holding it
+
+    Attributes
+    ----------
+    lockPath : (str) Path of lock file
+    threadLock : (RLock) Lock keeping threads of this process from holding file lock at same time
+    depth : (int) Number of nested holds by current holder
+    fileDescriptor : (int) Open lock file while lock is held, None otherwise
+
+    Methods
+    -------
+    hold(exclusive) : Context manager holding lock
+    read_reserved_id() : Reads highest reserved note ID from lock file
+    write_reserved_id(ID) : Writes highest reserved note ID to lock file
+    """
+    def __init__(self, lockPath):
+        """
+        Initializes lock; lock file is created on first hold
+        :param lockPath: (str) Path of lock file
+        """
+        self.lockPath = lockPath
+        self.threadLock = threading.RLock()
+        self.depth = 0
+        self.fileDescriptor = None
+
+    @contextmanager
+    def hold(self, exclusive=True):
+        """
+        Holds lock for duration of 'with' block; nested holds only count depth, so outermost hold decides whether
+        lock is shared or exclusive
+        :param exclusive: (bool) True for writers, False for readers, which may hold lock together
+        :return: (generator) Context manager
+        """
+        with self.threadLock:
+            if self.depth == 0:
+                self.fileDescriptor = os.open(self.lockPath, os.O_RDWR | os.O_CREAT, 0o644)
+
+                if fcntl is not None:
+                    fcntl.flock(self.fileDescriptor, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+            self.depth += 1
+
+            try:
+                yield
+
+            finally:
+                self.depth -= 1
+
+                if self.depth == 0:
+                    # Closing lock file releases lock
+                    os.close(self.fileDescriptor)
+                    self.fileDescriptor = None
+
+    def read_reserved_id(self):
+        """
+        Reads highest reserved note ID; lock must be held
+        :return: (int) Highest reserved note ID, 0 if none reserved yet
+        """
+        os.lseek(self.fileDescriptor, 0, os.SEEK_SET)
+        content = os.read(self.fileDescriptor, RESERVED_ID.size)
+
+        return RESERVED_ID.unpack(content)[0] if len(content) == RESERVED_ID.size else 0
+
+    def write_reserved_id(self, ID):
+        """
+        Writes highest reserved note ID; lock must be held exclusively
+        :param ID: (int) Highest reserved note ID
+        :return: None
+        """
+        os.lseek(self.fileDescriptor, 0, os.SEEK_SET)
+        os.write(self.fileDescriptor, RESERVED_ID.pack(ID))
+
+
+class StripedLocks:
+    """
+    Represents fixed set of locks notes are spread over by ID, so changes to different notes rarely wait on each
+    other while changes to same note never interleave
+
+    Attributes
+    ----------
+    locks : (list) Locks, or single no-op context when not thread-safe
+
+    Methods
+    -------
+    lock_for(ID) : Returns lock guarding note
+    """
+    def __init__(self, threadSafe=False, stripes=LOCK_STRIPES):
+        """
+        Initializes locks
+        :param threadSafe: (bool) True to create real locks
+        :param stripes: (int) Number of locks
+        """
+        self.locks = [threading.RLock() for _ in range(stripes)] if threadSafe else [nullcontext()]
+
+    def lock_for(self, ID):
+        """
+        Returns lock guarding note
+        :param ID: (int) Note ID
+        :return: (RLock or nullcontext) Lock to hold while note is changed
+        """
+        return self.locks[ID % len(self.locks)]
+
+
+def file_lock(lockPath):
+    """
+    Returns file lock of lock file, shared by all journals of this process using it; advisory locks belong to open
+    files, so a second lock on same file held by same process would wait for the first one forever
+    :param lockPath: (str) Path of lock file
+    :return: (FileLock) Lock
+    """
+    with FILE_LOCKS_GUARD:
+        return FILE_LOCKS.setdefault(os.path.abspath(lockPath), FileLock(lockPath))
+
+
+def structure_lock(threadSafe):
+    """
+    Returns lock guarding one shared structure (journal, statistics or search index)
+    :param threadSafe: (bool) True for real lock, False for no-op context
+    :return: (Lock or nullcontext) Lock
+    """
+    return threading.Lock() if threadSafe else nullcontext()
+
+
+def take_mine(baseValue, myValue, theirValue):
+    """
+    Decides one field of three-way merge
+    :param baseValue: Field value in common base version
+    :param myValue: Field value in this process
+    :param theirValue: Field value saved by another process
+    :return: (tuple) True if merged note takes 'myValue', and True if both sides changed field differently
+    """
+    if myValue == baseValue or myValue == theirValue:
+        return False, False
+
+    return True, theirValue != baseValue
+
+
+def merge_notes(base, mine, theirs):
+    """
+    Merges two versions of note changed independently since common base version, field by field: title, text and
+    completion (status together with date); field changed on one side only takes that side's value, field changed on
+    both sides to different values is a conflict and takes 'mine'
+    :param base: (Note) Version both sides started from
+    :param mine: (Note) Version changed in this process
+    :param theirs: (Note) Version saved by another process
+    :return: (tuple) Merged note (copy of 'theirs' with merged fields) and True if any field conflicted
+    """
+    mergedNote = theirs.copy()
+
+    takeTitle, titleConflict = take_mine(base.title, mine.title, theirs.title)
+    takeText, textConflict = take_mine(base.text, mine.text, theirs.text)
+    takeCompletion, completionConflict = take_mine((base.isCompleted, base.completedEpoch),
+                                                   (mine.isCompleted, mine.completedEpoch),
+                                                   (theirs.isCompleted, theirs.completedEpoch))
+
+    if takeTitle:
+        mergedNote.update_title(mine.title)
+
+    if takeText:
+        mergedNote.update_text(mine.text)
+
+    if takeCompletion:
+        mergedNote.isCompleted, mergedNote.completedEpoch = mine.isCompleted, mine.completedEpoch
+
+    return mergedNote, titleConflict or textConflict or completionConflict
+
+
+def resolve_change(noteID, myNote, baseNotes, readSavedNote, mergedNotes=None, conflictIDs=None):
+    """
+    Decides what to write for one changed note, given version saved by other processes meanwhile:
+    Note nobody else saved since it was read is written as is; note also changed elsewhere is merged field by field;
+    deleting note changed elsewhere keeps other version; changing note deleted elsewhere keeps this one
+    :param noteID: (int) ID of changed note
+    :param myNote: (Note) Version of note in session, None if deleted in session
+    :param baseNotes: (dict) Versions notes were read in, None for notes created in session; None if caller does not
+                      track them, in which case its changes are written as is
+    :param readSavedNote: (function) Returns saved version of note by ID, None if note is not saved
+    :param mergedNotes: (dict) Optional dictionary collecting notes written in different form than in session
+    :param conflictIDs: (list) Optional list collecting IDs of notes changed differently in both places
+    :return: (tuple) Note to write (None for deletion) and its new version; None if nothing is to be written
+    """
+    if baseNotes is None:
+        return myNote, (myNote.version + 1 if myNote is not None else 0)
+
+    baseNote = baseNotes.get(noteID)
+    savedNote = readSavedNote(noteID)
+    savedVersion = savedNote.version if savedNote is not None else 0
+
+    # Nobody else saved note since it was read (or, for note created in session, nobody saved its ID)
+    if (savedNote is None) == (baseNote is None) and savedVersion == (baseNote.version if baseNote else 0):
+        return myNote, savedVersion + 1
+
+    if myNote is None:
+        if savedNote is not None and conflictIDs is not None:
+            conflictIDs.append(noteID)
+
+        # Deleted in both places, or deleted here while changed elsewhere; other version is kept
+        return None
+
+    if savedNote is None or baseNote is None:
+        # Deleted elsewhere while changed here, or ID saved elsewhere; this version is kept
+        writtenNote, hasConflict = myNote, True
+
+    else:
+        writtenNote, hasConflict = merge_notes(baseNote, myNote, savedNote)
+
+        if mergedNotes is not None:
+            mergedNotes[noteID] = writtenNote
+
+    if hasConflict and conflictIDs is not None:
+        conflictIDs.append(noteID)
+
+    return writtenNote, savedVersion + 1
+
+# This is end of script.
@@ -0,0 +1,465 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import mmap
+import zlib
+import struct
+from itertools import chain, islice
+from Note import Note, NO_DATE
+from noteLoader import iter_notes
+from noteBodies import LAZY_OFF, LAZY_ALL, COMPRESS_OFF, COMPRESS_MODE, TRAINING_TEXTS, MAX_CODECS, MappedFile, \
+    LazyText, CODECS, codec_for, train_dictionary
+from noteMetrics import METRICS
+
+# Names of supported on-disk formats
+FORMAT_TEXT = 'text'
+FORMAT_BINARY = 'binary'
+
+# Format used when saving; can be switched to plain text through 'NOTES_FORMAT' environment variable
+DEFAULT_FORMAT = os.environ.get('NOTES_FORMAT', FORMAT_BINARY)
+
+# Binary file header: magic bytes followed by format version; since format version 3 followed by length of
+# compression dictionary shared by note texts and dictionary itself, empty if texts are not compressed
+BINARY_MAGIC = b'PNHB'
+BINARY_VERSION = 4
+FILE_HEADER = struct.Struct('<4sH')
+DICTIONARY_HEADER = struct.Struct('<I')
+
+# Binary record header: ID, creation and completion timestamps (epoch microseconds, 'NO_DATE' if absent), flags, title
+# length and text length in bytes, and since format version 2 version counter of note;
+# UTF-8 encoded title and text follow the header; texts flagged compressed are raw deflate streams over dictionary
+RECORD_HEADERS = {1: struct.Struct('<qqqBII'),
+                  2: struct.Struct('<qqqBIIq'),
+                  3: struct.Struct('<qqqBIIq'),
+                  4: struct.Struct('<qqqBIIq')}
+RECORD_HEADER = RECORD_HEADERS[BINARY_VERSION]
+
+# Completion timestamp of records without completion date before format version 4; also a valid timestamp, one
+# microsecond before epoch, so it is only read as missing date from older files and journals
+LEGACY_NO_DATE = -1
+
+# Record flags
+FLAG_COMPLETED = 1
+FLAG_COMPRESSED = 2
+
+# Binary records joined before each write to file; one write per record costs more than encoding record
+WRITE_BATCH = 4096
+
+# Compression dictionaries of files read by 'read_note_at()', with file identity they were read from
+FILE_CODECS = {}
+
+
+def detect_format(filePath):
+    """
+    Detects format of notes file from its first bytes
+    :param filePath: (str) Path of notes file
+    :return: (str) 'FORMAT_BINARY' if file starts with binary header, 'FORMAT_TEXT' otherwise
+    """
+    with open(filePath, 'rb') as f:
+        magic = f.read(len(BINARY_MAGIC))
+
+    return FORMAT_BINARY if magic == BINARY_MAGIC else FORMAT_TEXT
+
+
+def record_header(version):
+    """
+    Returns record header layout used by given version of binary notes file or journal
+    :param version: (int) Format version read from file header
+    :return: (Struct) Record header layout
+    :raises ValueError: If version is not supported
+    """
+    recordHeader = RECORD_HEADERS.get(version)
+
+    if recordHeader is None:
+        raise ValueError('Unsupported notes file version: ' + str(version))
+
+    return recordHeader
+
+
+def read_layout(buffer):
+    """
+    Reads file header of binary notes file
+    :param buffer: (bytes-like) Contents of file, from its start
+    :return: (tuple) Record header layout, codec of compressed texts (None if file has no dictionary) and offset of
+             first record
+    :raises ValueError: If buffer does not start with binary header
+    """
+    magic, version = FILE_HEADER.unpack_from(buffer, 0)
+
+    if magic != BINARY_MAGIC:
+        raise ValueError('Not a binary notes file')
+
+    recordHeader = record_header(version)
+
+    if version < 3:
+        return recordHeader, None, FILE_HEADER.size
+
+    dictionaryStart = FILE_HEADER.size + DICTIONARY_HEADER.size
+    dictionaryEnd = dictionaryStart + DICTIONARY_HEADER.unpack_from(buffer, FILE_HEADER.size)[0]
+    codec = codec_for(bytes(buffer[dictionaryStart:dictionaryEnd])) if dictionaryEnd > dictionaryStart else None
+
+    return recordHeader, codec, dictionaryEnd
+
+
+def file_codec(filePath):
+    """
+    Returns codec of compression dictionary of binary notes file
+    :param filePath: (str) Path of notes file
+    :return: (TextCodec) Codec, None if file is missing, not binary or has no dictionary
+    """
+    try:
+        with open(filePath, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                return read_layout(buffer)[1]
+
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def encode_note(noteObject, codec=None):
+    """
+    Encodes note object as binary record
+    :param noteObject: (Note) Note to encode
+    :param codec: (TextCodec) Codec of file record is written to, to compress text with; None to write text as is
+    :return: (bytes) Record header followed by title and text bytes
+    """
+    titleBytes = noteObject.title.encode('utf-8')
+    flags = FLAG_COMPLETED if noteObject.isCompleted else 0
+    textBytes = None
+
+    if codec is not None:
+        packedText = noteObject._text
+
+        # Text kept compressed with same dictionary is written without decompressing it
+        if isinstance(packedText, bytes) and packedText[0] == codec.number and CODECS[codec.number] is codec:
+            textBytes = packedText[1:]
+
+        else:
+            textBytes = codec.compress(noteObject.text.encode('utf-8'))
+
+    if textBytes is not None:
+        flags |= FLAG_COMPRESSED
+
+    else:
+        textBytes = noteObject.text.encode('utf-8')
+
+    return RECORD_HEADER.pack(noteObject.ID, noteObject.createdEpoch, noteObject.completedEpoch, flags,
+                              len(titleBytes), len(textBytes), noteObject.version) \
+        + titleBytes + textBytes
+
+
+def decode_note(buffer, offset, mappedFile=None, lazyMode=LAZY_OFF, recordHeader=RECORD_HEADER, codec=None):
+    """
+    Decodes binary record starting at 'offset'; compressed texts are kept compressed in note when compression is on,
+    and decompressed otherwise
+    :param buffer: (bytes-like) Buffer holding binary records
+    :param offset: (int) Position of record header within 'buffer'
+    :param mappedFile: (MappedFile) Memory-mapped file 'buffer' belongs to; needed for lazy decoding only
+    :param lazyMode: (str) 'LAZY_TEXT' or 'LAZY_ALL' to leave text (and title) in file as lazy handles
+    :param recordHeader: (Struct) Record header layout of file version 'buffer' was read from
+    :param codec: (TextCodec) Codec of compression dictionary of file 'buffer' was read from
+    :return: (tuple) Decoded note object and offset of the next record
+    :raises ValueError: If record is truncated, or compressed while file has no dictionary
+    """
+    if offset + recordHeader.size > len(buffer):
+        raise ValueError('Truncated note record at offset ' + str(offset))
+
+    headerFields = recordHeader.unpack_from(buffer, offset)
+    ID, createdEpoch, completedEpoch, flags, titleLength, textLength = headerFields[:6]
+
+    if completedEpoch == LEGACY_NO_DATE and recordHeader is not RECORD_HEADER:
+        completedEpoch = NO_DATE
+
+    # Records written before format version 2 carry no version counter
+    version = headerFields[6] if len(headerFields) > 6 else 0
+
+    titleStart = offset + recordHeader.size
+    textStart = titleStart + titleLength
+    nextOffset = textStart + textLength
+
+    if nextOffset > len(buffer):
+        raise ValueError('Truncated note record at offset ' + str(offset))
+
+    isCompressed = flags & FLAG_COMPRESSED
+
+    if isCompressed and codec is None:
+        raise ValueError('Compressed note record without dictionary at offset ' + str(offset))
+
+    if lazyMode == LAZY_OFF:
+        title = str(buffer[titleStart:textStart], 'utf-8')
+
+        if not isCompressed:
+            text = str(buffer[textStart:nextOffset], 'utf-8')
+
+        # Compressed text stays compressed in memory, which also spares decompressing it on restore
+        elif COMPRESS_MODE != COMPRESS_OFF and codec.number < MAX_CODECS:
+            text = codec.pack(buffer[textStart:nextOffset])
+
+        else:
+            text = str(codec.decompress(buffer[textStart:nextOffset]), 'utf-8')
+
+    else:
+        title = LazyText(mappedFile, titleStart, titleLength) if lazyMode == LAZY_ALL \
+            else str(buffer[titleStart:textStart], 'utf-8')
+        text = LazyText(mappedFile, textStart, textLength, codec if isCompressed else None)
+
+    noteObject = Note.from_epochs(ID, createdEpoch, title, text, bool(flags & FLAG_COMPLETED), completedEpoch,
+                                  version)
+
+    return noteObject, nextOffset
+
+
+def iter_binary_notes(filePath, malformedLines=None, lazyMode=LAZY_OFF):
+    """
+    Generator yielding note objects from binary notes file;
+    Reading stops at first truncated record, which is reported through 'malformedLines'
+    :param filePath: (str) Path of binary notes file
+    :param malformedLines: (list) Optional list to which offset of truncated record is appended
+    :param lazyMode: (str) 'LAZY_TEXT' or 'LAZY_ALL' to keep file mapped and decode texts (and titles) on access
+    :return: (generator) Note objects in order of appearance in file
+    """
+    mappedFile = MappedFile(filePath)
+    buffer = mappedFile.buffer
+
+    if FILE_HEADER.unpack_from(buffer, 0)[0] != BINARY_MAGIC:
+        raise ValueError('Not a binary notes file: ' + filePath)
+
+    recordHeader, codec, offset = read_layout(buffer)
+
+    try:
+        while offset < len(buffer):
+            try:
+                noteObject, offset = decode_note(buffer, offset, mappedFile, lazyMode, recordHeader, codec)
+
+            except ValueError:
+                if malformedLines is not None:
+                    malformedLines.append(offset)
+
+                return
+
+            yield noteObject
+
+    finally:
+        # Map is closed right away unless lazy notes still refer to it
+        if lazyMode == LAZY_OFF:
+            buffer.close()
+
+
+def iter_binary_headers(filePath):
+    """
+    Generator yielding position and metadata of every record in binary notes file, without decoding note texts
+    :param filePath: (str) Path of binary notes file
+    :return: (generator) Tuples of record offset, note ID, completion status, title and content hash of record
+    """
+    with open(filePath, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            recordHeader, _, offset = read_layout(buffer)
+
+            while offset + recordHeader.size <= len(buffer):
+                ID, _, _, flags, titleLength, textLength = recordHeader.unpack_from(buffer, offset)[:6]
+                titleStart = offset + recordHeader.size
+
+                if titleStart + titleLength + textLength > len(buffer):
+                    return
+
+                recordEnd = titleStart + titleLength + textLength
+
+                title = str(buffer[titleStart:titleStart + titleLength], 'utf-8')
+
+                yield offset, ID, bool(flags & FLAG_COMPLETED), title, zlib.crc32(buffer[offset:recordEnd])
+
+                offset = recordEnd
+
+
+def text_line(noteObject):
+    """
+    Returns line under which note is saved in plain text notes file, without line break
+    :param noteObject: (Note) Note
+    :return: (str) Dictionary returned by 'Note.get_all_data()' as string
+    """
+    return "%s" % noteObject.get_all_data()
+
+
+def content_hash(noteObject, record=None):
+    """
+    Returns content hash of saved note: CRC32 of its binary record, or of its plain text line if no record is given;
+    Hash of binary record changes on every save of note, since record also holds its version counter
+    :param noteObject: (Note) Note
+    :param record: (bytes) Binary record of note as written to file
+    :return: (int) Unsigned 32-bit hash
+    """
+    return zlib.crc32(record if record is not None else text_line(noteObject).encode('utf-8'))
+
+
+def read_note_at(filePath, offset):
+    """
+    Reads single binary record at known position of file
+    :param filePath: (str) Path of binary notes file or journal; both start with magic bytes and format version
+    :param offset: (int) Position of record header within file
+    :return: (Note) Decoded note object
+    """
+    with open(filePath, 'rb') as f:
+        version = FILE_HEADER.unpack(f.read(FILE_HEADER.size))[1]
+        recordHeader = record_header(version)
+        codec = None
+
+        # Dictionary of notes file is read once per version of file
+        if version >= 3:
+            fileStat = os.fstat(f.fileno())
+            fileIdentity = (fileStat.st_ino, fileStat.st_size, fileStat.st_mtime_ns)
+            cachedIdentity, codec = FILE_CODECS.get(filePath, (None, None))
+
+            if cachedIdentity != fileIdentity:
+                codec = file_codec(filePath)
+                FILE_CODECS[filePath] = (fileIdentity, codec)
+
+        f.seek(offset)
+        header = f.read(recordHeader.size)
+
+        _, _, _, _, titleLength, textLength = recordHeader.unpack(header)[:6]
+
+        noteObject, _ = decode_note(header + f.read(titleLength + textLength), 0, recordHeader=recordHeader,
+                                    codec=codec)
+
+    METRICS.count('notes_bytes_read_total', len(header) + titleLength + textLength, (('file', 'record'),))
+
+    return noteObject
+
+
+def read_notes(filePath, malformedLines=None, lazyMode=LAZY_OFF):
+    """
+    Generator yielding note objects from notes file in any supported format
+    :param filePath: (str) Path of notes file
+    :param malformedLines: (list) Optional list collecting positions of skipped malformed records
+    :param lazyMode: (str) Lazy loading mode; applies to binary format only
+    :return: (generator) Note objects in order of appearance in file
+    """
+    if os.path.getsize(filePath) == 0:
+        return iter(())
+
+    fileFormat = detect_format(filePath)
+    notes = iter_binary_notes(filePath, malformedLines, lazyMode) if fileFormat == FORMAT_BINARY \
+        else iter_notes(filePath, malformedLines)
+
+    if not METRICS.enabled:
+        return notes
+
+    # Records are parsed while caller consumes them, so only time spent producing them counts as parse time
+    METRICS.count('notes_bytes_read_total', os.path.getsize(filePath), (('file', 'snapshot'),))
+
+    return METRICS.timed_iter(notes, 'notes_parse_seconds_total', (('format', fileFormat),))
+
+
+def compression_codec(filePath, notes):
+    """
+    Returns codec note texts written to file are compressed with: dictionary of file being replaced, so texts kept
+    compressed in memory are written as they are, or else dictionary trained on first notes written
+    :param filePath: (str) Path of notes file
+    :param notes: (iterator) Note objects to write
+    :return: (tuple) Codec, and iterator yielding same notes as 'notes'
+    """
+    codec = file_codec(filePath) if os.path.exists(filePath) else None
+
+    if codec is not None:
+        return codec, notes
+
+    sampleNotes = list(islice(notes, TRAINING_TEXTS))
+    dictionary = train_dictionary([noteObject.text for noteObject in sampleNotes])
+
+    return (codec_for(dictionary) if dictionary else None), chain(sampleNotes, notes)
+
+
+def sync_directory(directoryPath):
+    """
+    Forces directory entries to disk, so files created, renamed or removed in directory survive power loss
+    :param directoryPath: (str) Path of directory
+    :return: None
+    """
+    try:
+        directoryDescriptor = os.open(directoryPath or '.', os.O_RDONLY)
+
+    # Directories cannot be opened on Windows, where renames are synced by file system itself
+    except OSError:
+        return
+
+    try:
+        os.fsync(directoryDescriptor)
+
+    finally:
+        os.close(directoryDescriptor)
+
+
+def write_notes(filePath, notes, fileFormat=DEFAULT_FORMAT, indexEntries=None, compressMode=COMPRESS_MODE):
+    """
+    Writes note objects to file in requested format;
+    File is written to a temporary file first, forced to disk and then swapped in, so an interrupted save or power
+    loss keeps either previous or new contents
+    :param filePath: (str) Path of notes file
+    :param notes: (iterable) Note objects to write
+    :param fileFormat: (str) 'FORMAT_BINARY' or 'FORMAT_TEXT'
+    :param indexEntries: (list) Optional list to which record offset, ID, completion status, title and content hash
+                         of every written note are appended; offset is -1 for plain text format
+    :param compressMode: (str) 'COMPRESS_ZLIB' to compress note texts of binary file, 'COMPRESS_OFF' otherwise
+    :return: None
+    """
+    if fileFormat not in (FORMAT_TEXT, FORMAT_BINARY):
+        raise ValueError('Unknown notes file format: ' + str(fileFormat))
+
+    tempPath = filePath + '.tmp'
+
+    if fileFormat == FORMAT_TEXT:
+        with open(tempPath, 'w') as f:
+            for noteObject in notes:
+                f.write(text_line(noteObject) + '\n')
+
+                if indexEntries is not None:
+                    indexEntries.append((-1, noteObject.ID, noteObject.isCompleted, noteObject.title,
+                                         content_hash(noteObject)))
+
+            f.flush()
+            os.fsync(f.fileno())
+
+    else:
+        codec = None
+
+        if compressMode != COMPRESS_OFF:
+            codec, notes = compression_codec(filePath, iter(notes))
+
+        dictionary = codec.dictionary if codec is not None else b''
+
+        with open(tempPath, 'wb') as f:
+            f.write(FILE_HEADER.pack(BINARY_MAGIC, BINARY_VERSION) + DICTIONARY_HEADER.pack(len(dictionary))
+                    + dictionary)
+            offset = FILE_HEADER.size + DICTIONARY_HEADER.size + len(dictionary)
+            records = []
+
+            for noteObject in notes:
+                record = encode_note(noteObject, codec)
+                records.append(record)
+
+                if indexEntries is not None:
+                    indexEntries.append((offset, noteObject.ID, noteObject.isCompleted, noteObject.title,
+                                         content_hash(noteObject, record)))
+
+                offset += len(record)
+
+                if len(records) >= WRITE_BATCH:
+                    f.write(b''.join(records))
+                    records = []
+
+            f.write(b''.join(records))
+            f.flush()
+            os.fsync(f.fileno())
+
+    os.replace(tempPath, filePath)
+    sync_directory(os.path.dirname(filePath))
+
+    if METRICS.enabled:
+        METRICS.count('notes_bytes_written_total', os.path.getsize(filePath), (('file', 'snapshot'),))
+
+# This is end of script.
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import datetime
+from bisect import bisect_right
+from collections import deque
+from Note import NO_DATE, to_epoch, from_epoch
+
+# Retention of history: number of changes kept, and age in seconds of oldest change kept (0 for no age limit);
+# set through environment variables
+MAX_CHANGES = int(os.environ.get('NOTES_HISTORY_CHANGES', 10000))
+MAX_AGE = float(os.environ.get('NOTES_HISTORY_SECONDS', 0))
+
+
+def current_epoch():
+    """
+    Returns current time as used for history; local time, like creation and completion dates of notes
+    :return: (int) Current time in epoch microseconds
+    """
+    return to_epoch(datetime.datetime.now())
+
+
+class NoteHistory:
+    """
+    Represents history of note changes made in session, for undo and redo and for looking up notes as they were at
+    any time since session started;
+    Notes are never changed in place but replaced by copies sharing unchanged title and text, so history only holds
+    references to versions that were replaced, and keeping a version costs no copy of unchanged text;
+    Changes beyond retention are dropped oldest first, together with versions only they referred to
+
+    Attributes
+    ----------
+    maxChanges : (int) Maximum number of changes kept
+    maxAge : (float) Maximum age in seconds of changes kept, 0 for no age limit
+    changeLog : (deque) Times and note IDs of kept changes, oldest first
+    changeTimes : (dict) Note IDs as keys; lists of times of kept changes of note as values
+    versions : (dict) Note IDs as keys; lists of versions of note as values: version before first kept change,
+               followed by version after every kept change; None where note did not exist
+    undoSteps : (deque) Changes that can be undone, as tuples of change time, note ID, version before and version
+                after change
+    redoSteps : (deque) Undone changes that can be made again, most recently undone last
+    horizon : (int) Time in epoch microseconds of latest dropped change; notes are not known as they were before it
+
+    Methods
+    -------
+    record(ID, previousNote, noteObject, isUndoable) : Records change of note
+    pop_undo() : Takes most recent change to undo
+    pop_redo() : Takes most recently undone change to make again
+    as_of(ID, epoch) : Returns version of note at given time
+    trim(epoch) : Drops changes beyond retention
+    changes_count() : Returns number of kept changes
+    """
+    def __init__(self, maxChanges=MAX_CHANGES, maxAge=MAX_AGE):
+        """
+        Initializes empty history
+        :param maxChanges: (int) Maximum number of changes kept
+        :param maxAge: (float) Maximum age in seconds of changes kept, 0 for no age limit
+        """
+        self.maxChanges = maxChanges
+        self.maxAge = maxAge
+        self.changeLog = deque()
+        self.changeTimes = {}
+        self.versions = {}
+        self.undoSteps = deque(maxlen=maxChanges)
+        self.redoSteps = deque(maxlen=maxChanges)
+        self.horizon = NO_DATE
+
+    def record(self, ID, previousNote, noteObject, isUndoable=True):
+        """
+        Records change of note; new change that can be undone makes undone changes final
+        :param ID: (int) Note ID
+        :param previousNote: (Note) Version before change, None for created note
+        :param noteObject: (Note) Version after change, None for deleted note
+        :param isUndoable: (bool) False for changes made by undo and redo themselves
+        :return: None
+        """
+        if not self.maxChanges:
+            return
+
+        changeEpoch = current_epoch()
+
+        versions = self.versions.get(ID)
+
+        if versions is None:
+            self.changeTimes[ID] = [changeEpoch]
+            self.versions[ID] = [previousNote, noteObject]
+
+        else:
+            self.changeTimes[ID].append(changeEpoch)
+            versions.append(noteObject)
+
+        self.changeLog.append((changeEpoch, ID))
+
+        if isUndoable:
+            self.undoSteps.append((changeEpoch, ID, previousNote, noteObject))
+
+            if self.redoSteps:
+                self.redoSteps.clear()
+
+        if len(self.changeLog) > self.maxChanges or self.maxAge:
+            self.trim(changeEpoch)
+
+    def pop_undo(self):
+        """
+        Takes most recent change to undo, and keeps it for redo
+        :return: (tuple) Change time, note ID, version before and version after change; None if there is nothing to
+                 undo
+        """
+        if not self.undoSteps:
+            return None
+
+        step = self.undoSteps.pop()
+        self.redoSteps.append(step)
+
+        return step
+
+    def pop_redo(self):
+        """
+        Takes most recently undone change to make again, and keeps it for undo
+        :return: (tuple) Change time, note ID, version before and version after change; None if there is nothing to
+                 redo
+        """
+        if not self.redoSteps:
+            return None
+
+        step = self.redoSteps.pop()
+        self.undoSteps.append(step)
+
+        return step
+
+    def as_of(self, ID, epoch):
+        """
+        Returns version of note at given time, from kept changes
+        :param ID: (int) Note ID
+        :param epoch: (int) Time in epoch microseconds
+        :return: (tuple) True and version of note (None if note did not exist then) if history knows it; False and
+                 None if note did not change since that time, so current version applies
+        :raises LookupError: If changes made since that time have been dropped
+        """
+        if epoch < self.horizon:
+            raise LookupError('History before ' + str(from_epoch(self.horizon)) + ' is no longer kept.')
+
+        changeTimes = self.changeTimes.get(ID)
+
+        if changeTimes is None or epoch >= changeTimes[-1]:
+            return False, None
+
+        return True, self.versions[ID][bisect_right(changeTimes, epoch)]
+
+    def trim(self, epoch):
+        """
+        Drops oldest changes while more than 'maxChanges' are kept or they are older than 'maxAge', along with undo
+        and redo of changes dropped; versions only dropped changes referred to are released
+        :param epoch: (int) Current time in epoch microseconds
+        :return: None
+        """
+        oldestKept = epoch - int(self.maxAge * 1000000) if self.maxAge else None
+
+        while self.changeLog and (len(self.changeLog) > self.maxChanges or
+                                  (oldestKept is not None and self.changeLog[0][0] < oldestKept)):
+            changeEpoch, ID = self.changeLog.popleft()
+            self.horizon = changeEpoch
+
+            # Version after dropped change becomes version before first kept change
+            del self.changeTimes[ID][0]
+            del self.versions[ID][0]
+
+            if not self.changeTimes[ID]:
+                del self.changeTimes[ID]
+                del self.versions[ID]
+
+        for steps in (self.undoSteps, self.redoSteps):
+            while steps and steps[0][0] <= self.horizon:
+                steps.popleft()
+
+    def changes_count(self):
+        """
+        Returns number of kept changes
+        :return: (int) Number of changes
+        """
+        return len(self.changeLog)
+
+# This is end of script.
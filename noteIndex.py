@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import zlib
+import struct
+from array import array
+from bisect import bisect_left
+from noteFormats import FORMAT_BINARY, RECORD_HEADER, detect_format, iter_binary_headers, read_note_at, read_notes, \
+    content_hash
+from noteLoader import iter_notes_by_id
+from noteMetrics import METRICS
+
+# Index file header: magic bytes, format version, maximum note ID, number of entries, size and modification time of
+# snapshot file, size of journal covered by entries and size of journal covered by maximum note ID
+INDEX_MAGIC = b'PNHI'
+INDEX_VERSION = 2
+INDEX_HEADER = struct.Struct('<4sHqqqqqq')
+
+# Index entry: note ID, record offset, flags, content hash of record and title length in bytes; UTF-8 encoded title
+# follows
+INDEX_ENTRY = struct.Struct('<qqBII')
+
+# Entry flags
+FLAG_COMPLETED = 1
+FLAG_IN_JOURNAL = 2
+
+# Offset of notes saved in plain text format, which can only be found by scanning file
+NO_OFFSET = -1
+
+
+class NoteIndex:
+    """
+    Represents sidecar index of saved notes: note ID to record offset, completion status, title and content hash;
+    Entries are kept sorted by note ID, so lookups never touch note texts
+
+    Attributes
+    ----------
+    filePath : (str) Path of notes snapshot file
+    journalPath : (str) Path of journal file
+    indexPath : (str) Path of index file
+    ids : (array) Sorted note IDs
+    offsets : (array) Record offsets in snapshot or journal file, matching 'ids'
+    flags : (bytearray) Completion and location flags, matching 'ids'
+    titles : (list) Note titles, matching 'ids'
+    hashes : (array) Content hashes of saved records (see 'noteFormats.content_hash()'), matching 'ids'
+    maxID : (int) Highest note ID saved, 0 if none
+    isLoaded : (bool) True once entries have been loaded into memory
+
+    Methods
+    -------
+    read_header() : Reads index file header
+    is_fresh(header) : Checks if index file matches notes and journal files on disk
+    load() : Loads entries from index file, or rebuilds them from snapshot file
+    save(journalSize) : Writes all entries to index file
+    update_header(journalSize) : Updates maximum note ID and covered journal size in index file
+    replace(indexEntries) : Replaces all entries by entries of freshly written snapshot
+    set_entry(ID, offset, flags, title, contentHash) : Adds or replaces entry of note
+    remove_entry(ID) : Removes entry of note
+    find(ID) : Returns position of note entry
+    read_note(ID) : Reads single saved note from file
+    read_notes(IDs) : Reads several saved notes from file
+    """
+    def __init__(self, filePath, journalPath):
+        """
+        Initializes index attributes; entries are loaded on first use
+        :param filePath: (str) Path of notes snapshot file
+        :param journalPath: (str) Path of journal file
+        """
+        self.filePath = filePath
+        self.journalPath = journalPath
+        self.indexPath = os.path.splitext(filePath)[0] + '.idx'
+        self.ids = array('q')
+        self.offsets = array('q')
+        self.flags = bytearray()
+        self.titles = []
+        self.hashes = array('I')
+        self.maxID = 0
+        self.isLoaded = False
+
+    def file_state(self):
+        """
+        Returns size and modification time of snapshot file and size of journal file
+        :return: (tuple) Snapshot size, snapshot modification time (ns) and journal size; zeros for missing files
+        """
+        snapshotSize, snapshotTime, journalSize = 0, 0, 0
+
+        if os.path.exists(self.filePath):
+            snapshotStat = os.stat(self.filePath)
+            snapshotSize, snapshotTime = snapshotStat.st_size, snapshotStat.st_mtime_ns
+
+        if os.path.exists(self.journalPath):
+            journalSize = os.path.getsize(self.journalPath)
+
+        return snapshotSize, snapshotTime, journalSize
+
+    def read_header(self):
+        """
+        Reads index file header
+        :return: (tuple) Magic, version, maximum ID, entries count, snapshot size, snapshot modification time, indexed
+                 journal size and journal size; None if index file is missing or unreadable
+        """
+        try:
+            with open(self.indexPath, 'rb') as f:
+                header = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+
+        except (OSError, struct.error):
+            return None
+
+        if header[0] != INDEX_MAGIC or header[1] != INDEX_VERSION:
+            return None
+
+        return header
+
+    def is_fresh(self, header):
+        """
+        Checks if index file header matches notes and journal files currently on disk
+        :param header: (tuple) Header returned by 'read_header()'
+        :return: (bool) True if index describes files on disk, False otherwise
+        """
+        if header is None:
+            return False
+
+        snapshotSize, snapshotTime, journalSize = self.file_state()
+
+        return header[4] == snapshotSize and header[5] == snapshotTime and header[7] == journalSize
+
+    def load(self):
+        """
+        Loads entries from index file if it still belongs to snapshot file on disk, rebuilds them from snapshot file
+        otherwise; Journal entries past returned offset still have to be applied by caller
+        :return: (int) Journal offset up to which loaded entries are up to date
+        """
+        header = self.read_header()
+        snapshotSize, snapshotTime, journalSize = self.file_state()
+
+        self.ids, self.offsets, self.flags, self.titles, self.hashes = array('q'), array('q'), bytearray(), [], \
+            array('I')
+        self.maxID = 0
+        self.isLoaded = True
+
+        if header is not None and header[4] == snapshotSize and header[5] == snapshotTime and header[6] <= journalSize:
+            with open(self.indexPath, 'rb') as f:
+                buffer = f.read()
+
+            METRICS.count('notes_bytes_read_total', len(buffer), (('file', 'index'),))
+            offset = INDEX_HEADER.size
+
+            for _ in range(header[3]):
+                ID, recordOffset, flags, contentHash, titleLength = INDEX_ENTRY.unpack_from(buffer, offset)
+                offset += INDEX_ENTRY.size
+
+                self.ids.append(ID)
+                self.offsets.append(recordOffset)
+                self.flags.append(flags)
+                self.hashes.append(contentHash)
+                self.titles.append(str(buffer[offset:offset + titleLength], 'utf-8'))
+
+                offset += titleLength
+
+            self.maxID = header[2]
+
+            return header[6]
+
+        entries = []
+
+        if snapshotSize:
+            if detect_format(self.filePath) == FORMAT_BINARY:
+                entries = list(iter_binary_headers(self.filePath))
+
+            else:
+                entries = [(NO_OFFSET, noteObject.ID, noteObject.isCompleted, noteObject.title,
+                            content_hash(noteObject)) for noteObject in read_notes(self.filePath)]
+
+        self.replace(entries)
+
+        return 0
+
+    def save(self, journalSize):
+        """
+        Writes all entries to index file; file is swapped in only once completely written
+        :param journalSize: (int) Size of journal covered by entries
+        :return: None
+        """
+        snapshotSize, snapshotTime, _ = self.file_state()
+        tempPath = self.indexPath + '.tmp'
+
+        with open(tempPath, 'wb') as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, self.maxID, len(self.ids), snapshotSize, snapshotTime,
+                                      journalSize, journalSize))
+
+            for position, ID in enumerate(self.ids):
+                titleBytes = self.titles[position].encode('utf-8')
+
+                f.write(INDEX_ENTRY.pack(ID, self.offsets[position], self.flags[position], self.hashes[position],
+                                         len(titleBytes)))
+                f.write(titleBytes)
+
+            METRICS.count('notes_bytes_written_total', f.tell(), (('file', 'index'),))
+
+        os.replace(tempPath, self.indexPath)
+
+    def update_header(self, maxID, journalSize):
+        """
+        Updates maximum note ID and journal size in place after journal was appended, without rewriting entries;
+        Entries for appended journal part are rebuilt from journal on next load
+        :param maxID: (int) Highest note ID saved
+        :param journalSize: (int) New size of journal
+        :return: None
+        """
+        header = list(self.read_header())
+        header[2] = max(header[2], maxID)
+        header[7] = journalSize
+
+        with open(self.indexPath, 'r+b') as f:
+            f.write(INDEX_HEADER.pack(*header))
+
+    def replace(self, indexEntries):
+        """
+        Replaces all entries by entries of freshly written snapshot
+        :param indexEntries: (list) Tuples of record offset, note ID, completion status, title and content hash
+        :return: None
+        """
+        indexEntries.sort(key=lambda entry: entry[1])
+
+        self.ids = array('q', [entry[1] for entry in indexEntries])
+        self.offsets = array('q', [entry[0] for entry in indexEntries])
+        self.flags = bytearray(FLAG_COMPLETED if entry[2] else 0 for entry in indexEntries)
+        self.titles = [entry[3] for entry in indexEntries]
+        self.hashes = array('I', [entry[4] for entry in indexEntries])
+        self.maxID = self.ids[-1] if self.ids else 0
+        self.isLoaded = True
+
+    def find(self, ID):
+        """
+        Finds position of note entry using binary search
+        :param ID: (int) Note ID
+        :return: (int) Position of entry, -1 if note is not saved
+        """
+        position = bisect_left(self.ids, ID)
+
+        if position < len(self.ids) and self.ids[position] == ID:
+            return position
+
+        return -1
+
+    def set_entry(self, ID, offset, flags, title, contentHash):
+        """
+        Adds entry of note, or replaces it if note is already indexed
+        :param ID: (int) Note ID
+        :param offset: (int) Record offset in snapshot or journal file
+        :param flags: (int) Combination of 'FLAG_COMPLETED' and 'FLAG_IN_JOURNAL'
+        :param title: (str) Note title
+        :param contentHash: (int) Content hash of saved record
+        :return: None
+        """
+        position = bisect_left(self.ids, ID)
+
+        if position < len(self.ids) and self.ids[position] == ID:
+            self.offsets[position] = offset
+            self.flags[position] = flags
+            self.titles[position] = title
+            self.hashes[position] = contentHash
+
+        else:
+            self.ids.insert(position, ID)
+            self.offsets.insert(position, offset)
+            self.flags.insert(position, flags)
+            self.titles.insert(position, title)
+            self.hashes.insert(position, contentHash)
+
+        self.maxID = max(self.maxID, ID)
+
+    def set_journal_entry(self, payload, offset):
+        """
+        Adds or replaces entry of note from its journal record, decoding title only
+        :param payload: (bytes) Binary note record written to journal
+        :param offset: (int) Offset of record within journal file
+        :return: None
+        """
+        ID, _, _, isCompleted, titleLength, _ = RECORD_HEADER.unpack_from(payload, 0)[:6]
+        title = str(payload[RECORD_HEADER.size:RECORD_HEADER.size + titleLength], 'utf-8')
+
+        self.set_entry(ID, offset, FLAG_IN_JOURNAL | (FLAG_COMPLETED if isCompleted else 0), title,
+                       zlib.crc32(payload))
+
+    def remove_entry(self, ID):
+        """
+        Removes entry of note if it is indexed
+        :param ID: (int) Note ID
+        :return: None
+        """
+        position = self.find(ID)
+
+        if position != -1:
+            del self.ids[position]
+            del self.offsets[position]
+            del self.flags[position]
+            del self.titles[position]
+            del self.hashes[position]
+
+    def read_note(self, ID):
+        """
+        Reads single saved note from snapshot or journal file
+        :param ID: (int) Note ID
+        :return: (Note) Saved note object, None if note is not saved
+        """
+        position = self.find(ID)
+
+        if position == -1:
+            return None
+
+        if self.flags[position] & FLAG_IN_JOURNAL:
+            return read_note_at(self.journalPath, self.offsets[position])
+
+        if self.offsets[position] != NO_OFFSET:
+            return read_note_at(self.filePath, self.offsets[position])
+
+        # Plain text snapshot has no offsets; scan it
+        return next(iter_notes_by_id(self.filePath, {ID}), None)
+
+    def read_notes(self, IDs):
+        """
+        Generator reading several saved notes; notes with known offsets are read one by one, plain text snapshot is
+        scanned at most once for all others
+        :param IDs: (iterable) Note IDs; IDs of notes not saved are skipped
+        :return: (generator) Saved note objects
+        """
+        scannedIDs = set()
+
+        for ID in IDs:
+            position = self.find(ID)
+
+            if position == -1:
+                continue
+
+            if self.offsets[position] == NO_OFFSET and not self.flags[position] & FLAG_IN_JOURNAL:
+                scannedIDs.add(ID)
+
+            else:
+                yield self.read_note(ID)
+
+        if scannedIDs:
+            yield from iter_notes_by_id(self.filePath, scannedIDs)
+
+# This is end of script.
@@ -0,0 +1,522 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import struct
+import zlib
+import itertools
+from array import array
+from noteFormats import DEFAULT_FORMAT, RECORD_HEADERS, detect_format, record_header, encode_note, decode_note, \
+    read_notes, write_notes
+from noteIndex import NoteIndex
+from noteBodies import LAZY_OFF
+from noteConcurrency import file_lock, resolve_change
+from noteMetrics import METRICS
+
+# Operations recorded in journal
+OP_CREATE = 1
+OP_UPDATE = 2
+OP_COMPLETE = 3
+OP_DELETE = 4
+
+# Journal file header: magic bytes followed by format version, which matches binary record layout of its payloads
+JOURNAL_MAGIC = b'PNHJ'
+JOURNAL_VERSION = 4
+JOURNAL_HEADER = struct.Struct('<4sH')
+
+# Journal entry header: operation, payload length and CRC32 checksum of payload;
+# Payload is a binary note record, or only the note ID for deletions
+ENTRY_HEADER = struct.Struct('<BII')
+DELETE_PAYLOAD = struct.Struct('<q')
+
+# Journal is compacted into snapshot once it grows larger than snapshot itself (and at least this many bytes)
+COMPACT_MIN_BYTES = 1 << 20
+
+
+class NoteJournal:
+    """
+    Represents append-only write-ahead journal of note changes kept next to notes snapshot file;
+    Processes sharing notes file take advisory lock on lock file kept next to it: exclusively to write, shared to
+    read; Changes are merged with changes saved by other processes in the meantime, using version counters of notes
+
+    Attributes
+    ----------
+    filePath : (str) Path of notes snapshot file
+    journalPath : (str) Path of journal file
+    pendingChanges : (dict) IDs of notes changed in session but not yet written to journal, with last operation
+    index : (NoteIndex) Sidecar index of saved notes, maintained on every flush and compaction
+    fileLock : (FileLock) Lock shared with other processes using notes file; lock file also holds highest reserved ID
+    syncedState : (tuple) Snapshot size, snapshot modification time and journal size loaded index entries match
+    writesEachChange : (bool) False; stores write changes on save, batched into one flush
+
+    Methods
+    -------
+    record(operation, noteID) : Records a note change to be written on next flush
+    flush(noteObjectList, allowCompaction, baseNotes, mergedNotes, conflictIDs) : Merges recorded changes with
+        changes saved by other processes and appends them to journal; compacts journal when it grows too large
+    compact_if_needed() : Compacts journal if it grew too large
+    iter_notes(malformedLines) : Yields notes of snapshot with journal replayed on top
+    sync_point() : Returns state of saved notes to find changes against later
+    iter_changed_notes(syncPoint) : Yields notes saved or changed since sync point
+    max_id() : Returns highest saved note ID from index header
+    reserve_ids(count) : Reserves note IDs no other process will use
+    load_index() : Loads index entries, bringing them up to date with journal
+    compact(appendedNotes) : Rewrites snapshot with journal replayed and new notes appended, and empties journal
+    saved_size() : Returns total size of snapshot and journal files
+    delete_files() : Deletes snapshot, journal and index files
+    repair() : Truncates incomplete entry left at end of journal by interrupted write
+    """
+    writesEachChange = False
+
+    def __init__(self, filePath):
+        """
+        Initializes journal attributes; repairs journal left behind by interrupted write, and merges journal written
+        by previous format version into snapshot
+        :param filePath: (str) Path of notes snapshot file
+        """
+        self.filePath = filePath
+        self.journalPath = os.path.splitext(filePath)[0] + '.journal'
+        self.pendingChanges = {}
+        self.index = NoteIndex(filePath, self.journalPath)
+        self.fileLock = file_lock(os.path.splitext(filePath)[0] + '.lock')
+        self.syncedState = None
+
+        with self.fileLock.hold():
+            self.repair()
+
+            if self.journal_version() not in (None, JOURNAL_VERSION):
+                self.compact()
+
+    def record(self, operation, noteID):
+        """
+        Records a note change; nothing is written until 'flush()', several changes to one note are written once
+        :param operation: (int) One of 'OP_CREATE', 'OP_UPDATE', 'OP_COMPLETE', 'OP_DELETE'
+        :param noteID: (int) ID of changed note
+        :return: None
+        """
+        # Re-inserting moves note to the end, so changes are written in order they were last made
+        self.pendingChanges.pop(noteID, None)
+        self.pendingChanges[noteID] = operation
+
+    def flush(self, noteObjectList, allowCompaction=True, baseNotes=None, mergedNotes=None, conflictIDs=None):
+        """
+        Appends current state of every note changed since last flush to journal and forces it to disk, merged with
+        changes other processes saved meanwhile; version counter of every written note is increased;
+        Compacts journal into snapshot if it outgrew snapshot, or if snapshot is missing or not in current format
+        :param noteObjectList: (dict) Notes in session, with note IDs as keys
+        :param allowCompaction: (bool) False to postpone compaction, e.g. between batches of a bulk import or until
+                                caller no longer holds locks others wait on
+        :param baseNotes: (dict) Note IDs as keys; versions of notes as read before first change in session, None for
+                          notes created in session; None to write changes as is without merging
+        :param mergedNotes: (dict) Optional dictionary collecting notes written in different form than in session,
+                            which caller should take over
+        :param conflictIDs: (list) Optional list collecting IDs of notes changed differently here and elsewhere
+        :return: (int) Number of changes written
+        """
+        with self.fileLock.hold():
+            entries = []
+            indexUpdates = []
+            maxID = 0
+
+            # Saved versions are looked up in index, so it is brought up to date with other processes first
+            if baseNotes is not None or self.index.isLoaded:
+                self.load_index()
+
+            # Index file header can be kept up to date in place only if it matched files before this flush
+            indexIsFresh = self.index.is_fresh(self.index.read_header())
+            journalSize = os.path.getsize(self.journalPath) if os.path.exists(self.journalPath) \
+                else JOURNAL_HEADER.size
+            payloadOffset = journalSize + ENTRY_HEADER.size
+
+            # Saved versions of all changed notes are read at once, so plain text snapshot is scanned once per flush
+            savedNotes = {}
+
+            if baseNotes is not None:
+                savedNotes = {noteObject.ID: noteObject for noteObject in self.index.read_notes(self.pendingChanges)}
+
+            for noteID, operation in self.pendingChanges.items():
+                resolvedChange = resolve_change(noteID, noteObjectList.get(noteID), baseNotes, savedNotes.get,
+                                                mergedNotes, conflictIDs)
+
+                if resolvedChange is None:
+                    continue
+
+                noteObject, version = resolvedChange
+
+                if noteObject is None:
+                    operation = OP_DELETE
+                    payload = DELETE_PAYLOAD.pack(noteID)
+
+                else:
+                    # Note deleted and then restored again in same session is written as an update
+                    operation = OP_UPDATE if operation == OP_DELETE else operation
+
+                    # Only version counter of note in session changes in place, once note is saved
+                    noteObject.version = version
+                    payload = encode_note(noteObject)
+                    maxID = max(maxID, noteID)
+
+                entries.append(ENTRY_HEADER.pack(operation, len(payload), zlib.crc32(payload)) + payload)
+                indexUpdates.append((operation, noteID, payload, payloadOffset))
+                payloadOffset += len(payload) + ENTRY_HEADER.size
+
+            if entries:
+                isNewJournal = not os.path.exists(self.journalPath)
+
+                try:
+                    with open(self.journalPath, 'ab') as f:
+                        if isNewJournal:
+                            f.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION))
+
+                        f.write(b''.join(entries))
+                        f.flush()
+                        os.fsync(f.fileno())
+
+                except OSError:
+                    # Changes stay recorded for next flush; partly written entries are cut off, since replay stops at
+                    # first damaged entry and would miss entries appended after it
+                    if isNewJournal:
+                        os.remove(self.journalPath)
+
+                    else:
+                        os.truncate(self.journalPath, journalSize)
+
+                    raise
+
+                METRICS.count('notes_bytes_written_total', sum(map(len, entries)), (('file', 'journal'),))
+
+                if self.index.isLoaded:
+                    self.apply_to_index(indexUpdates)
+
+                    if self.syncedState is not None:
+                        self.syncedState = self.index.file_state()
+
+                if indexIsFresh:
+                    self.index.update_header(maxID, os.path.getsize(self.journalPath))
+
+            # Changes are only forgotten once they are on disk
+            self.pendingChanges = {}
+
+            if allowCompaction:
+                self.compact_if_needed()
+
+            return len(entries)
+
+    def compact_if_needed(self):
+        """
+        Compacts journal into snapshot if it outgrew snapshot, or if snapshot is missing or not in current format
+        :return: (bool) True if journal was compacted
+        """
+        with self.fileLock.hold():
+            snapshotSize = os.path.getsize(self.filePath) if os.path.exists(self.filePath) else 0
+            journalSize = os.path.getsize(self.journalPath) if os.path.exists(self.journalPath) else 0
+
+            if journalSize and (not snapshotSize or journalSize > max(COMPACT_MIN_BYTES, snapshotSize)
+                                or detect_format(self.filePath) != DEFAULT_FORMAT):
+                self.compact()
+
+                return True
+
+            return False
+
+    def journal_version(self):
+        """
+        Reads format version of journal file
+        :return: (int) Format version, None if journal is missing or not a journal
+        """
+        try:
+            with open(self.journalPath, 'rb') as f:
+                magic, version = JOURNAL_HEADER.unpack(f.read(JOURNAL_HEADER.size))
+
+        except (OSError, struct.error):
+            return None
+
+        return version if magic == JOURNAL_MAGIC else None
+
+    def iter_entries(self, startOffset=0):
+        """
+        Generator yielding valid journal entries; stops at first incomplete or corrupted entry
+        :param startOffset: (int) Offset of first entry to read, entries from start of journal by default
+        :return: (generator) Tuples of operation, payload and offset just past the entry
+        """
+        if self.journal_version() not in RECORD_HEADERS:
+            return
+
+        offset = max(startOffset, JOURNAL_HEADER.size)
+
+        # Only part of journal from start offset on is read
+        with open(self.journalPath, 'rb') as f:
+            f.seek(offset)
+            buffer = f.read()
+
+        METRICS.count('notes_bytes_read_total', len(buffer), (('file', 'journal'),))
+        position = 0
+
+        while position + ENTRY_HEADER.size <= len(buffer):
+            operation, payloadLength, checksum = ENTRY_HEADER.unpack_from(buffer, position)
+            payloadStart = position + ENTRY_HEADER.size
+            payload = buffer[payloadStart:payloadStart + payloadLength]
+
+            if len(payload) != payloadLength or zlib.crc32(payload) != checksum:
+                return
+
+            position = payloadStart + payloadLength
+
+            yield operation, payload, offset + position
+
+    def replay(self):
+        """
+        Replays journal into latest state of every note changed in it
+        :return: (dict) Note IDs as keys; latest note objects, or None for deleted notes, as values
+        """
+        changedNotes = {}
+        recordHeader = None
+
+        for operation, payload, _ in self.iter_entries():
+            if operation == OP_DELETE:
+                changedNotes[DELETE_PAYLOAD.unpack(payload)[0]] = None
+
+            else:
+                recordHeader = recordHeader or record_header(self.journal_version())
+                noteObject, _ = decode_note(payload, 0, recordHeader=recordHeader)
+                changedNotes[noteObject.ID] = noteObject
+
+        return changedNotes
+
+    def apply_to_index(self, indexUpdates):
+        """
+        Applies journal entries to loaded index entries
+        :param indexUpdates: (iterable) Tuples of operation, note ID, payload and payload offset in journal
+        :return: None
+        """
+        for operation, noteID, payload, payloadOffset in indexUpdates:
+            if operation == OP_DELETE:
+                self.index.remove_entry(noteID)
+
+            else:
+                self.index.set_journal_entry(payload, payloadOffset)
+
+    def journal_updates(self, startOffset):
+        """
+        Generator converting journal entries into index updates
+        :param startOffset: (int) Offset of first entry to convert
+        :return: (generator) Tuples of operation, note ID (for deletions only), payload and payload offset
+        """
+        for operation, payload, endOffset in self.iter_entries(startOffset):
+            yield (operation, DELETE_PAYLOAD.unpack(payload)[0] if operation == OP_DELETE else None, payload,
+                   endOffset - len(payload))
+
+    def load_index(self):
+        """
+        Loads index entries, rebuilding index file if it no longer matches notes file, and applies journal entries
+        written after index file; Loaded index is brought up to date with changes saved by other processes since
+        :return: (NoteIndex) Loaded index
+        """
+        with self.fileLock.hold():
+            fileState = self.index.file_state()
+
+            if self.index.isLoaded and self.syncedState == fileState:
+                return self.index
+
+            if self.index.isLoaded and self.syncedState is not None and self.syncedState[:2] == fileState[:2] \
+                    and self.syncedState[2] <= fileState[2]:
+                # Other processes only appended to journal; their entries are applied to loaded entries
+                self.apply_to_index(self.journal_updates(self.syncedState[2]))
+
+            else:
+                indexIsFresh = self.index.is_fresh(self.index.read_header())
+                startOffset = self.index.load()
+
+                self.apply_to_index(self.journal_updates(startOffset))
+
+                if not indexIsFresh:
+                    self.index.save(fileState[2])
+
+            self.syncedState = fileState
+
+            return self.index
+
+    def max_id(self):
+        """
+        Returns highest saved note ID; only index file header is read while index is up to date
+        :return: (int) Highest saved note ID, None if no notes have been saved
+        """
+        with self.fileLock.hold():
+            header = self.index.read_header()
+
+            if self.index.is_fresh(header):
+                return header[2] or None
+
+            return self.load_index().maxID or None
+
+    def reserve_ids(self, count):
+        """
+        Reserves consecutive note IDs above every ID saved or reserved by any process sharing notes file
+        :param count: (int) Number of IDs needed
+        :return: (int) First reserved ID
+        """
+        with self.fileLock.hold():
+            firstID = max(self.fileLock.read_reserved_id(), self.max_id() or 0) + 1
+            self.fileLock.write_reserved_id(firstID + count - 1)
+
+        return firstID
+
+    def iter_notes(self, malformedLines=None, lazyMode=LAZY_OFF):
+        """
+        Generator yielding notes of snapshot file with journal replayed on top; snapshot is streamed while other
+        processes are kept from writing
+        :param malformedLines: (list) Optional list collecting positions of skipped malformed snapshot records
+        :param lazyMode: (str) Lazy loading mode for notes read from binary snapshot
+        :return: (generator) Note objects currently saved
+        """
+        with self.fileLock.hold(exclusive=False):
+            changedNotes = self.replay()
+
+            if os.path.exists(self.filePath):
+                for noteObject in read_notes(self.filePath, malformedLines, lazyMode):
+                    if noteObject.ID in changedNotes:
+                        # Replace snapshot version by latest journal version; yield it only once
+                        noteObject = changedNotes.pop(noteObject.ID)
+
+                        if noteObject is None:
+                            continue
+
+                    yield noteObject
+
+            # Notes created after last compaction exist in journal only
+            for noteObject in changedNotes.values():
+                if noteObject is not None:
+                    yield noteObject
+
+    def sync_point(self):
+        """
+        Returns state of saved notes, against which 'iter_changed_notes()' later finds notes saved since: file sizes
+        and copies of index columns of note IDs and content hashes
+        :return: (tuple) File state (see 'NoteIndex.file_state()'), array of note IDs and array of content hashes
+        """
+        with self.fileLock.hold():
+            index = self.load_index()
+
+            return self.syncedState, array('q', index.ids), array('I', index.hashes)
+
+    def iter_changed_notes(self, syncPoint):
+        """
+        Generator yielding notes created or changed by any process since sync point was taken, in their saved
+        version; deleted notes are not reported. While snapshot is the same only journal entries appended since are
+        read; after compaction, content hashes of index entries are compared with those of sync point, and only notes
+        whose hash differs are read
+        :param syncPoint: (tuple) State returned by 'sync_point()'
+        :return: (generator) Note objects saved since sync point
+        """
+        syncedState, syncedIDs, syncedHashes = syncPoint
+
+        with self.fileLock.hold(exclusive=False):
+            fileState = self.index.file_state()
+
+            if fileState == syncedState:
+                return
+
+            if fileState[:2] == syncedState[:2] and syncedState[2] <= fileState[2]:
+                changedNotes = {}
+                recordHeader = record_header(JOURNAL_VERSION)
+
+                for operation, payload, _ in self.iter_entries(syncedState[2]):
+                    if operation == OP_DELETE:
+                        changedNotes.pop(DELETE_PAYLOAD.unpack(payload)[0], None)
+
+                    else:
+                        noteObject, _ = decode_note(payload, 0, recordHeader=recordHeader)
+                        changedNotes[noteObject.ID] = noteObject
+
+                yield from changedNotes.values()
+
+                return
+
+        # Snapshot was rewritten; both sorted ID columns are matched at once in NumPy
+        import numpy as np
+
+        with self.fileLock.hold():
+            index = self.load_index()
+            IDs, hashes = np.array(index.ids, dtype=np.int64), np.array(index.hashes, dtype=np.uint32)
+            oldIDs, oldHashes = np.array(syncedIDs, dtype=np.int64), np.array(syncedHashes, dtype=np.uint32)
+
+            if len(oldIDs):
+                positions = np.minimum(np.searchsorted(oldIDs, IDs), len(oldIDs) - 1)
+                isChanged = (oldIDs[positions] != IDs) | (oldHashes[positions] != hashes)
+
+            else:
+                isChanged = np.ones(len(IDs), dtype=bool)
+
+            yield from index.read_notes(IDs[isChanged].tolist())
+
+    def compact(self, appendedNotes=()):
+        """
+        Rewrites snapshot file with journal replayed on top, then empties journal;
+        Replaying same journal again after interrupted compaction gives same result
+        :param appendedNotes: (iterable) Notes streamed into snapshot after saved ones, e.g. by bulk import;
+                              their IDs must not be saved already
+        :return: None
+        """
+        with self.fileLock.hold():
+            indexEntries = []
+
+            write_notes(self.filePath, itertools.chain(self.iter_notes(), appendedNotes), indexEntries=indexEntries)
+
+            # Rewritten snapshot is forced to disk by 'write_notes()', so journal is only removed once it is redundant
+            if os.path.exists(self.journalPath):
+                os.remove(self.journalPath)
+
+            # Snapshot has just been rewritten, so index is rebuilt from offsets of written records
+            self.index.replace(indexEntries)
+            self.index.save(0)
+            self.syncedState = self.index.file_state()
+
+    def saved_size(self):
+        """
+        Returns total size of snapshot and journal files
+        :return: (int) Size in bytes, None if neither file exists
+        """
+        fileSizes = [os.path.getsize(path) for path in (self.filePath, self.journalPath) if os.path.exists(path)]
+
+        return sum(fileSizes) if fileSizes else None
+
+    def delete_files(self):
+        """
+        Deletes snapshot, journal and index files; lock must be held
+        :return: None
+        """
+        for path in (self.filePath, self.journalPath, self.index.indexPath):
+            if os.path.exists(path):
+                os.remove(path)
+
+        self.index = NoteIndex(self.filePath, self.journalPath)
+        self.syncedState = None
+
+    def repair(self):
+        """
+        Truncates journal after last complete entry, discarding entry half-written by interrupted save
+        :return: None
+        """
+        if not os.path.exists(self.journalPath):
+            return
+
+        # Journal whose header itself was not completely written holds no entries
+        if os.path.getsize(self.journalPath) < JOURNAL_HEADER.size:
+            os.remove(self.journalPath)
+
+            return
+
+        validSize = JOURNAL_HEADER.size
+
+        for _, _, validSize in self.iter_entries():
+            pass
+
+        if os.path.getsize(self.journalPath) > validSize:
+            with open(self.journalPath, 'r+b') as f:
+                f.truncate(validSize)
+
+# This is end of script.
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+
+# Number of notes displayed per page; set through environment variable
+PAGE_SIZE = int(os.environ.get('NOTES_PAGE_SIZE', 20))
+
+
+def page_rows(notesPage):
+    """
+    Converts page of notes into table rows of note ID and title
+    :param notesPage: (list) Notes on page
+    :return: (list) Rows for 'tabulate'
+    """
+    return [[noteObject.ID, noteObject.title] for noteObject in notesPage]
+
+# This is end of script.
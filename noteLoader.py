@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import re
+import sys
+import locale
+import datetime
+from itertools import islice
+from Note import Note, NO_DATE, to_epoch
+
+# Format in which timestamps are stringified by 'Note.get_all_data()'; microseconds are left out when zero, and files
+# written by earlier versions may lack them altogether
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+# Start of line written by 'Note.get_all_data()', holding note ID; lines of notes not looked for are skipped by it
+LINE_ID_PATTERN = re.compile(r"\{'Note ID': '(\d+)'")
+
+# Lines parsed at once; timestamps of all notes of a batch are converted together
+BATCH_LINES = 8192
+
+# Timestamps are converted by NumPy if it is loaded already, or if file (or chunk) is at least this large; smaller
+# files are converted faster than NumPy would be imported
+VECTORIZE_MIN_BYTES = 64 << 20
+
+# Processes parsing large files at once; set through environment variable
+LOAD_WORKERS = int(os.environ.get('NOTES_LOAD_WORKERS', os.cpu_count() or 1))
+
+# Files smaller than this are parsed in this process, since starting worker processes would take longer
+PARALLEL_MIN_BYTES = 1 << 20
+
+# Chunks per worker process; more, smaller chunks even out workers finishing at different times
+CHUNKS_PER_WORKER = 4
+
+
+def parse_timestamp(value):
+    """
+    Converts timestamp string saved in file back to datetime object
+    :param value: (str) Timestamp string, or None/'None' if note has no such date
+    :return: (datetime) Parsed timestamp, None if no date was saved
+    """
+    if value is None or value == 'None':
+        return None
+
+    # Reads 'TIMESTAMP_FORMAT', with or without microseconds, many times faster than 'strptime()'
+    return datetime.datetime.fromisoformat(value)
+
+
+def timestamps_to_epochs(values):
+    """
+    Converts column of timestamp strings to epoch microseconds at once using NumPy 'datetime64'
+    :param values: (list) Timestamp strings, None/'None' for notes without such date
+    :return: (list) Microseconds since epoch, 'NO_DATE' for missing dates
+    :raises ValueError: If any timestamp is malformed
+    """
+    import numpy as np
+
+    values = ['NaT' if value is None or value == 'None' else value for value in values]
+
+    # NumPy would also take numbers, as offsets from epoch
+    if not all(isinstance(value, str) for value in values):
+        raise ValueError('Malformed timestamp: not a string')
+
+    epochs = np.array(values, dtype='datetime64[us]').astype(np.int64)
+
+    # Missing dates become NaT, which is smallest 64-bit integer
+    epochs[epochs == np.iinfo(np.int64).min] = NO_DATE
+
+    return epochs.tolist()
+
+
+def parse_note_fields(line):
+    """
+    Parses one line of notes file (dictionary returned by 'Note.get_all_data()' written as string), leaving timestamps
+    as strings
+    :param line: (str) Single line of notes file
+    :return: (tuple) Note ID, creation timestamp, title, text, completion status and completion timestamp
+    :raises ValueError: If line is not a valid note record
+    """
+    # Only files saved in plain text format need 'ast', which is slow to import, so it is imported on first use
+    import ast
+
+    try:
+        # Line is a python dictionary literal, so it is evaluated directly instead of going through yaml
+        noteDict = ast.literal_eval(line.strip())
+
+        return (int(noteDict['Note ID']), noteDict['Creation Date'], noteDict['Title'], noteDict['Text'],
+                noteDict['Completed'] == 'Yes', noteDict['Completion Date'])
+
+    except (SyntaxError, ValueError, TypeError, KeyError, MemoryError, RecursionError) as error:
+        raise ValueError('Malformed note record: ' + repr(error)) from None
+
+
+def parse_note_line(line):
+    """
+    Parses one line of notes file into note object
+    :param line: (str) Single line of notes file
+    :return: (Note) Note object built from line
+    :raises ValueError: If line is not a valid note record
+    """
+    ID, dateCreated, title, text, isCompleted, dateCompleted = parse_note_fields(line)
+
+    try:
+        return Note.from_epochs(ID, to_epoch(parse_timestamp(dateCreated)), title, text, isCompleted,
+                                to_epoch(parse_timestamp(dateCompleted)))
+
+    except (ValueError, TypeError) as error:
+        raise ValueError('Malformed note record: ' + repr(error)) from None
+
+
+def iter_notes_by_id(filePath, IDs):
+    """
+    Generator reading notes with given IDs from notes file in a single pass; lines of other notes are recognized by
+    note ID at their start and are not parsed, and lines not starting with note ID are parsed to find it.
+    Malformed lines are skipped
+    :param filePath: (str) Path of notes file
+    :param IDs: (set) IDs of notes to read
+    :return: (generator) Note objects in order of appearance in file
+    """
+    with open(filePath, 'r') as f:
+        for line in f:
+            lineID = LINE_ID_PATTERN.match(line)
+
+            if (lineID is not None and int(lineID.group(1)) not in IDs) or not line.strip():
+                continue
+
+            try:
+                noteObject = parse_note_line(line)
+
+            except ValueError:
+                continue
+
+            if noteObject.ID in IDs:
+                yield noteObject
+
+
+def parse_lines(lines, firstLineNumber=1, vectorize=False):
+    """
+    Parses batch of lines of notes file; timestamps of all notes are converted together, by NumPy if requested
+    :param lines: (list) Lines of notes file
+    :param firstLineNumber: (int) Line number of first line
+    :param vectorize: (bool) True to convert timestamps by NumPy
+    :return: (tuple) Arguments of 'Note.from_epochs()' for every note, and line numbers of malformed lines
+    """
+    parsedFields, lineNumbers, malformedLines = [], [], []
+
+    for lineNumber, line in enumerate(lines, start=firstLineNumber):
+        if not line.strip():
+            continue
+
+        try:
+            parsedFields.append(parse_note_fields(line))
+            lineNumbers.append(lineNumber)
+
+        except ValueError:
+            malformedLines.append(lineNumber)
+
+    if vectorize and parsedFields:
+        try:
+            createdEpochs = timestamps_to_epochs([fields[1] for fields in parsedFields])
+            completedEpochs = timestamps_to_epochs([fields[5] for fields in parsedFields])
+
+            return [(ID, createdEpoch, title, text, isCompleted, completedEpoch)
+                    for (ID, _, title, text, isCompleted, _), createdEpoch, completedEpoch
+                    in zip(parsedFields, createdEpochs, completedEpochs)], malformedLines
+
+        except ValueError:
+            # Batch holds malformed timestamp; notes are converted one at a time to find it
+            pass
+
+    noteArguments = []
+
+    for (ID, dateCreated, title, text, isCompleted, dateCompleted), lineNumber in zip(parsedFields, lineNumbers):
+        try:
+            noteArguments.append((ID, to_epoch(parse_timestamp(dateCreated)), title, text, isCompleted,
+                                  to_epoch(parse_timestamp(dateCompleted))))
+
+        except (ValueError, TypeError):
+            malformedLines.append(lineNumber)
+
+    return noteArguments, sorted(malformedLines)
+
+
+def should_vectorize(byteCount):
+    """
+    Decides if timestamps are converted by NumPy
+    :param byteCount: (int) Size of parsed text
+    :return: (bool) True if NumPy is loaded already or text is large enough to pay for loading it
+    """
+    return 'numpy' in sys.modules or byteCount >= VECTORIZE_MIN_BYTES
+
+
+def chunk_offsets(filePath, chunksCount):
+    """
+    Splits notes file into byte ranges of about equal size, each ending at end of a line
+    :param filePath: (str) Path of notes file
+    :param chunksCount: (int) Number of chunks wanted
+    :return: (list) Tuples of start and end offset; fewer than 'chunksCount' if lines are long
+    """
+    fileSize = os.path.getsize(filePath)
+    offsets = [0]
+
+    with open(filePath, 'rb') as f:
+        for chunkNumber in range(1, chunksCount):
+            if chunkNumber * fileSize // chunksCount <= offsets[-1]:
+                continue
+
+            # Chunk is extended up to end of line it would otherwise cut
+            f.seek(chunkNumber * fileSize // chunksCount)
+            f.readline()
+
+            if offsets[-1] < f.tell() < fileSize:
+                offsets.append(f.tell())
+
+    offsets.append(fileSize)
+
+    return list(zip(offsets, offsets[1:]))
+
+
+def parse_chunk(filePath, start, end):
+    """
+    Parses lines of one chunk of notes file; run in worker process
+    :param filePath: (str) Path of notes file
+    :param start: (int) Offset of first line of chunk
+    :param end: (int) Offset just past last line of chunk
+    :return: (tuple) Arguments of 'Note.from_epochs()' for every note (plain values pass between processes much
+             faster than note objects), line numbers of malformed lines counted from start of chunk, and number of
+             lines in chunk
+    """
+    with open(filePath, 'rb') as f:
+        f.seek(start)
+        lines = f.read(end - start).decode(locale.getpreferredencoding(False)).split('\n')
+
+    # Chunk ends with newline, after which split leaves an empty string
+    if lines and not lines[-1]:
+        lines.pop()
+
+    noteArguments, malformedLines = parse_lines(lines, 1, should_vectorize(end - start))
+
+    return noteArguments, malformedLines, len(lines)
+
+
+def iter_notes_parallel(filePath, malformedLines=None, workersCount=LOAD_WORKERS):
+    """
+    Generator parsing chunks of notes file in worker processes and yielding note objects in order of appearance in
+    file; notes of chunks already parsed are yielded while later chunks are still being parsed
+    :param filePath: (str) Path of notes file
+    :param malformedLines: (list) Optional list to which line numbers of skipped malformed lines are appended
+    :param workersCount: (int) Number of worker processes
+    :return: (generator) Note objects in order of appearance in file
+    """
+    # Imported only when parsing in parallel, to keep startup fast
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunks = chunk_offsets(filePath, workersCount * CHUNKS_PER_WORKER)
+    linesBefore = 0
+
+    with ProcessPoolExecutor(workersCount) as executor:
+        for noteArguments, chunkMalformedLines, linesCount in executor.map(parse_chunk, [filePath] * len(chunks),
+                                                                          *zip(*chunks)):
+            for arguments in noteArguments:
+                yield Note.from_epochs(*arguments)
+
+            if malformedLines is not None:
+                malformedLines.extend(linesBefore + lineNumber for lineNumber in chunkMalformedLines)
+
+            linesBefore += linesCount
+
+
+def iter_notes(filePath, malformedLines=None, workersCount=None):
+    """
+    Generator reading notes file in batches of lines and yielding note objects in a single pass;
+    Blank lines are ignored, malformed lines are skipped; large files are parsed by several processes at once
+    :param filePath: (str) Path of notes file
+    :param malformedLines: (list) Optional list to which line numbers of skipped malformed lines are appended
+    :param workersCount: (int) Number of worker processes for large files, 'LOAD_WORKERS' by default
+    :return: (generator) Note objects in order of appearance in file
+    """
+    workersCount = LOAD_WORKERS if workersCount is None else workersCount
+
+    if workersCount > 1 and os.path.getsize(filePath) >= PARALLEL_MIN_BYTES:
+        yield from iter_notes_parallel(filePath, malformedLines, workersCount)
+
+        return
+
+    vectorize = should_vectorize(os.path.getsize(filePath))
+    firstLineNumber = 1
+
+    with open(filePath, 'r') as f:
+        while True:
+            lines = list(islice(f, BATCH_LINES))
+
+            if not lines:
+                return
+
+            noteArguments, batchMalformedLines = parse_lines(lines, firstLineNumber, vectorize)
+
+            for arguments in noteArguments:
+                yield Note.from_epochs(*arguments)
+
+            if malformedLines is not None:
+                malformedLines.extend(batchMalformedLines)
+
+            firstLineNumber += len(lines)
+
+# This is end of script.
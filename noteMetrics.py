@@ -0,0 +1,484 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import io
+import os
+import sys
+import json
+import time
+import atexit
+import functools
+import threading
+from bisect import bisect_left
+
+# Output formats of collected metrics
+FORMAT_JSON = 'json'
+FORMAT_PROMETHEUS = 'prometheus'
+
+# Profilers capturing single operation: 'cpu' uses cProfile, 'memory' uses tracemalloc
+PROFILE_CPU = 'cpu'
+PROFILE_MEMORY = 'memory'
+
+# Instrumentation is off unless output format is set; metrics are written at exit to file, or to standard error if no
+# file is given. Set through environment variables or command line options, see 'add_arguments()'
+METRICS_FORMAT = os.environ.get('NOTES_METRICS', '')
+METRICS_FILE = os.environ.get('NOTES_METRICS_FILE', '')
+
+# Name of operation whose first run is profiled, e.g. 'handle_restore_file_contents', and profiler used
+PROFILE_OPERATION = os.environ.get('NOTES_PROFILE', '')
+PROFILE_MODE = os.environ.get('NOTES_PROFILE_MODE', PROFILE_CPU)
+
+# Upper bounds of latency histogram buckets in seconds, roughly 2.5 per decade from 50 microseconds to 10 seconds
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+                   2.5, 5.0, 10.0)
+
+# Number of functions or source lines listed in profile report
+PROFILE_LINES = 25
+
+
+class Histogram:
+    """
+    Represents distribution of observed values over fixed buckets, as Prometheus histograms do
+
+    Attributes
+    ----------
+    bounds : (tuple) Upper bounds of buckets, ascending; last bucket, for larger values, has no bound
+    counts : (list) Number of values observed per bucket
+    total : (float) Sum of observed values
+
+    Methods
+    -------
+    observe(value) : Adds value to its bucket
+    count() : Returns number of observed values
+    quantile(fraction) : Estimates quantile from bucket bounds
+    """
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        """
+        Initializes empty histogram
+        :param bounds: (tuple) Upper bounds of buckets
+        """
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+
+    def observe(self, value):
+        """
+        Adds value to first bucket whose bound is not below it
+        :param value: (float) Observed value
+        :return: None
+        """
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def count(self):
+        """
+        Returns number of observed values
+        :return: (int) Count
+        """
+        return sum(self.counts)
+
+    def quantile(self, fraction):
+        """
+        Estimates quantile as upper bound of bucket it falls into
+        :param fraction: (float) Quantile, 0 to 1
+        :return: (float) Bucket bound, infinity if quantile falls into last bucket, None if nothing was observed
+        """
+        rank = fraction * self.count()
+        seen = 0
+
+        for position, bucketCount in enumerate(self.counts):
+            seen += bucketCount
+
+            if bucketCount and seen >= rank:
+                return self.bounds[position] if position < len(self.bounds) else float('inf')
+
+        return None
+
+
+class Metrics:
+    """
+    Represents metrics collected by this process: counters and latency histograms, both keyed by metric name and
+    label values; recording is a no-op while disabled, so instrumented code costs a single attribute check
+
+    Attributes
+    ----------
+    enabled : (bool) True while metrics are collected
+    counters : (dict) Metric name and labels tuple as keys, values as values
+    histograms : (dict) Metric name and labels tuple as keys, 'Histogram' objects as values
+    lock : (Lock) Lock guarding counters and histograms, which threads of thread-safe store share
+
+    Methods
+    -------
+    count(name, amount, labels) : Adds to counter
+    observe(name, seconds, labels) : Adds value to histogram
+    timer(name, labels) : Returns context manager observing time spent in its block
+    timed_iter(iterable, name, labels) : Yields items of iterable, adding time spent producing them to counter
+    as_dict() : Returns collected metrics as nested dictionary
+    to_json() : Formats metrics as JSON
+    to_prometheus() : Formats metrics in Prometheus text exposition format
+    """
+    def __init__(self):
+        """
+        Initializes disabled, empty metrics
+        """
+        self.enabled = False
+        self.counters = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def count(self, name, amount=1, labels=()):
+        """
+        Adds to counter, e.g. number of bytes read
+        :param name: (str) Metric name
+        :param amount: (int or float) Amount added
+        :param labels: (tuple) Pairs of label name and value
+        :return: None
+        """
+        if not self.enabled:
+            return
+
+        with self.lock:
+            self.counters[name, labels] = self.counters.get((name, labels), 0) + amount
+
+    def observe(self, name, seconds, labels=()):
+        """
+        Adds value to latency histogram
+        :param name: (str) Metric name
+        :param seconds: (float) Observed latency
+        :param labels: (tuple) Pairs of label name and value
+        :return: None
+        """
+        if not self.enabled:
+            return
+
+        with self.lock:
+            histogram = self.histograms.get((name, labels))
+
+            if histogram is None:
+                histogram = self.histograms[name, labels] = Histogram()
+
+            histogram.observe(seconds)
+
+    def timer(self, name, labels=()):
+        """
+        Returns context manager observing time spent in its block into histogram
+        :param name: (str) Metric name
+        :param labels: (tuple) Pairs of label name and value
+        :return: (Timer) Context manager
+        """
+        return Timer(self, name, labels)
+
+    def timed_iter(self, iterable, name, labels=()):
+        """
+        Generator yielding items of iterable, adding time spent producing them (but not consuming them) to counter;
+        used to measure parsing of files read one record at a time
+        :param iterable: (iterable) Items, e.g. notes parsed from file
+        :param name: (str) Metric name of counter of seconds
+        :param labels: (tuple) Pairs of label name and value
+        :return: (generator) Same items
+        """
+        iterator = iter(iterable)
+        elapsedTime = 0.0
+
+        try:
+            while True:
+                startTime = time.perf_counter()
+
+                try:
+                    item = next(iterator)
+
+                except StopIteration:
+                    elapsedTime += time.perf_counter() - startTime
+
+                    return
+
+                elapsedTime += time.perf_counter() - startTime
+
+                yield item
+
+        finally:
+            self.count(name, elapsedTime, labels)
+
+    def as_dict(self):
+        """
+        Returns collected metrics; histogram keys are upper bucket bounds with counts per bucket
+        :return: (dict) 'counters' and 'histograms', each a dictionary of metric names to lists of labelled values
+        """
+        result = {'counters': {}, 'histograms': {}}
+
+        with self.lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                result['counters'].setdefault(name, []).append({'labels': dict(labels), 'value': value})
+
+            for (name, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+                # Quantiles past last bucket are infinite, which JSON has no literal for
+                quantiles = {'p50': histogram.quantile(0.5), 'p99': histogram.quantile(0.99)}
+
+                result['histograms'].setdefault(name, []).append(
+                    dict({'labels': dict(labels), 'count': histogram.count(), 'sum': histogram.total,
+                          'buckets': {str(bound): bucketCount for bound, bucketCount in
+                                      zip(histogram.bounds + ('+Inf',), histogram.counts)}},
+                         **{key: '+Inf' if value == float('inf') else value for key, value in quantiles.items()}))
+
+        return result
+
+    def to_json(self):
+        """
+        Formats collected metrics as JSON
+        :return: (str) JSON document of 'as_dict()'
+        """
+        return json.dumps(self.as_dict(), indent=2)
+
+    def to_prometheus(self):
+        """
+        Formats collected metrics in Prometheus text exposition format; histogram buckets are cumulative
+        :return: (str) Metrics text
+        """
+        lines = []
+        typedNames = set()
+
+        with self.lock:
+            for (name, labels), value in sorted(self.counters.items()):
+                if name not in typedNames:
+                    typedNames.add(name)
+                    lines.append('# TYPE %s counter' % name)
+
+                lines.append('%s%s %s' % (name, format_labels(labels), value))
+
+            for (name, labels), histogram in sorted(self.histograms.items(), key=lambda item: item[0]):
+                if name not in typedNames:
+                    typedNames.add(name)
+                    lines.append('# TYPE %s histogram' % name)
+
+                cumulativeCount = 0
+
+                for bound, bucketCount in zip(histogram.bounds + ('+Inf',), histogram.counts):
+                    cumulativeCount += bucketCount
+                    lines.append('%s_bucket%s %d' % (name, format_labels(labels + (('le', str(bound)),)),
+                                                     cumulativeCount))
+
+                lines.append('%s_sum%s %s' % (name, format_labels(labels), histogram.total))
+                lines.append('%s_count%s %d' % (name, format_labels(labels), cumulativeCount))
+
+        return '\n'.join(lines) + '\n'
+
+
+class Timer:
+    """
+    Represents context manager observing time spent in its block into latency histogram
+
+    Attributes
+    ----------
+    metrics : (Metrics) Metrics recorded into
+    name : (str) Metric name
+    labels : (tuple) Pairs of label name and value
+    startTime : (float) Performance counter value on entering block
+    """
+    def __init__(self, metrics, name, labels):
+        """
+        Initializes timer; time is measured from entering block
+        """
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+        self.startTime = 0.0
+
+    def __enter__(self):
+        """
+        Starts measuring time
+        :return: (Timer) This timer
+        """
+        self.startTime = time.perf_counter()
+
+        return self
+
+    def __exit__(self, *exceptionInfo):
+        """
+        Observes time spent in block, also when block raised exception
+        :return: (bool) False, so exception is not suppressed
+        """
+        self.metrics.observe(self.name, time.perf_counter() - self.startTime, self.labels)
+
+        return False
+
+
+def format_labels(labels):
+    """
+    Formats labels of Prometheus sample, e.g. '{operation="handle_read"}'
+    :param labels: (tuple) Pairs of label name and value
+    :return: (str) Labels in braces, empty string if there are none
+    """
+    if not labels:
+        return ''
+
+    return '{' + ','.join('%s="%s"' % (name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+                          for name, value in labels) + '}'
+
+
+# Metrics of this process, shared by all instrumented modules
+METRICS = Metrics()
+
+# Operation still to be profiled (None once profile was captured), profiler, and file reports are appended to
+PROFILE_STATE = {'operation': PROFILE_OPERATION or None, 'mode': PROFILE_MODE, 'outputPath': METRICS_FILE}
+
+
+def profile_call(function, args, kwargs, name):
+    """
+    Calls function under cProfile or tracemalloc and writes report, ranked by cumulative time or allocated size
+    :param function: (function) Profiled function
+    :param args: (tuple) Positional arguments
+    :param kwargs: (dict) Keyword arguments
+    :param name: (str) Operation name shown in report
+    :return: Return value of function
+    """
+    report = io.StringIO()
+
+    if PROFILE_STATE['mode'] == PROFILE_MEMORY:
+        import tracemalloc
+
+        tracemalloc.start()
+        startSnapshot = tracemalloc.take_snapshot()
+
+        try:
+            return function(*args, **kwargs)
+
+        finally:
+            endSnapshot = tracemalloc.take_snapshot()
+            currentSize, peakSize = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            report.write('Memory profile of %s: %.1f KB still allocated, %.1f KB peak\n'
+                         % (name, currentSize / 1024, peakSize / 1024))
+
+            for statistic in endSnapshot.compare_to(startSnapshot, 'lineno')[:PROFILE_LINES]:
+                report.write('%s\n' % statistic)
+
+            write_report(report.getvalue())
+
+    import cProfile
+    import pstats
+
+    profiler = cProfile.Profile()
+
+    try:
+        return profiler.runcall(function, *args, **kwargs)
+
+    finally:
+        report.write('CPU profile of %s:\n' % name)
+        pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(PROFILE_LINES)
+
+        write_report(report.getvalue())
+
+
+def operation(function):
+    """
+    Decorator instrumenting operation named after decorated function: counts calls and errors and observes latency
+    into 'notes_operation_seconds' histogram; first call of profiled operation is also profiled
+    :param function: (function) Operation, e.g. menu handler
+    :return: (function) Instrumented function
+    """
+    name = function.__name__
+    labels = (('operation', name),)
+
+    @functools.wraps(function)
+    def instrumented(*args, **kwargs):
+        if PROFILE_STATE['operation'] == name:
+            PROFILE_STATE['operation'] = None
+
+            return profile_call(function, args, kwargs, name)
+
+        if not METRICS.enabled:
+            return function(*args, **kwargs)
+
+        METRICS.count('notes_operations_total', 1, labels)
+        startTime = time.perf_counter()
+
+        try:
+            return function(*args, **kwargs)
+
+        except BaseException:
+            METRICS.count('notes_operation_errors_total', 1, labels)
+
+            raise
+
+        finally:
+            METRICS.observe('notes_operation_seconds', time.perf_counter() - startTime, labels)
+
+    return instrumented
+
+
+def write_report(text):
+    """
+    Writes metrics or profile report to metrics file, appending to it, or to standard error
+    :param text: (str) Report
+    :return: None
+    """
+    if PROFILE_STATE['outputPath']:
+        with open(PROFILE_STATE['outputPath'], 'a') as f:
+            f.write(text)
+
+    else:
+        sys.stderr.write(text)
+
+
+def dump_metrics(metricsFormat):
+    """
+    Writes collected metrics in requested format; registered to run at exit once metrics are enabled
+    :param metricsFormat: (str) 'FORMAT_JSON' or 'FORMAT_PROMETHEUS'
+    :return: None
+    """
+    write_report(METRICS.to_prometheus() if metricsFormat == FORMAT_PROMETHEUS else METRICS.to_json() + '\n')
+
+
+def add_arguments(parser):
+    """
+    Adds instrumentation options to command line parser; defaults come from environment variables
+    :param parser: (ArgumentParser) Parser
+    :return: (ArgumentParser) Same parser
+    """
+    parser.add_argument('--metrics', choices=[FORMAT_JSON, FORMAT_PROMETHEUS], default=METRICS_FORMAT or None,
+                        help='collect operation latencies, counters and bytes read and written, and write them at exit')
+    parser.add_argument('--metrics-file', default=METRICS_FILE, help='file metrics and profiles are appended to '
+                                                                     '(default: standard error)')
+    parser.add_argument('--profile', default=PROFILE_OPERATION, metavar='OPERATION',
+                        help='profile first run of operation, e.g. handle_restore_file_contents')
+    parser.add_argument('--profile-mode', choices=[PROFILE_CPU, PROFILE_MEMORY], default=PROFILE_MODE,
+                        help='cProfile (cpu) or tracemalloc (memory); default: cpu')
+
+    return parser
+
+
+def configure(arguments):
+    """
+    Enables metrics and profiling as requested by command line options added by 'add_arguments()'
+    :param arguments: (Namespace) Parsed options
+    :return: None
+    """
+    PROFILE_STATE['outputPath'] = arguments.metrics_file
+    PROFILE_STATE['operation'] = arguments.profile or None
+    PROFILE_STATE['mode'] = arguments.profile_mode
+
+    if arguments.metrics:
+        enable(arguments.metrics)
+
+
+def enable(metricsFormat):
+    """
+    Starts collecting metrics, to be written in requested format at exit
+    :param metricsFormat: (str) 'FORMAT_JSON' or 'FORMAT_PROMETHEUS'
+    :return: None
+    """
+    if not METRICS.enabled:
+        METRICS.enabled = True
+        atexit.register(dump_metrics, metricsFormat)
+
+
+# Stores used from Python programs are instrumented through environment variables alone
+if METRICS_FORMAT:
+    enable(METRICS_FORMAT)
+
+# This is end of script.
@@ -0,0 +1,355 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import islice
+from Note import NO_DATE
+
+
+class DateIndex:
+    """
+    Represents notes sorted by one of their dates, as two parallel columns of epoch microseconds and note IDs;
+    Notes with same date are sorted by ID, so every note has one position found by binary search
+
+    Attributes
+    ----------
+    epochs : (array) Dates in epoch microseconds, ascending
+    ids : (array) Note IDs, matching 'epochs'
+
+    Methods
+    -------
+    build(pairs) : Replaces index contents with sorted pairs of date and note ID
+    insert(epoch, ID) : Adds note at its date
+    delete(epoch, ID) : Removes note from its date
+    positions(start, end) : Returns range of positions of notes dated within bounds
+    """
+    def __init__(self):
+        """
+        Initializes empty index
+        """
+        self.epochs = array('q')
+        self.ids = array('q')
+
+    def __len__(self):
+        """
+        Returns number of notes in index
+        :return: (int) Number of notes
+        """
+        return len(self.ids)
+
+    def build(self, pairs):
+        """
+        Replaces index contents in one go, cheaper than inserting notes one by one
+        :param pairs: (list) Tuples of date in epoch microseconds and note ID, in any order
+        :return: None
+        """
+        pairs.sort()
+
+        self.epochs = array('q', [epoch for epoch, _ in pairs])
+        self.ids = array('q', [ID for _, ID in pairs])
+
+    def find(self, epoch, ID):
+        """
+        Returns position note has, or would have, in index
+        :param epoch: (int) Date of note in epoch microseconds
+        :param ID: (int) Note ID
+        :return: (int) Position of note
+        """
+        start = bisect_left(self.epochs, epoch)
+        end = bisect_right(self.epochs, epoch, start)
+
+        return bisect_left(self.ids, ID, start, end)
+
+    def insert(self, epoch, ID):
+        """
+        Adds note at its date; notes dated after every other note, e.g. created or completed now, are appended
+        :param epoch: (int) Date of note in epoch microseconds
+        :param ID: (int) Note ID
+        :return: None
+        """
+        position = self.find(epoch, ID)
+
+        self.epochs.insert(position, epoch)
+        self.ids.insert(position, ID)
+
+    def delete(self, epoch, ID):
+        """
+        Removes note from its date; note not in index is ignored
+        :param epoch: (int) Date of note in epoch microseconds
+        :param ID: (int) Note ID
+        :return: None
+        """
+        position = self.find(epoch, ID)
+
+        if position < len(self.ids) and self.ids[position] == ID and self.epochs[position] == epoch:
+            del self.epochs[position]
+            del self.ids[position]
+
+    def positions(self, start=None, end=None):
+        """
+        Returns range of positions of notes dated within bounds, by binary search
+        :param start: (int) Earliest date in epoch microseconds, None for no limit
+        :param end: (int) Latest date (exclusive) in epoch microseconds, None for no limit
+        :return: (range) Positions in 'ids', in ascending date order
+        """
+        first = 0 if start is None else bisect_left(self.epochs, start)
+        last = len(self.ids) if end is None else bisect_left(self.epochs, end)
+
+        return range(first, max(first, last))
+
+    def pairs(self, positionRange):
+        """
+        Generator yielding dates and note IDs at positions, for merging several indexes in date order
+        :param positionRange: (range) Positions, see 'positions()'
+        :return: (generator) Tuples of date in epoch microseconds and note ID
+        """
+        epochs, ids = self.epochs, self.ids
+
+        for position in positionRange:
+            yield epochs[position], ids[position]
+
+
+def split_offset(firstIndex, firstRange, secondIndex, secondRange, offset):
+    """
+    Splits number of notes to skip between ranges of two date indexes, as if ranges were merged in date order; split
+    is found by binary search, so skipped notes are not read
+    :param firstIndex: (DateIndex) First index
+    :param firstRange: (range) Positions in first index, see 'DateIndex.positions()'
+    :param secondIndex: (DateIndex) Second index
+    :param secondRange: (range) Positions in second index
+    :param offset: (int) Number of notes to skip
+    :return: (tuple) Number of notes skipped in first range and in second range
+    """
+    offset = min(offset, len(firstRange) + len(secondRange))
+    low, high = max(0, offset - len(secondRange)), min(offset, len(firstRange))
+
+    # Smallest split at which next note of first range comes after last skipped note of second range
+    while low < high:
+        middle = (low + high) // 2
+        firstPosition, secondPosition = firstRange[middle], secondRange[offset - middle - 1]
+
+        if (firstIndex.epochs[firstPosition], firstIndex.ids[firstPosition]) < \
+                (secondIndex.epochs[secondPosition], secondIndex.ids[secondPosition]):
+            low = middle + 1
+
+        else:
+            high = middle
+
+    return low, offset - low
+
+
+class NoteQueryIndex:
+    """
+    Represents secondary indexes of notes for filtered queries: completion bitset by note ID, creation-date indexes
+    of non-completed and of completed notes, and completion-date index of completed notes;
+    Queries binary search date bounds and read matching notes only, so they take O(log n + k) for k notes returned;
+    Indexes are built on first query and kept up to date on every change after
+
+    Attributes
+    ----------
+    createdIndexes : (tuple) Creation-date indexes ('DateIndex') of non-completed notes and of completed notes
+    completedIndex : (DateIndex) Completion-date index of completed notes with completion date
+    createdByID : (array) Creation date of note at position of note ID, 'NO_DATE' where there is no note
+    completedByID : (array) Completion date of note at position of note ID, 'NO_DATE' where there is none
+    completedBits : (bytearray) Completion status of notes, one bit per note ID
+    isLoaded : (bool) True once indexes have been built
+
+    Methods
+    -------
+    ensure_loaded(noteObjectList) : Builds indexes on first query
+    unload() : Drops indexes; they are rebuilt on next query
+    add(noteObject) : Indexes new or changed note
+    remove(ID) : Removes note from indexes
+    is_completed(ID) : Checks completion bit of note
+    count(isCompleted) : Returns number of indexed notes
+    query(isCompleted, createdFrom, createdTo, completedFrom, completedTo, offset, limit) : Returns IDs of matching
+        notes in date order
+    """
+    def __init__(self):
+        """
+        Initializes empty indexes; nothing is built until first query
+        """
+        self.createdIndexes = (DateIndex(), DateIndex())
+        self.completedIndex = DateIndex()
+        self.createdByID = array('q')
+        self.completedByID = array('q')
+        self.completedBits = bytearray()
+        self.isLoaded = False
+
+    def ensure_loaded(self, noteObjectList):
+        """
+        Builds indexes over notes, sorting each index once
+        :param noteObjectList: (dict) Notes with note IDs as keys
+        :return: None
+        """
+        if self.isLoaded:
+            return
+
+        createdPairs = ([], [])
+        completedPairs = []
+        maxID = max(noteObjectList, default=0)
+
+        self.createdByID = array('q', [NO_DATE]) * (maxID + 1)
+        self.completedByID = array('q', [NO_DATE]) * (maxID + 1)
+        self.completedBits = bytearray(maxID // 8 + 1)
+
+        for noteObject in noteObjectList.values():
+            ID = noteObject.ID
+            self.createdByID[ID] = noteObject.createdEpoch
+            createdPairs[noteObject.isCompleted].append((noteObject.createdEpoch, ID))
+
+            if noteObject.isCompleted:
+                self.completedBits[ID >> 3] |= 1 << (ID & 7)
+
+                if noteObject.completedEpoch != NO_DATE:
+                    self.completedByID[ID] = noteObject.completedEpoch
+                    completedPairs.append((noteObject.completedEpoch, ID))
+
+        self.createdIndexes[False].build(createdPairs[False])
+        self.createdIndexes[True].build(createdPairs[True])
+        self.completedIndex.build(completedPairs)
+        self.isLoaded = True
+
+    def unload(self):
+        """
+        Drops indexes, e.g. before many notes are restored at once; rebuilding them on next query is cheaper than
+        inserting notes one by one
+        :return: None
+        """
+        self.createdIndexes = (DateIndex(), DateIndex())
+        self.completedIndex = DateIndex()
+        self.createdByID = array('q')
+        self.completedByID = array('q')
+        self.completedBits = bytearray()
+        self.isLoaded = False
+
+    def grow(self, ID):
+        """
+        Extends columns by note ID so that note ID has a position in them
+        :param ID: (int) Note ID
+        :return: None
+        """
+        if ID >= len(self.createdByID):
+            extraCount = max(ID + 1, 2 * len(self.createdByID)) - len(self.createdByID)
+            self.createdByID.extend(array('q', [NO_DATE]) * extraCount)
+            self.completedByID.extend(array('q', [NO_DATE]) * extraCount)
+            self.completedBits.extend(bytes(len(self.createdByID) // 8 + 1 - len(self.completedBits)))
+
+    def is_completed(self, ID):
+        """
+        Checks completion bit of note
+        :param ID: (int) Note ID
+        :return: (bool) True if note is indexed as completed, False otherwise
+        """
+        return ID < len(self.createdByID) and bool(self.completedBits[ID >> 3] & (1 << (ID & 7)))
+
+    def add(self, noteObject):
+        """
+        Indexes new or changed note; notes whose dates and completion status did not change are left in place
+        :param noteObject: (Note) Note to index
+        :return: None
+        """
+        if not self.isLoaded:
+            return
+
+        ID = noteObject.ID
+        self.grow(ID)
+
+        if (self.createdByID[ID] == noteObject.createdEpoch and self.completedByID[ID] == noteObject.completedEpoch
+                and self.is_completed(ID) == noteObject.isCompleted):
+            return
+
+        self.remove(ID)
+
+        self.createdByID[ID] = noteObject.createdEpoch
+        self.createdIndexes[noteObject.isCompleted].insert(noteObject.createdEpoch, ID)
+
+        if noteObject.isCompleted:
+            self.completedBits[ID >> 3] |= 1 << (ID & 7)
+
+            if noteObject.completedEpoch != NO_DATE:
+                self.completedByID[ID] = noteObject.completedEpoch
+                self.completedIndex.insert(noteObject.completedEpoch, ID)
+
+    def remove(self, ID):
+        """
+        Removes note from indexes; note not indexed is ignored
+        :param ID: (int) Note ID
+        :return: None
+        """
+        if not self.isLoaded or ID >= len(self.createdByID) or self.createdByID[ID] == NO_DATE:
+            return
+
+        isCompleted = self.is_completed(ID)
+        self.createdIndexes[isCompleted].delete(self.createdByID[ID], ID)
+
+        if self.completedByID[ID] != NO_DATE:
+            self.completedIndex.delete(self.completedByID[ID], ID)
+
+        self.createdByID[ID] = NO_DATE
+        self.completedByID[ID] = NO_DATE
+        self.completedBits[ID >> 3] &= ~(1 << (ID & 7)) & 0xFF
+
+    def count(self, isCompleted=None):
+        """
+        Returns number of indexed notes
+        :param isCompleted: (bool) True for completed notes only, False for non-completed notes only, None for all
+        :return: (int) Number of notes
+        """
+        if isCompleted is None:
+            return len(self.createdIndexes[False]) + len(self.createdIndexes[True])
+
+        return len(self.createdIndexes[isCompleted])
+
+    def query(self, isCompleted=None, createdFrom=None, createdTo=None, completedFrom=None, completedTo=None,
+              offset=0, limit=None):
+        """
+        Returns IDs of notes passing filters; with completion date bounds, notes are in completion date order and
+        creation date bounds are checked per note, otherwise notes are in creation date order
+        :param isCompleted: (bool) True for completed notes only, False for non-completed notes only, None for all
+        :param createdFrom: (int) Earliest creation date in epoch microseconds, None for no limit
+        :param createdTo: (int) Latest creation date (exclusive) in epoch microseconds, None for no limit
+        :param completedFrom: (int) Earliest completion date in epoch microseconds, None for no limit
+        :param completedTo: (int) Latest completion date (exclusive) in epoch microseconds, None for no limit
+        :param offset: (int) Number of matching notes to skip
+        :param limit: (int) Maximum number of note IDs returned, None for all
+        :return: (list) Note IDs
+        """
+        end = None if limit is None else offset + limit
+
+        if completedFrom is not None or completedTo is not None:
+            if isCompleted is False:
+                return []
+
+            createdByID = self.createdByID
+            IDs = (ID for ID in (self.completedIndex.ids[position]
+                                 for position in self.completedIndex.positions(completedFrom, completedTo))
+                   if (createdFrom is None or createdByID[ID] >= createdFrom)
+                   and (createdTo is None or createdByID[ID] < createdTo))
+
+            return list(islice(IDs, offset, end))
+
+        if isCompleted is not None:
+            dateIndex = self.createdIndexes[isCompleted]
+
+            # Single index is sliced directly, so skipped notes are not read
+            positionRange = dateIndex.positions(createdFrom, createdTo)[offset:end]
+
+            return dateIndex.ids[positionRange.start:positionRange.stop].tolist()
+
+        # Notes of both indexes are merged from first note not skipped, so deep pages do not read notes before them
+        positionRanges = [dateIndex.positions(createdFrom, createdTo) for dateIndex in self.createdIndexes]
+        skippedCounts = split_offset(self.createdIndexes[0], positionRanges[0], self.createdIndexes[1],
+                                     positionRanges[1], offset)
+        mergedPairs = heapq.merge(*(dateIndex.pairs(positionRange[skippedCount:]) for dateIndex, positionRange,
+                                    skippedCount in zip(self.createdIndexes, positionRanges, skippedCounts)))
+
+        return [ID for _, ID in islice(mergedPairs, limit)]
+
+# This is end of script.
@@ -0,0 +1,483 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import re
+import gc
+import math
+import heapq
+import struct
+from array import array
+from itertools import chain
+from bisect import bisect_left
+
+# Words are runs of letters, digits and underscores
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Title words count this many times in term frequency, so matches in titles rank higher
+TITLE_WEIGHT = 2
+
+# BM25 ranking parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Maximum number of index terms a single prefix expands to
+MAX_PREFIX_TERMS = 100
+
+# Words found in at least this many notes are scored with NumPy over cached posting arrays
+ARRAY_MIN_POSTINGS = 2000
+
+# Search file header: magic bytes, format version, number of notes, number of words, number of postings and size of
+# word list in bytes; followed by little-endian 64-bit integer arrays: note IDs, note lengths, version counters and
+# creation dates of notes, number of words of each note, words of all notes as positions in word list, postings count
+# of each word, note IDs and term frequencies of all postings; and by newline separated word list. Words are kept both
+# ways so loading needs no sort
+SEARCH_MAGIC = b'PNHS'
+SEARCH_FILE_VERSION = 3
+
+# Version counter saved for notes changed in session and not saved yet; matches no saved note, so they are re-indexed
+UNSAVED_VERSION = -1
+SEARCH_HEADER = struct.Struct('<4sHqqqq')
+
+
+def tokenize(text):
+    """
+    Splits text into lower case words
+    :param text: (str) Text to split
+    :return: (list) Words in order of appearance
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def change_marker(noteObject):
+    """
+    Returns version counter and creation date of note, used to detect notes saved since index was saved; both are kept
+    in note header, so lazily restored titles and texts are not read
+    :param noteObject: (Note) Note to mark
+    :return: (tuple) Version counter and creation date in microseconds since epoch
+    """
+    return noteObject.version, noteObject.createdEpoch
+
+
+class SearchIndex:
+    """
+    Represents full-text inverted index over note titles and texts with BM25 ranking;
+    Index is built, or loaded from file saved next to notes file, only when first searched
+
+    Attributes
+    ----------
+    searchPath : (str) Path of file index is saved to
+    postings : (dict) Words as keys; dictionaries of note IDs and term frequencies as values
+    docTerms : (dict) Note IDs as keys; tuples of distinct words of note as values
+    docLengths : (dict) Note IDs as keys; weighted number of words of note as values
+    docNotes : (dict) Note IDs as keys; notes as indexed as values, whose version counters increase once saved
+    totalLength : (int) Sum of 'docLengths'
+    lengthByID : (array) Weighted number of words of note at position of note ID, for NumPy scoring
+    postingArrays : (dict) Words as keys; cached NumPy arrays of note IDs, term frequencies and note lengths as values
+    sortedTerms : (list) Sorted words, for prefix matching; None when it has to be rebuilt
+    isLoaded : (bool) True once index has been built or loaded
+
+    Methods
+    -------
+    add(noteObject) : Indexes new or changed note
+    remove(ID) : Removes note from index
+    ensure_loaded(noteObjectList, changedIDs) : Builds or loads index on first use
+    search(query, noteObjectList, limit) : Returns best matching note IDs with scores
+    load(noteObjectList) : Loads index saved to file
+    load_buffer(buffer, noteObjectList) : Loads index from contents of saved file
+    save(changedIDs) : Saves index to file
+    """
+    def __init__(self, filePath):
+        """
+        Initializes empty index; nothing is read until first search
+        :param filePath: (str) Path of notes file; index is saved next to it
+        """
+        self.searchPath = os.path.splitext(filePath)[0] + '.search'
+        self.postings = {}
+        self.docTerms = {}
+        self.docLengths = {}
+        self.docNotes = {}
+        self.totalLength = 0
+        self.lengthByID = array('d')
+        self.postingArrays = {}
+        self.sortedTerms = None
+        self.isLoaded = False
+
+    def set_length(self, ID, docLength):
+        """
+        Stores weighted number of words of note at position of its ID
+        :param ID: (int) Note ID
+        :param docLength: (int) Weighted number of words, 0 for removed note
+        :return: None
+        """
+        if ID >= len(self.lengthByID):
+            self.lengthByID.extend([0.0] * (max(ID + 1, 2 * len(self.lengthByID)) - len(self.lengthByID)))
+
+        self.lengthByID[ID] = docLength
+
+    def index_note(self, noteObject):
+        """
+        Adds note to postings; note must not be indexed already
+        :param noteObject: (Note) Note to index
+        :return: None
+        """
+        termCounts = {}
+
+        for term in tokenize(noteObject.title):
+            termCounts[term] = termCounts.get(term, 0) + TITLE_WEIGHT
+
+        for term in tokenize(noteObject.text):
+            termCounts[term] = termCounts.get(term, 0) + 1
+
+        for term, termFrequency in termCounts.items():
+            termPostings = self.postings.get(term)
+
+            if termPostings is None:
+                self.postings[term] = termPostings = {}
+                self.sortedTerms = None
+
+            termPostings[noteObject.ID] = termFrequency
+            self.postingArrays.pop(term, None)
+
+        docLength = sum(termCounts.values())
+        self.set_length(noteObject.ID, docLength)
+
+        self.docTerms[noteObject.ID] = tuple(termCounts)
+        self.docLengths[noteObject.ID] = docLength
+        self.docNotes[noteObject.ID] = noteObject
+        self.totalLength += docLength
+
+    def add(self, noteObject):
+        """
+        Indexes new or changed note; ignored until index is loaded, since loading picks up all notes
+        :param noteObject: (Note) Note to index
+        :return: None
+        """
+        if not self.isLoaded:
+            return
+
+        self.remove(noteObject.ID)
+        self.index_note(noteObject)
+
+    def remove(self, ID):
+        """
+        Removes note from index
+        :param ID: (int) Note ID
+        :return: None
+        """
+        terms = self.docTerms.pop(ID, None)
+
+        if terms is None:
+            return
+
+        for term in terms:
+            termPostings = self.postings[term]
+            del termPostings[ID]
+            self.postingArrays.pop(term, None)
+
+            if not termPostings:
+                del self.postings[term]
+                self.sortedTerms = None
+
+        self.totalLength -= self.docLengths.pop(ID)
+        self.set_length(ID, 0)
+        self.docNotes.pop(ID, None)
+
+    def load(self, noteObjectList):
+        """
+        Loads index saved next to notes file; saved notes no longer present in session are left out, so index stays
+        consistent and sized by notes in session whatever file contains
+        :param noteObjectList: (dict) Notes in session, with note IDs as keys
+        :return: (dict) Note IDs as keys; version counters and creation dates of notes as indexed as values
+        :raises OSError: If search file cannot be read
+        :raises ValueError: If search file is of other version, truncated or malformed
+        """
+        with open(self.searchPath, 'rb') as f:
+            buffer = f.read()
+
+        # Loading creates millions of references in few containers, which garbage collector would scan over and over
+        gcEnabled = gc.isenabled()
+        gc.disable()
+
+        try:
+            return self.load_buffer(buffer, noteObjectList)
+
+        finally:
+            if gcEnabled:
+                gc.enable()
+
+    def load_buffer(self, buffer, noteObjectList):
+        """
+        Loads index from search file contents; see 'load()'
+        :param buffer: (bytes) Search file contents
+        :param noteObjectList: (dict) Notes in session, with note IDs as keys
+        :return: (dict) Note IDs as keys; version counters and creation dates of notes as indexed as values
+        :raises ValueError: If search file is of other version, truncated or malformed
+        """
+        import numpy as np
+
+        magic, version, docCount, termCount, postingCount, termBytes = SEARCH_HEADER.unpack_from(buffer, 0)
+
+        if magic != SEARCH_MAGIC or version != SEARCH_FILE_VERSION or min(docCount, termCount, postingCount) < 0:
+            raise ValueError('Unknown search file format')
+
+        fileArrays = []
+        offset = SEARCH_HEADER.size
+
+        for count in (docCount, docCount, docCount, docCount, docCount, postingCount, termCount, postingCount,
+                      postingCount):
+            fileArrays.append(np.frombuffer(buffer, dtype='<i8', count=count, offset=offset))
+            offset += 8 * count
+
+        IDs, docLengths, docVersions, docCreatedEpochs, docTermCounts, docTermPositions, postingCounts, postingIDs, \
+            termFrequencies = fileArrays
+        terms = buffer[offset:offset + termBytes].decode('utf-8').split('\n') if termCount else []
+
+        if len(terms) != termCount or len(set(terms)) != termCount or (docTermCounts < 0).any() or \
+                docTermCounts.sum() != postingCount or (postingCounts < 0).any() or \
+                postingCounts.sum() != postingCount or ((docTermPositions < 0) | (docTermPositions >= termCount)).any():
+            raise ValueError('Search file is malformed')
+
+        # Notes no longer in session are left out, along with their postings
+        isKept = np.fromiter(map(noteObjectList.__contains__, IDs.tolist()), dtype=bool, count=docCount)
+        keptIDs = IDs[isKept]
+        termPositions = np.repeat(np.arange(termCount), postingCounts)
+
+        if len(keptIDs) < docCount:
+            docTermPositions = docTermPositions[np.repeat(isKept, docTermCounts)]
+            docTermCounts = docTermCounts[isKept]
+            isKeptPosting = np.isin(postingIDs, keptIDs)
+            postingIDs, termFrequencies, termPositions = postingIDs[isKeptPosting], termFrequencies[isKeptPosting], \
+                termPositions[isKeptPosting]
+
+        # Words of each note and notes of each word must list same pairs; checked through sums of pair keys
+        docPairKeys = np.repeat(keptIDs, docTermCounts).astype(np.uint64) * np.uint64(termCount) + \
+            docTermPositions.astype(np.uint64)
+        postingPairKeys = postingIDs.astype(np.uint64) * np.uint64(termCount) + termPositions.astype(np.uint64)
+
+        if len(docPairKeys) != len(postingPairKeys) or docPairKeys.sum() != postingPairKeys.sum() or \
+                (docPairKeys * docPairKeys).sum() != (postingPairKeys * postingPairKeys).sum():
+            raise ValueError('Search file is malformed')
+
+        termEnds = np.cumsum(np.bincount(termPositions, minlength=termCount)).tolist()
+        IDList, frequencyList = postingIDs.tolist(), termFrequencies.tolist()
+        postings = {}
+
+        for term, start, end in zip(terms, [0] + termEnds[:-1], termEnds):
+            if end > start:
+                postings[term] = dict(zip(IDList[start:end], frequencyList[start:end]))
+
+        termTuple = tuple(map(terms.__getitem__, docTermPositions.tolist()))
+        docEnds = np.cumsum(docTermCounts).tolist()
+        docTerms = dict(zip(keptIDs.tolist(), map(termTuple.__getitem__, map(slice, [0] + docEnds[:-1], docEnds))))
+
+        # Note listed twice, or listed twice under same word
+        if len(docTerms) != len(keptIDs) or sum(map(len, postings.values())) != len(IDList):
+            raise ValueError('Search file is malformed')
+
+        self.postings = postings
+        self.docTerms = docTerms
+        self.docLengths = dict(zip(keptIDs.tolist(), docLengths[isKept].tolist()))
+        self.docNotes = {}
+        self.totalLength = sum(self.docLengths.values())
+
+        if len(keptIDs):
+            self.set_length(int(keptIDs.max()), 0)
+            np.frombuffer(self.lengthByID, dtype=np.float64)[keptIDs] = docLengths[isKept]
+
+        return dict(zip(keptIDs.tolist(), zip(docVersions[isKept].tolist(), docCreatedEpochs[isKept].tolist())))
+
+    def ensure_loaded(self, noteObjectList, changedIDs=()):
+        """
+        Loads index saved next to notes file and re-indexes only notes changed since, or builds index from scratch;
+        Saved notes are compared by change marker, so only texts of notes to re-index are read
+        :param noteObjectList: (dict) Notes in session, with note IDs as keys
+        :param changedIDs: (set) IDs of notes changed in session and not saved yet, which still carry version counter
+                           of saved note
+        :return: None
+        """
+        if self.isLoaded:
+            return
+
+        self.isLoaded = True
+
+        # Missing, outdated or damaged search file only means index is built from scratch
+        try:
+            savedMarkers = self.load(noteObjectList)
+
+        except (OSError, ValueError, struct.error):
+            savedMarkers = {}
+
+        # Index notes created or changed since index was saved; notes indexed as they are now are only referenced
+        docNotes = self.docNotes
+
+        for ID, noteObject in noteObjectList.items():
+            if ID in changedIDs or savedMarkers.get(ID) != change_marker(noteObject):
+                self.remove(ID)
+                self.index_note(noteObject)
+
+            else:
+                docNotes[ID] = noteObject
+
+    def save(self, changedIDs=()):
+        """
+        Saves index to file next to notes file, if it has been loaded in session; notes are saved with version counter
+        they have now, so notes saved after they were indexed are not re-indexed in next session
+        :param changedIDs: (set) IDs of notes changed in session and not saved yet; they are re-indexed in next session
+        :return: None
+        """
+        if not self.isLoaded:
+            return
+
+        import numpy as np
+
+        termBytes = '\n'.join(self.postings).encode('utf-8')
+        termPositions = {term: position for position, term in enumerate(self.postings)}
+        docTerms = list(map(self.docTerms.__getitem__, self.docLengths))
+        docNotes = list(map(self.docNotes.__getitem__, self.docLengths))
+        tempPath = self.searchPath + '.tmp'
+
+        with open(tempPath, 'wb') as f:
+            f.write(SEARCH_HEADER.pack(SEARCH_MAGIC, SEARCH_FILE_VERSION, len(self.docLengths), len(self.postings),
+                                       sum(map(len, self.postings.values())), len(termBytes)))
+
+            for values in (self.docLengths, self.docLengths.values(),
+                           (UNSAVED_VERSION if noteObject.ID in changedIDs else noteObject.version
+                            for noteObject in docNotes), (noteObject.createdEpoch for noteObject in docNotes),
+                           map(len, docTerms), map(termPositions.__getitem__, chain.from_iterable(docTerms)),
+                           map(len, self.postings.values()), chain.from_iterable(self.postings.values()),
+                           chain.from_iterable(map(dict.values, self.postings.values()))):
+                f.write(np.fromiter(values, dtype='<i8').tobytes())
+
+            f.write(termBytes)
+
+        os.replace(tempPath, self.searchPath)
+
+    def expand(self, term):
+        """
+        Expands query word to index words: word ending with '*' matches all words starting with it
+        :param term: (str) Query word
+        :return: (list) Matching index words
+        """
+        if not term.endswith('*'):
+            return [term] if term in self.postings else []
+
+        prefix = term.rstrip('*')
+
+        if self.sortedTerms is None:
+            self.sortedTerms = sorted(self.postings)
+
+        matchingTerms = []
+        position = bisect_left(self.sortedTerms, prefix)
+
+        while position < len(self.sortedTerms) and self.sortedTerms[position].startswith(prefix) and \
+                len(matchingTerms) < MAX_PREFIX_TERMS:
+            matchingTerms.append(self.sortedTerms[position])
+            position += 1
+
+        return matchingTerms
+
+    def posting_arrays(self, term):
+        """
+        Returns postings of word as NumPy arrays, cached until word's postings change;
+        Any note whose length changes is re-indexed, which drops cached arrays of all its words
+        :param term: (str) Index word
+        :return: (tuple) Arrays of note IDs, term frequencies and note lengths
+        """
+        import numpy as np
+
+        arrays = self.postingArrays.get(term)
+
+        if arrays is None:
+            termPostings = self.postings[term]
+            IDs = np.fromiter(termPostings.keys(), dtype=np.int64, count=len(termPostings))
+            arrays = (IDs, np.fromiter(termPostings.values(), dtype=np.float64, count=len(termPostings)),
+                      np.frombuffer(self.lengthByID, dtype=np.float64)[IDs])
+            self.postingArrays[term] = arrays
+
+        return arrays
+
+    def search(self, query, noteObjectList, limit=10):
+        """
+        Ranks notes matching any query word using BM25;
+        Postings of common words are scored with NumPy, those of rare words in plain Python
+        :param query: (str) Words to search for; words ending with '*' match as prefixes
+        :param noteObjectList: (dict) Notes in session, used to load index on first search
+        :param limit: (int) Maximum number of results
+        :return: (list) Tuples of note ID and score, best match first; equal scores by ID
+        """
+        self.ensure_loaded(noteObjectList)
+
+        docCount = len(self.docLengths)
+
+        if not docCount:
+            return []
+
+        averageLength = self.totalLength / docCount
+        scores = {}
+        arrayScores = []
+
+        # Lower casing may change length of query, so word ends are looked up in lower cased query itself
+        loweredQuery = query.lower()
+        queryTerms = [match.group(0) + ('*' if loweredQuery[match.end():match.end() + 1] == '*' else '')
+                      for match in TOKEN_PATTERN.finditer(loweredQuery)]
+
+        for queryTerm in queryTerms:
+            for term in self.expand(queryTerm):
+                termPostings = self.postings[term]
+
+                # Rare words weigh more than common ones
+                inverseFrequency = math.log(1 + (docCount - len(termPostings) + 0.5) / (len(termPostings) + 0.5))
+
+                if len(termPostings) >= ARRAY_MIN_POSTINGS:
+                    import numpy as np
+
+                    IDs, termFrequencies, docLengths = self.posting_arrays(term)
+                    lengthNorms = BM25_K1 * (1 - BM25_B + BM25_B * docLengths / averageLength)
+
+                    arrayScores.append((IDs, inverseFrequency * termFrequencies * (BM25_K1 + 1) /
+                                        (termFrequencies + lengthNorms)))
+
+                    continue
+
+                docLengths = self.docLengths
+
+                for ID, termFrequency in termPostings.items():
+                    lengthNorm = BM25_K1 * (1 - BM25_B + BM25_B * docLengths[ID] / averageLength)
+                    scores[ID] = scores.get(ID, 0.0) + \
+                        inverseFrequency * termFrequency * (BM25_K1 + 1) / (termFrequency + lengthNorm)
+
+        if not arrayScores:
+            return heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+
+        # Sum scores of all words per note ID, then pick best notes without sorting all of them
+        import numpy as np
+
+        if scores:
+            arrayScores.append((np.fromiter(scores.keys(), dtype=np.int64, count=len(scores)),
+                                np.fromiter(scores.values(), dtype=np.float64, count=len(scores))))
+
+        if len(arrayScores) == 1:
+            # Single word: scores are already per note
+            matchedIDs, matchedScores = arrayScores[0]
+
+        else:
+            totalScores = np.bincount(np.concatenate([IDs for IDs, _ in arrayScores]),
+                                      weights=np.concatenate([termScores for _, termScores in arrayScores]))
+            matchedIDs = np.flatnonzero(totalScores)
+            matchedScores = totalScores[matchedIDs]
+
+        if len(matchedIDs) > limit:
+            bestPositions = np.argpartition(-matchedScores, limit)[:limit]
+            matchedIDs, matchedScores = matchedIDs[bestPositions], matchedScores[bestPositions]
+
+        # Equally scored notes are listed by ID
+        bestOrder = np.lexsort((matchedIDs, -matchedScores))
+
+        return [(int(ID), float(score)) for ID, score in zip(matchedIDs[bestOrder], matchedScores[bestOrder])]
+
+# This is end of script.
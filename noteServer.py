@@ -0,0 +1,473 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import sys
+import json
+import signal
+import asyncio
+import datetime
+from urllib.parse import urlsplit, parse_qs
+
+# Writes committed to notes file at once, and longest time a write waits for more writes to join its batch;
+# Writes arriving while a batch is being saved join next batch anyway, so by default no write waits
+BATCH_SIZE = 1000
+BATCH_DELAY = 0
+
+# Requests a client may send ahead of their responses on one connection
+PIPELINE_DEPTH = 1024
+
+# Largest request head and body accepted
+MAX_HEAD_BYTES = 1 << 16
+MAX_BODY_BYTES = 1 << 20
+
+STATUS_TEXTS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+def parse_request_head(head):
+    """
+    Parses request line and headers of HTTP/1.1 request
+    :param head: (bytes) Request head, up to and including the empty line
+    :return: (tuple) Method, target and headers dictionary with lower case names
+    :raises ValueError: If request head is malformed
+    """
+    lines = head.decode('latin-1').split('\r\n')
+    method, target, httpVersion = lines[0].split(' ')
+
+    if not httpVersion.startswith('HTTP/1.'):
+        raise ValueError('Unsupported protocol: ' + httpVersion)
+
+    headers = {}
+
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+    # HTTP/1.0 clients close connection after each response unless asked otherwise
+    if httpVersion == 'HTTP/1.0' and headers.get('connection', '').lower() != 'keep-alive':
+        headers['connection'] = 'close'
+
+    return method, target, headers
+
+
+def completed_flag(arguments):
+    """
+    Reads optional 'completed' flag of request body
+    :param arguments: (dict) Request body and query parameters
+    :return: (bool) Flag, None if not given
+    :raises ValueError: If flag is not a JSON boolean
+    """
+    isCompleted = arguments.get('completed')
+
+    if isCompleted is not None and not isinstance(isCompleted, bool):
+        raise ValueError("Note 'completed' must be true or false.")
+
+    return isCompleted
+
+
+def encode_response(status, payload, keepAlive=True):
+    """
+    Encodes JSON response
+    :param status: (int) HTTP status code
+    :param payload: JSON-serializable response body
+    :param keepAlive: (bool) False to tell client connection is closed after response
+    :return: (bytes) Complete response
+    """
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+    return ('HTTP/1.1 %d %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\n%s\r\n'
+            % (status, STATUS_TEXTS[status], len(body), '' if keepAlive else 'Connection: close\r\n')).encode() + body
+
+
+class NotesServer:
+    """
+    Represents HTTP/JSON front end of notes store, serving clients on localhost from single asyncio event loop;
+    Requests are handled in order they arrive and clients may pipeline them; changes are committed to notes file in
+    batches, one save per batch, and a write is answered once its batch has been saved
+
+    Attributes
+    ----------
+    store : (NotesStore) Thread-safe store served; saves run in worker thread while requests keep being handled
+    batchSize : (int) Number of waiting writes that triggers save without waiting further
+    batchDelay : (float) Seconds a write waits for more writes to join its batch
+    commitWaiters : (list) Futures of writes waiting for next save
+    savingWaiters : (list) Futures of writes in batch being saved
+    writesPending, batchFull : (Event) Events waking committing task
+    ROUTES : (dict) Methods and path patterns as keys, handler names as values
+
+    Methods
+    -------
+    serve(host, port) : Serves clients until cancelled
+    handle_connection(reader, writer) : Reads pipelined requests of one client and queues their responses
+    send_responses(responses, writer) : Writes responses of one client in order of requests
+    commit_changes() : Saves batched writes to notes file
+    release(commitWaiters, error) : Answers writes of saved or failed batch
+    dispatch(method, target, body) : Runs request against store
+    handle_create, handle_read, handle_update, handle_delete, handle_complete, handle_stats : Request handlers
+    """
+    ROUTES = {('POST', 'notes'): 'handle_create',
+              ('GET', 'notes', 'ID'): 'handle_read',
+              ('PATCH', 'notes', 'ID'): 'handle_update',
+              ('DELETE', 'notes', 'ID'): 'handle_delete',
+              ('POST', 'notes', 'ID', 'complete'): 'handle_complete',
+              ('GET', 'stats'): 'handle_stats'}
+
+    def __init__(self, store, batchSize=BATCH_SIZE, batchDelay=BATCH_DELAY):
+        """
+        Initializes server over store; events are created once event loop runs
+        :param store: (NotesStore) Store created with 'threadSafe=True', with saved notes restored
+        :param batchSize: (int) Number of waiting writes that triggers save without waiting further
+        :param batchDelay: (float) Seconds a write waits for more writes to join its batch
+        """
+        self.store = store
+        self.batchSize = batchSize
+        self.batchDelay = batchDelay
+        self.commitWaiters = []
+        self.savingWaiters = []
+        self.writesPending = None
+        self.batchFull = None
+
+    async def serve(self, host='127.0.0.1', port=8080, onStarted=None):
+        """
+        Serves clients until cancelled or terminated; changes still waiting are saved before returning
+        :param host: (str) Address to listen on
+        :param port: (int) Port to listen on, 0 for any free port
+        :param onStarted: (function) Optional callback receiving address server listens on
+        :return: None
+        """
+        self.writesPending, self.batchFull = asyncio.Event(), asyncio.Event()
+        committingTask = asyncio.create_task(self.commit_changes())
+        server = await asyncio.start_server(self.handle_connection, host, port, limit=MAX_HEAD_BYTES)
+
+        # Termination signal stops server like an interrupt; not available on Windows, nor outside main thread
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+
+        except (NotImplementedError, RuntimeError):
+            pass
+
+        if onStarted is not None:
+            onStarted(server.sockets[0].getsockname())
+
+        try:
+            async with server:
+                await server.serve_forever()
+
+        finally:
+            # Batch cancelled while being saved is saved again here, along with writes still waiting
+            committingTask.cancel()
+            commitWaiters = self.savingWaiters + self.commitWaiters
+            self.savingWaiters, self.commitWaiters = [], []
+
+            try:
+                self.store.save()
+
+            except Exception as error:
+                self.release(commitWaiters, error)
+
+                raise
+
+            self.release(commitWaiters)
+
+    async def handle_connection(self, reader, writer):
+        """
+        Reads requests of one client one after another and queues their responses; next request is read without
+        waiting for response to previous one, so pipelined writes join same batch
+        :param reader: (StreamReader) Client input stream
+        :param writer: (StreamWriter) Client output stream
+        :return: None
+        """
+        responses = asyncio.Queue(PIPELINE_DEPTH)
+        sendingTask = asyncio.create_task(self.send_responses(responses, writer))
+
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+
+                except asyncio.IncompleteReadError:
+                    # Client closed connection between requests
+                    break
+
+                try:
+                    method, target, headers = parse_request_head(head)
+                    bodyLength = int(headers.get('content-length', 0))
+
+                    if bodyLength < 0:
+                        raise ValueError('Negative content length')
+
+                except ValueError:
+                    await responses.put((None, 400, {'error': 'Malformed request.'}, False))
+
+                    break
+
+                if bodyLength > MAX_BODY_BYTES:
+                    await responses.put((None, 413, {'error': 'Request body too large.'}, False))
+
+                    break
+
+                body = await reader.readexactly(bodyLength) if bodyLength else b''
+                keepAlive = headers.get('connection', '').lower() != 'close'
+                status, payload, commitFuture = await self.dispatch(method, target, body)
+
+                await responses.put((commitFuture, status, payload, keepAlive))
+
+                if not keepAlive:
+                    break
+
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+
+        except asyncio.CancelledError:
+            # Server is shutting down; changes have been saved, responses not sent yet are dropped
+            sendingTask.cancel()
+            writer.close()
+
+            return
+
+        try:
+            await responses.put(None)
+            await sendingTask
+
+        except asyncio.CancelledError:
+            # Server shut down while responses were still being sent
+            sendingTask.cancel()
+
+        writer.close()
+
+    async def send_responses(self, responses, writer):
+        """
+        Writes responses of one client in order of its requests; response to a write is held back until write is
+        saved, and output is flushed whenever no further response is ready
+        :param responses: (Queue) Tuples of commit future (None for reads), status, payload and keep-alive flag;
+                          None after last response
+        :param writer: (StreamWriter) Client output stream
+        :return: None
+        """
+        while True:
+            response = await responses.get()
+
+            if response is None:
+                break
+
+            commitFuture, status, payload, keepAlive = response
+
+            if commitFuture is not None:
+                try:
+                    await commitFuture
+
+                except Exception as error:
+                    status, payload = 500, {'error': 'Change could not be saved: ' + str(error)}
+
+            writer.write(encode_response(status, payload, keepAlive))
+
+            if responses.empty():
+                try:
+                    await writer.drain()
+
+                except ConnectionError:
+                    # Client is gone; remaining responses are only consumed
+                    pass
+
+    async def commit_changes(self):
+        """
+        Saves writes in batches: waits for first write, optionally gives more writes a short time to join unless batch
+        is full already, then saves them all at once in worker thread and releases their responses; writes arriving
+        during save form next batch
+        :return: None
+        """
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await self.writesPending.wait()
+
+            if not self.batchDelay:
+                # Requests already received are handled first, so pipelined writes join batch
+                await asyncio.sleep(0)
+
+            elif len(self.commitWaiters) < self.batchSize:
+                try:
+                    await asyncio.wait_for(self.batchFull.wait(), self.batchDelay)
+
+                except asyncio.TimeoutError:
+                    pass
+
+            self.writesPending.clear()
+            self.batchFull.clear()
+            self.savingWaiters, self.commitWaiters = self.commitWaiters, []
+
+            try:
+                await loop.run_in_executor(None, self.store.save, None, False)
+
+            except Exception as error:
+                self.release(self.savingWaiters, error)
+                self.savingWaiters = []
+
+                continue
+
+            self.release(self.savingWaiters)
+            self.savingWaiters = []
+
+            # Changes are durable once in journal; compacting it does not hold back their responses, and journal
+            # failing to compact keeps growing until a later compaction succeeds
+            try:
+                await loop.run_in_executor(None, self.store.journal.compact_if_needed)
+
+            except Exception as error:
+                print('Compacting notes file failed: ' + str(error), file=sys.stderr)
+
+    def release(self, commitWaiters, error=None):
+        """
+        Answers writes of batch once it has been saved, or failed to save
+        :param commitWaiters: (list) Futures of writes in batch
+        :param error: (Exception) Error batch failed with, None if batch was saved
+        :return: None
+        """
+        for commitFuture in commitWaiters:
+            # Future is cancelled along with response of client that has gone away
+            if commitFuture.done():
+                continue
+
+            if error is None:
+                commitFuture.set_result(None)
+
+            else:
+                commitFuture.set_exception(error)
+
+    async def dispatch(self, method, target, body):
+        """
+        Runs request against store in worker thread, as store calls may wait on file I/O and on locks held by save;
+        changes are applied to store right away and wait for next batch to be saved
+        :param method: (str) HTTP method
+        :param target: (str) Request target, e.g. '/notes/1?x=y'
+        :param body: (bytes) Request body, JSON object for requests taking input
+        :return: (tuple) Status, response payload and commit future of write (None for reads and failed requests)
+        """
+        urlParts = urlsplit(target)
+        pathParts = [part for part in urlParts.path.split('/') if part]
+        routeKey = tuple(['ID' if part.isdigit() and position == 1 else part for position, part in
+                          enumerate(pathParts)])
+
+        handlerName = self.ROUTES.get((method,) + routeKey)
+
+        if handlerName is None:
+            if any(route[1:] == routeKey for route in self.ROUTES):
+                return 405, {'error': 'Method ' + method + ' not allowed on ' + urlParts.path}, None
+
+            return 404, {'error': 'Unknown path ' + urlParts.path}, None
+
+        try:
+            arguments = json.loads(body) if body else {}
+
+            if not isinstance(arguments, dict):
+                raise ValueError('Request body must be a JSON object.')
+
+            arguments.update((name, values[-1]) for name, values in parse_qs(urlParts.query).items())
+            status, payload, isWrite = await asyncio.get_running_loop().run_in_executor(
+                None, getattr(self, handlerName), int(pathParts[1]) if 'ID' in routeKey else None, arguments)
+
+        # Missing or mistyped fields of request body
+        except (KeyError, TypeError) as error:
+            return 400, {'error': 'Invalid request: ' + str(error)}, None
+
+        except LookupError as error:
+            return 404, {'error': str(error)}, None
+
+        except ValueError as error:
+            return 400, {'error': str(error)}, None
+
+        except Exception as error:
+            return 500, {'error': 'Request failed: ' + str(error)}, None
+
+        if not isWrite:
+            return status, payload, None
+
+        commitFuture = asyncio.get_running_loop().create_future()
+        self.commitWaiters.append(commitFuture)
+        self.writesPending.set()
+
+        if len(self.commitWaiters) >= self.batchSize:
+            self.batchFull.set()
+
+        return status, payload, commitFuture
+
+    def handle_create(self, ID, arguments):
+        """
+        Creates note from 'title', 'text' and optional 'completed' of request body
+        :return: (tuple) Status, created note data and True as request is a write
+        :raises ValueError: If title or text is missing or empty, or completed flag is not a boolean
+        """
+        for name in ('title', 'text'):
+            if not isinstance(arguments.get(name), str):
+                raise ValueError('Note ' + name + ' is required.')
+
+        noteObject = self.store.create(arguments['title'], arguments['text'], completed_flag(arguments) or False)
+
+        return 201, noteObject.get_all_data(), True
+
+    def handle_read(self, ID, arguments):
+        """
+        Returns note data
+        :return: (tuple) Status, note data and False as request is a read
+        :raises LookupError: If note does not exist
+        """
+        return 200, self.store.get(ID).get_all_data(), False
+
+    def handle_update(self, ID, arguments):
+        """
+        Updates note with optional 'title', 'text' and 'completed' of request body
+        :return: (tuple) Status, updated note data and True as request is a write
+        :raises LookupError: If note does not exist
+        :raises ValueError: If new title or text is empty, or completed flag is not a boolean
+        """
+        for name in ('title', 'text'):
+            if not isinstance(arguments.get(name, ''), str):
+                raise ValueError('Note ' + name + ' must be a string.')
+
+        noteObject = self.store.update(ID, arguments.get('title'), arguments.get('text'), completed_flag(arguments))
+
+        return 200, noteObject.get_all_data(), True
+
+    def handle_delete(self, ID, arguments):
+        """
+        Deletes note
+        :return: (tuple) Status, ID of deleted note and True as request is a write
+        :raises LookupError: If note does not exist
+        """
+        self.store.delete(ID)
+
+        return 200, {'Note ID': str(ID), 'Deleted': 'Yes'}, True
+
+    def handle_complete(self, ID, arguments):
+        """
+        Marks note complete with optional 'date' (YYYY-MM-DD) of request body, current timestamp by default
+        :return: (tuple) Status, completed note data and True as request is a write
+        :raises LookupError: If note does not exist
+        :raises ValueError: If date is malformed or before creation date
+        """
+        if not isinstance(arguments.get('date', ''), str):
+            raise ValueError("Note completion 'date' must be a string.")
+
+        dateCompleted = datetime.datetime.strptime(arguments['date'], '%Y-%m-%d') if arguments.get('date') else None
+
+        return 200, self.store.complete(ID, dateCompleted).get_all_data(), True
+
+    def handle_stats(self, ID, arguments):
+        """
+        Returns completion statistics grouped by optional 'period' ('week' or 'month') query parameter
+        :return: (tuple) Status, statistics and False as request is a read
+        :raises ValueError: If period is unknown
+        """
+        period = arguments.get('period', 'month')
+
+        if period not in ('week', 'month'):
+            raise ValueError("Period must be 'week' or 'month'.")
+
+        return 200, self.store.stats(period), False
+
+# This is end of script.
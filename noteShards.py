@@ -0,0 +1,627 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import json
+import shutil
+import itertools
+import noteLoader
+from Note import Note
+from noteJournal import NoteJournal
+from noteFormats import DEFAULT_FORMAT, detect_format, sync_directory
+from noteBodies import LAZY_OFF
+from noteConcurrency import file_lock
+
+# Notes per shard of new sharded notes files; 0 keeps notes in single file. Set through environment variable
+SHARD_SIZE = int(os.environ.get('NOTES_SHARD_SIZE', 0))
+
+# Processes loading shards at once; same setting as for parsing large plain text files
+LOAD_WORKERS = noteLoader.LOAD_WORKERS
+
+# Shards smaller than this in total are loaded in this process, since starting worker processes would take longer
+PARALLEL_MIN_BYTES = 4 << 20
+
+MANIFEST_VERSION = 1
+
+# Storage backends: notes file with journal (single or sharded), or SQLite database next to notes file;
+# backend of new notes files is set through environment variable
+BACKEND_FILES = 'files'
+BACKEND_SQLITE = 'sqlite'
+STORAGE_BACKEND = os.environ.get('NOTES_BACKEND', BACKEND_FILES)
+
+# Markers in folder new layout is written to while notes are moved: new layout is complete and on disk, and files of
+# old layout have been deleted
+MARKER_COMMITTED = '.committed'
+MARKER_OLD_DELETED = '.old-deleted'
+
+
+def manifest_path(filePath):
+    """
+    Returns path of manifest of sharded notes file
+    :param filePath: (str) Path of notes file, e.g. 'Notes.txt'
+    :return: (str) Path of manifest, e.g. 'Notes.manifest'
+    """
+    return os.path.splitext(filePath)[0] + '.manifest'
+
+
+def database_path(filePath):
+    """
+    Returns path of SQLite database of notes file
+    :param filePath: (str) Path of notes file, e.g. 'Notes.txt'
+    :return: (str) Path of database, e.g. 'Notes.db'
+    """
+    return os.path.splitext(filePath)[0] + '.db'
+
+
+def relayout_path(filePath):
+    """
+    Returns path of folder notes are written to while they are moved into new layout
+    :param filePath: (str) Path of notes file, e.g. 'Notes.txt'
+    :return: (str) Path of folder, e.g. 'Notes.relayout'
+    """
+    return os.path.splitext(filePath)[0] + '.relayout'
+
+
+def layout_files(filePath):
+    """
+    Returns files of notes file in any backend and layout: notes file, journal, index, manifest, shards and database;
+    lock file is shared by all layouts and not included
+    :param filePath: (str) Path of notes file
+    :return: (list) Paths of existing files
+    """
+    basePath = os.path.splitext(filePath)[0]
+    directoryPath = os.path.dirname(filePath) or '.'
+    shardPrefix = os.path.basename(basePath) + '.shard'
+    databasePath = database_path(filePath)
+
+    paths = [filePath, basePath + '.journal', basePath + '.idx', manifest_path(filePath), databasePath,
+             databasePath + '-wal', databasePath + '-shm']
+    paths += [os.path.join(directoryPath, name) for name in os.listdir(directoryPath) if name.startswith(shardPrefix)]
+
+    return [path for path in paths if os.path.isfile(path)]
+
+
+def finish_relayout(filePath):
+    """
+    Completes or discards moving notes into new layout, e.g. after program was interrupted while moving them: new
+    layout that was completely written replaces old one, and new layout left incomplete is deleted, keeping old one;
+    Every step can be repeated, so interrupting this as well loses nothing. Lock must be held
+    :param filePath: (str) Path of notes file
+    :return: None
+    """
+    relayoutPath = relayout_path(filePath)
+
+    if not os.path.isdir(relayoutPath):
+        return
+
+    if not os.path.exists(os.path.join(relayoutPath, MARKER_COMMITTED)):
+        shutil.rmtree(relayoutPath)
+
+        return
+
+    directoryPath = os.path.dirname(filePath)
+
+    if not os.path.exists(os.path.join(relayoutPath, MARKER_OLD_DELETED)):
+        for path in layout_files(filePath):
+            os.remove(path)
+
+        sync_directory(directoryPath)
+
+        with open(os.path.join(relayoutPath, MARKER_OLD_DELETED), 'wb'):
+            pass
+
+        sync_directory(relayoutPath)
+
+    # Lock files of new layout stay behind; lock file next to notes file keeps its reserved IDs
+    for name in os.listdir(relayoutPath):
+        if not name.startswith('.') and not name.endswith('.lock'):
+            os.replace(os.path.join(relayoutPath, name), os.path.join(directoryPath, name))
+
+    sync_directory(directoryPath)
+    shutil.rmtree(relayoutPath)
+
+
+def replace_layout(journal, write_layout):
+    """
+    Moves all saved notes into new backend or layout: new layout is written into folder next to notes file and
+    forced to disk, and only then are files of old layout deleted and new files renamed into their place;
+    Nothing is changed if any saved record cannot be read. No other program should use notes file meanwhile
+    :param journal: (NoteJournal, ShardedJournal or SqliteJournal) Journal of notes file in its current layout
+    :param write_layout: (function) Writes given notes (iterator) in new layout of notes file at given path
+    :return: None
+    :raises ValueError: If saved records cannot be read
+    """
+    relayoutPath = relayout_path(journal.filePath)
+
+    with journal.fileLock.hold():
+        finish_relayout(journal.filePath)
+        os.mkdir(relayoutPath)
+
+        try:
+            malformedLines = []
+
+            write_layout(os.path.join(relayoutPath, os.path.basename(journal.filePath)),
+                         journal.iter_notes(malformedLines))
+
+            if malformedLines:
+                raise ValueError(str(len(malformedLines)) + ' saved note record(s) could not be read (at line or '
+                                 'offset ' + ', '.join(map(str, malformedLines[:10])) + '); notes have not been moved.')
+
+            for name in os.listdir(relayoutPath):
+                with open(os.path.join(relayoutPath, name), 'rb+') as f:
+                    os.fsync(f.fileno())
+
+            with open(os.path.join(relayoutPath, MARKER_COMMITTED), 'wb') as f:
+                os.fsync(f.fileno())
+
+            sync_directory(relayoutPath)
+
+        except BaseException:
+            shutil.rmtree(relayoutPath, ignore_errors=True)
+            raise
+
+        # Database connection of old layout is closed as well
+        journal.delete_files()
+        finish_relayout(journal.filePath)
+
+
+def open_journal(filePath):
+    """
+    Opens journal of notes file in backend and layout found on disk: SQLite database if it exists, sharded if
+    manifest exists, single file otherwise; New notes files are kept in database if 'NOTES_BACKEND' is 'sqlite', and
+    sharded if 'NOTES_SHARD_SIZE' is set
+    :param filePath: (str) Path of notes file
+    :return: (NoteJournal, ShardedJournal or SqliteJournal) Journal of notes file
+    """
+    # Notes left between layouts by interrupted move are put in one of them first
+    if os.path.isdir(relayout_path(filePath)):
+        with file_lock(os.path.splitext(filePath)[0] + '.lock').hold():
+            finish_relayout(filePath)
+
+    if os.path.exists(database_path(filePath)) or (STORAGE_BACKEND == BACKEND_SQLITE
+                                                   and not os.path.exists(manifest_path(filePath))
+                                                   and not NoteJournal(filePath).saved_size()):
+        # Imported only when notes are kept in database, to keep startup fast
+        from noteSqlite import SqliteJournal
+
+        return SqliteJournal(filePath)
+
+    if os.path.exists(manifest_path(filePath)):
+        return ShardedJournal(filePath)
+
+    if SHARD_SIZE and not NoteJournal(filePath).saved_size():
+        return ShardedJournal(filePath, SHARD_SIZE)
+
+    return NoteJournal(filePath)
+
+
+def note_fields(noteObject):
+    """
+    Converts note into tuple of plain values, which pass between processes much faster than note objects
+    :param noteObject: (Note) Note
+    :return: (tuple) ID, creation and completion timestamps (epoch microseconds), completion flag, title, text and
+             version
+    """
+    return (noteObject.ID, noteObject.createdEpoch, noteObject.completedEpoch, noteObject.isCompleted,
+            noteObject.title, noteObject.text, noteObject.version)
+
+
+def note_from_fields(fields):
+    """
+    Builds note from tuple returned by 'note_fields()'
+    :param fields: (tuple) Plain values of note
+    :return: (Note) Note object
+    """
+    ID, createdEpoch, completedEpoch, isCompleted, title, text, version = fields
+
+    return Note.from_epochs(ID, createdEpoch, title, text, isCompleted, completedEpoch, version)
+
+
+def load_shard(shardPath):
+    """
+    Reads all notes of one shard; run in worker process
+    :param shardPath: (str) Path of shard file
+    :return: (tuple) Plain values of notes (see 'note_fields()') and positions of skipped malformed records
+    """
+    malformedLines = []
+
+    # Shards are already loaded one per process; plain text shard is parsed by this process alone
+    noteLoader.LOAD_WORKERS = 1
+
+    return [note_fields(noteObject) for noteObject in NoteJournal(shardPath).iter_notes(malformedLines)], \
+        malformedLines
+
+
+class ShardedIndex:
+    """
+    Represents indexes of all shards as one; each shard's index is loaded only once a note of it is looked up
+
+    Attributes
+    ----------
+    journal : (ShardedJournal) Sharded journal
+
+    Methods
+    -------
+    find(ID) : Finds note in index of its shard
+    read_note(ID) : Reads saved note from its shard
+    """
+    def __init__(self, journal):
+        """
+        Initializes index over shards of journal
+        :param journal: (ShardedJournal) Sharded journal
+        """
+        self.journal = journal
+
+    def find(self, ID):
+        """
+        Finds note in index of its shard
+        :param ID: (int) Note ID
+        :return: (int) Position of note in shard index, -1 if note is not saved
+        """
+        if self.journal.shard_number(ID) not in self.journal.read_manifest():
+            return -1
+
+        return self.journal.shard_for(ID).load_index().find(ID)
+
+    def read_note(self, ID):
+        """
+        Reads saved note from its shard
+        :param ID: (int) Note ID
+        :return: (Note) Saved note object, None if note is not saved
+        """
+        if self.journal.shard_number(ID) not in self.journal.read_manifest():
+            return None
+
+        return self.journal.shard_for(ID).load_index().read_note(ID)
+
+
+class ShardedJournal:
+    """
+    Represents notes file split by ID range into shard files, each a notes file with its own journal, index and lock;
+    Manifest next to notes file records shard size and shards in use. Only shards holding changed notes are written
+    on save, and a shard is rewritten only once its own journal grows too large; shards are loaded in parallel by
+    worker processes. Offers same operations as 'NoteJournal'
+
+    Attributes
+    ----------
+    filePath : (str) Path of notes file; notes themselves are in shard files next to it
+    manifestPath : (str) Path of manifest
+    shardSize : (int) Number of consecutive note IDs per shard
+    shards : (dict) Shard numbers as keys and opened shard journals as values
+    pendingChanges : (dict) IDs of notes changed in session but not yet written, with last operation
+    fileLock : (FileLock) Lock guarding manifest; lock file also holds highest reserved ID of all shards
+    writesEachChange : (bool) False; stores write changes on save, batched into one flush
+
+    Methods
+    -------
+    shard_number(ID) : Returns number of shard holding note
+    shard_path(shardNumber) : Returns path of shard file
+    shard_for(ID) : Returns journal of shard holding note
+    read_manifest() : Reads shard numbers in use
+    record(operation, noteID) : Records a note change to be written on next flush
+    flush(noteObjectList, allowCompaction, baseNotes, mergedNotes, conflictIDs) : Writes changes to their shards
+    compact_if_needed() : Compacts journals of shards that grew too large
+    iter_notes(malformedLines, lazyMode) : Yields notes of all shards
+    sync_point() : Returns state of saved notes of every shard to find changes against later
+    iter_changed_notes(syncPoint) : Yields notes saved or changed since sync point
+    max_id() : Returns highest saved note ID
+    reserve_ids(count) : Reserves note IDs no other process will use
+    load_index() : Returns index over all shards
+    compact(appendedNotes) : Rewrites changed shards, with new notes appended to shards they belong to
+    saved_size() : Returns total size of shard files
+    delete_files() : Deletes all shard files and manifest
+    """
+    writesEachChange = False
+
+    def __init__(self, filePath, shardSize=None):
+        """
+        Opens sharded notes file; manifest is created if missing
+        :param filePath: (str) Path of notes file
+        :param shardSize: (int) Notes per shard of new sharded file; ignored if manifest exists already
+        :raises ValueError: If manifest is missing and no shard size is given
+        """
+        self.filePath = filePath
+        self.manifestPath = manifest_path(filePath)
+        self.shards = {}
+        self.pendingChanges = {}
+        self.fileLock = file_lock(os.path.splitext(filePath)[0] + '.lock')
+
+        with self.fileLock.hold():
+            if not os.path.exists(self.manifestPath):
+                self.shardSize = shardSize or SHARD_SIZE
+
+                if self.shardSize < 1:
+                    raise ValueError('Shard size must be a positive number of notes.')
+
+                self.write_manifest([])
+
+            with open(self.manifestPath, 'r') as f:
+                self.shardSize = json.load(f)['shardSize']
+
+    def shard_number(self, ID):
+        """
+        Returns number of shard holding note
+        :param ID: (int) Note ID
+        :return: (int) Shard number
+        """
+        return (ID - 1) // self.shardSize
+
+    def shard_path(self, shardNumber):
+        """
+        Returns path of shard file, e.g. 'Notes.shard0003.txt'
+        :param shardNumber: (int) Shard number
+        :return: (str) Path of shard file
+        """
+        filePathBase, extension = os.path.splitext(self.filePath)
+
+        return '%s.shard%04d%s' % (filePathBase, shardNumber, extension)
+
+    def shard(self, shardNumber):
+        """
+        Returns journal of shard, opening it on first use
+        :param shardNumber: (int) Shard number
+        :return: (NoteJournal) Shard journal
+        """
+        if shardNumber not in self.shards:
+            self.shards[shardNumber] = NoteJournal(self.shard_path(shardNumber))
+
+        return self.shards[shardNumber]
+
+    def shard_for(self, ID):
+        """
+        Returns journal of shard holding note
+        :param ID: (int) Note ID
+        :return: (NoteJournal) Shard journal
+        """
+        return self.shard(self.shard_number(ID))
+
+    def read_manifest(self):
+        """
+        Reads numbers of shards in use; read again each time, since other processes may add shards
+        :return: (list) Shard numbers in ascending order
+        """
+        with open(self.manifestPath, 'r') as f:
+            return json.load(f)['shards']
+
+    def write_manifest(self, shardNumbers):
+        """
+        Replaces manifest atomically; lock must be held
+        :param shardNumbers: (iterable) Shard numbers in use
+        :return: None
+        """
+        tempPath = self.manifestPath + '.tmp'
+
+        with open(tempPath, 'w') as f:
+            json.dump({'version': MANIFEST_VERSION, 'partitioning': 'range', 'shardSize': self.shardSize,
+                       'shards': sorted(shardNumbers)}, f)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tempPath, self.manifestPath)
+
+    def add_shards(self, shardNumbers):
+        """
+        Adds shards to manifest before notes are first written to them
+        :param shardNumbers: (iterable) Shard numbers about to be written
+        :return: None
+        """
+        with self.fileLock.hold():
+            knownShards = set(self.read_manifest())
+
+            if not knownShards.issuperset(shardNumbers):
+                self.write_manifest(knownShards.union(shardNumbers))
+
+    def record(self, operation, noteID):
+        """
+        Records a note change; nothing is written until 'flush()', several changes to one note are written once
+        :param operation: (int) One of 'OP_CREATE', 'OP_UPDATE', 'OP_COMPLETE', 'OP_DELETE'
+        :param noteID: (int) ID of changed note
+        :return: None
+        """
+        self.pendingChanges.pop(noteID, None)
+        self.pendingChanges[noteID] = operation
+
+    def flush(self, noteObjectList, allowCompaction=True, baseNotes=None, mergedNotes=None, conflictIDs=None):
+        """
+        Writes every note changed since last flush to journal of its shard; shards without changes are not touched
+        :param noteObjectList: (dict) Notes in session, with note IDs as keys
+        :param allowCompaction: (bool) False to postpone compaction of shard journals
+        :param baseNotes: (dict) Versions of changed notes as read, see 'NoteJournal.flush()'
+        :param mergedNotes: (dict) Optional dictionary collecting notes written in different form than in session
+        :param conflictIDs: (list) Optional list collecting IDs of notes changed differently here and elsewhere
+        :return: (int) Number of changes written
+        """
+        shardChanges = {}
+
+        for noteID, operation in self.pendingChanges.items():
+            shardChanges.setdefault(self.shard_number(noteID), {})[noteID] = operation
+
+        self.add_shards(shardChanges)
+
+        changesCount = 0
+
+        for shardNumber, changes in sorted(shardChanges.items()):
+            shardJournal = self.shard(shardNumber)
+            shardJournal.pendingChanges = changes
+
+            changesCount += shardJournal.flush(noteObjectList, allowCompaction, baseNotes, mergedNotes, conflictIDs)
+
+            # Changes of shards not written because of error stay recorded for next flush
+            for noteID in changes:
+                del self.pendingChanges[noteID]
+
+        return changesCount
+
+    def compact_if_needed(self):
+        """
+        Compacts journals of shards that grew too large; other shards are left as they are
+        :return: (bool) True if any shard was compacted
+        """
+        # List is built first, so every shard is checked
+        return any([self.shard(shardNumber).compact_if_needed() for shardNumber in self.read_manifest()])
+
+    def iter_notes(self, malformedLines=None, lazyMode=LAZY_OFF):
+        """
+        Generator yielding notes of all shards in shard order; large sharded files are loaded by worker processes,
+        one shard each, while notes of shards already loaded are yielded
+        :param malformedLines: (list) Optional list collecting shard files and positions of skipped malformed records
+        :param lazyMode: (str) Lazy loading mode; lazily loaded shards are read in this process
+        :return: (generator) Note objects currently saved
+        """
+        shardNumbers = self.read_manifest()
+        shardPaths = [self.shard_path(shardNumber) for shardNumber in shardNumbers]
+        workersCount = min(LOAD_WORKERS, len(shardPaths))
+
+        # Lazy notes point into memory-mapped files of this process, so they cannot be loaded elsewhere
+        if lazyMode != LAZY_OFF or workersCount < 2 or self.saved_size() < PARALLEL_MIN_BYTES:
+            for shardNumber, shardPath in zip(shardNumbers, shardPaths):
+                shardMalformedLines = []
+
+                yield from self.shard(shardNumber).iter_notes(shardMalformedLines, lazyMode)
+
+                if malformedLines is not None:
+                    malformedLines.extend(shardPath + ':' + str(position) for position in shardMalformedLines)
+
+            return
+
+        # Imported only when loading in parallel, to keep startup fast
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(workersCount) as executor:
+            for shardPath, (shardNotes, shardMalformedLines) in zip(shardPaths, executor.map(load_shard, shardPaths)):
+                for fields in shardNotes:
+                    yield note_from_fields(fields)
+
+                if malformedLines is not None:
+                    malformedLines.extend(shardPath + ':' + str(position) for position in shardMalformedLines)
+
+    def sync_point(self):
+        """
+        Returns state of saved notes of every shard, see 'NoteJournal.sync_point()'
+        :return: (dict) Shard numbers as keys and their sync points as values
+        """
+        return {shardNumber: self.shard(shardNumber).sync_point() for shardNumber in self.read_manifest()}
+
+    def iter_changed_notes(self, syncPoint):
+        """
+        Generator yielding notes created or changed since sync point was taken; shards added since are read whole
+        :param syncPoint: (dict) Sync points returned by 'sync_point()'
+        :return: (generator) Note objects saved since sync point
+        """
+        for shardNumber in self.read_manifest():
+            if shardNumber in syncPoint:
+                yield from self.shard(shardNumber).iter_changed_notes(syncPoint[shardNumber])
+
+            else:
+                yield from self.shard(shardNumber).iter_notes()
+
+    def max_id(self):
+        """
+        Returns highest saved note ID; only index headers of last shards are read while indexes are up to date
+        :return: (int) Highest saved note ID, None if no notes have been saved
+        """
+        # Shards hold increasing ID ranges, so highest ID is in last shard that is not empty
+        for shardNumber in reversed(self.read_manifest()):
+            maxID = self.shard(shardNumber).max_id()
+
+            if maxID:
+                return maxID
+
+        return None
+
+    def reserve_ids(self, count):
+        """
+        Reserves consecutive note IDs above every ID saved or reserved by any process sharing notes file
+        :param count: (int) Number of IDs needed
+        :return: (int) First reserved ID
+        """
+        with self.fileLock.hold():
+            firstID = max(self.fileLock.read_reserved_id(), self.max_id() or 0) + 1
+            self.fileLock.write_reserved_id(firstID + count - 1)
+
+        return firstID
+
+    def load_index(self):
+        """
+        Returns index over all shards
+        :return: (ShardedIndex) Index looking notes up in their shards
+        """
+        return ShardedIndex(self)
+
+    def compact(self, appendedNotes=()):
+        """
+        Rewrites shards with journal replayed, or not yet in current format; new notes are streamed into shards they
+        belong to; other shards are left as they are
+        :param appendedNotes: (iterable) Notes in ascending ID order, e.g. from bulk import; their IDs must not be
+                              saved already
+        :return: None
+        """
+        with self.fileLock.hold():
+            compactedShards = set()
+
+            # Notes in ascending ID order arrive shard after shard
+            for shardNumber, shardNotes in itertools.groupby(appendedNotes, lambda noteObject:
+                                                             self.shard_number(noteObject.ID)):
+                self.add_shards([shardNumber])
+                self.shard(shardNumber).compact(shardNotes)
+                compactedShards.add(shardNumber)
+
+            for shardNumber in self.read_manifest():
+                shardJournal = self.shard(shardNumber)
+
+                if shardNumber not in compactedShards and (os.path.exists(shardJournal.journalPath)
+                                                           or not os.path.exists(shardJournal.filePath)
+                                                           or detect_format(shardJournal.filePath) != DEFAULT_FORMAT):
+                    shardJournal.compact()
+
+    def saved_size(self):
+        """
+        Returns total size of shard files and their journals
+        :return: (int) Size in bytes, None if no notes have been saved
+        """
+        sizes = [self.shard(shardNumber).saved_size() for shardNumber in self.read_manifest()]
+
+        return sum(size or 0 for size in sizes) if any(size is not None for size in sizes) else None
+
+    def delete_files(self):
+        """
+        Deletes all shard files and manifest; lock must be held
+        :return: None
+        """
+        for shardNumber in self.read_manifest():
+            shardJournal = self.shard(shardNumber)
+
+            with shardJournal.fileLock.hold():
+                shardJournal.delete_files()
+
+            os.remove(shardJournal.fileLock.lockPath)
+
+        os.remove(self.manifestPath)
+        self.shards = {}
+
+
+def reshard(journal, shardSize):
+    """
+    Moves all saved notes into new layout: shards of given number of notes each, or single notes file; see
+    'replace_layout()'. Notes are held in memory while they are sorted into shards
+    :param journal: (NoteJournal, ShardedJournal or SqliteJournal) Journal of notes file in its current layout
+    :param shardSize: (int) Notes per shard, 0 for single notes file
+    :return: (NoteJournal or ShardedJournal) Journal of notes file in new layout
+    :raises ValueError: If shard size is negative, or saved records cannot be read
+    """
+    if shardSize < 0:
+        raise ValueError('Shard size must be a positive number of notes, or 0 for single file.')
+
+    def write_shards(filePath, notes):
+        newJournal = ShardedJournal(filePath, shardSize) if shardSize else NoteJournal(filePath)
+        newJournal.compact(sorted(notes, key=lambda noteObject: noteObject.ID))
+
+    replace_layout(journal, write_shards)
+
+    return ShardedJournal(journal.filePath) if shardSize else NoteJournal(journal.filePath)
+
+# This is end of script.
@@ -0,0 +1,447 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sqlite3
+import threading
+from itertools import islice
+from Note import Note, NO_DATE
+from noteBodies import LAZY_OFF
+from noteConcurrency import file_lock, resolve_change
+from noteFormats import LEGACY_NO_DATE
+from noteShards import BACKEND_FILES, database_path, replace_layout, reshard
+from noteMetrics import METRICS
+
+# Durability of committed changes: 'FULL' syncs write-ahead log on every commit, as journal files are synced on every
+# flush; 'NORMAL' survives crashes of program but not of system. Set through environment variable
+SYNCHRONOUS = os.environ.get('NOTES_SQLITE_SYNC', 'FULL')
+
+# Number of notes inserted by one statement execution when many notes are written at once
+BATCH_SIZE = 10000
+
+# Schema: notes with dates as epoch microseconds, and number of change that last wrote them, which later restores
+# read changes by; 'meta' holds counter of changes
+SCHEMA = ('CREATE TABLE IF NOT EXISTS notes (id INTEGER PRIMARY KEY, created INTEGER NOT NULL, '
+          'completed INTEGER NOT NULL, isCompleted INTEGER NOT NULL, title TEXT NOT NULL, text TEXT NOT NULL, '
+          'version INTEGER NOT NULL, change INTEGER NOT NULL)',
+          'CREATE INDEX IF NOT EXISTS notesByChange ON notes (change)',
+          'CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)',
+          "INSERT OR IGNORE INTO meta VALUES ('change', 0)")
+
+# Version of database contents, kept in 'user_version' of database; databases before version 1 held -1 for notes
+# without completion date, databases before version 2 had indexes on completion status and dates
+SCHEMA_VERSION = 2
+
+# Indexes of earlier versions; notes are filtered by query indexes of session, so they only slowed down writes
+DROPPED_INDEXES = ('notesByCompletion', 'notesByCreation', 'notesByCompletionDate')
+
+# Statements; sqlite3 keeps compiled statements in cache of connection by their text, so each is prepared only once
+NOTE_COLUMNS = 'id, created, completed, isCompleted, title, text, version'
+SELECT_NOTE = 'SELECT ' + NOTE_COLUMNS + ' FROM notes WHERE id = ?'
+SELECT_NOTES = 'SELECT ' + NOTE_COLUMNS + ' FROM notes ORDER BY id'
+SELECT_CHANGED = 'SELECT ' + NOTE_COLUMNS + ' FROM notes WHERE change > ? ORDER BY id'
+SELECT_MAX_ID = 'SELECT MAX(id) FROM notes'
+SELECT_ANY = 'SELECT 1 FROM notes LIMIT 1'
+SELECT_CHANGE = "SELECT value FROM meta WHERE key = 'change'"
+UPDATE_CHANGE = "UPDATE meta SET value = ? WHERE key = 'change'"
+INSERT_NOTE = 'INSERT INTO notes VALUES (?, ?, ?, ?, ?, ?, ?, ?)'
+REPLACE_NOTE = 'INSERT OR REPLACE INTO notes VALUES (?, ?, ?, ?, ?, ?, ?, ?)'
+DELETE_NOTE = 'DELETE FROM notes WHERE id = ?'
+
+
+def note_row(noteObject, changeNumber):
+    """
+    Converts note into row of 'notes' table; texts kept compressed in memory are stored decompressed
+    :param noteObject: (Note) Note
+    :param changeNumber: (int) Number of change writing note
+    :return: (tuple) Column values
+    """
+    return (noteObject.ID, noteObject.createdEpoch, noteObject.completedEpoch, int(noteObject.isCompleted),
+            noteObject.title, noteObject.text, noteObject.version, changeNumber)
+
+
+def note_from_row(row):
+    """
+    Builds note from row selected with 'NOTE_COLUMNS'
+    :param row: (tuple) Column values
+    :return: (Note) Note object
+    """
+    ID, createdEpoch, completedEpoch, isCompleted, title, text, version = row
+
+    return Note.from_epochs(ID, createdEpoch, title, text, bool(isCompleted), completedEpoch, version)
+
+
+class SqliteJournal:
+    """
+    Represents notes kept in SQLite database next to notes file ('Notes.db' for 'Notes.txt'), in write-ahead log mode
+    so readers never wait for writers; offers same operations as 'NoteJournal', and database is its own index;
+    Changes recorded since last flush are written in one transaction, merged with changes other processes saved
+    meanwhile; notes written at once are inserted in batches. Stores write every change as it is made, since a
+    transaction costs far less than appending to journal file and syncing it;
+    Notes are looked up by primary key; index on number of change that last wrote each note lets later restores read
+    only notes changed since
+
+    Attributes
+    ----------
+    filePath : (str) Path of notes file; notes themselves are in database next to it
+    databasePath : (str) Path of database
+    pendingChanges : (dict) IDs of notes changed in session but not yet written, with last operation
+    fileLock : (FileLock) Lock file shared with other layouts of notes file; holds highest reserved ID
+    connection : (Connection) Connection to database used for writes and single lookups
+    connectionLock : (RLock) Lock serializing use of 'connection' by threads
+    writesEachChange : (bool) True; stores write every change right away
+
+    Methods
+    -------
+    upgrade() : Converts notes written by earlier versions
+    record(operation, noteID) : Records a note change to be written on next flush
+    flush(noteObjectList, allowCompaction, baseNotes, mergedNotes, conflictIDs) : Writes recorded changes in one
+        transaction, merged with changes saved by other processes
+    compact_if_needed() : Does nothing; database needs no compaction
+    iter_notes(malformedLines, lazyMode) : Yields saved notes
+    sync_point() : Returns number of last change written to database
+    iter_changed_notes(syncPoint) : Yields notes saved or changed since sync point
+    max_id() : Returns highest saved note ID
+    reserve_ids(count) : Reserves note IDs no other process will use
+    load_index() : Returns journal itself, which looks notes up in database
+    find(ID) : Checks if note is saved
+    read_note(ID) : Reads saved note
+    compact(appendedNotes) : Inserts new notes in one transaction
+    saved_size() : Returns total size of database files
+    close() : Merges write-ahead log into database and closes connection
+    delete_files() : Deletes database files
+    """
+    writesEachChange = True
+
+    def __init__(self, filePath):
+        """
+        Opens database of notes file, creating it if missing
+        :param filePath: (str) Path of notes file
+        """
+        self.filePath = filePath
+        self.databasePath = database_path(filePath)
+        self.pendingChanges = {}
+        self.fileLock = file_lock(os.path.splitext(filePath)[0] + '.lock')
+        self.connectionLock = threading.RLock()
+        self.connection = self.connect()
+
+        with self.connectionLock:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+
+            if self.connection.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+                self.upgrade()
+
+    def upgrade(self):
+        """
+        Converts notes written by earlier versions and drops indexes no longer used, in one transaction; converted
+        notes count as changed, so other sessions restoring incrementally read them again
+        :return: None
+        """
+        def upgrade_notes(changeNumber):
+            self.connection.execute('UPDATE notes SET completed = ?, change = ? WHERE completed = ?',
+                                    (NO_DATE, changeNumber, LEGACY_NO_DATE))
+
+            for indexName in DROPPED_INDEXES:
+                self.connection.execute('DROP INDEX IF EXISTS ' + indexName)
+
+            self.connection.execute('PRAGMA user_version = ' + str(SCHEMA_VERSION))
+
+        self.write(upgrade_notes)
+
+    def connect(self):
+        """
+        Opens connection to database in write-ahead log mode; transactions are begun explicitly
+        :return: (Connection) Connection
+        """
+        # Connection is used by several threads of thread-safe stores, one at a time under 'connectionLock'
+        connection = sqlite3.connect(self.databasePath, isolation_level=None, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode = WAL')
+        connection.execute('PRAGMA synchronous = ' + SYNCHRONOUS)
+
+        return connection
+
+    def record(self, operation, noteID):
+        """
+        Records a note change; nothing is written until 'flush()', several changes to one note are written once
+        :param operation: (int) One of 'OP_CREATE', 'OP_UPDATE', 'OP_COMPLETE', 'OP_DELETE'
+        :param noteID: (int) ID of changed note
+        :return: None
+        """
+        self.pendingChanges.pop(noteID, None)
+        self.pendingChanges[noteID] = operation
+
+    def next_change(self):
+        """
+        Takes number of next change; transaction must be open
+        :return: (int) Change number
+        """
+        changeNumber = self.connection.execute(SELECT_CHANGE).fetchone()[0] + 1
+        self.connection.execute(UPDATE_CHANGE, (changeNumber,))
+
+        return changeNumber
+
+    def write(self, statements):
+        """
+        Runs statements in one transaction taking write lock of database at once, so notes read to merge changes
+        cannot be changed by other processes before changes are written; transaction is rolled back on error
+        :param statements: (function) Runs statements on 'connection', given number of change
+        :return: (object) Value returned by 'statements'
+        :raises ValueError: If statements insert note whose ID is saved already
+        """
+        with self.connectionLock:
+            self.connection.execute('BEGIN IMMEDIATE')
+
+            try:
+                result = statements(self.next_change())
+
+            except BaseException as error:
+                # Some errors end transaction by themselves
+                if self.connection.in_transaction:
+                    self.connection.execute('ROLLBACK')
+
+                if isinstance(error, sqlite3.IntegrityError):
+                    raise ValueError('Note ID is saved already: ' + str(error)) from error
+
+                raise
+
+            self.connection.execute('COMMIT')
+
+            return result
+
+    def flush(self, noteObjectList, allowCompaction=True, baseNotes=None, mergedNotes=None, conflictIDs=None):
+        """
+        Writes current state of every note changed since last flush in one transaction, merged with changes other
+        processes saved meanwhile; version counter of every written note is increased
+        :param noteObjectList: (dict) Notes in session, with note IDs as keys
+        :param allowCompaction: (bool) Ignored; database needs no compaction
+        :param baseNotes: (dict) Note IDs as keys; versions of notes as read before first change in session, None for
+                          notes created in session; None to write changes as is without merging
+        :param mergedNotes: (dict) Optional dictionary collecting notes written in different form than in session,
+                            which caller should take over
+        :param conflictIDs: (list) Optional list collecting IDs of notes changed differently here and elsewhere
+        :return: (int) Number of changes written
+        """
+        if not self.pendingChanges:
+            return 0
+
+        def write_changes(changeNumber):
+            rows, deletedIDs = [], []
+
+            for noteID in self.pendingChanges:
+                resolvedChange = resolve_change(noteID, noteObjectList.get(noteID), baseNotes, self.read_note,
+                                                mergedNotes, conflictIDs)
+
+                if resolvedChange is None:
+                    continue
+
+                noteObject, version = resolvedChange
+
+                if noteObject is None:
+                    deletedIDs.append((noteID,))
+
+                else:
+                    # Only version counter of note in session changes in place, once note is saved
+                    noteObject.version = version
+                    rows.append(note_row(noteObject, changeNumber))
+
+            self.connection.executemany(REPLACE_NOTE, rows)
+            self.connection.executemany(DELETE_NOTE, deletedIDs)
+
+            return len(rows) + len(deletedIDs)
+
+        changesCount = self.write(write_changes)
+
+        # Changes are only forgotten once transaction is committed; failed transaction leaves them for next flush
+        self.pendingChanges = {}
+        METRICS.count('notes_rows_written_total', changesCount, (('file', 'database'),))
+
+        return changesCount
+
+    def compact_if_needed(self):
+        """
+        Does nothing; write-ahead log is merged into database by SQLite itself
+        :return: (bool) False
+        """
+        return False
+
+    def iter_rows(self, statement, parameters=()):
+        """
+        Generator yielding notes selected by statement; own connection reads one consistent state of database while
+        notes are consumed, without holding up other threads
+        :param statement: (str) Statement selecting 'NOTE_COLUMNS'
+        :param parameters: (tuple) Statement parameters
+        :return: (generator) Note objects
+        """
+        connection = self.connect()
+
+        try:
+            connection.execute('BEGIN')
+
+            for row in connection.execute(statement, parameters):
+                yield note_from_row(row)
+
+            connection.execute('COMMIT')
+
+        finally:
+            connection.close()
+
+    def iter_notes(self, malformedLines=None, lazyMode=LAZY_OFF):
+        """
+        Generator yielding saved notes in ID order
+        :param malformedLines: (list) Ignored; database holds no malformed records
+        :param lazyMode: (str) Ignored; notes are read whole
+        :return: (generator) Note objects currently saved
+        """
+        return self.iter_rows(SELECT_NOTES)
+
+    def sync_point(self):
+        """
+        Returns number of last change written to database, against which 'iter_changed_notes()' finds notes saved later
+        :return: (int) Change number
+        """
+        with self.connectionLock:
+            return self.connection.execute(SELECT_CHANGE).fetchone()[0]
+
+    def iter_changed_notes(self, syncPoint):
+        """
+        Generator yielding notes created or changed by any process since sync point was taken, found through index on
+        change numbers; deleted notes are not reported
+        :param syncPoint: (int) Change number returned by 'sync_point()'
+        :return: (generator) Note objects saved since sync point
+        """
+        return self.iter_rows(SELECT_CHANGED, (syncPoint,))
+
+    def max_id(self):
+        """
+        Returns highest saved note ID, read from end of primary key
+        :return: (int) Highest saved note ID, None if no notes have been saved
+        """
+        with self.connectionLock:
+            return self.connection.execute(SELECT_MAX_ID).fetchone()[0]
+
+    def reserve_ids(self, count):
+        """
+        Reserves consecutive note IDs above every ID saved or reserved by any process sharing notes file
+        :param count: (int) Number of IDs needed
+        :return: (int) First reserved ID
+        """
+        with self.fileLock.hold():
+            firstID = max(self.fileLock.read_reserved_id(), self.max_id() or 0) + 1
+            self.fileLock.write_reserved_id(firstID + count - 1)
+
+        return firstID
+
+    def load_index(self):
+        """
+        Returns journal itself; database is its own index
+        :return: (SqliteJournal) Journal
+        """
+        return self
+
+    def find(self, ID):
+        """
+        Checks if note is saved
+        :param ID: (int) Note ID
+        :return: (int) Note ID if note is saved, -1 otherwise
+        """
+        return ID if self.read_note(ID) is not None else -1
+
+    def read_note(self, ID):
+        """
+        Reads saved note through primary key
+        :param ID: (int) Note ID
+        :return: (Note) Saved note object, None if note is not saved
+        """
+        with self.connectionLock:
+            row = self.connection.execute(SELECT_NOTE, (ID,)).fetchone()
+
+        return note_from_row(row) if row is not None else None
+
+    def compact(self, appendedNotes=()):
+        """
+        Inserts new notes, e.g. from bulk import or migration, in one transaction, a batch of rows per statement
+        execution; nothing is inserted if any ID is saved already
+        :param appendedNotes: (iterable) Notes to insert; their IDs must not be saved already
+        :return: None
+        :raises ValueError: If ID of any note is saved already
+        """
+        appendedNotes = iter(appendedNotes)
+
+        def insert_notes(changeNumber):
+            while True:
+                rows = [note_row(noteObject, changeNumber) for noteObject in islice(appendedNotes, BATCH_SIZE)]
+
+                if not rows:
+                    return
+
+                self.connection.executemany(INSERT_NOTE, rows)
+                METRICS.count('notes_rows_written_total', len(rows), (('file', 'database'),))
+
+        self.write(insert_notes)
+
+    def saved_size(self):
+        """
+        Returns total size of database and its write-ahead log
+        :return: (int) Size in bytes, None if no notes have been saved
+        """
+        with self.connectionLock:
+            if self.connection.execute(SELECT_ANY).fetchone() is None:
+                return None
+
+        return sum(os.path.getsize(path) for path in (self.databasePath, self.databasePath + '-wal')
+                   if os.path.exists(path))
+
+    def close(self):
+        """
+        Merges write-ahead log into database and closes connection, leaving database complete in one file
+        :return: None
+        """
+        with self.connectionLock:
+            self.connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            self.connection.close()
+
+    def delete_files(self):
+        """
+        Closes and deletes database files
+        :return: None
+        """
+        with self.connectionLock:
+            self.connection.close()
+
+            for path in (self.databasePath, self.databasePath + '-wal', self.databasePath + '-shm'):
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+def migrate(journal, backend):
+    """
+    Moves all saved notes into other storage backend: SQLite database, or single notes file; see
+    'noteShards.replace_layout()'. Notes are streamed into new database, which replaces old files only once it holds
+    them all and is on disk; nothing is moved if any saved record cannot be read. No other program should use notes
+    file meanwhile
+    :param journal: (NoteJournal, ShardedJournal or SqliteJournal) Journal of notes file in its current backend
+    :param backend: (str) 'BACKEND_SQLITE' or 'BACKEND_FILES'
+    :return: (NoteJournal or SqliteJournal) Journal of notes file in new backend
+    :raises ValueError: If saved records cannot be read
+    """
+    if backend == BACKEND_FILES:
+        return reshard(journal, 0)
+
+    if isinstance(journal, SqliteJournal):
+        return journal
+
+    def write_database(filePath, notes):
+        newJournal = SqliteJournal(filePath)
+        newJournal.compact(notes)
+        newJournal.close()
+
+    replace_layout(journal, write_database)
+
+    return SqliteJournal(journal.filePath)
+
+# This is end of script.
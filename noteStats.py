@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+from array import array
+from Note import NO_DATE
+
+MICROSECONDS_PER_DAY = 86400 * 1000000
+
+# Lower edges of days-to-complete histogram buckets; last bucket is open-ended
+HISTOGRAM_EDGES = (0, 1, 2, 4, 8, 15, 31, 91)
+
+# Percentiles of days-to-complete reported in summary
+PERCENTILES = (50, 75, 90, 99)
+
+
+class NoteStats:
+    """
+    Represents completion statistics engine over columnar copy of note dates;
+    Counters are maintained on every change so basic statistics never rescan notes,
+    distributions are computed with NumPy over the columns
+
+    Attributes
+    ----------
+    ids : (array) Note IDs, one row per note
+    created : (array) Creation timestamps in epoch microseconds, matching 'ids'
+    completed : (array) Completion timestamps in epoch microseconds, 'NO_DATE' for notes without one
+    isCompleted : (bytearray) Completion status flags, matching 'ids'
+    rowOf : (dict) Note IDs as keys and row numbers as values
+    completedCount : (int) Number of notes marked complete
+    completedDaysSum : (int) Sum of days to complete over notes marked complete with completion date
+    completedDaysCount : (int) Number of notes contributing to 'completedDaysSum'
+
+    Methods
+    -------
+    add(noteObject) : Adds note to statistics
+    update(noteObject) : Refreshes statistics of changed note
+    remove(ID) : Removes note from statistics
+    total_count() : Returns number of notes
+    incomplete_count() : Returns number of notes not completed
+    mean_days_to_complete() : Returns average number of days to complete notes
+    snapshot() : Returns copy of columns and counters, for summaries while notes keep changing
+    summary(period) : Returns completion rate, days-to-complete histogram, percentiles and counts per period
+    """
+    def __init__(self):
+        """
+        Initializes empty statistics
+        """
+        self.ids = array('q')
+        self.created = array('q')
+        self.completed = array('q')
+        self.isCompleted = bytearray()
+        self.rowOf = {}
+        self.completedCount = 0
+        self.completedDaysSum = 0
+        self.completedDaysCount = 0
+
+    def count_row(self, row, sign):
+        """
+        Adds (sign 1) or subtracts (sign -1) row from counters
+        :param row: (int) Row number
+        :param sign: (int) 1 or -1
+        :return: None
+        """
+        if self.isCompleted[row]:
+            self.completedCount += sign
+
+            if self.completed[row] != NO_DATE:
+                self.completedDaysSum += sign * ((self.completed[row] - self.created[row]) // MICROSECONDS_PER_DAY)
+                self.completedDaysCount += sign
+
+    def add(self, noteObject):
+        """
+        Adds note to statistics; note already present is refreshed instead
+        :param noteObject: (Note) Note to add
+        :return: None
+        """
+        if noteObject.ID in self.rowOf:
+            self.update(noteObject)
+
+            return
+
+        self.rowOf[noteObject.ID] = len(self.ids)
+        self.ids.append(noteObject.ID)
+        self.created.append(noteObject.createdEpoch)
+        self.completed.append(noteObject.completedEpoch)
+        self.isCompleted.append(1 if noteObject.isCompleted else 0)
+
+        self.count_row(len(self.ids) - 1, 1)
+
+    def update(self, noteObject):
+        """
+        Refreshes statistics of changed note
+        :param noteObject: (Note) Changed note
+        :return: None
+        """
+        row = self.rowOf.get(noteObject.ID)
+
+        if row is None:
+            self.add(noteObject)
+
+            return
+
+        self.count_row(row, -1)
+
+        self.created[row] = noteObject.createdEpoch
+        self.completed[row] = noteObject.completedEpoch
+        self.isCompleted[row] = 1 if noteObject.isCompleted else 0
+
+        self.count_row(row, 1)
+
+    def remove(self, ID):
+        """
+        Removes note from statistics; last row is moved into freed row so columns stay dense
+        :param ID: (int) Note ID
+        :return: None
+        """
+        row = self.rowOf.pop(ID, None)
+
+        if row is None:
+            return
+
+        self.count_row(row, -1)
+
+        lastRow = len(self.ids) - 1
+
+        if row != lastRow:
+            self.ids[row] = self.ids[lastRow]
+            self.created[row] = self.created[lastRow]
+            self.completed[row] = self.completed[lastRow]
+            self.isCompleted[row] = self.isCompleted[lastRow]
+            self.rowOf[self.ids[row]] = row
+
+        self.ids.pop()
+        self.created.pop()
+        self.completed.pop()
+        self.isCompleted.pop()
+
+    def total_count(self):
+        """
+        Returns number of notes
+        :return: (int) Number of notes
+        """
+        return len(self.ids)
+
+    def incomplete_count(self):
+        """
+        Returns number of notes not completed
+        :return: (int) Number of notes not completed
+        """
+        return len(self.ids) - self.completedCount
+
+    def mean_days_to_complete(self):
+        """
+        Returns average number of days it took to complete notes
+        :return: (float) Average days to complete, None if no note has completion date
+        """
+        if not self.completedDaysCount:
+            return None
+
+        return self.completedDaysSum / self.completedDaysCount
+
+    def snapshot(self):
+        """
+        Returns copy of columns and counters; copy is meant for reading only, so note ID to row map is not copied
+        :return: (NoteStats) Copied statistics
+        """
+        statsCopy = NoteStats()
+        statsCopy.ids = array('q', self.ids)
+        statsCopy.created = array('q', self.created)
+        statsCopy.completed = array('q', self.completed)
+        statsCopy.isCompleted = bytearray(self.isCompleted)
+        statsCopy.completedCount = self.completedCount
+        statsCopy.completedDaysSum = self.completedDaysSum
+        statsCopy.completedDaysCount = self.completedDaysCount
+
+        return statsCopy
+
+    def summary(self, period='month'):
+        """
+        Computes completion statistics over columns using NumPy
+        :param period: (str) 'week' or 'month'; period by which notes are grouped on creation date
+        :return: (dict) 'total', 'completed', 'completion rate' (%), 'histogram' (list of bucket label and count),
+                 'percentiles' (list of percentile and days) and 'periods' (list of period, created and completed
+                 counts)
+        """
+        # NumPy is only needed for distributions, so it is imported on first use
+        import numpy as np
+
+        created = np.frombuffer(self.created, dtype=np.int64)
+        completed = np.frombuffer(self.completed, dtype=np.int64)
+        isCompleted = np.frombuffer(self.isCompleted, dtype=np.uint8).astype(bool)
+
+        total = len(created)
+        result = {'total': total,
+                  'completed': self.completedCount,
+                  'completion rate': round(100 * self.completedCount / total, 2) if total else None,
+                  'histogram': [],
+                  'percentiles': [],
+                  'periods': []}
+
+        if not total:
+            return result
+
+        # Days to complete, for completed notes with completion date only
+        hasDays = isCompleted & (completed != NO_DATE)
+        days = (completed[hasDays] - created[hasDays]) // MICROSECONDS_PER_DAY
+
+        if len(days):
+            counts = np.bincount(np.searchsorted(HISTOGRAM_EDGES, np.maximum(days, 0), side='right') - 1,
+                                 minlength=len(HISTOGRAM_EDGES))
+
+            for bucket, lowerEdge in enumerate(HISTOGRAM_EDGES):
+                if bucket + 1 < len(HISTOGRAM_EDGES):
+                    upperEdge = HISTOGRAM_EDGES[bucket + 1] - 1
+                    label = str(lowerEdge) if upperEdge == lowerEdge else str(lowerEdge) + '-' + str(upperEdge)
+
+                else:
+                    label = str(lowerEdge) + '+'
+
+                result['histogram'].append((label, int(counts[bucket])))
+
+            result['percentiles'] = [(percentile, float(value)) for percentile, value in
+                                     zip(PERCENTILES, np.percentile(days, PERCENTILES))]
+
+        # Group creation dates by calendar week (starting Monday; epoch day 0 was a Thursday) or month
+        if period == 'week':
+            createdDays = created // MICROSECONDS_PER_DAY
+            periods = ((createdDays + 3) // 7 * 7 - 3).astype('datetime64[D]')
+
+        else:
+            periods = created.astype('datetime64[us]').astype('datetime64[M]')
+        periodValues, periodIndex = np.unique(periods, return_inverse=True)
+        createdCounts = np.bincount(periodIndex, minlength=len(periodValues))
+        completedCounts = np.bincount(periodIndex, weights=isCompleted, minlength=len(periodValues))
+
+        result['periods'] = [(str(periodValue), int(createdCount), int(completedCount)) for
+                             periodValue, createdCount, completedCount in
+                             zip(periodValues, createdCounts, completedCounts)]
+
+        return result
+
+# This is end of script.
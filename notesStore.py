@@ -0,0 +1,753 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import datetime
+import itertools
+from Note import Note, to_epoch
+from noteJournal import OP_CREATE, OP_UPDATE, OP_COMPLETE, OP_DELETE
+from noteShards import open_journal
+from noteBodies import LAZY_MODE
+from noteStats import NoteStats
+from noteSearch import SearchIndex
+from noteQueries import NoteQueryIndex
+from noteHistory import NoteHistory
+from noteListing import PAGE_SIZE
+from noteConcurrency import IDAllocator, StripedLocks, structure_lock
+
+# Restores of more notes than this drop query indexes, to be rebuilt on next query, instead of inserting notes one by
+# one
+QUERY_INDEX_INSERT_MAX = 1000
+
+
+def check_not_empty(name, value):
+    """
+    Checks that note title or text is not empty
+    :param name: (str) 'title' or 'text'
+    :param value: (str) Value to check, or None if not given
+    :return: None
+    :raises ValueError: If value is empty or only whitespace
+    """
+    if value is not None and (value == '' or value.isspace()):
+        raise ValueError('Note ' + name + ' cannot be empty.')
+
+
+class NotesStore:
+    """
+    Represents notes of one session backed by notes file, without any terminal input or output;
+    Journal of unsaved changes, completion statistics and search index are kept in step with every change;
+    Changed notes are replaced by changed copies instead of being changed in place, so a note once returned never
+    changes under its reader;
+    In thread-safe mode IDs are allocated atomically, changes to one note are serialized by its striped lock and each
+    shared structure has its own lock, so listings, statistics and searches see consistent snapshots;
+    Several processes may share notes file: IDs are reserved in its lock file, and on save changes are merged with
+    changes other processes saved since notes were read;
+    Only first restore reads whole file; later restores read only notes saved or changed since previous one;
+    Secondary indexes on completion status and dates answer filtered queries and listings without scanning notes;
+    Replaced versions of notes are kept in history, within its retention, for undo, redo and looking up notes as they
+    were at earlier time;
+    Stores over SQLite database write every change as it is made, bulk changes in one transaction, instead of on save
+
+    Attributes
+    ----------
+    filePath : (str) Path of notes file
+    threadSafe : (bool) True if store may be used from several threads at once
+    idAllocator : (IDAllocator) Hands out note IDs; 'idCounter' is highest ID handed out
+    noteObjectList : (dict) Note IDs as keys and corresponding 'Note' class objects as values
+    journal : (NoteJournal, ShardedJournal or SqliteJournal) Journal of note changes, written to file (or its shards
+              or database) on save
+    writeThrough : (bool) True if every change is written right away instead of on save
+    baseNotes : (dict) Note IDs as keys; versions of notes changed since last save as they were before first change,
+                None for notes created since
+    syncPoint : (object) State of saved notes at last restore, see 'NoteJournal.sync_point()'; None before first
+                restore
+    deletedIDs : (set) IDs of notes deleted in session since last restore
+    noteStats : (NoteStats) Completion statistics, kept up to date on every change
+    searchIndex : (SearchIndex) Full-text index over note titles and texts, loaded on first search
+    queryIndex : (NoteQueryIndex) Completion and date indexes, built on first filtered query
+    history : (NoteHistory) Versions of notes changed in session, for undo, redo and 'note_as_of()'
+    noteLocks : (StripedLocks) Locks serializing changes to same note
+    journalLock, statsLock, searchLock, queryLock, historyLock : (Lock) Locks guarding journal, statistics, search
+                                                                index, query indexes and history
+
+    Methods
+    -------
+    create(title, text, isCompleted) : Creates note
+    get(ID) : Returns note
+    update(ID, title, text, isCompleted) : Updates title, text and/or completion status of note
+    delete(ID) : Deletes note
+    complete(ID, dateCompleted) : Marks note complete with completion date
+    undo() : Undoes most recent change not undone yet
+    redo() : Makes most recently undone change again
+    note_as_of(ID, dateValue) : Returns note as it was at given time
+    bulk_create(entries) : Creates several notes
+    bulk_update(changes) : Updates several notes
+    bulk_delete(IDs) : Deletes several notes
+    bulk_complete(IDs, dateCompleted) : Marks several notes complete
+    count() : Returns number of notes
+    days_to_complete(ID) : Returns number of days it took to complete note
+    stats(period) : Returns completion statistics
+    search(query, limit) : Returns notes best matching search words
+    query(isCompleted, createdFrom, createdTo, completedFrom, completedTo, offset, limit) : Returns notes passing
+        filters, in date order
+    page(cursor, pageSize, isCompleted, createdFrom, createdTo) : Returns one page of notes
+    write_changes() : Writes changes right away if store writes through
+    save(conflictIDs, allowCompaction) : Saves changes made since last save to file, merged with changes saved by
+        other processes
+    restore(malformedLines, lazyMode) : Adds notes saved in file that are not in session, reading only notes saved
+        since last restore
+    is_saved(ID) : Checks if note is saved in file
+    snapshot() : Returns consistent copy of notes dictionary
+    """
+    def __init__(self, filePath='Notes.txt', maxID=None, threadSafe=False, writeThrough=None):
+        """
+        Initializes empty session over notes file; nothing is read from file until notes are restored
+        :param filePath: (str) Path of notes file
+        :param maxID: (int) Maximum ID value from saved notes, to continue from previous state; read from index of
+                      notes file if not given
+        :param threadSafe: (bool) True to allow use from several threads at once; locks are no-ops otherwise
+        :param writeThrough: (bool) True to write every change right away, False to write changes on save; None
+                             writes through if notes are kept in database
+        """
+        self.filePath = filePath
+        self.threadSafe = threadSafe
+        self.journal = open_journal(filePath)
+        self.writeThrough = writeThrough if writeThrough is not None else self.journal.writesEachChange
+        self.idAllocator = IDAllocator(maxID if maxID is not None else (self.journal.max_id() or 0), threadSafe,
+                                       self.journal)
+        self.noteObjectList = {}
+        self.baseNotes = {}
+        self.syncPoint = None
+        self.deletedIDs = set()
+        self.noteStats = NoteStats()
+        self.searchIndex = SearchIndex(filePath)
+        self.queryIndex = NoteQueryIndex()
+        self.history = NoteHistory()
+        self.noteLocks = StripedLocks(threadSafe)
+        self.journalLock = structure_lock(threadSafe)
+        self.statsLock = structure_lock(threadSafe)
+        self.searchLock = structure_lock(threadSafe)
+        self.queryLock = structure_lock(threadSafe)
+        self.historyLock = structure_lock(threadSafe)
+
+    @property
+    def idCounter(self):
+        """
+        Returns highest note ID handed out
+        :return: (int) Highest note ID
+        """
+        return self.idAllocator.lastID
+
+    def apply_change(self, operation, noteObject, previousNote=None, isUndoable=True):
+        """
+        Publishes created or changed note to session, journal, statistics, search index, query indexes and history
+        :param operation: (int) One of 'OP_CREATE', 'OP_UPDATE', 'OP_COMPLETE'
+        :param noteObject: (Note) New version of note
+        :param previousNote: (Note) Version of note before change, None for created note
+        :param isUndoable: (bool) False for changes made by undo and redo themselves
+        :return: None
+        """
+        # Replacing dictionary entry is atomic, so readers see either old or new version
+        self.noteObjectList[noteObject.ID] = noteObject
+
+        # Record change to be written to file on next save, along with version it was made to
+        with self.journalLock:
+            self.journal.record(operation, noteObject.ID)
+            self.baseNotes.setdefault(noteObject.ID, previousNote)
+
+        with self.statsLock:
+            self.noteStats.add(noteObject)
+
+        with self.queryLock:
+            self.queryIndex.add(noteObject)
+
+        # Completion date is not indexed, so completing note leaves search index as is
+        if operation != OP_COMPLETE:
+            with self.searchLock:
+                self.searchIndex.add(noteObject)
+
+        with self.historyLock:
+            self.history.record(noteObject.ID, previousNote, noteObject, isUndoable)
+
+    def create(self, title, text, isCompleted=False):
+        """
+        Creates note with next free ID; completed note gets current timestamp as completion date
+        :param title: (str) Note title
+        :param text: (str) Note text
+        :param isCompleted: (bool) True if note is complete
+        :return: (Note) Created note
+        :raises ValueError: If title or text is empty
+        """
+        check_not_empty('title', title)
+        check_not_empty('text', text)
+
+        noteObject = self.create_with_id(self.idAllocator.allocate(), title, text, isCompleted)
+        self.write_changes()
+
+        return noteObject
+
+    def create_with_id(self, ID, title, text, isCompleted):
+        """
+        Creates note with ID allocated by caller
+        :return: (Note) Created note
+        """
+        dateCreated = datetime.datetime.now()
+        noteObject = Note(ID, dateCreated, title, text, isCompleted)
+
+        if noteObject.isCompleted:
+            noteObject.mark_complete(datetime.datetime.now())
+
+        self.apply_change(OP_CREATE, noteObject)
+
+        return noteObject
+
+    def get(self, ID):
+        """
+        Returns note of session
+        :param ID: (int) Note ID
+        :return: (Note) Note object
+        :raises LookupError: If note is not in session
+        """
+        noteObject = self.noteObjectList.get(ID)
+
+        if noteObject is None:
+            raise LookupError('Note ID ' + str(ID) + ' not found.')
+
+        return noteObject
+
+    def update(self, ID, title=None, text=None, isCompleted=None):
+        """
+        Updates title, text and/or completion status of note; completion date of note that is complete after update
+        is set to current timestamp
+        :param ID: (int) Note ID
+        :param title: (str) New title, None to keep title
+        :param text: (str) New text, None to keep text
+        :param isCompleted: (bool) New completion status, None to keep status
+        :return: (Note) Updated note
+        :raises LookupError: If note is not in session
+        :raises ValueError: If new title or text is empty
+        """
+        noteObject = self.change_note(ID, title, text, isCompleted)
+        self.write_changes()
+
+        return noteObject
+
+    def change_note(self, ID, title, text, isCompleted):
+        """
+        Updates note without writing change through; see 'update()'
+        :return: (Note) Updated note
+        """
+        check_not_empty('title', title)
+        check_not_empty('text', text)
+
+        with self.noteLocks.lock_for(ID):
+            previousNote = self.get(ID)
+            noteObject = previousNote.copy()
+
+            if title is not None:
+                noteObject.update_title(title)
+
+            if text is not None:
+                noteObject.update_text(text)
+
+            if isCompleted is False:
+                noteObject.mark_incomplete()
+
+            elif isCompleted or noteObject.isCompleted:
+                noteObject.mark_complete(datetime.datetime.now())
+
+            self.apply_change(OP_UPDATE, noteObject, previousNote)
+
+        return noteObject
+
+    def delete(self, ID):
+        """
+        Deletes note from session; note is deleted from file on next save
+        :param ID: (int) Note ID
+        :return: None
+        :raises LookupError: If note is not in session
+        """
+        with self.noteLocks.lock_for(ID):
+            self.apply_deletion(self.get(ID))
+
+        self.write_changes()
+
+    def apply_deletion(self, previousNote, isUndoable=True):
+        """
+        Removes note from session, statistics, search index and query indexes, and records deletion in journal and
+        history
+        :param previousNote: (Note) Version of note before deletion
+        :param isUndoable: (bool) False for deletions made by undo and redo themselves
+        :return: None
+        """
+        ID = previousNote.ID
+
+        del self.noteObjectList[ID]
+
+        with self.journalLock:
+            self.journal.record(OP_DELETE, ID)
+            self.baseNotes.setdefault(ID, previousNote)
+            self.deletedIDs.add(ID)
+
+        with self.statsLock:
+            self.noteStats.remove(ID)
+
+        with self.searchLock:
+            self.searchIndex.remove(ID)
+
+        with self.queryLock:
+            self.queryIndex.remove(ID)
+
+        with self.historyLock:
+            self.history.record(ID, previousNote, None, isUndoable)
+
+    def complete(self, ID, dateCompleted=None):
+        """
+        Marks note complete with completion date, whether it was complete already or not
+        :param ID: (int) Note ID
+        :param dateCompleted: (datetime) Completion date, current timestamp if not given
+        :return: (Note) Completed note
+        :raises LookupError: If note is not in session
+        :raises ValueError: If completion date is before creation date
+        """
+        noteObject = self.complete_note(ID, dateCompleted if dateCompleted is not None else datetime.datetime.now())
+        self.write_changes()
+
+        return noteObject
+
+    def complete_note(self, ID, dateCompleted):
+        """
+        Marks note complete without writing change through; see 'complete()'
+        :return: (Note) Completed note
+        """
+        with self.noteLocks.lock_for(ID):
+            previousNote = self.get(ID)
+            noteObject = previousNote.copy()
+
+            # Completion date may fall on day of creation
+            if (noteObject.dateCreated - datetime.timedelta(days=1)) >= dateCompleted:
+                raise ValueError('Note completion date cannot be before note creation date!')
+
+            noteObject.mark_complete(dateCompleted)
+
+            self.apply_change(OP_COMPLETE, noteObject, previousNote)
+
+        return noteObject
+
+    def undo(self):
+        """
+        Undoes most recent change not undone yet, made by any thread of session; undone change is saved like any other
+        change, and can be made again with 'redo()' until a new change is made
+        :return: (tuple) Note ID and version of note after undo, None if undo deleted note; None if there is nothing
+                 to undo
+        """
+        with self.historyLock:
+            step = self.history.pop_undo()
+
+        if step is None:
+            return None
+
+        _, ID, previousNote, _ = step
+        noteObject = self.switch_version(ID, previousNote)
+        self.write_changes()
+
+        return ID, noteObject
+
+    def redo(self):
+        """
+        Makes most recently undone change again
+        :return: (tuple) Note ID and version of note after redo, None if redo deleted note; None if there is nothing
+                 to redo
+        """
+        with self.historyLock:
+            step = self.history.pop_redo()
+
+        if step is None:
+            return None
+
+        _, ID, _, noteObject = step
+        noteObject = self.switch_version(ID, noteObject)
+        self.write_changes()
+
+        return ID, noteObject
+
+    def switch_version(self, ID, noteObject):
+        """
+        Makes version from history current version of note; version is published as copy sharing its title and text,
+        with version counter of note in session, so saving it is merged like any other change
+        :param ID: (int) Note ID
+        :param noteObject: (Note) Version to switch to, None to delete note
+        :return: (Note) Current version of note, None if note is deleted
+        """
+        with self.noteLocks.lock_for(ID):
+            currentNote = self.noteObjectList.get(ID)
+
+            if noteObject is None:
+                if currentNote is not None:
+                    self.apply_deletion(currentNote, isUndoable=False)
+
+                return None
+
+            versionCopy = noteObject.copy()
+
+            if currentNote is not None:
+                versionCopy.version = currentNote.version
+
+            self.apply_change(OP_UPDATE if currentNote is not None else OP_CREATE, versionCopy, currentNote,
+                              isUndoable=False)
+
+        return versionCopy
+
+    def note_as_of(self, ID, dateValue):
+        """
+        Returns note as it was at given time, from history of changes made in session; notes not changed since that
+        time are returned as they are now
+        :param ID: (int) Note ID
+        :param dateValue: (datetime) Time to look up
+        :return: (Note) Version of note at that time, None if note did not exist then
+        :raises LookupError: If changes made since that time are no longer kept by history
+        """
+        epoch = to_epoch(dateValue)
+
+        with self.historyLock:
+            isKnown, noteObject = self.history.as_of(ID, epoch)
+
+        if not isKnown:
+            noteObject = self.noteObjectList.get(ID)
+
+        # Notes created later did not exist then, whether created in session or saved by other sessions
+        if noteObject is not None and noteObject.createdEpoch > epoch:
+            return None
+
+        return noteObject
+
+    def bulk_create(self, entries):
+        """
+        Creates several notes; all entries are checked before any note is created
+        :param entries: (iterable) Tuples of title, text and completion status
+        :return: (list) Created notes, in order of entries
+        :raises ValueError: If any title or text is empty
+        """
+        entries = list(entries)
+
+        for title, text, _ in entries:
+            check_not_empty('title', title)
+            check_not_empty('text', text)
+
+        # IDs of all notes are allocated at once, so they are consecutive even with other threads creating notes
+        firstID = self.idAllocator.allocate(len(entries))
+
+        createdNotes = [self.create_with_id(ID, title, text, isCompleted)
+                        for ID, (title, text, isCompleted) in enumerate(entries, firstID)]
+        self.write_changes()
+
+        return createdNotes
+
+    def bulk_update(self, changes):
+        """
+        Updates several notes; all changes are checked before any note is updated
+        :param changes: (iterable) Tuples of note ID, title, text and completion status; None keeps value
+        :return: (list) Updated notes, in order of changes
+        :raises LookupError: If any note is not in session
+        :raises ValueError: If any new title or text is empty
+        """
+        changes = list(changes)
+
+        for ID, title, text, _ in changes:
+            self.get(ID)
+            check_not_empty('title', title)
+            check_not_empty('text', text)
+
+        updatedNotes = [self.change_note(ID, title, text, isCompleted) for ID, title, text, isCompleted in changes]
+        self.write_changes()
+
+        return updatedNotes
+
+    def bulk_delete(self, IDs):
+        """
+        Deletes several notes; nothing is deleted if any note is not in session
+        :param IDs: (iterable) Note IDs
+        :return: None
+        :raises LookupError: If any note is not in session
+        """
+        IDs = list(IDs)
+
+        for ID in IDs:
+            self.get(ID)
+
+        for ID in IDs:
+            with self.noteLocks.lock_for(ID):
+                self.apply_deletion(self.get(ID))
+
+        self.write_changes()
+
+    def bulk_complete(self, IDs, dateCompleted=None):
+        """
+        Marks several notes complete with same completion date; nothing is changed if any note cannot be completed
+        :param IDs: (iterable) Note IDs
+        :param dateCompleted: (datetime) Completion date, current timestamp if not given
+        :return: (list) Completed notes, in order of IDs
+        :raises LookupError: If any note is not in session
+        :raises ValueError: If completion date is before creation date of any note
+        """
+        IDs = list(IDs)
+        dateCompleted = dateCompleted if dateCompleted is not None else datetime.datetime.now()
+
+        for ID in IDs:
+            if (self.get(ID).dateCreated - datetime.timedelta(days=1)) >= dateCompleted:
+                raise ValueError('Note completion date cannot be before note creation date!')
+
+        completedNotes = [self.complete_note(ID, dateCompleted) for ID in IDs]
+        self.write_changes()
+
+        return completedNotes
+
+    def count(self):
+        """
+        Returns number of notes in session
+        :return: (int) Number of notes
+        """
+        return len(self.noteObjectList)
+
+    def days_to_complete(self, ID):
+        """
+        Returns number of days it took to complete note
+        :param ID: (int) Note ID
+        :return: (int) Days to complete, None if note is not complete
+        :raises LookupError: If note is not in session
+        """
+        noteObject = self.get(ID)
+
+        if not noteObject.isCompleted:
+            return None
+
+        return (noteObject.dateCompleted - noteObject.dateCreated).days
+
+    def stats(self, period='month'):
+        """
+        Returns completion statistics of notes in session
+        :param period: (str) 'week' or 'month'; period by which notes are grouped on creation date
+        :return: (dict) Summary returned by 'NoteStats.summary()', with 'incomplete' count and 'mean days to
+                 complete' added
+        """
+        # Summary is computed over copy of columns taken under lock, so changes made meanwhile neither block nor
+        # skew it
+        if self.threadSafe:
+            with self.statsLock:
+                noteStats = self.noteStats.snapshot()
+
+        else:
+            noteStats = self.noteStats
+
+        statsSummary = noteStats.summary(period)
+        statsSummary['incomplete'] = noteStats.incomplete_count()
+        statsSummary['mean days to complete'] = noteStats.mean_days_to_complete()
+
+        return statsSummary
+
+    def search(self, query, limit=10):
+        """
+        Ranks notes by relevance to search words; search index is loaded on first search
+        :param query: (str) Words to search for; words ending with '*' match as prefixes
+        :param limit: (int) Maximum number of results
+        :return: (list) Tuples of note ID and score, best match first
+        """
+        with self.searchLock:
+            # Notes are only copied for first search, which builds index from them; notes changed and not saved yet
+            # are re-indexed, as their saved version says nothing about their contents
+            if not self.searchIndex.isLoaded:
+                with self.journalLock:
+                    changedIDs = set(self.journal.pendingChanges)
+
+                self.searchIndex.ensure_loaded(self.snapshot(), changedIDs)
+
+            return self.searchIndex.search(query, self.noteObjectList, limit)
+
+    def query(self, isCompleted=None, createdFrom=None, createdTo=None, completedFrom=None, completedTo=None,
+              offset=0, limit=None):
+        """
+        Returns notes passing filters, found through query indexes in O(log n + k) for k notes returned;
+        e.g. overdue notes are 'query(isCompleted=False, createdTo=cutoff)' and notes completed in a period are
+        'query(completedFrom=start, completedTo=end)'; indexes are built on first query
+        :param isCompleted: (bool) True for completed notes only, False for non-completed notes only, None for all
+        :param createdFrom: (datetime) Earliest creation date, None for no limit
+        :param createdTo: (datetime) Latest creation date (exclusive), None for no limit
+        :param completedFrom: (datetime) Earliest completion date, None for no limit
+        :param completedTo: (datetime) Latest completion date (exclusive), None for no limit
+        :param offset: (int) Number of matching notes to skip
+        :param limit: (int) Maximum number of notes returned, None for all
+        :return: (list) Notes in creation date order, or in completion date order if completion dates are bounded
+        """
+        bounds = [to_epoch(dateValue) if dateValue is not None else None
+                  for dateValue in (createdFrom, createdTo, completedFrom, completedTo)]
+
+        # Notes are published before they are indexed, so indexes built from snapshot taken under lock miss no change
+        with self.queryLock:
+            # Notes are only copied for first query, which builds indexes from them
+            if not self.queryIndex.isLoaded:
+                self.queryIndex.ensure_loaded(self.snapshot())
+
+            IDs = self.queryIndex.query(isCompleted, *bounds, offset=offset, limit=limit)
+
+        # Single lookups need no snapshot; note deleted by other thread after IDs were taken is left out
+        return [noteObject for noteObject in map(self.noteObjectList.get, IDs) if noteObject is not None]
+
+    def page(self, cursor=0, pageSize=PAGE_SIZE, isCompleted=None, createdFrom=None, createdTo=None):
+        """
+        Returns one page of notes passing filters, in creation date order; pages are read from query indexes, so
+        only notes on page are looked up and notes dictionary is not copied
+        :param cursor: (int) Number of matching notes before page; 0 for first page
+        :param pageSize: (int) Maximum number of notes on page
+        :param isCompleted: (bool) True for completed notes only, False for non-completed notes only, None for all
+        :param createdFrom: (datetime) Earliest creation date, None for no limit
+        :param createdTo: (datetime) Latest creation date (exclusive), None for no limit
+        :return: (tuple) List of notes on page and cursor of next page, None if page is last one
+        """
+        # One note more than fits tells whether there is a next page
+        notesPage = self.query(isCompleted, createdFrom, createdTo, offset=cursor, limit=pageSize + 1)
+
+        return notesPage[:pageSize], (cursor + pageSize if len(notesPage) > pageSize else None)
+
+    def write_changes(self):
+        """
+        Writes changes right away if store writes through, e.g. to database; otherwise changes wait for 'save()'.
+        Search index is left to 'save()'
+        :return: (int) Number of changes written
+        """
+        if not self.writeThrough:
+            return 0
+
+        return self.save(allowCompaction=False, saveSearchIndex=False)
+
+    def save(self, conflictIDs=None, allowCompaction=True, saveSearchIndex=True):
+        """
+        Saves notes created, updated or deleted since last save to file, along with search index;
+        Notes other processes saved meanwhile are merged field by field, and merged versions replace notes in session;
+        where both changed same field differently, this session's value is saved
+        :param conflictIDs: (list) Optional list collecting IDs of notes changed differently by another process
+        :param allowCompaction: (bool) False to leave compacting journal to caller; see
+                                'NoteJournal.compact_if_needed()'
+        :param saveSearchIndex: (bool) False to leave saving search index to later save
+        :return: (int) Number of changes saved
+        """
+        mergedNotes = {}
+
+        with self.journalLock:
+            # Only changed notes are looked up by flush; deleted notes are missing
+            changedNotes = {ID: self.noteObjectList.get(ID) for ID in self.journal.pendingChanges}
+            changedNotes = {ID: noteObject for ID, noteObject in changedNotes.items() if noteObject is not None}
+
+            changesCount = self.journal.flush(changedNotes, allowCompaction=False, baseNotes=self.baseNotes,
+                                              mergedNotes=mergedNotes, conflictIDs=conflictIDs)
+            self.baseNotes = {}
+
+        # Compaction rewrites whole file; changes keep being recorded meanwhile
+        if allowCompaction:
+            self.journal.compact_if_needed()
+
+        for noteObject in mergedNotes.values():
+            previousNote = self.noteObjectList.get(noteObject.ID)
+            self.noteObjectList[noteObject.ID] = noteObject
+
+            with self.statsLock:
+                self.noteStats.add(noteObject)
+
+            with self.searchLock:
+                self.searchIndex.add(noteObject)
+
+            with self.queryLock:
+                self.queryIndex.add(noteObject)
+
+            # Merged version shows in history, but merges are not undone
+            with self.historyLock:
+                self.history.record(noteObject.ID, previousNote, noteObject, isUndoable=False)
+
+        # Changes written through leave search index to be saved on explicit save
+        if saveSearchIndex and (changesCount or self.writeThrough):
+            # Search index is saved next to file as well, so it does not have to be rebuilt in next session
+            with self.searchLock:
+                # Notes indexed while lock is held have been recorded in journal already
+                with self.journalLock:
+                    changedIDs = set(self.journal.pendingChanges)
+
+                self.searchIndex.save(changedIDs)
+
+        return changesCount
+
+    def restore(self, malformedLines=None, lazyMode=LAZY_MODE):
+        """
+        Adds notes saved in file that are not in session; notes in session are never overwritten;
+        Every note saved at last restore is in session already, unless deleted in session since; so later restores
+        read only notes saved or changed since last restore, found by journal offsets and content hashes kept from
+        then, and saved versions of notes deleted in session since
+        :param malformedLines: (list) Optional list collecting positions of skipped malformed records; only filled by
+                               first restore, which reads whole file
+        :param lazyMode: (str) Lazy loading mode for notes read from binary file by first restore
+        :return: (list) Restored notes
+        """
+        restoredNotes = []
+
+        with self.journalLock:
+            syncPoint = self.journal.sync_point()
+            isFirstRestore = self.syncPoint is None
+
+            if isFirstRestore:
+                notes = self.journal.iter_notes(malformedLines, lazyMode)
+
+            else:
+                # Read while journal is not flushed by other threads; only changed notes are held in memory
+                savedIndex = self.journal.load_index()
+                notes = list(itertools.chain(self.journal.iter_changed_notes(self.syncPoint),
+                                             (savedIndex.read_note(ID) for ID in self.deletedIDs)))
+
+            self.syncPoint, self.deletedIDs = syncPoint, set()
+
+        # Indexes dropped here are rebuilt from notes in session on next query, restored notes included
+        if isFirstRestore or len(notes) > QUERY_INDEX_INSERT_MAX:
+            with self.queryLock:
+                self.queryIndex.unload()
+
+        for noteObject in notes:
+            if noteObject is None:
+                continue
+
+            # Adding only if absent is atomic, so notes created or changed meanwhile are never overwritten
+            if self.noteObjectList.setdefault(noteObject.ID, noteObject) is noteObject:
+                with self.statsLock:
+                    self.noteStats.add(noteObject)
+
+                with self.searchLock:
+                    self.searchIndex.add(noteObject)
+
+                with self.queryLock:
+                    self.queryIndex.add(noteObject)
+
+                restoredNotes.append(noteObject)
+
+        return restoredNotes
+
+    def is_saved(self, ID):
+        """
+        Checks if note is saved in file, using index of notes file
+        :param ID: (int) Note ID
+        :return: (bool) True if note is saved, False otherwise
+        """
+        with self.journalLock:
+            return self.journal.load_index().find(ID) != -1
+
+    def snapshot(self):
+        """
+        Returns notes dictionary as it is at this moment; notes are never changed in place, so snapshot stays
+        consistent while other threads keep changing notes
+        :return: (dict) Copy of notes dictionary, or dictionary itself when not thread-safe
+        """
+        if not self.threadSafe:
+            return self.noteObjectList
+
+        # Copying dictionary does not let other threads run in between
+        return self.noteObjectList.copy()
+
+# This is end of script.
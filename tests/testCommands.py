@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import io
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+# Tests are run from the 'tests' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from noteCommands import MAX_ID_GAP, run_command
+from notesStore import NotesStore
+
+IMPORTED_ROWS = [{'Title': 'Groceries', 'Text': 'Milk, eggs', 'Completed': 'No',
+                  'Creation Date': '2021-03-01 09:30:00'},
+                 {'Title': 'Taxes', 'Text': 'File return', 'Completed': 'Yes',
+                  'Creation Date': '2021-03-02 10:00:00.250000', 'Completion Date': '2021-04-01 12:00:00'},
+                 {'Title': 'Trip', 'Text': 'Book train', 'Completed': 'No', 'Creation Date': '2021-03-05T08:00:00'}]
+
+
+class CommandsTest(unittest.TestCase):
+    """
+    Tests non-interactive commands run against notes file
+    """
+    def setUp(self):
+        """
+        Creates folder for notes file and imported and exported files
+        :return: None
+        """
+        self.tempDir = tempfile.mkdtemp()
+        self.filePath = os.path.join(self.tempDir, 'Notes.txt')
+
+    def tearDown(self):
+        """
+        Deletes notes files
+        :return: None
+        """
+        shutil.rmtree(self.tempDir)
+
+    def run_notes_command(self, *argv, filePath=None):
+        """
+        Runs command against notes file, capturing its output
+        :param argv: (str) Command and its arguments
+        :param filePath: (str) Path of notes file, 'filePath' of test if not given
+        :return: (tuple) Exit status, standard output and standard error
+        """
+        stdout, stderr = io.StringIO(), io.StringIO()
+
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            status = run_command(['--file', filePath or self.filePath] + list(argv))
+
+        return status, stdout.getvalue(), stderr.getvalue()
+
+    def write_rows(self, fileName, rows):
+        """
+        Writes rows to JSON Lines file
+        :param fileName: (str) Name of file in folder of test
+        :param rows: (list) Row dictionaries
+        :return: (str) Path of file
+        """
+        path = os.path.join(self.tempDir, fileName)
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(row) + '\n' for row in rows))
+
+        return path
+
+    def saved_notes(self):
+        """
+        Restores notes saved to notes file
+        :return: (dict) Note IDs as keys and note data as values
+        """
+        store = NotesStore(self.filePath)
+        store.restore()
+
+        return {ID: noteObject.get_all_data() for ID, noteObject in store.noteObjectList.items()}
+
+    def read_note(self, ID):
+        """
+        Reads saved note through 'read' command
+        :param ID: (int) Note ID
+        :return: (dict) Note data
+        """
+        status, stdout, _ = self.run_notes_command('read', str(ID), '--json')
+        self.assertEqual(status, 0)
+
+        return json.loads(stdout)
+
+    def test_create_update_complete(self):
+        self.assertEqual(self.run_notes_command('create', '--title', 'Call', '--text', 'Dentist')[:2],
+                         (0, 'Created note ID 1\n'))
+        self.assertEqual(self.run_notes_command('update', '1', '--text', 'Dentist at 5')[0], 0)
+        self.assertEqual(self.run_notes_command('complete', '1', '--date', '2999-01-01')[0], 0)
+
+        noteData = self.read_note(1)
+        self.assertEqual((noteData['Title'], noteData['Text'], noteData['Completed'], noteData['Completion Date']),
+                         ('Call', 'Dentist at 5', 'Yes', '2999-01-01 00:00:00'))
+
+        self.assertEqual(self.run_notes_command('update', '1', '--incomplete')[0], 0)
+        self.assertEqual((self.read_note(1)['Completed'], self.read_note(1)['Completion Date']), ('No', None))
+
+        # Completion date may not fall before day of creation
+        status, _, stderr = self.run_notes_command('complete', '1', '--date', '2000-01-01')
+        self.assertEqual(status, 1)
+        self.assertIn('cannot be before note creation date', stderr)
+
+        self.assertEqual(self.run_notes_command('update', '2', '--title', 'Missing')[0], 1)
+
+    def test_empty_title_or_text_is_rejected(self):
+        for argv in (['create', '--title', '', '--text', 'Text'], ['create', '--title', 'Title', '--text', '  ']):
+            status, _, stderr = self.run_notes_command(*argv)
+
+            self.assertEqual(status, 1)
+            self.assertIn('cannot be empty', stderr)
+
+        self.run_notes_command('create', '--title', 'Title', '--text', 'Text')
+
+        self.assertEqual(self.run_notes_command('update', '1', '--title', '')[0], 1)
+        self.assertEqual(self.read_note(1)['Title'], 'Title')
+
+    def test_import_export_round_trip(self):
+        self.run_notes_command('create', '--title', 'Existing', '--text', 'Saved before import')
+
+        status, _, stderr = self.run_notes_command('import', self.write_rows('import.jsonl', IMPORTED_ROWS))
+        self.assertEqual(status, 0)
+        self.assertIn('Imported 3 notes', stderr)
+
+        # Imported notes get IDs after saved ones
+        savedNotes = self.saved_notes()
+        self.assertEqual(sorted(savedNotes), [1, 2, 3, 4])
+        self.assertEqual([savedNotes[ID]['Title'] for ID in (2, 3, 4)], ['Groceries', 'Taxes', 'Trip'])
+        self.assertEqual((savedNotes[3]['Creation Date'], savedNotes[3]['Completion Date']),
+                         ('2021-03-02 10:00:00.250000', '2021-04-01 12:00:00'))
+
+        for fileName in ('export.csv', 'export.jsonl'):
+            exportPath = os.path.join(self.tempDir, fileName)
+            self.assertEqual(self.run_notes_command('export', exportPath)[0], 0)
+
+            # Exported file imports into new notes file with same IDs and contents
+            otherPath = os.path.join(self.tempDir, 'Other.txt')
+            self.assertEqual(self.run_notes_command('import', exportPath, '--keep-ids', filePath=otherPath)[0], 0)
+
+            otherStore = NotesStore(otherPath)
+            otherStore.restore()
+
+            self.assertEqual({ID: noteObject.get_all_data() for ID, noteObject in otherStore.noteObjectList.items()},
+                             savedNotes)
+
+            for name in os.listdir(self.tempDir):
+                if name.startswith('Other.'):
+                    os.remove(os.path.join(self.tempDir, name))
+
+    def test_keep_ids_range(self):
+        self.run_notes_command('create', '--title', 'Existing', '--text', 'Saved before import')
+
+        keptRows = [dict(IMPORTED_ROWS[0], **{'Note ID': '7'}), dict(IMPORTED_ROWS[1], **{'Note ID': '1'}),
+                    IMPORTED_ROWS[2]]
+
+        self.assertEqual(self.run_notes_command('import', self.write_rows('kept.jsonl', keptRows), '--keep-ids')[0], 0)
+
+        # Kept ID replaces saved note, row without ID gets next free one
+        savedNotes = self.saved_notes()
+        self.assertEqual(sorted(savedNotes), [1, 7, 8])
+        self.assertEqual(savedNotes[1]['Title'], 'Taxes')
+
+        # Kept IDs may lie at most 'MAX_ID_GAP' above next free ID, 9
+        for ID in (0, -3, 10 + MAX_ID_GAP):
+            badPath = self.write_rows('bad.jsonl', [dict(IMPORTED_ROWS[0], **{'Note ID': str(ID)})])
+            status, _, stderr = self.run_notes_command('import', badPath, '--keep-ids')
+
+            self.assertEqual(status, 1)
+            self.assertIn('kept IDs must be between 1 and ' + str(9 + MAX_ID_GAP), stderr)
+
+        self.assertEqual(sorted(self.saved_notes()), [1, 7, 8])
+
+    def test_failed_import_writes_nothing(self):
+        self.run_notes_command('create', '--title', 'Existing', '--text', 'Saved before import')
+        savedNotes = self.saved_notes()
+
+        # Last row is invalid; notes given new IDs are imported completely or not at all
+        importPath = self.write_rows('import.jsonl', IMPORTED_ROWS + [{'Title': 'Empty', 'Text': ''}])
+        status, _, stderr = self.run_notes_command('import', importPath)
+
+        self.assertEqual(status, 1)
+        self.assertIn('cannot be empty', stderr)
+        self.assertEqual(self.saved_notes(), savedNotes)
+
+        self.assertEqual(self.run_notes_command('create', '--title', 'Next', '--text', 'After failed import')[1],
+                         'Created note ID 2\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# This is end of script.
@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import shutil
+import datetime
+import tempfile
+import unittest
+import threading
+import multiprocessing
+
+# Tests are run from the 'tests' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Note import Note
+from noteConcurrency import FileLock, fcntl, resolve_change
+from notesStore import NotesStore
+
+# Notes each process creates while processes save to same notes file
+PROCESS_NOTES = 50
+
+
+def hold_lock(lockPath, heldEvent, releaseEvent):
+    """
+    Holds file lock in child process until told to release it
+    :param lockPath: (str) Path of lock file
+    :param heldEvent: (Event) Set once lock is held
+    :param releaseEvent: (Event) Set by parent process to release lock
+    :return: None
+    """
+    with FileLock(lockPath).hold():
+        heldEvent.set()
+        releaseEvent.wait(10)
+
+
+def save_notes(filePath, position, startEvent):
+    """
+    Creates notes and changes one field of note 1 in child process, saving after every change
+    :param filePath: (str) Path of notes file
+    :param position: (int) Position of process; decides field of note 1 it changes
+    :param startEvent: (Event) Set by parent process once all processes have restored notes
+    :return: None
+    """
+    store = NotesStore(filePath, writeThrough=False)
+    store.restore()
+    startEvent.wait(10)
+
+    for _ in range(PROCESS_NOTES):
+        store.create('Process ' + str(position), 'Text')
+        store.save()
+
+    if position == 0:
+        store.update(1, title='Title of process 0')
+
+    elif position == 1:
+        store.update(1, text='Text of process 1')
+
+    else:
+        store.update(1, isCompleted=True)
+
+    store.save()
+
+
+class ResolveChangeTest(unittest.TestCase):
+    """
+    Tests deciding what to write for note changed in session, given version saved by other processes meanwhile
+    """
+    def setUp(self):
+        """
+        Creates base version of note, as read by session
+        :return: None
+        """
+        self.baseNote = Note(1, datetime.datetime(2021, 3, 5), 'Title', 'Text', False, version=3)
+        self.savedNotes = {1: self.baseNote}
+
+    def resolve(self, myNote, mergedNotes=None, conflictIDs=None):
+        """
+        Resolves change of note 1 made in session against notes saved in 'savedNotes'
+        :param myNote: (Note) Version of note in session, None if deleted in session
+        :param mergedNotes: (dict) Optional dictionary collecting merged notes
+        :param conflictIDs: (list) Optional list collecting IDs of conflicting notes
+        :return: (tuple) Note to write and its new version; None if nothing is to be written
+        """
+        return resolve_change(1, myNote, {1: self.baseNote}, self.savedNotes.get, mergedNotes, conflictIDs)
+
+    def changed_note(self, title=None, text=None, version=3):
+        """
+        Returns copy of base note with changed fields
+        :param title: (str) New title, None to keep title
+        :param text: (str) New text, None to keep text
+        :param version: (int) Version counter of copy
+        :return: (Note) Changed note
+        """
+        noteObject = self.baseNote.copy()
+        noteObject.version = version
+
+        if title is not None:
+            noteObject.update_title(title)
+
+        if text is not None:
+            noteObject.update_text(text)
+
+        return noteObject
+
+    def test_note_not_saved_elsewhere_is_written_as_is(self):
+        myNote = self.changed_note(title='Mine')
+        conflictIDs = []
+
+        self.assertEqual(self.resolve(myNote, conflictIDs=conflictIDs), (myNote, 4))
+        self.assertEqual(conflictIDs, [])
+
+    def test_changes_of_different_fields_are_merged(self):
+        self.savedNotes[1] = self.changed_note(text='Theirs', version=4)
+        mergedNotes, conflictIDs = {}, []
+
+        writtenNote, version = self.resolve(self.changed_note(title='Mine'), mergedNotes, conflictIDs)
+
+        self.assertEqual((writtenNote.title, writtenNote.text, version), ('Mine', 'Theirs', 5))
+        self.assertIs(mergedNotes[1], writtenNote)
+        self.assertEqual(conflictIDs, [])
+
+    def test_conflicting_change_keeps_this_session_value(self):
+        self.savedNotes[1] = self.changed_note(title='Theirs', text='Their text', version=4)
+        conflictIDs = []
+
+        writtenNote, version = self.resolve(self.changed_note(title='Mine'), conflictIDs=conflictIDs)
+
+        self.assertEqual((writtenNote.title, writtenNote.text, version), ('Mine', 'Their text', 5))
+        self.assertEqual(conflictIDs, [1])
+
+    def test_deleting_note_changed_elsewhere_keeps_other_version(self):
+        self.savedNotes[1] = self.changed_note(title='Theirs', version=4)
+        conflictIDs = []
+
+        self.assertIsNone(self.resolve(None, conflictIDs=conflictIDs))
+        self.assertEqual(conflictIDs, [1])
+
+    def test_changing_note_deleted_elsewhere_keeps_this_version(self):
+        del self.savedNotes[1]
+        myNote = self.changed_note(title='Mine')
+        conflictIDs = []
+
+        self.assertEqual(self.resolve(myNote, conflictIDs=conflictIDs), (myNote, 1))
+        self.assertEqual(conflictIDs, [1])
+
+    def test_untracked_changes_are_written_as_is(self):
+        self.savedNotes[1] = self.changed_note(title='Theirs', version=4)
+        myNote = self.changed_note(title='Mine')
+
+        self.assertEqual(resolve_change(1, myNote, None, self.savedNotes.get), (myNote, 4))
+
+
+class TwoSessionsTest(unittest.TestCase):
+    """
+    Tests saving changes of two sessions that restored same notes file
+    """
+    def setUp(self):
+        """
+        Creates notes file with two notes, restored by two sessions
+        :return: None
+        """
+        self.tempDir = tempfile.mkdtemp()
+        self.filePath = os.path.join(self.tempDir, 'Notes.txt')
+
+        store = NotesStore(self.filePath, writeThrough=False)
+        store.create('Title 1', 'Text 1')
+        store.create('Title 2', 'Text 2')
+        store.save()
+
+        self.firstStore, self.secondStore = NotesStore(self.filePath, writeThrough=False), \
+            NotesStore(self.filePath, writeThrough=False)
+        self.firstStore.restore()
+        self.secondStore.restore()
+
+    def tearDown(self):
+        """
+        Deletes notes files
+        :return: None
+        """
+        shutil.rmtree(self.tempDir)
+
+    def restored_notes(self):
+        """
+        Restores notes file in new session
+        :return: (dict) Note IDs as keys and restored notes as values
+        """
+        store = NotesStore(self.filePath, writeThrough=False)
+        store.restore()
+
+        return store.noteObjectList
+
+    def test_changes_of_different_fields_are_merged(self):
+        self.firstStore.update(1, text='First text')
+        self.firstStore.save()
+
+        conflictIDs = []
+        self.secondStore.update(1, title='Second title')
+        self.secondStore.save(conflictIDs)
+
+        self.assertEqual(conflictIDs, [])
+        self.assertEqual(self.secondStore.get(1).text, 'First text')
+
+        noteObject = self.restored_notes()[1]
+
+        self.assertEqual((noteObject.title, noteObject.text), ('Second title', 'First text'))
+
+    def test_conflicting_change_keeps_last_saved_session_value(self):
+        self.firstStore.update(1, title='First title')
+        self.firstStore.save()
+
+        conflictIDs = []
+        self.secondStore.update(1, title='Second title')
+        self.secondStore.save(conflictIDs)
+
+        self.assertEqual(conflictIDs, [1])
+        self.assertEqual(self.restored_notes()[1].title, 'Second title')
+
+    def test_deleting_note_changed_elsewhere_keeps_other_version(self):
+        self.firstStore.update(2, text='Changed text')
+        self.firstStore.save()
+
+        conflictIDs = []
+        self.secondStore.delete(2)
+        self.secondStore.save(conflictIDs)
+
+        self.assertEqual(conflictIDs, [2])
+        self.assertEqual(self.restored_notes()[2].text, 'Changed text')
+
+    def test_changes_of_plain_text_file_are_merged(self):
+        textPath = os.path.join(self.tempDir, 'Text.txt')
+
+        with open(textPath, 'w') as f:
+            for ID in range(1, 4):
+                f.write(str(Note(ID, datetime.datetime(2021, 3, ID), 'Title ' + str(ID), 'Text ' + str(ID),
+                                 False).get_all_data()) + '\n')
+
+        firstStore, secondStore = NotesStore(textPath, writeThrough=False), NotesStore(textPath, writeThrough=False)
+        firstStore.restore()
+        secondStore.restore()
+
+        # Saved notes stay in plain text snapshot, so versions they were read in are found by scanning it
+        firstStore.update(2, text='First text')
+        firstStore.save(allowCompaction=False)
+
+        conflictIDs = []
+        secondStore.update(2, title='Second title')
+        secondStore.update(3, title='Second title')
+        secondStore.save(conflictIDs, allowCompaction=False)
+
+        self.assertEqual(conflictIDs, [])
+
+        store = NotesStore(textPath, writeThrough=False)
+        store.restore()
+
+        self.assertEqual((store.get(2).title, store.get(2).text), ('Second title', 'First text'))
+        self.assertEqual((store.get(3).title, store.get(3).version), ('Second title', 1))
+        self.assertEqual(store.get(1).title, 'Title 1')
+
+
+
+@unittest.skipIf(fcntl is None, 'File locks are only available on Unix')
+class TwoProcessesTest(unittest.TestCase):
+    """
+    Tests processes sharing notes file: file lock held by one process keeps others waiting, and notes saved at same
+    time by several processes are all kept with distinct IDs and merged changes
+    """
+    def setUp(self):
+        """
+        Creates notes file with one note
+        :return: None
+        """
+        self.tempDir = tempfile.mkdtemp()
+        self.filePath = os.path.join(self.tempDir, 'Notes.txt')
+
+        store = NotesStore(self.filePath, writeThrough=False)
+        store.create('Title', 'Text')
+        store.save()
+
+    def tearDown(self):
+        """
+        Deletes notes files
+        :return: None
+        """
+        shutil.rmtree(self.tempDir)
+
+    def test_lock_held_by_other_process_is_waited_for(self):
+        lockPath = os.path.join(self.tempDir, 'Notes.lock')
+        heldEvent, releaseEvent = multiprocessing.Event(), multiprocessing.Event()
+        process = multiprocessing.Process(target=hold_lock, args=(lockPath, heldEvent, releaseEvent))
+        process.start()
+
+        try:
+            self.assertTrue(heldEvent.wait(10))
+            acquiredEvent = threading.Event()
+
+            def acquire():
+                with FileLock(lockPath).hold():
+                    acquiredEvent.set()
+
+            thread = threading.Thread(target=acquire)
+            thread.start()
+
+            self.assertFalse(acquiredEvent.wait(0.5))
+
+            releaseEvent.set()
+
+            self.assertTrue(acquiredEvent.wait(10))
+            thread.join()
+
+        finally:
+            releaseEvent.set()
+            process.join(10)
+
+    def test_processes_saving_at_same_time_keep_all_changes(self):
+        startEvent = multiprocessing.Event()
+        processes = [multiprocessing.Process(target=save_notes, args=(self.filePath, position, startEvent))
+                     for position in range(3)]
+
+        for process in processes:
+            process.start()
+
+        startEvent.set()
+
+        for process in processes:
+            process.join(60)
+
+            self.assertEqual(process.exitcode, 0)
+
+        store = NotesStore(self.filePath, writeThrough=False)
+        store.restore()
+
+        self.assertEqual(store.count(), 1 + 3 * PROCESS_NOTES)
+        self.assertEqual(sorted(store.noteObjectList), list(range(1, 2 + 3 * PROCESS_NOTES)))
+
+        for position in range(3):
+            self.assertEqual(sum(noteObject.title == 'Process ' + str(position)
+                                 for noteObject in store.noteObjectList.values()), PROCESS_NOTES)
+
+        noteObject = store.get(1)
+
+        self.assertEqual((noteObject.title, noteObject.text, noteObject.isCompleted),
+                         ('Title of process 0', 'Text of process 1', True))
+        self.assertEqual(noteObject.version, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# This is end of script.
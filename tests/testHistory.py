@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Tests are run from the 'tests' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notesStore import NotesStore
+
+
+class HistoryTest(unittest.TestCase):
+    """
+    Tests undoing and redoing changes of session, and saving notes as left by undo and redo
+    """
+    def setUp(self):
+        """
+        Creates store with one note
+        :return: None
+        """
+        self.tempDir = tempfile.mkdtemp()
+        self.filePath = os.path.join(self.tempDir, 'Notes.txt')
+
+        self.store = NotesStore(self.filePath, writeThrough=False)
+        self.store.create('Title', 'Text')
+
+    def tearDown(self):
+        """
+        Deletes notes files
+        :return: None
+        """
+        shutil.rmtree(self.tempDir)
+
+    def restored_notes(self):
+        """
+        Restores notes file in new session
+        :return: (dict) Note IDs as keys and restored notes as values
+        """
+        store = NotesStore(self.filePath, writeThrough=False)
+        store.restore()
+
+        return store.noteObjectList
+
+    def test_undo_and_redo_update(self):
+        self.store.update(1, title='New title', isCompleted=True)
+
+        ID, noteObject = self.store.undo()
+
+        self.assertEqual(ID, 1)
+        self.assertEqual((noteObject.title, noteObject.isCompleted), ('Title', False))
+        self.assertIs(self.store.get(1), noteObject)
+
+        ID, noteObject = self.store.redo()
+
+        self.assertEqual(ID, 1)
+        self.assertEqual((noteObject.title, noteObject.isCompleted), ('New title', True))
+        self.assertEqual(self.store.get(1).title, 'New title')
+
+    def test_undo_and_redo_create(self):
+        self.store.create('Second', 'Created last')
+
+        self.assertEqual(self.store.undo(), (2, None))
+        self.assertNotIn(2, self.store.noteObjectList)
+
+        ID, noteObject = self.store.redo()
+
+        self.assertEqual((ID, noteObject.title), (2, 'Second'))
+        self.assertEqual(self.store.get(2).text, 'Created last')
+
+    def test_undo_and_redo_delete(self):
+        self.store.delete(1)
+
+        ID, noteObject = self.store.undo()
+
+        self.assertEqual((ID, noteObject.title), (1, 'Title'))
+        self.assertEqual(self.store.redo(), (1, None))
+        self.assertNotIn(1, self.store.noteObjectList)
+
+    def test_new_change_clears_redo(self):
+        self.store.update(1, title='Undone title')
+        self.store.undo()
+        self.store.update(1, text='New text')
+
+        self.assertIsNone(self.store.redo())
+        self.assertEqual((self.store.get(1).title, self.store.get(1).text), ('Title', 'New text'))
+
+    def test_nothing_to_undo_or_redo(self):
+        self.store.undo()
+
+        self.assertIsNone(self.store.undo())
+
+        self.store.redo()
+
+        self.assertIsNone(self.store.redo())
+
+    def test_undone_changes_are_saved(self):
+        self.store.create('Second', 'Text')
+        self.store.save()
+
+        self.store.update(1, title='Undone title')
+        self.store.save()
+        self.store.undo()
+        self.store.undo()
+        self.store.save()
+
+        noteObjectList = self.restored_notes()
+
+        self.assertEqual(sorted(noteObjectList), [1])
+        self.assertEqual(noteObjectList[1].title, 'Title')
+
+        self.store.redo()
+        self.store.redo()
+        self.store.save()
+
+        noteObjectList = self.restored_notes()
+
+        self.assertEqual(sorted(noteObjectList), [1, 2])
+        self.assertEqual(noteObjectList[1].title, 'Undone title')
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# This is end of script.
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+# Tests are run from the 'tests' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import noteJournal
+from noteJournal import NoteJournal
+from notesStore import NotesStore
+
+
+class JournalTest(unittest.TestCase):
+    """
+    Tests replaying journal on top of snapshot, and discarding entries left corrupted or half-written
+    """
+    def setUp(self):
+        """
+        Creates notes file with three notes in snapshot and further changes in journal
+        :return: None
+        """
+        self.tempDir = tempfile.mkdtemp()
+        self.filePath = os.path.join(self.tempDir, 'Notes.txt')
+
+        store = NotesStore(self.filePath, writeThrough=False)
+
+        for position in range(3):
+            store.create('Title ' + str(position), 'Text ' + str(position))
+
+        store.save()
+        store.journal.compact()
+
+        store.update(1, title='Changed title')
+        store.delete(2)
+        store.save()
+
+        self.journalPath = store.journal.journalPath
+        self.savedSize = os.path.getsize(self.journalPath)
+
+        store.update(3, text='Last change')
+        store.save()
+
+    def tearDown(self):
+        """
+        Deletes notes files
+        :return: None
+        """
+        shutil.rmtree(self.tempDir)
+
+    def restored_notes(self):
+        """
+        Restores notes file in new session
+        :return: (dict) Note IDs as keys and restored notes as values
+        """
+        store = NotesStore(self.filePath, writeThrough=False)
+        store.restore()
+
+        return store.noteObjectList
+
+    def test_replay_applies_latest_change_of_every_note(self):
+        changedNotes = NoteJournal(self.filePath).replay()
+
+        self.assertEqual(changedNotes[1].title, 'Changed title')
+        self.assertIsNone(changedNotes[2])
+        self.assertEqual(changedNotes[3].text, 'Last change')
+
+        noteObjectList = self.restored_notes()
+
+        self.assertEqual(sorted(noteObjectList), [1, 3])
+        self.assertEqual(noteObjectList[1].title, 'Changed title')
+        self.assertEqual(noteObjectList[3].text, 'Last change')
+
+    def test_entry_with_bad_checksum_is_truncated(self):
+        with open(self.journalPath, 'r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            lastByte = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes([lastByte[0] ^ 0xFF]))
+
+        NoteJournal(self.filePath)
+
+        self.assertEqual(os.path.getsize(self.journalPath), self.savedSize)
+        self.assertEqual(self.restored_notes()[3].text, 'Text 2')
+
+    def test_half_written_entry_is_truncated(self):
+        fullSize = os.path.getsize(self.journalPath)
+
+        with open(self.journalPath, 'ab') as f:
+            f.write(b'\x02\xff\x00\x00\x00partial')
+
+        NoteJournal(self.filePath)
+
+        self.assertEqual(os.path.getsize(self.journalPath), fullSize)
+        self.assertEqual(self.restored_notes()[3].text, 'Last change')
+
+    def test_failed_flush_keeps_changes(self):
+        store = NotesStore(self.filePath, writeThrough=False)
+        store.restore()
+        store.update(1, title='Kept on failure')
+        journalSize = os.path.getsize(self.journalPath)
+
+        with mock.patch.object(noteJournal.os, 'fsync', side_effect=OSError(28, 'No space left on device')):
+            with self.assertRaises(OSError):
+                store.save()
+
+        self.assertEqual(os.path.getsize(self.journalPath), journalSize)
+        self.assertIn(1, store.journal.pendingChanges)
+
+        store.save()
+
+        self.assertEqual(self.restored_notes()[1].title, 'Kept on failure')
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# This is end of script.
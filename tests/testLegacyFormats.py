@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import shutil
+import datetime
+import tempfile
+import unittest
+
+# Tests are run from the 'tests' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Note import NO_DATE, to_epoch
+from noteFormats import FORMAT_BINARY, BINARY_MAGIC, FILE_HEADER, DICTIONARY_HEADER, RECORD_HEADERS, detect_format, \
+    read_notes
+from notesStore import NotesStore
+
+# Lines as written by plain text format: string of dictionary returned by 'Note.get_all_data()'
+LEGACY_LINES = ["{'Note ID': '1', 'Title': 'Groceries', 'Text': 'Milk, eggs', 'Completed': 'No', "
+                "'Creation Date': '2021-03-04 10:15:30.123456', 'Completion Date': None}",
+                "{'Note ID': '2', 'Title': 'Report', 'Text': 'Send it', 'Completed': 'Yes', "
+                "'Creation Date': '2021-03-05 08:00:00', 'Completion Date': '2021-03-06 17:45:00.5'}",
+                "{'Note ID': '3', 'Title': 'Bad date', 'Text': 'Month 13', 'Completed': 'No', "
+                "'Creation Date': '2018-13-01 00:00:00', 'Completion Date': None}"]
+
+
+class LegacyFormatsTest(unittest.TestCase):
+    """
+    Tests restoring notes files written in plain text format and in binary formats before missing completion dates
+    were marked with 'NO_DATE'
+    """
+    def setUp(self):
+        """
+        Creates folder for notes files
+        :return: None
+        """
+        self.tempDir = tempfile.mkdtemp()
+        self.filePath = os.path.join(self.tempDir, 'Notes.txt')
+
+    def tearDown(self):
+        """
+        Deletes notes files
+        :return: None
+        """
+        shutil.rmtree(self.tempDir)
+
+    def write_legacy_file(self):
+        """
+        Writes plain text notes file with two valid lines and one with malformed date
+        :return: None
+        """
+        with open(self.filePath, 'w') as f:
+            f.write('\n'.join(LEGACY_LINES) + '\n')
+
+    def test_text_file_is_restored(self):
+        self.write_legacy_file()
+        malformedLines = []
+
+        store = NotesStore(self.filePath, writeThrough=False)
+        store.restore(malformedLines)
+
+        self.assertEqual(sorted(store.noteObjectList), [1, 2])
+        self.assertEqual(malformedLines, [3])
+
+        openNote, doneNote = store.get(1), store.get(2)
+
+        self.assertEqual((openNote.title, openNote.text, openNote.isCompleted), ('Groceries', 'Milk, eggs', False))
+        self.assertEqual(openNote.dateCreated, datetime.datetime(2021, 3, 4, 10, 15, 30, 123456))
+        self.assertEqual(openNote.completedEpoch, NO_DATE)
+        self.assertIsNone(openNote.dateCompleted)
+
+        self.assertTrue(doneNote.isCompleted)
+        self.assertEqual(doneNote.dateCreated, datetime.datetime(2021, 3, 5, 8))
+        self.assertEqual(doneNote.dateCompleted, datetime.datetime(2021, 3, 6, 17, 45, 0, 500000))
+
+    def test_text_file_is_migrated_on_compaction(self):
+        with open(self.filePath, 'w') as f:
+            f.write('\n'.join(LEGACY_LINES[:2]) + '\n')
+
+        store = NotesStore(self.filePath, writeThrough=False)
+        store.restore()
+        store.update(1, title='Groceries today')
+        store.save()
+        store.journal.compact()
+
+        self.assertEqual(detect_format(self.filePath), FORMAT_BINARY)
+
+        restoredStore = NotesStore(self.filePath)
+        restoredStore.restore()
+
+        self.assertEqual(restoredStore.get(1).title, 'Groceries today')
+        self.assertIsNone(restoredStore.get(1).dateCompleted)
+        self.assertEqual(restoredStore.get(2).dateCompleted, datetime.datetime(2021, 3, 6, 17, 45, 0, 500000))
+
+    def test_binary_version_3_reads_minus_one_as_missing_date(self):
+        recordHeader = RECORD_HEADERS[3]
+        records = b''
+
+        for ID, completedEpoch in ((1, -1), (2, to_epoch(datetime.datetime(2021, 3, 6)))):
+            title, text = b'Title', b'Text'
+            records += recordHeader.pack(ID, to_epoch(datetime.datetime(2021, 3, 5)), completedEpoch, ID == 2,
+                                         len(title), len(text), 1) + title + text
+
+        with open(self.filePath, 'wb') as f:
+            f.write(FILE_HEADER.pack(BINARY_MAGIC, 3) + DICTIONARY_HEADER.pack(0) + records)
+
+        notes = {noteObject.ID: noteObject for noteObject in read_notes(self.filePath)}
+
+        self.assertEqual(notes[1].completedEpoch, NO_DATE)
+        self.assertIsNone(notes[1].dateCompleted)
+        self.assertEqual(notes[2].dateCompleted, datetime.datetime(2021, 3, 6))
+
+    def test_date_before_epoch_survives_save(self):
+        store = NotesStore(self.filePath, writeThrough=False)
+        noteObject = store.create('Old', 'Completed one microsecond before epoch')
+        noteObject.createdEpoch = to_epoch(datetime.datetime(1969, 1, 1))
+        store.complete(noteObject.ID, datetime.datetime(1969, 12, 31, 23, 59, 59, 999999))
+        store.save()
+        store.journal.compact()
+
+        restoredStore = NotesStore(self.filePath)
+        restoredStore.restore()
+
+        self.assertEqual(restoredStore.get(noteObject.ID).completedEpoch, -1)
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# This is end of script.
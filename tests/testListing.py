@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# Tests are run from the 'tests' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notesStore import NotesStore
+
+NOTES_COUNT = 23
+
+
+class ListingTest(unittest.TestCase):
+    """
+    Tests paging through notes with cursor, page size and filters
+    """
+    def setUp(self):
+        """
+        Creates thread-safe store with 'NOTES_COUNT' notes, every third one completed
+        :return: None
+        """
+        self.tempDir = tempfile.mkdtemp()
+        self.store = NotesStore(os.path.join(self.tempDir, 'Notes.txt'), threadSafe=True, writeThrough=False)
+
+        for number in range(NOTES_COUNT):
+            self.store.create('Title ' + str(number), 'Text ' + str(number), isCompleted=number % 3 == 0)
+
+    def tearDown(self):
+        """
+        Deletes notes files
+        :return: None
+        """
+        shutil.rmtree(self.tempDir)
+
+    def all_pages(self, pageSize, **filters):
+        """
+        Follows cursors from first page to last one
+        :param pageSize: (int) Maximum number of notes on page
+        :param filters: Filters passed to 'NotesStore.page()'
+        :return: (list) IDs of notes on each page
+        """
+        pages, cursor = [], 0
+
+        while cursor is not None:
+            notesPage, cursor = self.store.page(cursor, pageSize, **filters)
+            pages.append([noteObject.ID for noteObject in notesPage])
+
+        return pages
+
+    def test_cursor_and_page_size(self):
+        pages = self.all_pages(5)
+
+        self.assertEqual([len(IDs) for IDs in pages], [5, 5, 5, 5, 3])
+        self.assertEqual(sum(pages, []), list(range(1, NOTES_COUNT + 1)))
+
+        # Page ending exactly at last note has no next page
+        self.assertEqual(self.store.page(20, 3)[1], None)
+        self.assertEqual(self.store.page(NOTES_COUNT, 5), ([], None))
+
+    def test_every_offset(self):
+        # Unfiltered pages merge completed and non-completed notes; any cursor starts at right note
+        for cursor in range(NOTES_COUNT + 1):
+            notesPage, _ = self.store.page(cursor, 4)
+            expectedIDs = list(range(cursor + 1, min(cursor + 5, NOTES_COUNT + 1)))
+
+            self.assertEqual([noteObject.ID for noteObject in notesPage], expectedIDs)
+
+    def test_completion_filter(self):
+        completedIDs = [ID for ID in range(1, NOTES_COUNT + 1) if (ID - 1) % 3 == 0]
+
+        self.assertEqual(sum(self.all_pages(3, isCompleted=True), []), completedIDs)
+        self.assertEqual(sum(self.all_pages(4, isCompleted=False), []),
+                         [ID for ID in range(1, NOTES_COUNT + 1) if ID not in completedIDs])
+
+    def test_date_filter(self):
+        createdFrom, createdTo = self.store.get(6).dateCreated, self.store.get(15).dateCreated
+        expectedIDs = [ID for ID in range(1, NOTES_COUNT + 1)
+                       if createdFrom <= self.store.get(ID).dateCreated < createdTo]
+
+        self.assertEqual(sum(self.all_pages(4, createdFrom=createdFrom, createdTo=createdTo), []), expectedIDs)
+        self.assertEqual(sum(self.all_pages(2, isCompleted=False, createdFrom=createdFrom), []),
+                         [ID for ID in range(1, NOTES_COUNT + 1)
+                          if (ID - 1) % 3 and self.store.get(ID).dateCreated >= createdFrom])
+
+    def test_changes_are_listed(self):
+        self.store.page()
+        self.store.delete(2)
+        self.store.complete(3)
+        noteObject = self.store.create('New', 'Note')
+
+        self.assertEqual(sum(self.all_pages(10), []), [ID for ID in range(1, NOTES_COUNT + 1) if ID != 2] +
+                         [noteObject.ID])
+        self.assertIn(3, sum(self.all_pages(10, isCompleted=True), []))
+
+    def test_notes_not_copied(self):
+        self.store.page()
+
+        # Once indexes are built, pages do not take snapshot of all notes
+        snapshotCalls = []
+        self.store.snapshot = lambda: snapshotCalls.append(1)
+
+        for cursor in range(0, NOTES_COUNT, 5):
+            self.store.page(cursor, 5)
+
+        self.assertEqual(snapshotCalls, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# This is end of script.
@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+# Tests are run from the 'tests' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from noteMetrics import METRICS, PROFILE_CPU, PROFILE_MEMORY, PROFILE_STATE, Histogram, operation
+
+LABELS = (('operation', 'add_notes'),)
+
+
+@operation
+def add_notes(first, second):
+    """
+    Operation instrumented by tests
+    :param first: (int) First number
+    :param second: (int) Second number
+    :return: (int) Sum
+    :raises ValueError: If first number is negative
+    """
+    if first < 0:
+        raise ValueError('Negative number')
+
+    return first + second
+
+
+class MetricsTest(unittest.TestCase):
+    """
+    Tests counting and timing instrumented operations, output formats and one-shot profiles
+    """
+    def setUp(self):
+        """
+        Enables metrics of process with empty counters and histograms, and no profiled operation; all are restored
+        after test
+        :return: None
+        """
+        self.tempDir = tempfile.mkdtemp()
+        self.reportPath = os.path.join(self.tempDir, 'metrics.txt')
+
+        for patcher in (mock.patch.object(METRICS, 'enabled', True), mock.patch.object(METRICS, 'counters', {}),
+                        mock.patch.object(METRICS, 'histograms', {}),
+                        mock.patch.dict(PROFILE_STATE, {'operation': None, 'mode': PROFILE_CPU,
+                                                        'outputPath': self.reportPath})):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """
+        Deletes report file
+        :return: None
+        """
+        shutil.rmtree(self.tempDir)
+
+    def report(self):
+        """
+        Reads reports written to report file
+        :return: (str) Reports, empty if none were written
+        """
+        if not os.path.exists(self.reportPath):
+            return ''
+
+        with open(self.reportPath) as f:
+            return f.read()
+
+    def test_operation_counts_calls_errors_and_latency(self):
+        self.assertEqual(add_notes(2, 3), 5)
+        self.assertEqual(add_notes.__name__, 'add_notes')
+
+        with self.assertRaises(ValueError):
+            add_notes(-1, 3)
+
+        self.assertEqual(METRICS.counters[('notes_operations_total', LABELS)], 2)
+        self.assertEqual(METRICS.counters[('notes_operation_errors_total', LABELS)], 1)
+        self.assertEqual(METRICS.histograms[('notes_operation_seconds', LABELS)].count(), 2)
+
+    def test_disabled_metrics_record_nothing(self):
+        METRICS.enabled = False
+        add_notes(2, 3)
+
+        self.assertEqual((METRICS.counters, METRICS.histograms), ({}, {}))
+
+    def test_histogram_buckets_and_quantiles(self):
+        histogram = Histogram((0.1, 1.0))
+
+        for value in (0.05, 0.1, 0.5, 0.7, 2.0):
+            histogram.observe(value)
+
+        # Value equal to bound falls into its bucket
+        self.assertEqual(histogram.counts, [2, 2, 1])
+        self.assertEqual(histogram.quantile(0.4), 0.1)
+        self.assertEqual(histogram.quantile(0.5), 1.0)
+        self.assertEqual(histogram.quantile(1.0), float('inf'))
+        self.assertIsNone(Histogram().quantile(0.5))
+
+    def test_json_output(self):
+        add_notes(2, 3)
+        METRICS.count('notes_bytes_read_total', 100, (('file', 'index'),))
+        METRICS.observe('notes_operation_seconds', 20.0, LABELS)
+
+        metrics = json.loads(METRICS.to_json())
+        operationHistogram = metrics['histograms']['notes_operation_seconds'][0]
+
+        self.assertEqual(metrics['counters']['notes_bytes_read_total'], [{'labels': {'file': 'index'}, 'value': 100}])
+        self.assertEqual(metrics['counters']['notes_operations_total'], [{'labels': {'operation': 'add_notes'},
+                                                                          'value': 1}])
+        self.assertEqual((operationHistogram['labels'], operationHistogram['count'], operationHistogram['p99']),
+                         ({'operation': 'add_notes'}, 2, '+Inf'))
+        self.assertEqual(operationHistogram['buckets']['+Inf'], 1)
+        self.assertEqual(sum(operationHistogram['buckets'].values()), 2)
+
+    def test_prometheus_output(self):
+        METRICS.count('notes_operations_total', 3, (('operation', 'say "hi"'),))
+        METRICS.observe('notes_operation_seconds', 0.0002, LABELS)
+        METRICS.observe('notes_operation_seconds', 0.003, LABELS)
+
+        lines = METRICS.to_prometheus().splitlines()
+
+        self.assertIn('# TYPE notes_operations_total counter', lines)
+        self.assertIn('notes_operations_total{operation="say \\"hi\\""} 3', lines)
+        self.assertIn('# TYPE notes_operation_seconds histogram', lines)
+
+        # Buckets are cumulative
+        self.assertIn('notes_operation_seconds_bucket{operation="add_notes",le="0.0001"} 0', lines)
+        self.assertIn('notes_operation_seconds_bucket{operation="add_notes",le="0.00025"} 1', lines)
+        self.assertIn('notes_operation_seconds_bucket{operation="add_notes",le="0.005"} 2', lines)
+        self.assertIn('notes_operation_seconds_bucket{operation="add_notes",le="+Inf"} 2', lines)
+        self.assertIn('notes_operation_seconds_count{operation="add_notes"} 2', lines)
+
+    def test_profile_captures_first_call_only(self):
+        PROFILE_STATE['operation'] = 'add_notes'
+
+        self.assertEqual(add_notes(2, 3), 5)
+        self.assertIsNone(PROFILE_STATE['operation'])
+        self.assertIn('CPU profile of add_notes:', self.report())
+
+        reportSize = len(self.report())
+        self.assertEqual(add_notes(4, 5), 9)
+        self.assertEqual(len(self.report()), reportSize)
+
+        # Profiled call is not timed, later calls are
+        self.assertEqual(METRICS.counters[('notes_operations_total', LABELS)], 1)
+
+    def test_memory_profile(self):
+        PROFILE_STATE.update({'operation': 'add_notes', 'mode': PROFILE_MEMORY})
+
+        with self.assertRaises(ValueError):
+            add_notes(-1, 3)
+
+        # Report is written also when profiled call fails
+        self.assertIn('Memory profile of add_notes:', self.report())
+        self.assertIsNone(PROFILE_STATE['operation'])
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# This is end of script.
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import shutil
+import sqlite3
+import datetime
+import tempfile
+import unittest
+
+# Tests are run from the 'tests' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from noteJournal import NoteJournal
+from noteShards import BACKEND_FILES, BACKEND_SQLITE
+from noteSqlite import DROPPED_INDEXES, SqliteJournal, migrate
+from notesStore import NotesStore
+
+
+class MigrationTest(unittest.TestCase):
+    """
+    Tests moving saved notes between notes file and SQLite database
+    """
+    def setUp(self):
+        """
+        Creates notes file with open, completed and updated notes
+        :return: None
+        """
+        self.tempDir = tempfile.mkdtemp()
+        self.filePath = os.path.join(self.tempDir, 'Notes.txt')
+
+        store = NotesStore(self.filePath, writeThrough=False)
+        store.create('Open', 'Not done yet')
+        store.create('Done', 'Completed note')
+        store.complete(2, datetime.datetime.now() + datetime.timedelta(hours=1))
+        store.create('Updated', 'Saved twice')
+        store.save()
+        store.update(3, text='Saved twice, changed')
+        store.save()
+
+        self.savedNotes = self.restored_notes()
+
+    def tearDown(self):
+        """
+        Deletes notes files
+        :return: None
+        """
+        shutil.rmtree(self.tempDir)
+
+    def restored_notes(self):
+        """
+        Restores notes in new session, from backend notes file is in
+        :return: (dict) Note IDs as keys and restored notes as values
+        """
+        store = NotesStore(self.filePath, writeThrough=False)
+        store.restore()
+
+        return store.noteObjectList
+
+    def assert_notes_kept(self):
+        """
+        Checks that notes restored now match notes saved before migration
+        :return: None
+        """
+        noteObjectList = self.restored_notes()
+
+        self.assertEqual(sorted(noteObjectList), sorted(self.savedNotes))
+
+        for ID, savedNote in self.savedNotes.items():
+            noteObject = noteObjectList[ID]
+
+            self.assertEqual((noteObject.title, noteObject.text, noteObject.isCompleted, noteObject.dateCreated,
+                              noteObject.dateCompleted, noteObject.version),
+                             (savedNote.title, savedNote.text, savedNote.isCompleted, savedNote.dateCreated,
+                              savedNote.dateCompleted, savedNote.version))
+
+    def test_round_trip_keeps_notes(self):
+        journal = migrate(NotesStore(self.filePath).journal, BACKEND_SQLITE)
+
+        self.assertIsInstance(journal, SqliteJournal)
+        self.assertIsInstance(NotesStore(self.filePath).journal, SqliteJournal)
+        self.assert_notes_kept()
+
+        journal = migrate(journal, BACKEND_FILES)
+
+        self.assertIsInstance(journal, NoteJournal)
+        self.assertIsInstance(NotesStore(self.filePath).journal, NoteJournal)
+        self.assert_notes_kept()
+
+    def test_malformed_record_stops_migration(self):
+        with open(self.filePath, 'w') as f:
+            f.write("{'Note ID': '1', 'Title': 'Bad date', 'Text': 'Month 13', 'Completed': 'No', "
+                    "'Creation Date': '2018-13-01 00:00:00', 'Completion Date': None}\n")
+
+        for name in os.listdir(self.tempDir):
+            if name != 'Notes.txt':
+                os.remove(os.path.join(self.tempDir, name))
+
+        with open(self.filePath, 'rb') as f:
+            legacyContent = f.read()
+
+        with self.assertRaises(ValueError):
+            migrate(NotesStore(self.filePath).journal, BACKEND_SQLITE)
+
+        with open(self.filePath, 'rb') as f:
+            self.assertEqual(f.read(), legacyContent)
+
+        self.assertNotIsInstance(NotesStore(self.filePath).journal, SqliteJournal)
+
+    def test_upgrade_drops_unused_indexes(self):
+        journal = migrate(NotesStore(self.filePath).journal, BACKEND_SQLITE)
+        journal.close()
+
+        # Database written by version 1, with indexes on completion status and dates
+        connection = sqlite3.connect(journal.databasePath)
+        connection.execute('CREATE INDEX notesByCompletion ON notes (isCompleted, created)')
+        connection.execute('CREATE INDEX notesByCreation ON notes (created)')
+        connection.execute('CREATE INDEX notesByCompletionDate ON notes (completed)')
+        connection.execute('PRAGMA user_version = 1')
+        connection.commit()
+        connection.close()
+
+        journal = SqliteJournal(self.filePath)
+        indexNames = {row[0] for row in journal.connection.execute("SELECT name FROM sqlite_master "
+                                                                   "WHERE type = 'index'")}
+        journal.close()
+
+        self.assertFalse(indexNames & set(DROPPED_INDEXES))
+        self.assertIn('notesByChange', indexNames)
+        self.assert_notes_kept()
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# This is end of script.
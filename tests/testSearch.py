@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+# Tests are run from the 'tests' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import noteSearch
+from Note import Note
+from noteSearch import tokenize
+from notesStore import NotesStore
+
+NOTES = [('Garden', 'Water the tomatoes and the roses'),
+         ('Shopping', 'Tomatoes, tomatoes and more tomatoes for the sauce'),
+         ('Tomato sauce', 'Recipe from grandmother'),
+         ('Trip', 'Book train tickets to the coast')]
+
+
+class SearchTest(unittest.TestCase):
+    """
+    Tests ranking notes by words, prefixes and BM25 scores, and keeping search index across sessions
+    """
+    def setUp(self):
+        """
+        Creates store with notes of 'NOTES'
+        :return: None
+        """
+        self.tempDir = tempfile.mkdtemp()
+        self.filePath = os.path.join(self.tempDir, 'Notes.txt')
+
+        self.store = NotesStore(self.filePath, writeThrough=False)
+
+        for title, text in NOTES:
+            self.store.create(title, text)
+
+    def tearDown(self):
+        """
+        Deletes notes files
+        :return: None
+        """
+        shutil.rmtree(self.tempDir)
+
+    def restored_store(self):
+        """
+        Restores notes file in new session
+        :return: (NotesStore) Store with saved notes restored
+        """
+        store = NotesStore(self.filePath, writeThrough=False)
+        store.restore()
+
+        return store
+
+    def matched_ids(self, query, store=None):
+        """
+        Searches store
+        :param query: (str) Words to search for
+        :param store: (NotesStore) Store to search, 'store' of test if not given
+        :return: (list) Matching note IDs, best match first
+        """
+        return [ID for ID, _ in (store or self.store).search(query)]
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize("Don't forget: 2 eggs, SPAM_spam!"), ['don', 't', 'forget', '2', 'eggs', 'spam_spam'])
+        self.assertEqual(tokenize(''), [])
+
+    def test_ranking(self):
+        # Word repeated in text outranks single mention, word in title outranks word in text
+        self.assertEqual(self.matched_ids('tomatoes'), [2, 1])
+        self.assertEqual(self.matched_ids('sauce'), [3, 2])
+
+        # Rare word weighs more than common one
+        self.assertEqual(self.matched_ids('the coast')[0], 4)
+
+        self.assertEqual(self.matched_ids('TOMATOES'), self.matched_ids('tomatoes'))
+        self.assertEqual(self.matched_ids('unknown'), [])
+        self.assertEqual(len(self.store.search('the', limit=2)), 2)
+
+    def test_equal_scores_are_listed_by_id(self):
+        self.store.create('Same', 'identical words')
+        self.store.create('Same', 'identical words')
+
+        results = self.store.search('identical')
+
+        self.assertEqual([ID for ID, _ in results], [5, 6])
+        self.assertEqual(results[0][1], results[1][1])
+
+    def test_prefix_matching(self):
+        self.assertEqual(self.matched_ids('tomat*'), [3, 2, 1])
+        self.assertEqual(self.matched_ids('tomat'), [])
+        self.assertEqual(self.matched_ids('tick* grand*'), [3, 4])
+
+    def test_prefix_after_word_changing_length_when_lower_cased(self):
+        self.store.create('Poem', 'Stanza')
+
+        # 'İ' becomes two characters when lower cased
+        self.assertEqual(self.matched_ids('İ stan*'), [5])
+
+    def test_array_scoring_matches_plain_scoring(self):
+        plainResults = self.store.search('tomatoes the sauce')
+
+        with mock.patch.object(noteSearch, 'ARRAY_MIN_POSTINGS', 1):
+            self.store.searchIndex.postingArrays = {}
+            arrayResults = self.store.search('tomatoes the sauce')
+
+        self.assertEqual([ID for ID, _ in arrayResults], [ID for ID, _ in plainResults])
+
+        for (_, arrayScore), (_, plainScore) in zip(arrayResults, plainResults):
+            self.assertAlmostEqual(arrayScore, plainScore)
+
+    def test_changes_are_indexed(self):
+        self.matched_ids('tomatoes')
+        self.store.update(2, text='Bread')
+        self.store.delete(1)
+
+        self.assertEqual(self.matched_ids('tomatoes'), [])
+        self.assertEqual(self.matched_ids('bread'), [2])
+
+    def test_saved_index_is_loaded_without_reading_texts(self):
+        self.matched_ids('tomatoes')
+        self.store.save()
+        self.store.update(3, text='Tomatoes from the garden')
+        self.store.save()
+
+        expectedResults = self.store.search('tomatoes sauce')
+
+        store = self.restored_store()
+        readIDs = []
+
+        def read_text(noteObject):
+            readIDs.append(noteObject.ID)
+
+            return noteObject._text
+
+        with mock.patch.object(Note, 'text', property(read_text)):
+            self.assertEqual(store.search('tomatoes sauce'), expectedResults)
+
+        self.assertEqual(readIDs, [])
+
+    def test_notes_changed_since_index_was_saved_are_reindexed(self):
+        self.matched_ids('tomatoes')
+        self.store.save()
+
+        # Other session changes notes without searching, so saved index is not updated
+        store = self.restored_store()
+        store.update(2, text='Bread')
+        store.create('Bakery', 'Fresh bread')
+        store.save()
+
+        store = self.restored_store()
+
+        # Change not saved yet keeps version of saved note
+        store.update(4, text='Bread crumbs')
+
+        self.assertEqual(self.matched_ids('tomatoes', store), [1])
+        self.assertEqual(sorted(self.matched_ids('bread', store)), [2, 4, 5])
+
+    def test_note_not_saved_with_index_is_reindexed(self):
+        self.matched_ids('tomatoes')
+        self.store.save()
+
+        # Index saved by other thread while change is waiting for next save, which never comes
+        self.store.update(1, text='Bread')
+        self.store.searchIndex.save({1})
+
+        self.assertEqual(self.matched_ids('tomatoes', self.restored_store()), [2, 1])
+
+    def test_damaged_index_file_is_rebuilt(self):
+        self.matched_ids('tomatoes')
+        self.store.save()
+
+        with open(self.store.searchIndex.searchPath, 'r+b') as f:
+            f.seek(40)
+            f.write(b'\xff' * 16)
+
+        self.assertEqual(self.matched_ids('tomatoes', self.restored_store()), [2, 1])
+
+        with open(self.store.searchIndex.searchPath, 'wb') as f:
+            f.write(b'not a search file')
+
+        self.assertEqual(self.matched_ids('tomatoes', self.restored_store()), [2, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# This is end of script.
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+# Python Project
+# Python Notes Handler
+# Saumya Gupta, DS
+
+
+# Import required packages
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import tempfile
+import unittest
+from unittest import mock
+
+# Tests are run from the 'tests' folder; make program modules importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from notesStore import NotesStore
+from noteServer import NotesServer
+
+
+def encode_request(method, path, payload=None):
+    """
+    Encodes HTTP/1.1 request with optional JSON body
+    :param method: (str) HTTP method
+    :param path: (str) Request target
+    :param payload: Optional JSON-serializable body, or bytes sent as they are
+    :return: (bytes) Complete request
+    """
+    body = payload if isinstance(payload, bytes) else json.dumps(payload).encode() if payload is not None else b''
+
+    return ('%s %s HTTP/1.1\r\nHost: localhost\r\nContent-Length: %d\r\n\r\n' % (method, path, len(body))).encode() \
+        + body
+
+
+async def read_response(reader):
+    """
+    Reads one response from server
+    :param reader: (StreamReader) Connection input stream
+    :return: (tuple) Status and decoded JSON body
+    """
+    head = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+    headers = dict(line.lower().split(': ', 1) for line in head[1:] if line)
+    body = await reader.readexactly(int(headers['content-length']))
+
+    return int(head[0].split(' ')[1]), json.loads(body)
+
+
+class ServerTest(unittest.IsolatedAsyncioTestCase):
+    """
+    Tests serving store over HTTP: pipelined requests, writes saved in batches, errors, and saving on shutdown
+    """
+    async def asyncSetUp(self):
+        """
+        Starts server on free port over store of empty notes file, counting saves
+        :return: None
+        """
+        self.tempDir = tempfile.mkdtemp()
+        self.filePath = os.path.join(self.tempDir, 'Notes.txt')
+
+        self.store = NotesStore(self.filePath, threadSafe=True, writeThrough=False)
+        self.store.restore()
+        self.saveCalls = []
+        self.saveDelay = 0
+        store_save = self.store.save
+
+        def save(*arguments):
+            self.saveCalls.append(len(self.store.journal.pendingChanges))
+            time.sleep(self.saveDelay)
+
+            return store_save(*arguments)
+
+        self.store.save = save
+
+        # Batch is saved once it is full, or after writes of pipelined requests have had time to join it
+        self.server = NotesServer(self.store, batchSize=3, batchDelay=0.5)
+        started = asyncio.Event()
+        self.address = None
+
+        def on_started(address):
+            self.address = address
+            started.set()
+
+        self.serverTask = asyncio.create_task(self.server.serve('127.0.0.1', 0, on_started))
+        await started.wait()
+
+        self.reader, self.writer = await asyncio.open_connection(*self.address[:2])
+
+    async def asyncTearDown(self):
+        """
+        Closes connection, stops server and deletes notes files
+        :return: None
+        """
+        self.writer.close()
+
+        if not self.serverTask.done():
+            self.serverTask.cancel()
+
+            with self.assertRaises(asyncio.CancelledError):
+                await self.serverTask
+
+        shutil.rmtree(self.tempDir)
+
+    async def request(self, method, path, payload=None):
+        """
+        Sends one request and waits for its response
+        :return: (tuple) Status and decoded JSON body
+        """
+        self.writer.write(encode_request(method, path, payload))
+
+        return await read_response(self.reader)
+
+    def restored_notes(self):
+        """
+        Restores notes file in new session
+        :return: (dict) Note IDs as keys and restored notes as values
+        """
+        store = NotesStore(self.filePath, writeThrough=False)
+        store.restore()
+
+        return store.noteObjectList
+
+    async def test_pipelined_writes_are_saved_in_one_batch(self):
+        self.writer.write(b''.join(encode_request('POST', '/notes', {'title': 'Title ' + str(position), 'text': 'Text'})
+                                   for position in range(3)) + encode_request('GET', '/notes/2'))
+
+        responses = [await read_response(self.reader) for _ in range(4)]
+
+        self.assertEqual([status for status, _ in responses], [201, 201, 201, 200])
+        self.assertEqual([payload['Note ID'] for _, payload in responses], ['1', '2', '3', '2'])
+        self.assertEqual(self.saveCalls, [3])
+        self.assertEqual(sorted(self.restored_notes()), [1, 2, 3])
+
+    async def test_write_is_answered_after_save(self):
+        self.assertEqual((await self.request('POST', '/notes', {'title': 'Title', 'text': 'Text'}))[0], 201)
+        self.assertEqual(self.restored_notes()[1].title, 'Title')
+
+        status, payload = await self.request('PATCH', '/notes/1', {'title': 'New title', 'completed': True})
+
+        self.assertEqual((status, payload['Title'], payload['Completed']), (200, 'New title', 'Yes'))
+        self.assertTrue(self.restored_notes()[1].isCompleted)
+
+        self.assertEqual(await self.request('DELETE', '/notes/1'), (200, {'Note ID': '1', 'Deleted': 'Yes'}))
+        self.assertEqual(self.restored_notes(), {})
+
+    async def test_errors(self):
+        await self.request('POST', '/notes', {'title': 'Title', 'text': 'Text'})
+
+        for method, path, payload, expectedStatus in (('GET', '/notes/9', None, 404),
+                                                      ('GET', '/unknown', None, 404),
+                                                      ('PUT', '/notes/1', {}, 405),
+                                                      ('POST', '/notes', b'{not json', 400),
+                                                      ('POST', '/notes', ['title'], 400),
+                                                      ('POST', '/notes', {'title': 'Title'}, 400),
+                                                      ('POST', '/notes', {'title': '', 'text': 'Text'}, 400),
+                                                      ('PATCH', '/notes/1', {'completed': 'yes'}, 400),
+                                                      ('POST', '/notes/1/complete', {'date': 20210101}, 400),
+                                                      ('POST', '/notes/1/complete', {'date': '2021-13-01'}, 400),
+                                                      ('GET', '/stats?period=year', None, 400)):
+            status, payload = await self.request(method, path, payload)
+
+            self.assertEqual(status, expectedStatus, path)
+            self.assertIn('error', payload)
+
+        # Connection stays usable after failed requests
+        self.assertEqual((await self.request('GET', '/notes/1'))[1]['Title'], 'Title')
+
+    async def test_malformed_request_closes_connection(self):
+        self.writer.write(b'GARBAGE\r\n\r\n')
+
+        self.assertEqual((await read_response(self.reader))[0], 400)
+        self.assertEqual(await self.reader.read(), b'')
+
+    async def test_failed_compaction_keeps_answering_writes(self):
+        compact_if_needed = self.store.journal.compact_if_needed
+        failures = [OSError(28, 'No space left on device')]
+
+        def compact():
+            if failures:
+                raise failures.pop()
+
+            compact_if_needed()
+
+        with mock.patch.object(self.store.journal, 'compact_if_needed', compact), \
+                mock.patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            for position in range(3):
+                status, _ = await asyncio.wait_for(self.request('POST', '/notes', {'title': 'Title', 'text': 'Text'}),
+                                                   5)
+
+                self.assertEqual(status, 201)
+
+        self.assertIn('Compacting notes file failed', stderr.getvalue())
+        self.assertEqual(sorted(self.restored_notes()), [1, 2, 3])
+
+    async def test_shutdown_answers_batch_being_saved(self):
+        self.saveDelay = 0.5
+        self.writer.write(encode_request('POST', '/notes', {'title': 'Title', 'text': 'Text'}))
+
+        # Batch is taken by committing task once request delay has passed
+        while not self.server.savingWaiters:
+            await asyncio.sleep(0.01)
+
+        savingWaiters = list(self.server.savingWaiters)
+        self.serverTask.cancel()
+
+        with self.assertRaises(asyncio.CancelledError):
+            await self.serverTask
+
+        self.assertTrue(all(commitFuture.done() for commitFuture in savingWaiters))
+        self.assertEqual(self.restored_notes()[1].title, 'Title')
+
+
+if __name__ == '__main__':
+    unittest.main()
+
+# This is end of script.
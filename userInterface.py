@@ -6,29 +6,41 @@
 
 # Import required packages
 import sys
-import os
 import datetime
-import pandas as pd
-from tabulate import tabulate
-import yaml
-from Note import *
-from Main import retrieve_max_id
+from notesStore import NotesStore
+from noteListing import page_rows
+from noteMetrics import operation
 
-# Customize pandas behaviour to display more number of columns than 5
-pd.set_option('display.max_columns', 10)
 
-# Call function to retrieve maximum ID value from saved notes to help continue from previous state
-id_max = retrieve_max_id()
+def tabulate(*args, **kwargs):
+    """
+    Formats rows as text table; 'tabulate' package is slow to import, so it is imported when first table is displayed
+    :return: (str) Table
+    """
+    from tabulate import tabulate as tabulate_rows
+
+    return tabulate_rows(*args, **kwargs)
+
+
+def initialize_state(maxID=None, filePath='Notes.txt'):
+    """
+    Initializes session state of 'userInterface' class; nothing is read or written before this is called
+    :param maxID: (int) Maximum ID value from saved notes, to help continue from previous state; read from index of
+                  notes file if not given
+    :param filePath: (str) Path of notes file
+    :return: None
+    """
+    userInterface.store = NotesStore(filePath, maxID)
 
 
 class userInterface:
     """
-    Represents user interface
+    Represents user interface; takes input from user and displays results, while notes are handled by 'NotesStore';
+    Handlers are instrumented operations, see 'noteMetrics.operation()'
 
-    Class Attributes
+    Class Attributes (set by 'initialize_state()')
     ----------
-    idCounter : (int) Represent note IDs; increments on note creation
-    noteObjectList : (dict) Dictionary with note IDs as keys and corresponding 'Note' class objects as values
+    store : (NotesStore) Notes of session, with journal, statistics and search index
 
     Instance Attributes
     ----------
@@ -43,14 +55,17 @@ class userInterface:
     handle_delete() : Deletes specific note object
     handle_add_completion_date() : Adds/updates completion date to/of note object
     handle_find_days_to_complete() : Displays number of days it took to complete note
-    handle_save_in_file() : Saves all current note objects into file
+    handle_save_in_file() : Saves changes made to note objects into file
     handle_restore_file_contents() : Restores notes from saved file; DOES NOT overwrite already existing notes
     handle_show_stats() : Display notes statistics focussing note completion
+    handle_search() : Displays notes best matching search words
+    handle_undo_redo() : Undoes last change or redoes last undone change
+    handle_show_note_as_of() : Displays note as it was at given time
     print_notes_list() : Displays list of notes
-    is_note_present(idInput) : Checks if concerned note is present in 'noteObjectList'
+    print_notes_pages(heading, isCompleted) : Displays notes one page at a time
+    is_note_present(idInput) : Checks if concerned note is present in session
     """
-    idCounter = id_max if id_max else 0
-    noteObjectList = {}
+    store = None
 
     def __init__(self, userChoice):
         """
@@ -62,7 +77,7 @@ class userInterface:
     def handle_user_input(self):
         """
         Decides which handler to call based on 'userChoice', ex. calls 'handle_create'() is 'userChoice' is '1';
-        Responsible to exit program (session) if 'userChoice' is '10'
+        Responsible to exit program (session) if 'userChoice' is '13'
         :return: None
         """
         if self.userChoice == '1':
@@ -93,20 +108,26 @@ class userInterface:
             UserInterface.handle_show_stats(self)
 
         elif self.userChoice == '10':
+            UserInterface.handle_search(self)
+
+        elif self.userChoice == '11':
+            UserInterface.handle_undo_redo(self)
+
+        elif self.userChoice == '12':
+            UserInterface.handle_show_note_as_of(self)
+
+        elif self.userChoice == '13':
             print('\nSad to see you go. See you soon again!')
 
             sys.exit()
 
+    @operation
     def handle_create(self):
         """
         Takes and validates note properties from user;
-        Creates new note object;
-        Appends new note object to 'noteObjectList'
+        Creates new note in store
         :return: None
         """
-        # Increment note counter attribute
-        UserInterface.idCounter += 1
-
         # Initially consider empty input
         emptyTitleInput = True
 
@@ -150,23 +171,13 @@ class userInterface:
             else:
                 print("\nERROR : Invalid Input!\nEnter: 'Y' for completed and 'N' for not completed.")
 
-        # Current timestamp for creation date
-        dateCreated = datetime.datetime.now()
-
-        # Create note object
-        note = Note(UserInterface.idCounter, dateCreated, titleInput, textInput, isCompletedInput)
-
-        # If note is marked complete set completion date as current timestamp
-        if note.isCompleted:
-            note.mark_complete(datetime.datetime.now())
-
-        # Append note object to keep track of created notes
-        UserInterface.noteObjectList[UserInterface.idCounter] = note
+        # Create note with current timestamp as creation date (and completion date, if note is marked complete)
+        note = UserInterface.store.create(titleInput, textInput, isCompletedInput)
 
         # Prompt user what has changed
-        print(
-            "\nSUCCESS : A new Note - '" + titleInput + "' - has been created with ID: " + str(UserInterface.idCounter))
+        print("\nSUCCESS : A new Note - '" + titleInput + "' - has been created with ID: " + str(note.ID))
 
+    @operation
     def handle_read(self):
         """
         Takes and validates note ID from user:
@@ -191,7 +202,7 @@ class userInterface:
                 return 'Error 2'
 
             # Call function to get all data for desired note
-            noteData = UserInterface.noteObjectList[idInput].get_all_data()
+            noteData = UserInterface.store.get(idInput).get_all_data()
 
             # Print note data in tabular form
             print('\nHere is note ID ' + str(idInput) + ':\n')
@@ -206,6 +217,7 @@ class userInterface:
 
             return 'Error 3'
 
+    @operation
     def handle_update(self):
         """
         Calls 'handle_read()';
@@ -239,8 +251,6 @@ class userInterface:
             else:
                 wrongInputCheck = False
 
-        noteObject = UserInterface.noteObjectList[idInput]
-
         # Decide action according to user input
         if userSecondInput == '1':
             # Similar code for checking wrong input
@@ -256,11 +266,8 @@ class userInterface:
                 else:
                     print("ERROR : Note title cannot be empty.")
 
-            noteObject.update_title(newTitleInput)
-
-            # Update completion date to current timestamp if update was done to note already marked complete
-            if noteObject.isCompleted:
-                noteObject.mark_complete(datetime.datetime.now())
+            # Completion date is updated to current timestamp if update was done to note already marked complete
+            UserInterface.store.update(idInput, title=newTitleInput)
 
         elif userSecondInput == '2':
             # Similar code for checking wrong input
@@ -275,25 +282,17 @@ class userInterface:
                 else:
                     print("ERROR : Note text cannot be empty.")
 
-            noteObject.update_text(newTextInput)
-
-            if noteObject.isCompleted:
-                noteObject.mark_complete(datetime.datetime.now())
+            UserInterface.store.update(idInput, text=newTextInput)
 
         elif userSecondInput == '3':
-            noteObject.change_completion_status()
+            # Toggle completion status; completion date changes to current timestamp or 'None' accordingly
+            isCompletedInput = not UserInterface.store.get(idInput).isCompleted
+            noteObject = UserInterface.store.update(idInput, isCompleted=isCompletedInput)
 
-            # Change completion date to 'None', if completion status of previously completed note is changed
             if not noteObject.isCompleted:
-                noteObject.mark_incomplete()
-
                 print('\nSUCCESS : Note marked incomplete.')
 
             else:
-                # Change completion date to current timestamp, if completion status of previously non-completed note
-                # is changed
-                noteObject.mark_complete(datetime.datetime.now())
-
                 print('\nSUCCESS : Note marked complete.')
 
         else:
@@ -304,10 +303,11 @@ class userInterface:
 
         print('\nSUCCESS : Note ID ' + str(idInput) + ' has been updated.')
 
+    @operation
     def handle_delete(self):
         """
         Calls 'handle_read()';
-        Deletes corresponding note object from 'noteObjectList'
+        Deletes corresponding note from store
         :return: None
         """
         idInput = UserInterface.handle_read(self)
@@ -315,11 +315,11 @@ class userInterface:
         if idInput == 'Error 1' or idInput == 'Error 2' or idInput == 'Error 3':
             return
 
-        # Deleting note from dictionary
-        del UserInterface.noteObjectList[idInput]
+        UserInterface.store.delete(idInput)
 
         print('\nSUCCESS : Note ID ' + str(idInput) + ' has been deleted.')
 
+    @operation
     def handle_add_completion_date(self):
         """
         Calls 'handle_read()';
@@ -338,27 +338,26 @@ class userInterface:
             # Convert date string to datetime object
             dateCompleted = datetime.datetime.strptime(dateCompleted, '%Y-%m-%d')
 
-            noteObject = UserInterface.noteObjectList[idInput]
-
-            # Completion date entered should be future date
-            if (noteObject.dateCreated - datetime.timedelta(days=1)) < dateCompleted:
-                # Change completion date to date input irrespective of completion status of note
-                noteObject.mark_complete(dateCompleted)
-
-                print('\nSUCCESS : Note has been marked complete with the specified completion date.')
+        except ValueError:
+            print("\nERROR : Note completion date is either not correct or not in the specified format!")
+            print('Starting Over...')
 
-            else:
-                print("\nERROR : Note completion date cannot be before note creation date!")
-                print('Starting Over...')
+            return
 
-                return
+        try:
+            # Change completion date to date input irrespective of completion status of note
+            UserInterface.store.complete(idInput, dateCompleted)
 
-        except ValueError:
-            print("\nERROR : Note completion date is either not correct or not in the specified format!")
+        except ValueError as error:
+            # Completion date entered should not be before creation date
+            print("\nERROR : " + str(error))
             print('Starting Over...')
 
             return
 
+        print('\nSUCCESS : Note has been marked complete with the specified completion date.')
+
+    @operation
     def handle_find_days_to_complete(self):
         """
         Calls 'handle_read()';
@@ -371,75 +370,54 @@ class userInterface:
         if idInput == 'Error 1' or idInput == 'Error 2' or idInput == 'Error 3':
             return
 
-        noteObject = UserInterface.noteObjectList[idInput]
+        # Days are calculated only if selected note is marked complete
+        daysToComplete = UserInterface.store.days_to_complete(idInput)
 
-        # Calculate time delta only if selected note is marked complete
-        if noteObject.isCompleted:
-            timedelta = noteObject.dateCompleted - noteObject.dateCreated
-
-        else:
+        if daysToComplete is None:
             print("\nERROR : Note not supplied with completion date!")
             print('Starting Over...')
 
             return
 
-        print('\nIt took ' + str(timedelta.days) + ' days for the note to be completed.')
+        print('\nIt took ' + str(daysToComplete) + ' days for the note to be completed.')
+
+        meanDays = UserInterface.store.noteStats.mean_days_to_complete()
+
+        if meanDays is not None:
+            print('On average, it took ' + str(round(meanDays, 2)) + ' days to complete a note.')
 
+    @operation
     def handle_save_in_file(self):
         """
-        Saves all current note objects into file (created automatically)
-        Displays error if input regarding continuing or moving back is erroneous
-        :return: None;
+        Saves changes made to note objects since last save into file (created automatically);
+        Only changed notes are appended to journal kept next to file, file itself is rewritten only once journal
+        grows too large; changes other programs saved to file meanwhile are merged in
+        :return: None
         """
-        notesListIsEmpty = UserInterface.print_notes_list(self)
+        conflictIDs = []
 
-        if notesListIsEmpty:
-            return
+        # File used to save is always 'Notes.txt'
+        changesCount = UserInterface.store.save(conflictIDs)
 
-        try:
-            savedNotesList = []
-
-            # Get list of saved notes from file
-            if (os.path.exists('Notes.txt')) and (os.path.getsize('Notes.txt') != 0):
-                with open('Notes.txt', 'r') as f:
-                    for line in f.readlines():
-                        savedNotesList.append(int(line[13]))
-
-            userThirdInput = 0
-
-            # Warn user if there exists non empty notes file
-            if (os.path.exists('Notes.txt')) and (os.path.getsize('Notes.txt') != 0) and len(
-                    set(savedNotesList) - set(list(UserInterface.noteObjectList.keys()))) > 0:
-                print("\nWARNING : There are some notes already available in the file. Consider restoring before "
-                      "saving. Saving before restoring will overwrite file's contents.\nNOTE : Restoration will not "
-                      "overwrite the notes already present in the program, but add notes that are not already present "
-                      "in the program. In order to not lose any note data, go back to the main menu, select '8' from "
-                      "main menu.")
-
-                # Ask user choice about continuing or going back to main menu
-                userThirdInput = int(input("Enter '1' to go back to the main menu & '0' if you want to proceed "
-                                           "anyway: "))
-
-            # If user wants to continue
-            if userThirdInput == 0:
-                # File used to save is always 'Notes.txt'
-                with open('Notes.txt', 'w') as f:
-                    # Write note object to file one by one
-                    for noteObject in list(UserInterface.noteObjectList.values()):
-                        f.write("%s\n" % noteObject.get_all_data())
-
-                print("\nSUCCESS : All notes above have been saved to file - 'Notes.txt'")
-
-            # If user wants to rethink about restoring by going back to main menu
-            else:
-                return
+        if conflictIDs:
+            print("\nWARNING : Note ID(s) " + ', '.join(map(str, conflictIDs)) + " were also changed by another "
+                  "program using file. Where both changed the same title, text or completion, your changes have been "
+                  "kept; notes you deleted that were changed there have been kept in file.")
 
-        except ValueError:
-            print("\nERROR : Invalid Input!\nEnter either '1' or '0'.")
-            print('Starting Over...')
+        if changesCount == 0 and UserInterface.store.writeThrough:
+            print("\nNOTE : Notes are kept in database - '" + UserInterface.store.journal.databasePath + "'; every "
+                  "change has been saved as it was made.")
+
+            return
+
+        if changesCount == 0:
+            print("\nNOTE : No notes have been created, updated or deleted since last save. Nothing to save.")
 
             return
 
+        print("\nSUCCESS : " + str(changesCount) + " changed note(s) have been saved to file - 'Notes.txt'")
+
+    @operation
     def handle_restore_file_contents(self):
         """
         Restores contents stored in file in program;
@@ -448,8 +426,13 @@ class userInterface:
         :return: None
         """
         try:
+            savedSize = UserInterface.store.journal.saved_size()
+
+            if savedSize is None:
+                raise FileNotFoundError('Notes.txt')
+
             # In case created file created was manually emptied by user
-            if os.path.getsize('Notes.txt') == 0:
+            if savedSize == 0:
                 print(
                     "\nERROR : File is empty. Either file contents have been deleted or no notes have been saved to "
                     "file"
@@ -458,44 +441,28 @@ class userInterface:
 
                 return
 
-            notesDictList = []
-
-            with open('Notes.txt', 'r') as f:
-                for line in f.readlines():
-                    # Using yaml to parse dictionary object from string
-                    notesDictList.append(yaml.safe_load(line))
-
-            # Further beautifying result
-            notesDF = pd.DataFrame(notesDictList)
+            malformedLines = []
 
             print("\nNOTE : Restoration from file does not overwrite notes already present in the program, but add "
                   "notes that are not already present in the program (including currently deleted notes that were "
                   "saved previously).")
 
-            for note in range(len(notesDF)):
-                note_ID = int(notesDF.loc[note, "Note ID"])
-
-                # Restore notes not existing in program already, to avoid overwriting any possible updated note
-                if note_ID not in list(UserInterface.noteObjectList.keys()):
-                    noteObject = Note(int(notesDF.loc[note, "Note ID"]),
-                                      datetime.datetime.strptime(notesDF.loc[note, "Creation Date"],
-                                                                 '%Y-%m-%d %H:%M:%S.%f'),
-                                      notesDF.loc[note, "Title"],
-                                      notesDF.loc[note, "Text"],
-                                      True if notesDF.loc[note, "Completed"] == 'Yes' else False,
-                                      None if notesDF.loc[
-                                                  note, "Completion Date"] == 'None' else datetime.datetime.strptime(
-                                          notesDF.loc[note, "Creation Date"], '%Y-%m-%d %H:%M:%S.%f'))
-
-                    # Simultaneously add note object to class attribute to keep track of newly added notes
-                    UserInterface.noteObjectList[int(notesDF.loc[note, "Note ID"])] = noteObject
+            # Notes are parsed one record at a time straight into note objects; in lazy mode note texts stay in file;
+            # Only notes not existing in program already are restored, to avoid overwriting any possible updated note
+            restoredNotesList = [[noteObject.ID, noteObject.title, 'Yes' if noteObject.isCompleted else 'No']
+                                 for noteObject in UserInterface.store.restore(malformedLines)]
 
             # In case of updates done to any note, user must save notes using menu option first,
             # before expecting to see those changes in file
 
+            if malformedLines:
+                print('\nWARNING : Skipped ' + str(len(malformedLines)) + ' malformed record(s) in file (line/offset '
+                      + ', '.join(map(str, malformedLines[:10])) + (', ...' if len(malformedLines) > 10 else '')
+                      + ').')
+
             print('\nSUCCESS : All notes restored.')
-            print('\nHere is the list of notes present in the file:\n')
-            print(notesDF)
+            print('\nHere is the list of notes restored from the file:\n')
+            print(tabulate(restoredNotesList, ["ID", "Note Title", "Completed"]))
             print("\nTo see the list of all notes present in the session now and read any note, enter '2'.")
 
         except FileNotFoundError:
@@ -505,14 +472,14 @@ class userInterface:
 
             return
 
+    @operation
     def handle_show_stats(self):
         """
         Display notes statistics focussing note completion
         :return: None
         """
-        notesTotalCount = len(UserInterface.noteObjectList)
-
-        notesIncompleteCount = 0
+        # Counters are kept up to date on every change, so notes are not scanned here
+        notesTotalCount = UserInterface.store.count()
 
         print('\nTotal number of notes created: ' + str(notesTotalCount))
 
@@ -521,77 +488,216 @@ class userInterface:
 
             return
 
-        for noteObject in list(UserInterface.noteObjectList.values()):
-            if not noteObject.isCompleted:
-                notesIncompleteCount += 1
+        # Distributions are computed over columns of note dates
+        statsSummary = UserInterface.store.stats()
+        notesIncompleteCount = statsSummary['incomplete']
 
         print('Total number notes not completed: ' + str(notesIncompleteCount))
         # Calculating and rounding to prettify result
         print('% of notes not completed: ' + str(round(100 * (notesIncompleteCount / notesTotalCount), 2)) + '%')
 
+        print('% of notes completed: ' + str(statsSummary['completion rate']) + '%')
+
+        if statsSummary['histogram']:
+            print('\nNumber of days it took to complete notes:\n')
+            print(tabulate(statsSummary['histogram'], ["Days", "Notes"]))
+
+            print('\nPercentiles of days it took to complete notes:\n')
+            print(tabulate([[str(percentile) + 'th', round(days, 2)] for percentile, days in
+                            statsSummary['percentiles']], ["Percentile", "Days"]))
+
+        print('\nNotes created and completed by month of creation:\n')
+        print(tabulate(statsSummary['periods'], ["Month", "Created", "Completed"]))
+
+    @operation
+    def handle_search(self):
+        """
+        Takes search words from user;
+        Displays notes best matching them, ranked by relevance
+        :return: None
+        """
+        if not UserInterface.store.count():
+            print("\nERROR : No notes have been created yet! To create a note, enter '1'.\nIf notes have been "
+                  "previously stored in a file, enter '8' to restore contents to program.")
+
+            return
+
+        queryInput = input("\nEnter search words (end a word with '*' to match words starting with it) : ")
+
+        searchResults = UserInterface.store.search(queryInput)
+
+        if not searchResults:
+            print('\nNo notes match the search words.')
+
+            return
+
+        print('\nHere are the notes best matching the search words:\n')
+        print(tabulate([[ID, UserInterface.store.get(ID).title, round(score, 2)] for ID, score in searchResults],
+                       ["ID", "Note Title", "Relevance"]))
+        print("\nTo read any of these notes, enter '2'.")
+
+    @operation
+    def handle_undo_redo(self):
+        """
+        Display second menu item; Undoes most recent change made in session, or redoes most recently undone change;
+        Undone and redone changes are saved like any other change
+        :return: None
+        """
+        print("\nWhat do you want to do: \n(For example, enter '1' to undo last change.)")
+        print('\n1. Undo last change.')
+        print('2. Redo last undone change.')
+        print('3. Exit.')
+
+        # Similar code for checking wrong input
+        wrongInputCheck = True
+
+        while wrongInputCheck:
+            userSecondInput = input('\nEnter selection: ')
+
+            if userSecondInput not in ['1', '2', '3']:
+                print('\nERROR : Invalid Input!\nEnter from one of the options above (Integers ranging 1-3).')
+
+            else:
+                wrongInputCheck = False
+
+        if userSecondInput == '3':
+            # In user selected 'Exit' option
+            print('\nGoing to the main menu...')
+
+            return
+
+        action = 'undo' if userSecondInput == '1' else 'redo'
+        result = UserInterface.store.undo() if action == 'undo' else UserInterface.store.redo()
+
+        if result is None:
+            print('\nNOTE : There is no change to ' + action + '.')
+
+            return
+
+        ID, noteObject = result
+
+        if noteObject is None:
+            print('\nSUCCESS : Note ID ' + str(ID) + ' has been deleted by ' + action + '.')
+
+            return
+
+        print('\nSUCCESS : Note ID ' + str(ID) + ' is back to this version:\n')
+        print(tabulate(list(map(list, noteObject.get_all_data().items())), ["Attribute", "Value"]))
+
+    @operation
+    def handle_show_note_as_of(self):
+        """
+        Takes note ID and date and time from user;
+        Displays note as it was at that time, from history of changes made in session
+        :return: None
+        """
+        try:
+            idInput = int(input('\nEnter note ID: '))
+
+            dateInput = input("Enter date and time (YYYY-MM-DD HH:MM:SS) ('2018-12-31 18:30:00' for 6:30 PM on 31st "
+                              "December 2018) : ")
+
+            # Convert date string to datetime object
+            dateInput = datetime.datetime.strptime(dateInput, '%Y-%m-%d %H:%M:%S')
+
+        except ValueError:
+            print('\nERROR : Invalid Input! Please enter a valid note ID number and date in the specified format.')
+            print('Starting Over...')
+
+            return
+
+        try:
+            noteObject = UserInterface.store.note_as_of(idInput, dateInput)
+
+        except LookupError as error:
+            # Changes older than retention of history are dropped
+            print('\nERROR : ' + str(error))
+            print('Starting Over...')
+
+            return
+
+        if noteObject is None:
+            print('\nNOTE : Note ID ' + str(idInput) + ' did not exist at that time.')
+
+            return
+
+        print('\nHere is note ID ' + str(idInput) + ' as it was at ' + str(dateInput) + ':\n')
+        print(tabulate(list(map(list, noteObject.get_all_data().items())), ["Attribute", "Value"]))
+
+    @operation
     def print_notes_list(self):
         """
         Displays list of all notes if 'userChoice' isn't '5' or '6';
-        Displays list of completed and non-completed notes separately
-        :return: (bool) True if 'noteObjectList' is empty, False otherwise
+        Displays list of completed and non-completed notes separately;
+        Notes are displayed one page at a time
+        :return: (bool) True if no notes are present, False otherwise
         """
-        noteObjectList = UserInterface.noteObjectList
-
-        if not list(noteObjectList.keys()):
+        if not UserInterface.store.count():
             print("\nERROR : No notes have been created yet! To create a note, enter '1'.\nIf notes have been "
                   "previously stored in a file, enter '8' to restore contents to program.")
 
             return True
 
         elif (self.userChoice != '5') and (self.userChoice != '6'):
-            print('\nHere is the list of all notes available:\n')
-
-            noteKeys = list(noteObjectList.keys())
-
-            noteValues = []
+            UserInterface.print_notes_pages(self, 'Here is the list of all notes available:')
 
-            for noteObject in list(noteObjectList.values()):
-                noteValues.append(noteObject.title)
+            return False
 
-            allNotesDict = dict(zip(noteKeys, noteValues))
+        else:
+            UserInterface.print_notes_pages(self, 'Here is the list of all non-completed notes:', isCompleted=False)
 
-            print(tabulate(list(map(list, allNotesDict.items())), ["ID", "Note Title"]))
+            UserInterface.print_notes_pages(self, 'Here is the list of all completed notes:', isCompleted=True)
 
             return False
 
-        else:
-            nonCompletedNotesDict = {}
+    def print_notes_pages(self, heading, isCompleted=None):
+        """
+        Displays notes one page at a time, rendering only notes on current page;
+        Asks user whether to display next page
+        :param heading: (str) Text displayed above first page
+        :param isCompleted: (bool) True for completed notes only, False for non-completed notes only, None for all
+        :return: None
+        """
+        print('\n' + heading + '\n')
 
-            completedNotesDict = {}
+        cursor = 0
 
-            for noteObject in list(noteObjectList.values()):
-                if not noteObject.isCompleted:
-                    nonCompletedNotesDict[noteObject.ID] = noteObject.title
+        while True:
+            notesPage, cursor = UserInterface.store.page(cursor, isCompleted=isCompleted)
 
-                else:
-                    completedNotesDict[noteObject.ID] = noteObject.title
+            print(tabulate(page_rows(notesPage), ["ID", "Note Title"]))
 
-            print('\nHere is the list of all non-completed notes:\n')
-            print(tabulate(list(map(list, nonCompletedNotesDict.items())), ["ID", "Note Title"]))
+            # Stop at last page, or when user does not ask for more
+            if cursor is None:
+                return
 
-            print('\nHere is the list of all completed notes:\n')
-            print(tabulate(list(map(list, completedNotesDict.items())), ["ID", "Note Title"]))
+            if input("\nEnter 'n' to see next page of notes, or press Enter to continue: ").lower() != 'n':
+                return
 
-            return False
+            print()
 
     def is_note_present(self, idInput):
         """
-        Checks if concerned note is present in 'noteObjectList'
+        Checks if concerned note is present in session
         :param idInput: (int) Note ID entered by user
         :return: (bool) True if note is present, False otherwise
         """
-        if idInput in list(UserInterface.noteObjectList.keys()):
+        if idInput in UserInterface.store.noteObjectList:
             return True
 
         else:
             print("\nERROR : Note not found!\nAbove is the list of notes available.")
+
+            # Look note up in index of saved notes to point user to restoration
+            if UserInterface.store.is_saved(idInput):
+                print("NOTE : This note is saved in file. To restore notes saved in file, enter '8'.")
+
             print('Starting Over...')
 
             return False
 
+
+# Handlers refer to class by this name
+UserInterface = userInterface
+
 # This is end of script.